@@ -199,6 +199,10 @@ CONSTANCE_CONFIG = {
         24,
         "How many hours before sending another late to Delivery notficiation",
     ),
+    "NOTIFICATION_FANOUT_DEFERRED": (
+        False,
+        "Create notifications for their recipients in the background (within a minute) instead of during the request that triggered them.",
+    ),
     # Default days to TQA/PQA/Delivery
     "DAYS_TO_TQA": (
         0,
@@ -212,6 +216,11 @@ CONSTANCE_CONFIG = {
         7,
         "How many days after the last testing/reporting slot should a job be due to Delivery.",
     ),
+    # Scheduler history
+    "SCHEDULE_HISTORY_RETENTION_DAYS": (
+        180,
+        "How many days scheduler changes stay in the history panel (and can be undone) before being archived. 0 keeps them forever.",
+    ),
     # Work settings
     "DEFAULT_HOURS_IN_DAY": (7.5, "Default hours in a work day"),
     # Schedule thresholds (% of scoped time scheduled)
@@ -556,6 +565,8 @@ BOOTSTRAP_DATEPICKER_PLUS = {
 DJANGO_CRON_DELETE_LOGS_OLDER_THAN = 14
 DJANGO_CRON_LOCK_BACKEND = "django_cron.backends.lock.file.FileLock"
 CRON_CLASSES = [
+    "notifications.tasks.task_apply_subscription_rules",
+    "notifications.tasks.task_process_notification_fanouts",
     "notifications.tasks.task_send_email_notifications",
     "chaotica_utils.tasks.task_clean_historical_records",
     "chaotica_utils.tasks.task_sync_global_permissions",
@@ -568,8 +579,11 @@ CRON_CLASSES = [
     "jobtracker.tasks.task_fire_job_notifications",
     "jobtracker.tasks.task_fire_onboarding_reminders",
     "jobtracker.tasks.task_check_qualification_expiry",
+    "jobtracker.tasks.task_compact_schedule_history",
+    "jobtracker.tasks.task_refresh_service_readiness",
     "rm_sync.tasks.task_sync_rm_schedule",
     "reporting.tasks.task_send_scheduled_reports",
+    "reporting.tasks.task_run_queued_reports",
 ]
 
 REST_FRAMEWORK = {
@@ -407,6 +407,7 @@ class CustomConfigForm(ConstanceForm):
                             "Site Status",
                             "MAINTENANCE_MODE",
                             "EMAIL_ENABLED",
+                            "NOTIFICATION_FANOUT_DEFERRED",
                             help="Operational toggles affecting the whole site.",
                         ),
                         sect(
@@ -0,0 +1,179 @@
+"""
+Management command to benchmark the utilisation day maths.
+
+Compares the historical pure-Python day walk (users x days, then a per-slot
+``while`` loop) against the vectorised DayOccupancy engine on synthetic data,
+checks both produce the same counts, and prints the timings. No database
+access.
+
+Usage:
+    python manage.py benchmark_utilisation --users 500 --days 365
+"""
+
+import random
+import time
+from collections import defaultdict
+from datetime import date, timedelta
+
+from django.core.management.base import BaseCommand, CommandError
+
+from chaotica_utils.utils.utilisation import DayOccupancy
+
+CONFIRMED_STATUS = 6
+COUNT_KEYS = (
+    "working_days",
+    "non_working_days",
+    "holiday_days",
+    "scheduled_days",
+    "tentative_days",
+    "confirmed_days",
+    "non_delivery_days",
+)
+
+
+def _python_counts(user_ids, countries, holidays_by_country, slots, start, end, working_days):
+    """The pre-vectorisation algorithm, kept verbatim in spirit for comparison."""
+    date_range = []
+    current = start
+    while current <= end:
+        date_range.append(current)
+        current += timedelta(days=1)
+
+    slots_by_user = defaultdict(list)
+    for slot in slots:
+        slots_by_user[slot["user_id"]].append(slot)
+
+    results = {}
+    for user_id in user_ids:
+        user_holidays = holidays_by_country[countries[user_id]]
+        working = non_working = holiday = 0
+        for day in date_range:
+            if day in user_holidays:
+                holiday += 1
+            elif (day.weekday() + 1) not in working_days:
+                non_working += 1
+            else:
+                working += 1
+
+        days_with_slots = defaultdict(lambda: [False, False, False])
+        for slot in slots_by_user.get(user_id, []):
+            current = max(slot["start"], start)
+            slot_end = min(slot["end"], end)
+            while current <= slot_end:
+                if (current.weekday() + 1) in working_days and current not in user_holidays:
+                    if slot["phase_id"] is None:
+                        days_with_slots[current][2] = True
+                    elif slot["status"] < CONFIRMED_STATUS:
+                        days_with_slots[current][0] = True
+                    else:
+                        days_with_slots[current][1] = True
+                current += timedelta(days=1)
+
+        results[user_id] = {
+            "working_days": working,
+            "non_working_days": non_working,
+            "holiday_days": holiday,
+            "scheduled_days": len(days_with_slots),
+            "tentative_days": sum(1 for d in days_with_slots.values() if d[0]),
+            "confirmed_days": sum(1 for d in days_with_slots.values() if d[1]),
+            "non_delivery_days": sum(1 for d in days_with_slots.values() if d[2]),
+        }
+    return results
+
+
+def _vectorised_counts(user_ids, countries, holidays_by_country, slot_days, start, end, working_days):
+    occupancy = DayOccupancy(user_ids, start, end, working_days)
+    users_by_country = defaultdict(list)
+    for user_id in user_ids:
+        users_by_country[countries[user_id]].append(user_id)
+    for country, country_users in users_by_country.items():
+        occupancy.add_holidays(country_users, holidays_by_country[country])
+    occupancy.add_slot_days(slot_days, CONFIRMED_STATUS)
+    counts = occupancy.counts()
+    return {
+        user_id: {key: int(counts[key][row]) for key in COUNT_KEYS}
+        for row, user_id in enumerate(user_ids)
+    }
+
+
+class Command(BaseCommand):
+    help = "Benchmark pure-Python vs vectorised utilisation day counting"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--users", type=int, default=500)
+        parser.add_argument("--days", type=int, default=365)
+        parser.add_argument(
+            "--slots-per-user", type=int, default=60, help="Synthetic slots per user"
+        )
+        parser.add_argument("--repeat", type=int, default=3)
+        parser.add_argument("--seed", type=int, default=1)
+
+    def handle(self, *args, **options):
+        rng = random.Random(options["seed"])
+        start = date(2026, 1, 5)
+        end = start + timedelta(days=options["days"] - 1)
+        working_days = [1, 2, 3, 4, 5]
+
+        country_codes = ["GB", "US", "DE", "FR", "IE"]
+        holidays_by_country = {
+            code: {
+                start + timedelta(days=rng.randrange(options["days"]))
+                for _ in range(12)
+            }
+            for code in country_codes
+        }
+        user_ids = list(range(1, options["users"] + 1))
+        countries = {u: rng.choice(country_codes) for u in user_ids}
+
+        slots = []
+        slot_days = []
+        for user_id in user_ids:
+            for _ in range(options["slots_per_user"]):
+                first = start + timedelta(days=rng.randrange(-5, options["days"]))
+                last = first + timedelta(days=rng.randrange(0, 10))
+                phase_id = rng.choice([None, 1, 2])
+                status = rng.choice([4, 5, 6, 8]) if phase_id else None
+                slots.append({
+                    "user_id": user_id, "start": first, "end": last,
+                    "phase_id": phase_id, "status": status,
+                })
+                # The occupancy store holds these pre-expanded at write time.
+                day = max(first, start)
+                while day <= min(last, end):
+                    slot_days.append((user_id, day, phase_id, status))
+                    day += timedelta(days=1)
+
+        timings = {}
+        results = {}
+        for name, func, data in (
+            ("python", _python_counts, slots),
+            ("vectorised", _vectorised_counts, slot_days),
+        ):
+            best = None
+            for _ in range(options["repeat"]):
+                began = time.perf_counter()
+                results[name] = func(
+                    user_ids, countries, holidays_by_country, data,
+                    start, end, working_days,
+                )
+                elapsed = time.perf_counter() - began
+                best = elapsed if best is None else min(best, elapsed)
+            timings[name] = best
+
+        if results["python"] != results["vectorised"]:
+            raise CommandError("Vectorised counts differ from the Python day walk")
+
+        self.stdout.write(
+            "{} users x {} days, {} slots ({} slot-days)".format(
+                len(user_ids), options["days"], len(slots), len(slot_days)
+            )
+        )
+        for name, elapsed in timings.items():
+            self.stdout.write("  {:<11} {:8.1f} ms".format(name, elapsed * 1000))
+        self.stdout.write(
+            self.style.SUCCESS(
+                "Counts match; vectorised is {:.1f}x faster".format(
+                    timings["python"] / timings["vectorised"]
+                )
+            )
+        )
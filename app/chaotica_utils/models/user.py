@@ -1,6 +1,6 @@
 from django.db import models
-from django.db.models import Q, Count, When, Case, Value, Avg
-from django.db.models.functions import Lower, TruncDate
+from django.db.models import Q, Count, Avg
+from django.db.models.functions import Lower
 from django.contrib.auth.models import AbstractUser, Permission
 from django.templatetags.static import static
 import uuid, os, pytz, json
@@ -27,7 +27,6 @@ from constance import config
 from django.template.loader import render_to_string
 import django.core.mail
 from geopy.geocoders import Nominatim
-import pandas as pd
 from django.db.models.signals import post_save
 from django.dispatch import receiver
 from ..utils import get_sentinel_user
@@ -63,6 +62,9 @@ class Group(django.contrib.auth.models.Group):
                         assign_perm(perm, self, None)
                     except Permission.DoesNotExist:
                         pass  # ignore this for the moment!
+                from jobtracker import permission_scope
+
+                permission_scope.invalidate_all()
                 return True
 
         # If we reach this; this group isn't matched with a global role in code
@@ -360,6 +362,9 @@ class User(AbstractUser):
         from jobtracker.models.qualification import QualificationRecord
 
         QualificationRecord.objects.filter(user=user_to_merge).update(user=self)
+        from jobtracker import service_readiness
+
+        service_readiness.refresh_users([self.pk])
         ## Service
         from jobtracker.models.service import Service
 
@@ -371,6 +376,14 @@ class User(AbstractUser):
         from jobtracker.models.timeslot import TimeSlot
 
         TimeSlot.objects.filter(user=user_to_merge).update(user=self)
+        from jobtracker.models.timeslot import TimeSlotDay
+
+        TimeSlotDay.objects.filter(user=user_to_merge).update(user=self)
+        from jobtracker import schedule_cache
+
+        # update() skips the TimeSlot signals: drop both users' cached slots
+        # (and free-run indexes, which share the same generation token)
+        schedule_cache.invalidate_users_on_commit([self.pk, user_to_merge.pk])
 
         # If we have got this far... delete the target user!
         user_to_merge.delete()
@@ -1494,6 +1507,8 @@ class User(AbstractUser):
         """
         # Prepare holiday bits
         from .models import Holiday
+        from ..utils.utilisation import DayOccupancy
+        from jobtracker.occupancy import occupied_days
 
         holidays = Holiday.objects.filter(
             country=self.country, date__range=(start_date, end_date)
@@ -1506,159 +1521,32 @@ class User(AbstractUser):
         # Prepare org working_days
         if not org and self.unit_memberships.count() >0:
             org = self.unit_memberships.first().unit
+        if org:
             working_days = org.businessHours_days
         else:
             working_days = json.loads(config.DEFAULT_WORKING_DAYS)
 
-        # First, get all timeslots that overlap with our date range
-        timeslots = self.timeslots.filter(
-            start__date__lte=end_date, end__date__gte=start_date
-        ).annotate(
-            date=TruncDate("start"),
-            # Calculate if slot is tentative (phase status < 6)
-            is_tentative=Case(
-                When(
-                    phase__status__lt=PhaseStatuses.SCHEDULED_CONFIRMED, then=Value(1)
-                ),
-                When(
-                    phase__status__gte=PhaseStatuses.SCHEDULED_CONFIRMED, then=Value(0)
-                ),
-                When(phase__isnull=True, then=Value(0)),
-                default=Value(0),
-                output_field=models.IntegerField(),
-            ),
-            # Calculate if slot is confirmed (phase status >= 6)
-            is_confirmed=Case(
-                When(
-                    phase__status__gte=PhaseStatuses.SCHEDULED_CONFIRMED, then=Value(1)
-                ),
-                When(
-                    phase__status__lt=PhaseStatuses.SCHEDULED_CONFIRMED, then=Value(0)
-                ),
-                When(phase__isnull=True, then=Value(0)),
-                default=Value(0),
-                output_field=models.IntegerField(),
-            ),
-            # Calculate if slot has no phase (non-delivery)
-            is_non_delivery=Case(
-                When(phase__isnull=True, then=Value(1)),
-                default=Value(0),
-                output_field=models.IntegerField(),
-            ),
-        )
-
-        # Create a DataFrame with all dates in range
-        date_range = pd.date_range(start=start_date, end=end_date, freq="D")
-        dates_df = pd.DataFrame({"date": date_range})
-        # Convert to date (not datetime)
-        dates_df["date"] = dates_df["date"].dt.date
-
-        # Add holiday indicator
-        dates_df["is_holiday"] = dates_df["date"].apply(
-            lambda x: 1 if x in holiday_dates else 0
-        )
-        dates_df["is_working_day"] = dates_df["date"].apply(
-            lambda x: 1 if (x.weekday() + 1) in working_days else 0
-        )
-
-        # Convert timeslots to DataFrame for easier date-wise aggregation
-        slots_data = []
-        for slot in timeslots:
-            # Generate a row for each day the slot spans
-            current_date = max(slot.start.date(), start_date.date())
-            end_date_slot = min(slot.end.date(), end_date.date())
-
-            while current_date <= end_date_slot:
-                # Skip holidays when counting utilization
-                if (
-                    current_date.weekday() + 1
-                ) in working_days and current_date not in holiday_dates:
-                    slots_data.append(
-                        {
-                            "date": current_date,
-                            "is_tentative": slot.is_tentative,
-                            "is_confirmed": slot.is_confirmed,
-                            "is_non_delivery": slot.is_non_delivery,
-                        }
-                    )
-                current_date += timedelta(days=1)
-
-        slots_df = pd.DataFrame(slots_data)
-
-        # If we have any slots, merge and calculate daily statistics
-        if len(slots_df) > 0:
-            # Group by date and aggregate
-            daily_stats = (
-                slots_df.groupby("date")
-                .agg(
-                    {
-                        "is_tentative": "sum",
-                        "is_confirmed": "sum",
-                        "is_non_delivery": "sum",
-                    }
-                )
-                .reset_index()
-            )
-
-            # Merge with full date range
-            final_df = dates_df.merge(daily_stats, on="date", how="left").fillna(0)
-        else:
-            # If no slots, create empty statistics
-            final_df = dates_df.copy()
-            final_df["is_tentative"] = 0
-            final_df["is_confirmed"] = 0
-            final_df["is_non_delivery"] = 0
-
-        # Calculate statistics
-        total_days = len(date_range)
-        holiday_days = len(final_df[final_df["is_holiday"] > 0])
-        non_working_days = len(final_df[final_df["is_working_day"] == 0])
-
-        work_days = len(
-            final_df[(final_df["is_holiday"] == 0) & (final_df["is_working_day"] == 1)]
-        )
-
-        # Only count scheduled days on working days that aren't holidays
-        scheduled_days = len(
-            final_df[
-                (final_df["is_holiday"] == 0)
-                & (final_df["is_working_day"] == 1)
-                & (
-                    (final_df["is_tentative"] > 0)
-                    | (final_df["is_confirmed"] > 0)
-                    | (final_df["is_non_delivery"] > 0)
-                )
-            ]
+        # Vectorised day maths over the per-day occupancy store
+        occupancy = DayOccupancy([self.pk], start_date, end_date, working_days)
+        occupancy.add_holidays([self.pk], holiday_dates)
+        occupancy.add_slot_days(
+            occupied_days([self.pk], occupancy.start_date, occupancy.end_date),
+            PhaseStatuses.SCHEDULED_CONFIRMED,
         )
+        counts = occupancy.counts()
+        work_days = int(counts["working_days"][0])
+        scheduled_days = int(counts["scheduled_days"][0])
 
         data = {
-            "total_days": total_days,
+            "total_days": counts["total_days"],
             "working_days": work_days,
-            "non_working_days": non_working_days,
-            "holiday_days": holiday_days,
+            "non_working_days": counts["non_working_weekdays"],
+            "holiday_days": int(counts["holiday_days"][0]),
             "available_days": work_days - scheduled_days,
             "scheduled_days": scheduled_days,
-            "tentative_days": len(
-                final_df[
-                    (final_df["is_holiday"] == 0)
-                    & (final_df["is_working_day"] == 1)
-                    & (final_df["is_tentative"] > 0)
-                ]
-            ),
-            "confirmed_days": len(
-                final_df[
-                    (final_df["is_holiday"] == 0)
-                    & (final_df["is_working_day"] == 1)
-                    & (final_df["is_confirmed"] > 0)
-                ]
-            ),
-            "non_delivery_days": len(
-                final_df[
-                    (final_df["is_holiday"] == 0)
-                    & (final_df["is_working_day"] == 1)
-                    & (final_df["is_non_delivery"] > 0)
-                ]
-            ),
+            "tentative_days": int(counts["tentative_days"][0]),
+            "confirmed_days": int(counts["confirmed_days"][0]),
+            "non_delivery_days": int(counts["non_delivery_days"][0]),
         }
 
         ## Calculate percentages
@@ -1,8 +1,8 @@
 from django.db import models
 from django.contrib.auth.models import BaseUserManager
 from django.db.models import (
-    Q, Count, Sum, Case, When, Value, IntegerField,
-    DateField, F, Prefetch, Exists, OuterRef, BooleanField
+    Q, Count, Sum, IntegerField,
+    DateField, F, Prefetch, Exists, OuterRef
 )
 from django.db.models.functions import TruncDate
 from datetime import timedelta, datetime
@@ -51,28 +51,9 @@ class CustomUserManager(BaseUserManager):
         user.save(using=self._db)
         return user
         
-    def calculate_bulk_utilization(self, user_queryset, start_date, end_date, org=None, _user_dict=None):
-        """
-        Calculate utilization statistics for multiple users efficiently.
-        
-        Args:
-            user_queryset: QuerySet of users to analyze
-            start_date: datetime object for the start of the period
-            end_date: datetime object for the end of the period
-            org: Optional organizational unit for working days
-            
-        Returns:
-            dict: {
-                'summary': aggregate statistics across all users,
-                'by_user': detailed breakdown per user
-            }
-        """
-        from chaotica_utils.models import Holiday
-        from jobtracker.models import TimeSlot
-        from jobtracker.enums import PhaseStatuses
-        from .user import User
-        
-        # Ensure timezone-aware datetimes
+    @staticmethod
+    def _aware_range(start_date, end_date):
+        """Make a (start, end) pair timezone-aware, spanning whole days."""
         if not start_date.tzinfo:
             start_date = timezone.make_aware(
                 datetime.combine(start_date, datetime.min.time())
@@ -81,160 +62,92 @@ class CustomUserManager(BaseUserManager):
             end_date = timezone.make_aware(
                 datetime.combine(end_date, datetime.max.time())
             )
-        
-        user_ids = list(user_queryset.values_list('id', flat=True))
+        return start_date, end_date
 
-        if _user_dict is None:
-            _user_dict = {
-                u.id: u
-                for u in User.objects.filter(id__in=user_ids).select_related(
-                    'manager', 'acting_manager', 'city', 'city__country'
-                ).prefetch_related('unit_memberships__unit')
-            }
+    def _load_user_dict(self, user_ids):
+        from .user import User
+
+        return {
+            u.id: u
+            for u in User.objects.filter(id__in=user_ids).select_related(
+                'manager', 'acting_manager', 'city', 'city__country'
+            ).prefetch_related('unit_memberships__unit')
+        }
+
+    def _load_day_occupancy(self, user_dict, user_ids, start_date, end_date, org=None):
+        """
+        Load holidays and occupied days for ``user_ids`` over the window into a
+        vectorised :class:`~chaotica_utils.utils.utilisation.DayOccupancy`.
+
+        Two queries (holidays, occupancy store) regardless of how many users,
+        days or slots; every count is then an array reduction.
+        """
+        from chaotica_utils.models import Holiday
+        from chaotica_utils.utils.utilisation import DayOccupancy
+        from jobtracker.occupancy import occupied_days
+        from jobtracker.enums import PhaseStatuses
 
-        user_dict = _user_dict
-        
         # Get working days configuration
         if org:
             working_days = org.businessHours_days
         else:
             working_days = json.loads(config.DEFAULT_WORKING_DAYS)
-        
-        # Get unique countries for all users
-        user_countries = {u.country for u in user_dict.values()}
-        
+
+        occupancy = DayOccupancy(user_ids, start_date, end_date, working_days)
+
+        # Group users by country so each country's holidays are applied once
+        users_by_country = defaultdict(list)
+        for user_id in user_ids:
+            users_by_country[user_dict[user_id].country].append(user_id)
+
         # Fetch ALL holidays in a single query
         holidays = Holiday.objects.filter(
-            Q(country__in=user_countries) | Q(country__isnull=True),
-            date__range=(start_date.date(), end_date.date())
-        ).values('country', 'date')
-        
-        # Build holiday lookup by country
+            Q(country__in=list(users_by_country)) | Q(country__isnull=True),
+            date__range=(occupancy.start_date, occupancy.end_date)
+        ).values_list('country', 'date')
+
         holidays_by_country = defaultdict(set)
         global_holidays = set()
-        
-        for holiday in holidays:
-            if holiday['country'] is None:
-                global_holidays.add(holiday['date'])
+        for country, day in holidays:
+            if country is None:
+                global_holidays.add(day)
             else:
-                holidays_by_country[holiday['country']].add(holiday['date'])
-        
-        # Add global holidays to all countries
-        for country in user_countries:
-            holidays_by_country[country].update(global_holidays)
-        
-        # Generate date range
-        date_range = []
-        current = start_date.date()
-        while current <= end_date.date():
-            date_range.append(current)
-            current += timedelta(days=1)
-        
-        total_days = len(date_range)
-        
-        # Fetch ALL timeslots in a SINGLE query with proper annotations
-        timeslots = TimeSlot.objects.filter(
-            user_id__in=user_ids,
-            start__date__lte=end_date.date(),
-            end__date__gte=start_date.date()
-        ).select_related(
-            'phase'
-        ).annotate(
-            is_tentative=Case(
-                When(phase__isnull=False, 
-                     phase__status__lt=PhaseStatuses.SCHEDULED_CONFIRMED, 
-                     then=Value(True)),
-                default=Value(False),
-                output_field=BooleanField()
-            ),
-            is_confirmed=Case(
-                When(phase__isnull=False,
-                     phase__status__gte=PhaseStatuses.SCHEDULED_CONFIRMED,
-                     then=Value(True)),
-                default=Value(False),
-                output_field=BooleanField()
-            ),
-            is_non_delivery=Case(
-                When(phase__isnull=True, then=Value(True)),
-                default=Value(False),
-                output_field=BooleanField()
+                holidays_by_country[country].add(day)
+
+        for country, country_users in users_by_country.items():
+            occupancy.add_holidays(
+                country_users,
+                holidays_by_country.get(country, set()) | global_holidays,
             )
-        ).values(
-            'user_id',
-            'start',
-            'end',
-            'is_tentative',
-            'is_confirmed',
-            'is_non_delivery'
+
+        # Occupied days come pre-expanded from the per-day occupancy store
+        occupancy.add_slot_days(
+            occupied_days(user_ids, occupancy.start_date, occupancy.end_date),
+            PhaseStatuses.SCHEDULED_CONFIRMED,
         )
-        
-        # Group timeslots by user_id in memory
-        slots_by_user = defaultdict(list)
-        for slot in timeslots:
-            slots_by_user[slot['user_id']].append(slot)
-        
-        # Process statistics for each user
+        return occupancy
+
+    def _utilisation_from_occupancy(self, occupancy, user_dict, start_date, end_date):
+        """Build the calculate_bulk_utilization() result for a (sub-)window."""
+        counts = occupancy.counts(occupancy.window(start_date, end_date))
+        total_days = counts['total_days']
+
+        def safe_percentage(numerator, denominator):
+            return round((numerator / denominator * 100), 2) if denominator > 0 else 0
+
         user_stats = {}
         summary_totals = defaultdict(int)
-        
-        for user_id in user_ids:
+
+        for row, user_id in enumerate(occupancy.user_ids):
             user = user_dict[user_id]
-            user_holidays = holidays_by_country.get(user.country, set())
-            user_holidays.update(global_holidays)
-            
-            # Calculate working days for this user
-            working_days_count = 0
-            non_working_days_count = 0
-            holiday_days_count = 0
-            
-            for date in date_range:
-                is_holiday = date in user_holidays
-                is_working_day = (date.weekday() + 1) in working_days
-                
-                if is_holiday:
-                    holiday_days_count += 1
-                elif not is_working_day:
-                    non_working_days_count += 1
-                else:
-                    working_days_count += 1
-            
-            # Process timeslots for this user
-            user_slots = slots_by_user.get(user_id, [])
-            days_with_slots = defaultdict(lambda: {
-                'tentative': False,
-                'confirmed': False,
-                'non_delivery': False
-            })
-            
-            for slot in user_slots:
-                # Calculate which days this slot spans
-                slot_start = max(slot['start'].date(), start_date.date())
-                slot_end = min(slot['end'].date(), end_date.date())
-                
-                current_date = slot_start
-                while current_date <= slot_end:
-                    # Skip non-working days and holidays
-                    if (current_date.weekday() + 1) in working_days and \
-                       current_date not in user_holidays:
-                        if slot['is_tentative']:
-                            days_with_slots[current_date]['tentative'] = True
-                        if slot['is_confirmed']:
-                            days_with_slots[current_date]['confirmed'] = True
-                        if slot['is_non_delivery']:
-                            days_with_slots[current_date]['non_delivery'] = True
-                    current_date += timedelta(days=1)
-            
-            # Count days by type
-            scheduled_days = len(days_with_slots)
-            tentative_days = sum(1 for d in days_with_slots.values() if d['tentative'])
-            confirmed_days = sum(1 for d in days_with_slots.values() if d['confirmed'])
-            non_delivery_days = sum(1 for d in days_with_slots.values() if d['non_delivery'])
+            working_days_count = int(counts['working_days'][row])
+            non_working_days_count = int(counts['non_working_days'][row])
+            scheduled_days = int(counts['scheduled_days'][row])
+            tentative_days = int(counts['tentative_days'][row])
+            confirmed_days = int(counts['confirmed_days'][row])
+            non_delivery_days = int(counts['non_delivery_days'][row])
             available_days = working_days_count - scheduled_days
-            
-            # Calculate percentages
-            def safe_percentage(numerator, denominator):
-                return round((numerator / denominator * 100), 2) if denominator > 0 else 0
-            
+
             user_data = {
                 'user_id': user.id,
                 'user': user,
@@ -244,7 +157,7 @@ class CustomUserManager(BaseUserManager):
                 'total_days': total_days,
                 'working_days': working_days_count,
                 'non_working_days': non_working_days_count,
-                'holiday_days': holiday_days_count,
+                'holiday_days': int(counts['holiday_days'][row]),
                 'available_days': available_days,
                 'scheduled_days': scheduled_days,
                 'tentative_days': tentative_days,
@@ -269,7 +182,7 @@ class CustomUserManager(BaseUserManager):
                 summary_totals[key] += user_data[key]
         
         # Calculate summary statistics
-        num_users = len(user_ids)
+        num_users = len(occupancy.user_ids)
         total_working_days = summary_totals['working_days']
         
         summary = {
@@ -297,7 +210,63 @@ class CustomUserManager(BaseUserManager):
                 'end': end_date
             }
         }
-    
+
+    def calculate_bulk_utilization(self, user_queryset, start_date, end_date, org=None, _user_dict=None):
+        """
+        Calculate utilization statistics for multiple users efficiently.
+        
+        Args:
+            user_queryset: QuerySet of users to analyze
+            start_date: datetime object for the start of the period
+            end_date: datetime object for the end of the period
+            org: Optional organizational unit for working days
+            
+        Returns:
+            dict: {
+                'summary': aggregate statistics across all users,
+                'by_user': detailed breakdown per user
+            }
+        """
+        start_date, end_date = self._aware_range(start_date, end_date)
+        user_ids = list(user_queryset.values_list('id', flat=True))
+
+        if _user_dict is None:
+            _user_dict = self._load_user_dict(user_ids)
+
+        occupancy = self._load_day_occupancy(
+            _user_dict, user_ids, start_date, end_date, org
+        )
+        return self._utilisation_from_occupancy(
+            occupancy, _user_dict, start_date, end_date
+        )
+
+    def calculate_bulk_utilization_windows(self, user_queryset, windows, org=None):
+        """
+        calculate_bulk_utilization() for several (start, end) windows at once.
+
+        Occupancy is loaded once over the union of the windows and each window
+        is sliced out of the same arrays.
+
+        Returns:
+            list: one calculate_bulk_utilization() result per window, in order
+        """
+        windows = [self._aware_range(start, end) for start, end in windows]
+        if not windows:
+            return []
+        user_ids = list(user_queryset.values_list('id', flat=True))
+        user_dict = self._load_user_dict(user_ids)
+        occupancy = self._load_day_occupancy(
+            user_dict,
+            user_ids,
+            min(start for start, _ in windows),
+            max(end for _, end in windows),
+            org,
+        )
+        return [
+            self._utilisation_from_occupancy(occupancy, user_dict, start, end)
+            for start, end in windows
+        ]
+
     def get_bulk_stats(self, user_queryset, start_date=None, end_date=None, org=None):
         """
         Get comprehensive stats for multiple users efficiently.
@@ -311,8 +280,6 @@ class CustomUserManager(BaseUserManager):
         Returns:
             dict: Statistics including utilization and upcoming availability
         """
-        from datetime import timedelta
-        from django.utils import timezone
         from ..enums import UpcomingAvailabilityRanges
         
         # Set default dates if not provided
@@ -342,34 +309,30 @@ class CustomUserManager(BaseUserManager):
                 datetime.combine(end_date, datetime.max.time())
             )
         
-        # Build the user dict once and reuse across all calculate_bulk_utilization calls
-        from .user import User
+        # Build the user dict once and reuse across every window
         user_ids = list(user_queryset.values_list('id', flat=True))
-        shared_user_dict = {
-            u.id: u
-            for u in User.objects.filter(id__in=user_ids).select_related(
-                'manager', 'acting_manager', 'city', 'city__country'
-            ).prefetch_related('unit_memberships__unit')
-        }
+        shared_user_dict = self._load_user_dict(user_ids)
 
         current_utilization = self.calculate_bulk_utilization(
             user_queryset, start_date, end_date, org, _user_dict=shared_user_dict
         )
 
+        # Every upcoming range starts on the same day, so load the widest one
+        # once and slice the shorter ranges out of the same arrays.
         upcoming_availability = {}
         avail_start = timezone.now() - timedelta(days=timezone.now().weekday())
 
         max_days_ahead = max(UpcomingAvailabilityRanges.DEFAULT.values())
         max_end_date = avail_start + timedelta(days=max_days_ahead)
 
-        all_range_data = self.calculate_bulk_utilization(
-            user_queryset, avail_start, max_end_date, org, _user_dict=shared_user_dict
+        upcoming = self._load_day_occupancy(
+            shared_user_dict, user_ids, avail_start, max_end_date, org
         )
 
         for range_name, days_ahead in UpcomingAvailabilityRanges.DEFAULT.items():
             avail_end = avail_start + timedelta(days=days_ahead)
-            upcoming_availability[range_name] = self.calculate_bulk_utilization(
-                user_queryset, avail_start, avail_end, org, _user_dict=shared_user_dict
+            upcoming_availability[range_name] = self._utilisation_from_occupancy(
+                upcoming, shared_user_dict, avail_start, avail_end
             )
         
         return {
@@ -390,27 +353,25 @@ class CustomUserManager(BaseUserManager):
         Returns:
             list: Weekly availability data
         """
-        from django.utils import timezone
-        
         weekly_data = []
         start_date = timezone.now().date()
         start_date = start_date - timedelta(days=start_date.weekday())  # Start of week
-        
-        # Calculate all weeks in one batch if possible
         end_date = start_date + timedelta(weeks=weeks_ahead)
         
-        # Get all data for the entire period
-        full_period_stats = self.calculate_bulk_utilization(
-            user_queryset, start_date, end_date
+        # Load the entire period once, then slice each week out of it
+        user_ids = list(user_queryset.values_list('id', flat=True))
+        user_dict = self._load_user_dict(user_ids)
+        period_start, period_end = self._aware_range(start_date, end_date)
+        occupancy = self._load_day_occupancy(
+            user_dict, user_ids, period_start, period_end
         )
         
-        # Break down by week (this is simplified - you might want to recalculate per week)
         for week in range(weeks_ahead):
             week_start = start_date + timedelta(weeks=week)
             week_end = week_start + timedelta(days=6)
             
-            week_stats = self.calculate_bulk_utilization(
-                user_queryset, week_start, week_end
+            week_stats = self._utilisation_from_occupancy(
+                occupancy, user_dict, *self._aware_range(week_start, week_end)
             )
             
             weekly_data.append({
@@ -173,10 +173,10 @@ class task_update_phase_dates(CronJobBase):
     code = 'chaotica_utils.task_update_phase_dates'
 
     def do(self):
-        from jobtracker.models import Phase
+        from jobtracker import phase_dates
 
-        for phase in Phase.objects.all():
-            phase.update_stored_dates()
+        changed = phase_dates.recompute_all()
+        return "Updated stored dates on {} phase(s)".format(changed)
 
 
 class task_sync_global_permissions(CronJobBase):
@@ -186,9 +186,11 @@ class task_sync_global_permissions(CronJobBase):
 
     def do(self):
         from .models import Group
+        from jobtracker import permission_scope
 
         for group in Group.objects.all():
             group.sync_global_permissions()
+        permission_scope.invalidate_all()
 
 
 class task_sync_role_permissions_to_default(CronJobBase):
@@ -198,12 +200,14 @@ class task_sync_role_permissions_to_default(CronJobBase):
 
     def do(self):
         from jobtracker.models import OrganisationalUnitRole, OrganisationalUnit
+        from jobtracker import permission_scope
 
         for unit in OrganisationalUnitRole.objects.all():
             unit.sync_default_permissions()
         # Now lets clean up the units
         for unit in OrganisationalUnit.objects.all():
             unit.sync_permissions()
+        permission_scope.invalidate_all()
 
 
 class task_sync_role_permissions(CronJobBase):
@@ -213,6 +217,8 @@ class task_sync_role_permissions(CronJobBase):
 
     def do(self):
         from jobtracker.models import OrganisationalUnit
+        from jobtracker import permission_scope
 
         for unit in OrganisationalUnit.objects.all():
-            unit.sync_permissions()
\ No newline at end of file
+            unit.sync_permissions()
+        permission_scope.invalidate_all()
\ No newline at end of file
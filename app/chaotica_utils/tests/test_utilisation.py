@@ -0,0 +1,60 @@
+from datetime import date, timedelta
+
+from django.test import SimpleTestCase
+
+from chaotica_utils.utils.utilisation import DayOccupancy
+
+CONFIRMED = 6
+# 2026-03-02 is a Monday; the window covers two full weeks.
+MONDAY = date(2026, 3, 2)
+
+
+class DayOccupancyTests(SimpleTestCase):
+    def _occupancy(self):
+        return DayOccupancy([10, 20], MONDAY, MONDAY + timedelta(days=13), [1, 2, 3, 4, 5])
+
+    def test_working_and_holiday_days(self):
+        occ = self._occupancy()
+        # Wednesday holiday for user 10, Saturday holiday for user 20
+        occ.add_holidays([10], {MONDAY + timedelta(days=2)})
+        occ.add_holidays([20], {MONDAY + timedelta(days=5)})
+        counts = occ.counts()
+        self.assertEqual(counts["total_days"], 14)
+        self.assertEqual(list(counts["working_days"]), [9, 10])
+        self.assertEqual(list(counts["holiday_days"]), [1, 1])
+        # Holidays take precedence over non-working days
+        self.assertEqual(list(counts["non_working_days"]), [4, 3])
+        self.assertEqual(counts["non_working_weekdays"], 4)
+
+    def test_slot_days_are_classified(self):
+        occ = self._occupancy()
+        occ.add_holidays([10], {MONDAY + timedelta(days=1)})
+        occ.add_slot_days(
+            [
+                (10, MONDAY, None, None),  # non-delivery
+                (10, MONDAY, 5, 4),  # tentative, same day
+                (10, MONDAY + timedelta(days=1), 5, CONFIRMED),  # holiday: ignored
+                (10, MONDAY + timedelta(days=5), 5, CONFIRMED),  # weekend: ignored
+                (20, MONDAY + timedelta(days=3), 7, CONFIRMED),
+                (99, MONDAY, None, None),  # unknown user: ignored
+                (20, MONDAY + timedelta(days=30), None, None),  # outside window
+            ],
+            CONFIRMED,
+        )
+        counts = occ.counts()
+        self.assertEqual(list(counts["scheduled_days"]), [1, 1])
+        self.assertEqual(list(counts["tentative_days"]), [1, 0])
+        self.assertEqual(list(counts["confirmed_days"]), [0, 1])
+        self.assertEqual(list(counts["non_delivery_days"]), [1, 0])
+
+    def test_sub_window(self):
+        occ = self._occupancy()
+        occ.add_slot_days([(20, MONDAY + timedelta(days=8), None, None)], CONFIRMED)
+        first_week = occ.counts(occ.window(MONDAY, MONDAY + timedelta(days=6)))
+        second_week = occ.counts(
+            occ.window(MONDAY + timedelta(days=7), MONDAY + timedelta(days=20))
+        )
+        self.assertEqual(first_week["total_days"], 7)
+        self.assertEqual(list(first_week["scheduled_days"]), [0, 0])
+        self.assertEqual(second_week["total_days"], 7)
+        self.assertEqual(list(second_week["scheduled_days"]), [0, 1])
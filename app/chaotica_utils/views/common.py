@@ -429,6 +429,19 @@ def log_system_activity(ref_obj, msg, author=None):
     return new_note
 
 
+def log_system_activity_many(entries, author=None):
+    """log_system_activity() for many ``(ref_obj, msg)`` pairs in one insert."""
+    from simple_history.utils import bulk_create_with_history
+
+    notes = [
+        Note(content=msg, is_system_note=True, author=author, content_object=ref_obj)
+        for ref_obj, msg in entries
+    ]
+    if not notes:
+        return []
+    return bulk_create_with_history(notes, Note, default_user=author)
+
+
 @require_safe
 def get_quote(request):
     lines = json.load(
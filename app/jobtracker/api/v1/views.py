@@ -16,7 +16,6 @@ from ...models import (
     Client,
     Job,
     OrganisationalUnit,
-    OrganisationalUnitMember,
     Phase,
     Project,
     Qualification,
@@ -28,6 +27,7 @@ from ...models import (
     TimeSlotType,
     UserSkill,
 )
+from ...permission_scope import unit_ids, viewable_user_ids
 from .base import BaseReadOnlyAPIViewSet
 from .serializers import (
     ClientSerializer,
@@ -71,10 +71,9 @@ class OrganisationalUnitViewSet(BaseReadOnlyAPIViewSet):
         return OrganisationalUnit.objects.all()
 
     def scope_queryset(self, queryset, user):
-        allowed = get_objects_for_user(
-            user, "jobtracker.view_organisationalunit", klass=OrganisationalUnit
+        return queryset.filter(
+            pk__in=unit_ids(user, "jobtracker.view_organisationalunit")
         )
-        return queryset.filter(pk__in=allowed.values_list("pk", flat=True))
 
 
 class ClientViewSet(BaseReadOnlyAPIViewSet):
@@ -195,13 +194,7 @@ class TimeSlotViewSet(BaseReadOnlyAPIViewSet):
     def scope_queryset(self, queryset, user):
         # Mirrors the scheduler feeds: visible = members of units where the
         # requester holds view_users_schedule, plus the requester's own slots.
-        units = get_objects_for_user(
-            user, "jobtracker.view_users_schedule", klass=OrganisationalUnit
-        )
-        member_ids = OrganisationalUnitMember.objects.filter(
-            unit__in=units
-        ).values_list("member_id", flat=True)
-        return queryset.filter(Q(user_id__in=member_ids) | Q(user=user)).distinct()
+        return queryset.filter(user_id__in=viewable_user_ids(user))
 
 
 # ---------------------------------------------------------------------------
@@ -219,9 +212,7 @@ class LeaveRequestViewSet(BaseReadOnlyAPIViewSet):
 
     def scope_queryset(self, queryset, user):
         # Exactly the manage_leave visibility clause.
-        units = get_objects_for_user(
-            user, "can_view_all_leave_requests", klass=OrganisationalUnit
-        )
+        units = unit_ids(user, "can_view_all_leave_requests")
         return queryset.filter(
             Q(user__unit_memberships__unit__in=units)
             | Q(user__manager=user)
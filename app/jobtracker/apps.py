@@ -66,6 +66,11 @@ class JobtrackerConfig(AppConfig):
 
         # Import signal handlers
         from . import signals  # noqa: F401
+        from .signals import occupancy  # noqa: F401
+        from .signals import permission_scope  # noqa: F401
+        from .signals import schedule_cache  # noqa: F401
+        from .signals import service_readiness  # noqa: F401
+        from .signals import workflow_queue  # noqa: F401
 
         try:
             from .signals import skill_cache  # noqa: F401
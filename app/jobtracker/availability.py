@@ -0,0 +1,186 @@
+"""Per-user free-run index for the scheduling assistant's window search.
+
+A :class:`FreeRunIndex` holds a user's bookable working days over a horizon
+(org business days that are not holidays and not occupied by any slot) as a
+sorted ordinal array, split into runs wherever an occupied working day breaks
+availability. Non-working days and holidays never break a run, matching the
+booking "around" mode. "Earliest window of N working days on or after D" is
+then a bisect plus a segment-tree descent over run lengths, so many lookups
+against the same person (different phases, lengths or start dates) are
+logarithmic instead of a day-by-day scan.
+
+Indexes are built from the :mod:`jobtracker.occupancy` day store and cached
+per user under the :mod:`jobtracker.schedule_cache` generation token, so any
+slot change for that user (scheduler actions, TimeSlot saves/deletes) drops
+the cached index.
+"""
+import hashlib
+from bisect import bisect_left, bisect_right
+from datetime import date, timedelta
+
+from django.core.cache import cache
+
+from . import occupancy, schedule_cache
+
+INDEX_CACHE_TIMEOUT = 60 * 60
+
+_INDEX_KEY = "avail_idx_{}_{}_{}_{}_{}"
+
+
+class FreeRunIndex:
+    def __init__(self, start, end, business_days, holidays, occupied):
+        """
+        Args:
+            start / end: inclusive date horizon the index covers
+            business_days: ISO weekdays (Monday == 1) the user works
+            holidays: dates that are not worked
+            occupied: dates with any slot booked
+        """
+        self.start = start
+        self.end = end
+        business_days = set(business_days)
+        days = []
+        run_starts = []
+        in_run = False
+        current = start
+        while current <= end:
+            if (current.weekday() + 1) in business_days and current not in holidays:
+                if current in occupied:
+                    in_run = False
+                else:
+                    if not in_run:
+                        run_starts.append(len(days))
+                        in_run = True
+                    days.append(current.toordinal())
+            current += timedelta(days=1)
+        self._days = days
+        self._run_starts = run_starts
+        self._run_ends = [s - 1 for s in run_starts[1:]] + ([len(days) - 1] if days else [])
+
+        # Max segment tree over run lengths (leaves padded with zeros)
+        size = 1
+        while size < max(len(run_starts), 1):
+            size *= 2
+        self._size = size
+        tree = [0] * (2 * size)
+        for r, (first, last) in enumerate(zip(self._run_starts, self._run_ends)):
+            tree[size + r] = last - first + 1
+        for node in range(size - 1, 0, -1):
+            tree[node] = max(tree[2 * node], tree[2 * node + 1])
+        self._tree = tree
+
+    def _range_max(self, lo, hi):
+        """Longest run among runs ``lo..hi`` inclusive (0 if empty)."""
+        best = 0
+        lo += self._size
+        hi += self._size + 1
+        while lo < hi:
+            if lo & 1:
+                best = max(best, self._tree[lo])
+                lo += 1
+            if hi & 1:
+                hi -= 1
+                best = max(best, self._tree[hi])
+            lo //= 2
+            hi //= 2
+        return best
+
+    def _first_at_least(self, lo, hi, length, node=1, node_lo=0, node_hi=None):
+        """First run in ``lo..hi`` at least ``length`` long, or None."""
+        if node_hi is None:
+            node_hi = self._size - 1
+        if node_hi < lo or node_lo > hi or self._tree[node] < length:
+            return None
+        if node_lo == node_hi:
+            return node_lo
+        mid = (node_lo + node_hi) // 2
+        found = self._first_at_least(lo, hi, length, 2 * node, node_lo, mid)
+        if found is None:
+            found = self._first_at_least(lo, hi, length, 2 * node + 1, mid + 1, node_hi)
+        return found
+
+    def earliest(self, required, on_or_after=None, until=None):
+        """First run of ``required`` bookable working days in ``[on_or_after, until]``.
+
+        Same contract as the historical linear scan: ``(start, end, required)``
+        when found, otherwise ``(None, None, longest_run_in_range)``.
+        """
+        on_or_after = max(on_or_after or self.start, self.start)
+        until = min(until or self.end, self.end)
+        first = bisect_left(self._days, on_or_after.toordinal())
+        last = bisect_right(self._days, until.toordinal()) - 1
+        if first > last:
+            return None, None, 0
+
+        first_run = bisect_right(self._run_starts, first) - 1
+        last_run = bisect_right(self._run_starts, last) - 1
+        head = min(self._run_ends[first_run], last) - first + 1
+        if head >= required:
+            return self._window(first, required)
+        if last_run == first_run:
+            return None, None, head
+
+        # Whole runs strictly between the (clipped) first and last
+        found = None
+        if last_run - first_run > 1:
+            found = self._first_at_least(first_run + 1, last_run - 1, required)
+        if found is not None:
+            return self._window(self._run_starts[found], required)
+        tail = last - self._run_starts[last_run] + 1
+        if tail >= required:
+            return self._window(self._run_starts[last_run], required)
+        middle = (
+            self._range_max(first_run + 1, last_run - 1) if last_run - first_run > 1 else 0
+        )
+        return None, None, max(head, middle, tail)
+
+    def _window(self, index, required):
+        return (
+            date.fromordinal(self._days[index]),
+            date.fromordinal(self._days[index + required - 1]),
+            required,
+        )
+
+
+def _calendar_digest(business_days, holidays):
+    raw = repr((sorted(business_days), sorted(d.toordinal() for d in holidays)))
+    return hashlib.md5(raw.encode(), usedforsecurity=False).hexdigest()[:12]
+
+
+def indexes_for_users(calendars, start, end):
+    """``{user_id: FreeRunIndex}`` over ``[start, end]`` for each user.
+
+    ``calendars`` maps user_id -> ``(business_days, holidays)``. Cached indexes
+    are reused; the rest are built from one occupancy query.
+    """
+    if not calendars:
+        return {}
+    versions = schedule_cache.user_versions(list(calendars))
+    keys = {}
+    for user_id, (business_days, holidays) in calendars.items():
+        key = _INDEX_KEY.format(
+            user_id,
+            start.toordinal(),
+            end.toordinal(),
+            _calendar_digest(business_days, holidays),
+            versions[user_id],
+        )
+        keys[key] = user_id
+    found = cache.get_many(list(keys))
+    indexes = {keys[key]: index for key, index in found.items()}
+
+    missing = [user_id for key, user_id in keys.items() if key not in found]
+    if missing:
+        occupied = {user_id: set() for user_id in missing}
+        for user_id, day, _, _ in occupancy.occupied_days(missing, start, end):
+            occupied[user_id].add(day)
+        fresh = {}
+        for key, user_id in keys.items():
+            if key in found:
+                continue
+            business_days, holidays = calendars[user_id]
+            index = FreeRunIndex(start, end, business_days, holidays, occupied[user_id])
+            indexes[user_id] = index
+            fresh[key] = index
+        cache.set_many(fresh, timeout=INDEX_CACHE_TIMEOUT)
+    return indexes
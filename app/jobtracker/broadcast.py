@@ -5,28 +5,241 @@ Called from :func:`jobtracker.schedule_history.record` (and, transitively,
 job group, and the global board; a job-scoped change reaches the job group and
 global; an unscoped change reaches only global. Guarded so a missing/broken
 channel layer never breaks the originating mutation.
+
+Live deltas use a compact wire format (``"v": 2``), built once per action and
+shared by every group:
+
+* a slot whose only changes are ``start``/``end``/``user_id`` (moves, shifts,
+  swaps) is sent as a partial upsert ``{"id", "p": 1, "userId", ...}`` carrying
+  just the changed values, built from the action payload without a query;
+* other upserts are loaded in one query and sent without the keys the client
+  can rebuild: the slot type name and text colour travel once per message in
+  the ``types`` / ``colours`` dictionaries;
+* ``users`` lists every user the upserts belong to, so a viewer whose
+  permitted set covers it skips per-slot filtering.
+
+:class:`~jobtracker.consumers.ScheduleConsumer` coalesces the deltas a
+connection receives within :data:`COALESCE_WINDOW` into one frame
+(:func:`coalesce_deltas`).
+
+A committed action never changes, so its delta is cached by action id for the
+``?since=`` polling fallback (:func:`cached_deltas`), and the newest action id
+per group is kept as that scope's "head" so an idle poll can answer without a
+query (:func:`scope_head`).
 """
 from asgiref.sync import async_to_sync
 from channels.layers import get_channel_layer
+from django.core.cache import cache
 
 from . import schedule_history
+from .models import TimeSlot, TimeSlotComment
+from .utils import _scheduler_colours
+
+DELTA_VERSION = 2
+# Seconds a connection holds deltas before sending them as one frame
+COALESCE_WINDOW = 0.25
+# Snapshot fields a partial upsert can carry, and their wire keys
+_PARTIAL_FIELDS = {"start": "start", "end": "end", "user_id": "userId"}
+DELTA_CACHE_TIMEOUT = 60 * 60
+# Heads expire so a racing commit can't leave one stale for long
+HEAD_TIMEOUT = 60
+
+_DELTA_KEY = "sched_delta_{}"
+_HEAD_KEY = "sched_head_{}"
+# get_schedule_json keys rebuilt client-side from the dictionaries / the record
+_DERIVED_KEYS = ("resourceId", "slot_type_name", "textColor", "classNames", "display", "icon")
+
+
+def scope_group(job_id=None, phase_id=None):
+    """Broadcast group for a viewer's scope (the narrowest one given)."""
+    if phase_id:
+        return "schedule_phase_{}".format(phase_id)
+    if job_id:
+        return "schedule_job_{}".format(job_id)
+    return "schedule_global"
 
 
 def _target_groups(action):
     groups = ["schedule_global"]
     if action.job_id:
-        groups.append("schedule_job_{}".format(action.job_id))
+        groups.append(scope_group(job_id=action.job_id))
     if action.phase_id:
-        groups.append("schedule_phase_{}".format(action.phase_id))
+        groups.append(scope_group(phase_id=action.phase_id))
     return groups
 
 
+def scope_head(group):
+    """Newest action id committed to ``group``, or None if not cached."""
+    return cache.get(_HEAD_KEY.format(group))
+
+
+def seed_scope_head(group, action_id):
+    """Record ``group``'s head from a query, unless a commit already set it."""
+    cache.add(_HEAD_KEY.format(group), action_id, HEAD_TIMEOUT)
+
+
+def cached_deltas(actions):
+    """Compact deltas for ``actions`` (same order), built once per action."""
+    keys = {_DELTA_KEY.format(action.pk): action for action in actions}
+    found = cache.get_many(list(keys))
+    missing = {
+        key: build_compact_delta(action)
+        for key, action in keys.items()
+        if key not in found
+    }
+    if missing:
+        cache.set_many(missing, DELTA_CACHE_TIMEOUT)
+        found.update(missing)
+    return [found[key] for key in keys]
+
+
+def _key(upsert):
+    return (bool(upsert.get("is_comment")), upsert["id"])
+
+
+def _partial(item):
+    """Partial upsert for a start/end/user-only update, else None."""
+    before, after = item["before"], item["after"]
+    if before is None or after is None:
+        return None
+    changed = {name for name in after if after[name] != before.get(name)}
+    if not changed or not changed <= set(_PARTIAL_FIELDS):
+        return None
+    upsert = {"id": item["pk"], "p": 1, "userId": after["user_id"]}
+    if item["model"] == "timeslotcomment":
+        upsert["is_comment"] = True
+    for name in changed:
+        upsert[_PARTIAL_FIELDS[name]] = after[name]
+    return upsert
+
+
+def _compact(data, types, colours):
+    """Strip a get_schedule_json dict down to what the client can't rebuild."""
+    data = schedule_history._jsonable(data)
+    colour = data.pop("backgroundColor", None) or data.pop("color", None)
+    if colour:
+        colours[colour] = data.get("textColor")
+        data["c"] = colour
+    if data.get("slot_type_ID") is not None:
+        types[str(data["slot_type_ID"])] = data.get("slot_type_name")
+    for key in _DERIVED_KEYS:
+        data.pop(key, None)
+    return data
+
+
+def build_compact_delta(action):
+    """Compact live delta for a committed ScheduleAction (see module docs)."""
+    upserts = []
+    removals = []
+    full = {"timeslot": [], "timeslotcomment": []}
+    for item in action.payload:
+        if item["after"] is None:
+            removals.append({"is_comment": item["model"] == "timeslotcomment", "id": item["pk"]})
+            continue
+        partial = _partial(item)
+        if partial is not None:
+            upserts.append(partial)
+        else:
+            full[item["model"]].append(item["pk"])
+
+    types, colours = {}, {}
+    if full["timeslot"] or full["timeslotcomment"]:
+        schedule_colours = _scheduler_colours()
+        for slot in TimeSlot.objects.filter(pk__in=full["timeslot"]).select_related(
+            "phase__job__client", "project", "slot_type", "user"
+        ):
+            upserts.append(
+                _compact(slot.get_schedule_json(schedule_colours=schedule_colours), types, colours)
+            )
+        for comment in TimeSlotComment.objects.filter(
+            pk__in=full["timeslotcomment"]
+        ).select_related("user"):
+            upserts.append(
+                _compact(comment.get_schedule_json(schedule_colours=schedule_colours), types, colours)
+            )
+    return {
+        "v": DELTA_VERSION,
+        "action_ids": [action.pk],
+        "users": sorted({u["userId"] for u in upserts}),
+        "types": types,
+        "colours": colours,
+        "upserts": upserts,
+        "removals": removals,
+    }
+
+
+def coalesce_deltas(deltas):
+    """Merge compact deltas, in commit order, into one.
+
+    The last state of each slot wins: a partial upsert is folded into an earlier
+    upsert of the same slot, a removal drops any earlier upsert and a later
+    upsert cancels an earlier removal.
+    """
+    if len(deltas) == 1:
+        return deltas[0]
+    upserts = {}
+    removals = {}
+    action_ids, types, colours = [], {}, {}
+    for delta in deltas:
+        action_ids.extend(delta["action_ids"])
+        types.update(delta["types"])
+        colours.update(delta["colours"])
+        for removal in delta["removals"]:
+            key = (bool(removal["is_comment"]), removal["id"])
+            upserts.pop(key, None)
+            removals[key] = removal
+        for upsert in delta["upserts"]:
+            key = _key(upsert)
+            removals.pop(key, None)
+            if upsert.get("p") and key in upserts:
+                upserts[key] = {**upserts[key], **{k: v for k, v in upsert.items() if k != "p"}}
+            else:
+                upserts[key] = upsert
+    return {
+        "v": DELTA_VERSION,
+        "action_ids": action_ids,
+        "users": sorted({u["userId"] for u in upserts.values()}),
+        "types": types,
+        "colours": colours,
+        "upserts": list(upserts.values()),
+        "removals": list(removals.values()),
+    }
+
+
+def filter_compact_delta(delta, viewable_user_pks):
+    """Restrict a compact delta to the users a global-scope viewer may see.
+
+    ``None`` means the whole scope is authorised. Upserts for anyone else become
+    removals, so a slot moved to a hidden user disappears rather than going
+    stale (removing an unknown item is a client-side no-op).
+    """
+    if viewable_user_pks is None or viewable_user_pks.issuperset(delta["users"]):
+        return delta
+    upserts = []
+    removals = list(delta["removals"])
+    for upsert in delta["upserts"]:
+        if upsert["userId"] in viewable_user_pks:
+            upserts.append(upsert)
+        else:
+            removals.append({"is_comment": bool(upsert.get("is_comment")), "id": upsert["id"]})
+    return {
+        **delta,
+        "users": sorted({u["userId"] for u in upserts}),
+        "upserts": upserts,
+        "removals": removals,
+    }
+
+
 def broadcast_action(action):
+    delta = build_compact_delta(action)
+    groups = _target_groups(action)
+    cache.set(_DELTA_KEY.format(action.pk), delta, DELTA_CACHE_TIMEOUT)
+    cache.set_many({_HEAD_KEY.format(group): action.pk for group in groups}, HEAD_TIMEOUT)
+
     layer = get_channel_layer()
     if layer is None:
         return
-    delta = schedule_history.build_delta(action)
     message = {"type": "schedule.delta", "delta": delta}
     send = async_to_sync(layer.group_send)
-    for group in _target_groups(action):
+    for group in groups:
         send(group, message)
@@ -0,0 +1,200 @@
+"""Business-hours arithmetic for timeslots.
+
+:class:`BusinessCalendar` answers "how many billable hours between ``start``
+and ``end``" in constant time from a handful of precomputed second offsets (the
+working window, the lunch window and the weekday count between two dates),
+instead of calling ``businessDuration`` and then walking the slot day by day to
+subtract lunch.
+
+Calendars are immutable and memoised on their defining values (working window,
+lunch window, timezone), so every slot of every user in the same unit shares
+one instance. :func:`slot_hours` resolves the calendars for a whole batch of
+slots with a single membership query; it is what the phase/job totals, the
+utilisation widgets, client framework totals and the reporting resolvers use.
+
+The numbers match the historical ``TimeSlot.get_business_hours``:
+
+* hours are counted Monday-Friday only (``businessDuration``'s default weekend);
+* users without a unit are measured over the whole day, with the default
+  09:00-17:30 window only used to place the lunch break;
+* one "lunch break" is subtracted per calendar day in proportion to how much of
+  the lunch window the slot covers on that day.
+"""
+import datetime
+import functools
+import zoneinfo
+from decimal import Decimal
+
+DEFAULT_START = datetime.time(9, 0)
+DEFAULT_END = datetime.time(17, 30)
+DEFAULT_LUNCH_START = datetime.time(12, 0)
+DEFAULT_LUNCH_END = datetime.time(13, 0)
+
+_DAY = 24 * 60 * 60
+# Monday == 0; matches businessDuration(weekendlist=[5, 6])
+_WORKING_WEEKDAYS = 5
+
+
+def _seconds(value):
+    return value.hour * 3600 + value.minute * 60 + value.second
+
+
+def _overlap(start, end, window_start, window_end):
+    return max(0, min(end, window_end) - max(start, window_start))
+
+
+def _weekdays_before(ordinal):
+    """Monday-Friday days with an ordinal in ``[1, ordinal)`` (day 1 is a Monday)."""
+    weeks, rest = divmod(ordinal - 1, 7)
+    return weeks * _WORKING_WEEKDAYS + min(rest, _WORKING_WEEKDAYS)
+
+
+class BusinessCalendar:
+    def __init__(self, window, lunch_window, lunch, tz_name):
+        """
+        Args:
+            window: ``(start, end)`` seconds-of-day counted as working time
+            lunch_window: ``(start, end)`` seconds-of-day the lunch break is
+                clipped to (the unit's business hours)
+            lunch: ``(start, end)`` seconds-of-day of the lunch break
+            tz_name: IANA name of the timezone the windows are defined in
+        """
+        self.window_start, self.window_end = window
+        self.lunch_window_start, self.lunch_window_end = lunch_window
+        self.lunch_start, self.lunch_end = lunch
+        self.tz = zoneinfo.ZoneInfo(tz_name)
+        self.lunch_hours = (self.lunch_end - self.lunch_start) / 3600
+        self._full_day = self.window_end - self.window_start
+        self._full_day_lunch = _overlap(
+            self.lunch_window_start, self.lunch_window_end, self.lunch_start, self.lunch_end
+        )
+
+    @classmethod
+    def for_unit(cls, unit, fallback_tz="UTC"):
+        """Shared calendar for ``unit`` (``None`` for a user without a unit)."""
+        if unit is None:
+            return _calendar(None, None, None, None, fallback_tz)
+        return _calendar(
+            unit.businessHours_startTime,
+            unit.businessHours_endTime,
+            unit.businessHours_lunch_startTime,
+            unit.businessHours_lunch_endTime,
+            getattr(unit, "businessHours_timezone", None) or fallback_tz,
+        )
+
+    def _lunch(self, start, end):
+        """Lunch breaks (in break units) within the day section ``[start, end]``."""
+        if not self.lunch_hours:
+            return 0
+        start = max(start, self.lunch_window_start)
+        end = min(end, self.lunch_window_end)
+        return _overlap(start, end, self.lunch_start, self.lunch_end) / 3600 / self.lunch_hours
+
+    def hours_between(self, start, end):
+        """Billable hours between two aware datetimes, as a Decimal."""
+        if end < start:
+            return Decimal(0)
+        local_start = start.astimezone(self.tz)
+        local_end = end.astimezone(self.tz)
+        first_ord = local_start.toordinal()
+        last_ord = local_end.toordinal()
+        start_secs = _seconds(local_start)
+        end_secs = _seconds(local_end)
+        first_working = local_start.weekday() < _WORKING_WEEKDAYS
+        last_working = local_end.weekday() < _WORKING_WEEKDAYS
+
+        if first_ord == last_ord:
+            raw = (
+                _overlap(start_secs, end_secs, self.window_start, self.window_end)
+                if first_working
+                else 0
+            )
+            lunch = self._lunch(start_secs, end_secs)
+        else:
+            raw = self._full_day * (
+                _weekdays_before(last_ord) - _weekdays_before(first_ord + 1)
+            )
+            if first_working:
+                raw += _overlap(start_secs, _DAY, self.window_start, self.window_end)
+            if last_working:
+                raw += _overlap(0, end_secs, self.window_start, self.window_end)
+            lunch = self._lunch(start_secs, _DAY) + self._lunch(0, end_secs)
+            if self.lunch_hours:
+                lunch += (
+                    (last_ord - first_ord - 1)
+                    * self._full_day_lunch / 3600 / self.lunch_hours
+                )
+        return Decimal(max(0, raw / 3600 - lunch))
+
+    def hours_many(self, ranges):
+        """:meth:`hours_between` for each ``(start, end)`` in ``ranges``."""
+        return [self.hours_between(start, end) for start, end in ranges]
+
+
+@functools.lru_cache(maxsize=256)
+def _calendar(start, end, lunch_start, lunch_end, tz_name):
+    if start is None:
+        # No unit: the whole day is countable, the default hours only place lunch
+        window = (0, _DAY)
+        lunch_window = (_seconds(DEFAULT_START), _seconds(DEFAULT_END))
+        lunch = (_seconds(DEFAULT_LUNCH_START), _seconds(DEFAULT_LUNCH_END))
+    else:
+        window = lunch_window = (_seconds(start), _seconds(end))
+        lunch = (_seconds(lunch_start), _seconds(lunch_end))
+    return BusinessCalendar(window, lunch_window, lunch, tz_name)
+
+
+def _user_tz(user):
+    return user.pref_timezone or "UTC"
+
+
+def calendar_for_user(user, unit=None):
+    """Calendar for ``user``'s first unit membership (or ``unit`` if given)."""
+    if unit is None:
+        membership = user.unit_memberships.first()
+        unit = membership.unit if membership else None
+    return BusinessCalendar.for_unit(unit, fallback_tz=_user_tz(user))
+
+
+def hours_between_many(rows):
+    """Hours for many ``(start, end, unit)`` tuples; ``unit`` may be ``None``."""
+    return [
+        BusinessCalendar.for_unit(unit).hours_between(start, end)
+        for start, end, unit in rows
+    ]
+
+
+def _first_units(user_ids):
+    """``{user_id: unit}`` for each user's first membership, in one query."""
+    from .models import OrganisationalUnitMember
+
+    units = {}
+    for membership in (
+        OrganisationalUnitMember.objects.filter(member_id__in=user_ids)
+        .select_related("unit")
+        .order_by("member", "pk")
+    ):
+        units.setdefault(membership.member_id, membership.unit)
+    return units
+
+
+def slot_hours(slots):
+    """Business hours for each slot in ``slots`` (a list, in order).
+
+    Units are resolved for all the slots' users at once; the slots' ``user``
+    should already be loaded (``select_related``/prefetch) for the fallback
+    timezone.
+    """
+    slots = list(slots)
+    units = _first_units({slot.user_id for slot in slots})
+    calendars = {}
+    hours = []
+    for slot in slots:
+        calendar = calendars.get(slot.user_id)
+        if calendar is None:
+            calendar = BusinessCalendar.for_unit(
+                units.get(slot.user_id), fallback_tz=_user_tz(slot.user)
+            )
+            calendars[slot.user_id] = calendar
+        hours.append(calendar.hours_between(slot.start, slot.end))
+    return hours
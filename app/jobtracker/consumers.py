@@ -5,15 +5,23 @@ connect we authorise against the same ``view_job_schedule`` permission the
 members/slots read views enforce, then join the scope's broadcast group. When a
 mutation commits a ScheduleAction, :mod:`jobtracker.broadcast` fans the delta out
 to the relevant group(s) and each connected client applies it to its vis DataSet.
+
+Deltas arriving within :data:`~jobtracker.broadcast.COALESCE_WINDOW` of each
+other are merged and sent as one frame, so a burst of commits costs the browser
+one redraw.
 """
+import asyncio
+import time
+
 from channels.generic.websocket import AsyncJsonWebsocketConsumer
 from channels.db import database_sync_to_async
 
 from .utils import (
+    VIEWABLE_CACHE_TIMEOUT,
     can_view_job_schedule as _can_view_job,
-    viewable_schedule_user_pks,
+    cached_viewable_schedule_user_pks,
 )
-from .schedule_history import filter_delta_for_users
+from .broadcast import COALESCE_WINDOW, coalesce_deltas, filter_compact_delta
 
 
 class ScheduleConsumer(AsyncJsonWebsocketConsumer):
@@ -24,6 +32,9 @@ class ScheduleConsumer(AsyncJsonWebsocketConsumer):
     viewable_user_pks = None
 
     async def connect(self):
+        self._pending = []
+        self._flush_task = None
+        self._viewable_at = time.monotonic()
         user = self.scope.get("user")
         if user is None or not user.is_authenticated:
             await self.close()
@@ -39,6 +50,8 @@ class ScheduleConsumer(AsyncJsonWebsocketConsumer):
         await self.accept()
 
     async def disconnect(self, code):
+        if self._flush_task is not None:
+            self._flush_task.cancel()
         if self.group_name:
             await self.channel_layer.group_discard(self.group_name, self.channel_name)
 
@@ -67,10 +80,29 @@ class ScheduleConsumer(AsyncJsonWebsocketConsumer):
         # Global scope — any authenticated user may join, but the shared global
         # broadcast must be filtered to the slots this user could see in the
         # calendar (mirrors the global slots view's view_users_schedule filter).
-        self.viewable_user_pks = viewable_schedule_user_pks(user)
+        self.viewable_user_pks = cached_viewable_schedule_user_pks(user)
         return "schedule_global"
 
+    @database_sync_to_async
+    def _load_viewable_user_pks(self):
+        return cached_viewable_schedule_user_pks(self.scope["user"])
+
     # Group message handler: broadcast.py sends {"type": "schedule.delta", ...}.
     async def schedule_delta(self, event):
-        delta = filter_delta_for_users(event["delta"], self.viewable_user_pks)
-        await self.send_json({"type": "delta", "delta": delta})
+        self._pending.append(event["delta"])
+        if self._flush_task is None:
+            self._flush_task = asyncio.ensure_future(self._flush_later())
+
+    async def _flush_later(self):
+        await asyncio.sleep(COALESCE_WINDOW)
+        deltas, self._pending = self._pending, []
+        self._flush_task = None
+        if (
+            self.viewable_user_pks is not None
+            and time.monotonic() - self._viewable_at > VIEWABLE_CACHE_TIMEOUT
+        ):
+            self.viewable_user_pks = await self._load_viewable_user_pks()
+            self._viewable_at = time.monotonic()
+        delta = filter_compact_delta(coalesce_deltas(deltas), self.viewable_user_pks)
+        if delta["upserts"] or delta["removals"]:
+            await self.send_json({"type": "delta", "delta": delta})
@@ -1,6 +1,6 @@
 from django.core.management.base import BaseCommand
 from django.core.cache import cache
-import hashlib
+from jobtracker import skill_matrix
 
 
 class Command(BaseCommand):
@@ -25,19 +25,16 @@ class Command(BaseCommand):
             self.stdout.write(self.style.SUCCESS('Successfully cleared all cache'))
         else:
             # Clear skills matrix specific cache
-            cache.delete('skill_matrix_filter_options')
-            self.stdout.write(self.style.SUCCESS('Cleared skill matrix filter options cache'))
+            skill_matrix.invalidate()
+            self.stdout.write(self.style.SUCCESS('Cleared skill matrix cache'))
 
+        if options['pattern']:
             # Try to clear pattern-based keys if using Redis
+            pattern = options['pattern']
             try:
                 from django_redis import get_redis_connection
                 con = get_redis_connection("default")
 
-                if options['pattern']:
-                    pattern = options['pattern']
-                else:
-                    pattern = "skill_matrix_*"
-
                 # Find and delete all matching keys
                 keys = con.keys(pattern)
                 if keys:
@@ -47,8 +44,7 @@ class Command(BaseCommand):
                     self.stdout.write(self.style.WARNING(f'No cache keys found matching "{pattern}"'))
 
             except ImportError:
-                self.stdout.write(self.style.WARNING('Redis cache backend not available. Only cleared known keys.'))
-                self.stdout.write(self.style.WARNING('To clear all matrix caches, use --all flag or switch to Redis cache backend.'))
+                self.stdout.write(self.style.WARNING('Redis cache backend not available. Pattern deletion skipped.'))
             except Exception as e:
                 self.stdout.write(self.style.WARNING(f'Could not clear pattern-based cache: {e}'))
 
@@ -0,0 +1,28 @@
+import json
+from datetime import datetime
+
+from django.core.management.base import BaseCommand, CommandError
+from django.utils import timezone
+from django.utils.dateparse import parse_date
+from jobtracker import schedule_retention
+
+
+class Command(BaseCommand):
+    help = "Export the scheduler change log (hot and archived) as JSON lines"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--since", help="Only changes on or after this date (YYYY-MM-DD)")
+        parser.add_argument("--until", help="Only changes before this date (YYYY-MM-DD)")
+
+    def handle(self, *args, **options):
+        bounds = []
+        for name in ("since", "until"):
+            value = options[name]
+            day = parse_date(value) if value else None
+            if value and day is None:
+                raise CommandError("Invalid --{} date: {}".format(name, value))
+            bounds.append(
+                timezone.make_aware(datetime.combine(day, datetime.min.time())) if day else None
+            )
+        for row in schedule_retention.export_actions(*bounds):
+            self.stdout.write(json.dumps(row))
@@ -0,0 +1,31 @@
+from django.core.management.base import BaseCommand
+from jobtracker import occupancy
+
+
+class Command(BaseCommand):
+    help = "Rebuild the per-day timeslot occupancy store used for utilisation stats"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--user",
+            type=int,
+            action="append",
+            dest="users",
+            help="Only rebuild for this user ID (repeatable)",
+        )
+        parser.add_argument(
+            "--chunk-size",
+            type=int,
+            default=occupancy.REBUILD_CHUNK_SIZE,
+            help="Rows per bulk insert",
+        )
+
+    def handle(self, *args, **options):
+        slots, days = occupancy.rebuild(
+            user_ids=options["users"], chunk_size=options["chunk_size"]
+        )
+        self.stdout.write(
+            self.style.SUCCESS(
+                "Rebuilt occupancy for {} timeslots ({} days)".format(slots, days)
+            )
+        )
@@ -0,0 +1,14 @@
+from django.core.management.base import BaseCommand
+from jobtracker import workflow_queue
+
+
+class Command(BaseCommand):
+    help = "Rebuild the due-transition queue used by the workflow progression cron"
+
+    def handle(self, *args, **options):
+        phases, jobs = workflow_queue.rebuild()
+        self.stdout.write(
+            self.style.SUCCESS(
+                "Queued {} phase and {} job transitions".format(phases, jobs)
+            )
+        )
@@ -0,0 +1,96 @@
+# Generated by Django 5.2.12 on 2026-10-18 09:12
+
+from datetime import timedelta
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+from django.utils import timezone
+
+
+# Frozen copy of jobtracker.occupancy.slot_dates as of this migration
+def slot_dates(start, end):
+    def local_date(value):
+        if timezone.is_aware(value):
+            value = timezone.localtime(value, timezone.get_default_timezone())
+        return value.date()
+
+    current = local_date(start)
+    last = local_date(end)
+    dates = []
+    while current <= last:
+        dates.append(current)
+        current += timedelta(days=1)
+    return dates
+
+
+def backfill_timeslot_days(apps, schema_editor):
+    TimeSlot = apps.get_model("jobtracker", "TimeSlot")
+    TimeSlotDay = apps.get_model("jobtracker", "TimeSlotDay")
+
+    rows = []
+    for pk, user_id, start, end in (
+        TimeSlot.objects.values_list("pk", "user_id", "start", "end").iterator(
+            chunk_size=500
+        )
+    ):
+        rows.extend(
+            TimeSlotDay(slot_id=pk, user_id=user_id, date=day)
+            for day in slot_dates(start, end)
+        )
+        if len(rows) >= 500:
+            TimeSlotDay.objects.bulk_create(rows)
+            rows = []
+    if rows:
+        TimeSlotDay.objects.bulk_create(rows)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("jobtracker", "0070_fix_tqa_pqa_scoper_superscoper_permissions"),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="TimeSlotDay",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("date", models.DateField()),
+                (
+                    "slot",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="days",
+                        to="jobtracker.timeslot",
+                    ),
+                ),
+                (
+                    "user",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="occupied_days",
+                        to=settings.AUTH_USER_MODEL,
+                    ),
+                ),
+            ],
+            options={
+                "indexes": [
+                    models.Index(
+                        fields=["user", "date"], name="jt_slotday_user_date_idx"
+                    )
+                ],
+                "unique_together": {("slot", "date")},
+            },
+        ),
+        migrations.RunPython(backfill_timeslot_days, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,116 @@
+# Generated by Django 5.2.12 on 2026-10-18 11:40
+
+from datetime import datetime, timedelta
+
+import django.db.models.deletion
+from django.db import migrations, models
+from django.utils import timezone
+
+# Status values and lead time as of this migration (jobtracker.enums,
+# jobtracker.workflow_queue)
+PHASE_SCHEDULED_CONFIRMED = 3
+PHASE_READY_TO_BEGIN = 6
+JOB_IN_PROGRESS = 7
+PRE_CHECKS_LEAD_DAYS = 6
+
+
+# Frozen copy of jobtracker.workflow_queue.phase_due as of this migration
+def phase_due(status, start_date):
+    def midnight(day):
+        return timezone.make_aware(datetime.combine(day, datetime.min.time()))
+
+    if not start_date:
+        return None
+    if status == PHASE_SCHEDULED_CONFIRMED:
+        return (
+            "to_pre_checks",
+            midnight(start_date - timedelta(days=PRE_CHECKS_LEAD_DAYS)),
+        )
+    if status == PHASE_READY_TO_BEGIN:
+        return "to_in_progress", midnight(start_date)
+    return None
+
+
+def backfill_due_transitions(apps, schema_editor):
+    Phase = apps.get_model("jobtracker", "Phase")
+    Job = apps.get_model("jobtracker", "Job")
+    DueTransition = apps.get_model("jobtracker", "DueTransition")
+
+    rows = []
+    for pk, status, desired_start, stored_start in Phase.objects.filter(
+        status__in=[PHASE_SCHEDULED_CONFIRMED, PHASE_READY_TO_BEGIN]
+    ).values_list("pk", "status", "desired_start_date", "_start_date"):
+        due = phase_due(status, desired_start or stored_start)
+        if due:
+            rows.append(DueTransition(phase_id=pk, transition=due[0], due_at=due[1]))
+    now = timezone.now()
+    rows.extend(
+        DueTransition(job_id=pk, transition="to_complete", due_at=now)
+        for pk in Job.objects.filter(status=JOB_IN_PROGRESS).values_list(
+            "pk", flat=True
+        )
+    )
+    DueTransition.objects.bulk_create(rows, batch_size=500)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("jobtracker", "0071_timeslotday"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="DueTransition",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                (
+                    "transition",
+                    models.CharField(
+                        choices=[
+                            ("to_pre_checks", "Phase to pre-checks"),
+                            ("to_in_progress", "Phase to in progress"),
+                            ("to_complete", "Job to complete"),
+                        ],
+                        max_length=32,
+                    ),
+                ),
+                ("due_at", models.DateTimeField()),
+                (
+                    "job",
+                    models.ForeignKey(
+                        blank=True,
+                        null=True,
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="due_transitions",
+                        to="jobtracker.job",
+                    ),
+                ),
+                (
+                    "phase",
+                    models.ForeignKey(
+                        blank=True,
+                        null=True,
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="due_transitions",
+                        to="jobtracker.phase",
+                    ),
+                ),
+            ],
+            options={
+                "indexes": [
+                    models.Index(fields=["due_at"], name="jt_duetransition_due_idx")
+                ],
+                "unique_together": {("job", "transition"), ("phase", "transition")},
+            },
+        ),
+        migrations.RunPython(backfill_due_transitions, migrations.RunPython.noop),
+    ]
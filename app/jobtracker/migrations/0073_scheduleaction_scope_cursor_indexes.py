@@ -0,0 +1,21 @@
+# Generated by Django 5.2.12 on 2026-10-18 14:05
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("jobtracker", "0072_duetransition"),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="scheduleaction",
+            index=models.Index(fields=["job", "id"], name="jt_schedaction_job_id_idx"),
+        ),
+        migrations.AddIndex(
+            model_name="scheduleaction",
+            index=models.Index(fields=["phase", "id"], name="jt_schedaction_phase_id_idx"),
+        ),
+    ]
@@ -0,0 +1,55 @@
+# Generated by Django 5.2.12 on 2026-10-18 15:20
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("jobtracker", "0073_scheduleaction_scope_cursor_indexes"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="ScheduleActionArchive",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("action_id", models.PositiveBigIntegerField(unique=True)),
+                ("actor_id", models.PositiveBigIntegerField(blank=True, null=True)),
+                ("created", models.DateTimeField(db_index=True)),
+                (
+                    "action_type",
+                    models.CharField(
+                        choices=[
+                            ("CREATE", "Create"),
+                            ("UPDATE", "Update"),
+                            ("DELETE", "Delete"),
+                            ("MOVE", "Move"),
+                            ("CLEAR", "Clear"),
+                            ("BATCH", "Batch"),
+                            ("REVERT", "Revert"),
+                        ],
+                        max_length=16,
+                    ),
+                ),
+                ("job_id", models.PositiveBigIntegerField(blank=True, null=True)),
+                ("phase_id", models.PositiveBigIntegerField(blank=True, null=True)),
+                ("summary", models.TextField(blank=True, default="")),
+                ("payload_compressed", models.BinaryField()),
+                ("reverted", models.BooleanField(default=False)),
+                ("reverted_by_id", models.PositiveBigIntegerField(blank=True, null=True)),
+                ("archived", models.DateTimeField(auto_now_add=True)),
+            ],
+            options={
+                "ordering": ["-created"],
+            },
+        ),
+    ]
@@ -0,0 +1,136 @@
+# Generated by Django 5.2.12 on 2026-10-18 18:40
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+# Enum values as of this migration (jobtracker.enums, ServiceReadiness)
+QUALIFICATION_AWARDED = 6
+RATING_CAN_DO_WITH_SUPPORT = 1
+TIER_INCOMPLETE = 0
+
+
+# Frozen copy of jobtracker.service_readiness.compute as of this migration
+def compute(required_skills, required_quals, ratings, awarded):
+    rows = {}
+    for service_id, skill_ids in required_skills.items():
+        if not skill_ids:
+            continue
+        qual_ids = required_quals.get(service_id, set())
+        for user_id, held in ratings.items():
+            met = skill_ids & held.keys()
+            if not met:
+                continue
+            missing = len(skill_ids) - len(met)
+            tier = min(held[s] for s in skill_ids) if not missing else TIER_INCOMPLETE
+            rows[(service_id, user_id)] = (
+                tier,
+                missing,
+                len(qual_ids - awarded.get(user_id, set())),
+            )
+    return rows
+
+
+def populate_readiness(apps, schema_editor):
+    Service = apps.get_model("jobtracker", "Service")
+    UserSkill = apps.get_model("jobtracker", "UserSkill")
+    QualificationRecord = apps.get_model("jobtracker", "QualificationRecord")
+    ServiceReadiness = apps.get_model("jobtracker", "ServiceReadiness")
+
+    def ids_by_service(through, field):
+        ids = {}
+        for service_id, related_id in through.objects.values_list("service_id", field):
+            ids.setdefault(service_id, set()).add(related_id)
+        return ids
+
+    required_skills = ids_by_service(Service.skillsRequired.through, "skill_id")
+    if not required_skills:
+        return
+    required_quals = ids_by_service(
+        Service.qualificationsRequired.through, "qualification_id"
+    )
+    ratings = {}
+    for user_id, skill_id, rating in UserSkill.objects.filter(
+        skill_id__in=set().union(*required_skills.values()),
+        rating__gte=RATING_CAN_DO_WITH_SUPPORT,
+    ).values_list("user_id", "skill_id", "rating"):
+        ratings.setdefault(user_id, {})[skill_id] = rating
+    awarded = {}
+    for user_id, qual_id in QualificationRecord.objects.filter(
+        status=QUALIFICATION_AWARDED
+    ).values_list("user_id", "qualification_id"):
+        awarded.setdefault(user_id, set()).add(qual_id)
+
+    rows = compute(required_skills, required_quals, ratings, awarded)
+    ServiceReadiness.objects.bulk_create(
+        [
+            ServiceReadiness(
+                service_id=service_id,
+                user_id=user_id,
+                tier=tier,
+                missing_skills=missing_skills,
+                missing_qualifications=missing_quals,
+            )
+            for (service_id, user_id), (tier, missing_skills, missing_quals) in rows.items()
+        ],
+        batch_size=1000,
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("jobtracker", "0074_scheduleactionarchive"),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="ServiceReadiness",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("tier", models.PositiveSmallIntegerField(default=0)),
+                ("missing_skills", models.PositiveSmallIntegerField(default=0)),
+                (
+                    "missing_qualifications",
+                    models.PositiveSmallIntegerField(default=0),
+                ),
+                ("updated_at", models.DateTimeField(auto_now=True)),
+                (
+                    "service",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="readiness",
+                        to="jobtracker.service",
+                    ),
+                ),
+                (
+                    "user",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="service_readiness",
+                        to=settings.AUTH_USER_MODEL,
+                    ),
+                ),
+            ],
+            options={
+                "indexes": [
+                    models.Index(
+                        fields=["service", "tier"],
+                        name="jt_readiness_service_tier_idx",
+                    )
+                ],
+                "unique_together": {("service", "user")},
+            },
+        ),
+        migrations.RunPython(populate_readiness, migrations.RunPython.noop),
+    ]
@@ -1,5 +1,5 @@
-from .common import Link, WorkflowTask, Feedback
-from .service import Service
+from .common import Link, WorkflowTask, Feedback, DueTransition
+from .service import Service, ServiceReadiness
 from .financial import BillingCode
 from .client import Client, ClientOnboarding, Contact, Address, FrameworkAgreement
 
@@ -17,8 +17,8 @@ from .qualification import (
     AwardingBody,
 )
 
-from .timeslot import TimeSlot, TimeSlotType,TimeSlotComment
-from .schedule_action import ScheduleAction, ScheduleActionType
+from .timeslot import TimeSlot, TimeSlotType,TimeSlotComment, TimeSlotDay
+from .schedule_action import ScheduleAction, ScheduleActionArchive, ScheduleActionType
 from .orgunit import (
     OrganisationalUnit,
     OrganisationalUnitMember,
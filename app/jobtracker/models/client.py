@@ -305,9 +305,9 @@ class FrameworkAgreement(models.Model):
         return self.client.hours_in_day
 
     def _slots_to_days(self, slots):
-        total = Decimal()
-        for slot in slots:
-            total += slot.get_business_hours()
+        from ..business_hours import slot_hours
+
+        total = sum(slot_hours(slots.select_related("user")), Decimal())
         hours_in_day = self.get_hours_in_day()
         return round(total / hours_in_day, 1) if hours_in_day else 0
 
@@ -349,6 +349,7 @@ class FrameworkAgreement(models.Model):
         if not frameworks:
             return
         from ..models import TimeSlot
+        from ..business_hours import slot_hours
 
         fw_by_id = {fw.pk: fw for fw in frameworks}
         slots = (
@@ -361,10 +362,11 @@ class FrameworkAgreement(models.Model):
 
         # Accumulate hours per framework
         hours_by_fw = {pk: Decimal() for pk in fw_by_id}
-        for slot in slots:
+        slots = list(slots)
+        for slot, hours in zip(slots, slot_hours(slots)):
             fw_id = slot.phase.job.associated_framework_id
             if fw_id in hours_by_fw:
-                hours_by_fw[fw_id] += slot.get_business_hours()
+                hours_by_fw[fw_id] += hours
 
         for pk, fw in fw_by_id.items():
             hours_in_day = fw.get_hours_in_day()
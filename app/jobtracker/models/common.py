@@ -79,3 +79,49 @@ class Feedback(models.Model):
 
     def __str__(self):
         return "Feedback {} by {}".format(self.body, self.author)
+
+
+class DueTransition(models.Model):
+    """An automatic workflow transition and when it should next be attempted.
+
+    The queue behind ``task_progress_workflows``: see
+    :mod:`jobtracker.workflow_queue`. Rows are derived data — maintained when a
+    phase's dates/status or a job's status change and rebuilt with
+    ``manage.py rebuild_workflow_queue``.
+    """
+
+    TO_PRE_CHECKS = "to_pre_checks"
+    TO_IN_PROGRESS = "to_in_progress"
+    TO_COMPLETE = "to_complete"
+    CHOICES = (
+        (TO_PRE_CHECKS, "Phase to pre-checks"),
+        (TO_IN_PROGRESS, "Phase to in progress"),
+        (TO_COMPLETE, "Job to complete"),
+    )
+
+    phase = models.ForeignKey(
+        Phase,
+        related_name="due_transitions",
+        on_delete=models.CASCADE,
+        null=True,
+        blank=True,
+    )
+    job = models.ForeignKey(
+        "Job",
+        related_name="due_transitions",
+        on_delete=models.CASCADE,
+        null=True,
+        blank=True,
+    )
+    transition = models.CharField(max_length=32, choices=CHOICES)
+    due_at = models.DateTimeField()
+
+    class Meta:
+        unique_together = [["phase", "transition"], ["job", "transition"]]
+        indexes = [
+            models.Index(fields=["due_at"], name="jt_duetransition_due_idx"),
+        ]
+
+    def __str__(self):
+        target = "phase {}".format(self.phase_id) if self.phase_id else "job {}".format(self.job_id)
+        return "{} {} at {}".format(target, self.transition, self.due_at)
@@ -14,6 +14,7 @@ from django.urls import reverse
 from simple_history.models import HistoricalRecords
 from django.db.models import Q
 from django.contrib.contenttypes.fields import GenericRelation
+from model_utils import FieldTracker
 from model_utils.fields import MonitorField
 from django.db.models import JSONField
 from django.contrib import messages
@@ -25,15 +26,14 @@ from chaotica_utils.views import log_system_activity
 from decimal import Decimal
 from django_bleach.models import BleachField
 from constance import config
-from guardian.shortcuts import get_objects_for_user
 
 
 class JobManager(models.Manager):
 
     def jobs_with_unit_permission(self, user, perm):
-        from ..models import OrganisationalUnit
+        from ..permission_scope import unit_ids
 
-        units = get_objects_for_user(user, perm, klass=OrganisationalUnit)
+        units = unit_ids(user, perm)
 
         matches = self.filter(
             Q(unit__in=units),
@@ -83,6 +83,7 @@ class Job(models.Model):
         default=JobStatuses.DRAFT,
     )
     status_changed_date = MonitorField(monitor="status")
+    tracker = FieldTracker(fields=["status"])
     is_imported = models.BooleanField(default=False)
     external_id = models.CharField(
         verbose_name="External ID",
@@ -494,11 +495,10 @@ class Job(models.Model):
     def total_hrs_scheduled(self):
         from ..models import TimeSlot
 
-        slots = TimeSlot.objects.filter(phase__job=self)
-        total = Decimal()
-        for slot in slots:
-            total = total + slot.get_business_hours()
-        return total
+        from ..business_hours import slot_hours
+
+        slots = TimeSlot.objects.filter(phase__job=self).select_related("user")
+        return sum(slot_hours(slots), Decimal())
 
     def total_days_scheduled(self):
         hrs = self.total_hrs_scheduled()
@@ -514,12 +514,12 @@ class Job(models.Model):
     def get_total_scheduled_by_type(self, slot_type):
         from ..models import TimeSlot
 
-        slots = TimeSlot.objects.filter(phase__job=self, deliveryRole=slot_type)
-        total = Decimal()
-        for slot in slots:
-            diff = slot.get_business_hours()
-            total = total + diff
-        return total
+        from ..business_hours import slot_hours
+
+        slots = TimeSlot.objects.filter(
+            phase__job=self, deliveryRole=slot_type
+        ).select_related("user")
+        return sum(slot_hours(slots), Decimal())
 
     def get_all_total_scoped_by_type(self):
         data = dict()
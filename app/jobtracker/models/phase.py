@@ -7,9 +7,10 @@ from django.utils import timezone
 from chaotica_utils.utils import unique_slug_generator
 from django.urls import reverse
 from simple_history.models import HistoricalRecords
-from django.db.models import Q
+from django.db.models import Q, F
 from django.contrib.contenttypes.fields import GenericRelation
 from model_utils.fields import MonitorField
+from model_utils import FieldTracker
 from django.db.models import JSONField
 from bs4 import BeautifulSoup
 from django.contrib import messages
@@ -17,8 +18,9 @@ from chaotica_utils.models import Note, User
 from notifications.enums import NotificationTypes
 from notifications.utils import AppNotification, send_notifications
 from chaotica_utils.views.common import log_system_activity
-from datetime import timedelta
+from datetime import timedelta, timezone as dt_timezone
 from decimal import Decimal
+from django.db.models.functions import Coalesce, TruncDate
 from django_bleach.models import BleachField
 from ..models.job import Job
 from ..enums import (
@@ -28,11 +30,94 @@ from ..enums import (
     FeedbackType,
     JobStatuses,
 )
-from guardian.shortcuts import get_objects_for_user
+
+
+class PhaseQuerySet(models.QuerySet):
+    """Database-side equivalents of the ``is_*_late`` properties.
+
+    Each ``late_*`` filter matches exactly the phases whose property is True
+    today, so the notification cron can fetch late phases in one query instead
+    of evaluating every phase in Python.
+    """
+
+    @staticmethod
+    def _today():
+        # Same clock as the is_*_late properties
+        return timezone.now().today().date()
+
+    def doing_qa(self):
+        """Phases where :meth:`Phase.should_do_qa` is True."""
+        return self.filter(report_to_be_left_on_client_site=False).exclude(
+            number_of_reports=0
+        )
+
+    def _late(self, due, reached_status, reached_field):
+        today = self._today()
+        return (
+            self.doing_qa()
+            .annotate(late_due=due)
+            .filter(late_due__isnull=False)
+            .annotate(
+                late_reached=TruncDate(reached_field, tzinfo=dt_timezone.utc)
+            )
+            .filter(
+                Q(status__lt=reached_status, late_due__lt=today)
+                | Q(late_reached__isnull=False, late_due__lt=F("late_reached"))
+            )
+        )
+
+    def late_prechecks(self):
+        return self.annotate(
+            late_due=Coalesce("desired_start_date", "_start_date")
+        ).filter(status=PhaseStatuses.PRE_CHECKS, late_due__lt=self._today())
+
+    def late_to_tqa(self):
+        return self._late(
+            Coalesce("due_to_techqa_set", "_due_to_techqa"),
+            PhaseStatuses.QA_TECH,
+            "actual_sent_to_tqa_date",
+        )
+
+    def late_to_pqa(self):
+        return self._late(
+            Coalesce("due_to_presqa_set", "_due_to_presqa"),
+            PhaseStatuses.QA_PRES,
+            "actual_sent_to_pqa_date",
+        )
+
+    def late_to_delivery(self):
+        return self._late(
+            Coalesce("desired_delivery_date", "_delivery_date"),
+            PhaseStatuses.DELIVERED,
+            "actual_delivery_date",
+        )
+
+    def notification_due(self, last_fired_field, hours):
+        """Exclude phases notified via ``last_fired_field`` in the last ``hours``."""
+        cutoff = timezone.now() - timedelta(hours=hours)
+        return self.filter(
+            Q(**{last_fired_field + "__isnull": True})
+            | Q(**{last_fired_field + "__lt": cutoff})
+        )
 
 
 class PhaseManager(models.Manager):
 
+    def get_queryset(self):
+        return PhaseQuerySet(self.model, using=self._db)
+
+    def late_prechecks(self):
+        return self.get_queryset().late_prechecks()
+
+    def late_to_tqa(self):
+        return self.get_queryset().late_to_tqa()
+
+    def late_to_pqa(self):
+        return self.get_queryset().late_to_pqa()
+
+    def late_to_delivery(self):
+        return self.get_queryset().late_to_delivery()
+
     def phases_with_unit_permission(
         self,
         user,
@@ -40,9 +125,9 @@ class PhaseManager(models.Manager):
         phase_statuses=PhaseStatuses.ACTIVE_STATUSES,
         job_statuses=JobStatuses.ACTIVE_STATUSES,
     ):
-        from ..models import OrganisationalUnit
+        from ..permission_scope import unit_ids
 
-        units = get_objects_for_user(user, perm, klass=OrganisationalUnit)
+        units = unit_ids(user, perm)
 
         matches = self.filter(
             Q(job__unit__in=units),
@@ -87,6 +172,10 @@ class Phase(models.Model):
     slug = models.SlugField(null=False, default="", unique=True)
     phase_id = models.CharField(max_length=100, unique=True, verbose_name="Phase ID")
     history = HistoricalRecords()
+    # Fields that change how this phase's timeslots render on the scheduler
+    tracker = FieldTracker(
+        fields=["status", "title", "desired_start_date", "_start_date"]
+    )
 
     ################
     ## Main Fields
@@ -443,38 +532,12 @@ class Phase(models.Model):
         if not self.pk:
             return
 
-        # Start date first...
-        # Calculate start from first delivery slot
-        if self.timeslots.filter(deliveryRole=TimeSlotDeliveryRole.DELIVERY).exists():
-            self._start_date = (
-                self.timeslots.filter(deliveryRole=TimeSlotDeliveryRole.DELIVERY)
-                .earliest("start")
-                .start
-            ).date()
-
-        # Now due to *qa
-        # Calculate start from last delivery slot
-        if self.timeslots.filter(
-            Q(deliveryRole=TimeSlotDeliveryRole.REPORTING)
-            | Q(deliveryRole=TimeSlotDeliveryRole.DELIVERY)
-        ).exists():
-            last_delivery_date = (
-                self.timeslots.filter(
-                    Q(deliveryRole=TimeSlotDeliveryRole.REPORTING)
-                    | Q(deliveryRole=TimeSlotDeliveryRole.DELIVERY)
-                )
-                .latest("end")
-                .end
-            ).date()
-            self._due_to_techqa = last_delivery_date + timedelta(
-                days=config.DAYS_TO_TQA
-            )
-            self._due_to_presqa = last_delivery_date + timedelta(
-                days=config.DAYS_TO_PQA
-            )
-            self._delivery_date = last_delivery_date + timedelta(
-                days=config.DAYS_TO_DELIVERY
-            )
+        # One grouped aggregate for first delivery start and last delivery/reporting end
+        from ..phase_dates import apply_bounds, slot_bounds
+
+        bounds = slot_bounds([self.pk]).get(self.pk)
+        if bounds:
+            apply_bounds(self, *bounds)
 
     @property
     def start_date(self):
@@ -745,10 +808,13 @@ class Phase(models.Model):
         # Iterate timeslots.all() which uses the prefetch cache when available,
         # avoiding per-role filter() calls that bypass the cache.
         if not hasattr(self, '_scheduled_totals_cache'):
+            from ..business_hours import slot_hours
+
             totals = {}
-            for slot in self.timeslots.all():
+            slots = list(self.timeslots.all())
+            for slot, hours in zip(slots, slot_hours(slots)):
                 role = slot.deliveryRole
-                totals[role] = totals.get(role, Decimal(0)) + slot.get_business_hours()
+                totals[role] = totals.get(role, Decimal(0)) + hours
             self._scheduled_totals_cache = totals
         return self._scheduled_totals_cache
 
@@ -16,15 +16,14 @@ from datetime import timedelta
 from django.db.models.functions import Lower
 from django_bleach.models import BleachField
 from constance import config
-from guardian.shortcuts import get_objects_for_user
 
 
 class ProjectManager(models.Manager):
 
     def projects_with_unit_permission(self, user, perm):
-        from ..models import OrganisationalUnit
+        from ..permission_scope import unit_ids
 
-        units = get_objects_for_user(user, perm, klass=OrganisationalUnit)
+        units = unit_ids(user, perm)
 
         matches = self.filter(Q(unit__in=units))
         return matches
@@ -1,3 +1,6 @@
+import json
+import zlib
+
 from django.db import models
 from django.conf import settings
 
@@ -67,6 +70,11 @@ class ScheduleAction(models.Model):
 
     class Meta:
         ordering = ["-created"]
+        indexes = [
+            # Delta polling reads a scope's actions after an id cursor
+            models.Index(fields=["job", "id"], name="jt_schedaction_job_id_idx"),
+            models.Index(fields=["phase", "id"], name="jt_schedaction_phase_id_idx"),
+        ]
         permissions = [
             ("revert_any_scheduleaction", "Can revert any schedule change"),
         ]
@@ -133,3 +141,53 @@ class ScheduleAction(models.Model):
             if units and not any(user.has_perm(perm, u) for u in units):
                 return False
         return True
+
+
+class ScheduleActionArchive(models.Model):
+    """Cold storage for ScheduleActions past the retention window.
+
+    Kept for audit export only: archived actions are no longer listed in the
+    history panel and can't be reverted. ``payload`` is stored zlib-compressed;
+    job/phase/actor are plain ids so archiving never cascades.
+    """
+
+    action_id = models.PositiveBigIntegerField(unique=True)
+    actor_id = models.PositiveBigIntegerField(null=True, blank=True)
+    created = models.DateTimeField(db_index=True)
+    action_type = models.CharField(
+        max_length=16, choices=ScheduleActionType.choices
+    )
+    job_id = models.PositiveBigIntegerField(null=True, blank=True)
+    phase_id = models.PositiveBigIntegerField(null=True, blank=True)
+    summary = models.TextField(default="", blank=True)
+    payload_compressed = models.BinaryField()
+    reverted = models.BooleanField(default=False)
+    reverted_by_id = models.PositiveBigIntegerField(null=True, blank=True)
+    archived = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        ordering = ["-created"]
+
+    def __str__(self):
+        return "{} (archived) @ {}".format(self.get_action_type_display(), self.created)
+
+    @classmethod
+    def from_action(cls, action):
+        return cls(
+            action_id=action.pk,
+            actor_id=action.actor_id,
+            created=action.created,
+            action_type=action.action_type,
+            job_id=action.job_id,
+            phase_id=action.phase_id,
+            summary=action.summary,
+            payload_compressed=zlib.compress(
+                json.dumps(action.payload, separators=(",", ":")).encode()
+            ),
+            reverted=action.reverted,
+            reverted_by_id=action.reverted_by_id,
+        )
+
+    @property
+    def payload(self):
+        return json.loads(zlib.decompress(bytes(self.payload_compressed)))
@@ -170,87 +170,70 @@ class Service(models.Model):
         ).filter(_held=required_count).distinct()
 
     def get_service_readiness_breakdown(self):
-        """Get comprehensive breakdown of service readiness including desired skills - cached and optimized"""
-        from django.core.cache import cache
-        from django.db.models import Count, Q
+        """Get comprehensive breakdown of service readiness including desired skills.
 
-        cache_key = f"service_readiness_{self.id}_{self.skillsRequired.count()}_{self.skillsDesired.count()}"
-        cached_result = cache.get(cache_key)
-        if cached_result:
-            return cached_result
+        Tiers are read from the materialised ServiceReadiness rows (see
+        ``jobtracker.service_readiness``) rather than recomputed per call.
+        """
+        from django.db.models import Count
 
-        required_skills = self.skillsRequired.all()
         desired_skills = self.skillsDesired.all()
 
-        if not required_skills.exists():
-            return {
-                'specialists': User.objects.none(),
-                'independent_only': User.objects.none(),
-                'support_only': User.objects.none(),
-                'missing_skills': User.objects.none(),
-                'total_capable': 0,
-                'desired_skills_analysis': {}
-            }
-
-        # Get all users with counts in a single query
-        specialists = self.get_users_specialist()
-        independent = self.get_users_can_do_alone()
-        need_support = self.get_users_can_do_with_support()
-        missing_skills = self.get_users_missing_skills()
+        def tier_users(*tiers):
+            return User.objects.filter(
+                service_readiness__service=self,
+                service_readiness__tier__in=tiers,
+                is_active=True,
+            )
 
-        # Use exclude to avoid additional queries
-        specialist_ids = list(specialists.values_list('id', flat=True))
-        independent_ids = list(independent.values_list('id', flat=True))
+        specialists = tier_users(UserSkillRatings.SPECIALIST)
+        independent_only = tier_users(UserSkillRatings.CAN_DO_ALONE)
+        support_only = tier_users(UserSkillRatings.CAN_DO_WITH_SUPPORT)
+        missing_skills = tier_users(ServiceReadiness.TIER_INCOMPLETE)
 
-        independent_only = independent.exclude(id__in=specialist_ids)
-        support_only = need_support.exclude(id__in=specialist_ids + independent_ids)
+        capable_user_ids = list(
+            self.readiness.capable()
+            .filter(user__is_active=True)
+            .values_list('user_id', flat=True)
+        )
 
         # Optimize desired skills analysis
         desired_skills_analysis = {}
-        if desired_skills.exists():
-            # Get all capable users in one query
-            capable_user_ids = specialist_ids + list(independent_only.values_list('id', flat=True)) + list(support_only.values_list('id', flat=True))
-
-            if capable_user_ids:
-                # Single query to get all skill data
-                skill_data = UserSkill.objects.filter(
-                    user_id__in=capable_user_ids,
-                    skill__in=desired_skills,
-                    user__is_active=True,
-                ).select_related('skill').values(
-                    'skill__id', 'skill__name', 'rating'
-                ).annotate(count=Count('id'))
-
-                # Group by skill
-                for skill in desired_skills:
-                    skill_ratings = [d for d in skill_data if d['skill__id'] == skill.id]
-
-                    total_with_skill = sum(d['count'] for d in skill_ratings)
-                    specialists_count = sum(d['count'] for d in skill_ratings if d['rating'] == UserSkillRatings.SPECIALIST)
-                    independent_count = sum(d['count'] for d in skill_ratings if d['rating'] == UserSkillRatings.CAN_DO_ALONE)
-                    support_count = sum(d['count'] for d in skill_ratings if d['rating'] == UserSkillRatings.CAN_DO_WITH_SUPPORT)
-
-                    desired_skills_analysis[skill] = {
-                        'total_with_skill': total_with_skill,
-                        'specialists_count': specialists_count,
-                        'independent_count': independent_count,
-                        'support_count': support_count,
-                        'coverage_percentage': round((total_with_skill / len(capable_user_ids) * 100), 1) if capable_user_ids else 0
-                    }
-
-        result = {
+        if capable_user_ids and desired_skills.exists():
+            # Single query to get all skill data
+            skill_data = UserSkill.objects.filter(
+                user_id__in=capable_user_ids,
+                skill__in=desired_skills,
+            ).values(
+                'skill__id', 'rating'
+            ).annotate(count=Count('id'))
+
+            # Group by skill
+            for skill in desired_skills:
+                skill_ratings = [d for d in skill_data if d['skill__id'] == skill.id]
+
+                total_with_skill = sum(d['count'] for d in skill_ratings)
+                specialists_count = sum(d['count'] for d in skill_ratings if d['rating'] == UserSkillRatings.SPECIALIST)
+                independent_count = sum(d['count'] for d in skill_ratings if d['rating'] == UserSkillRatings.CAN_DO_ALONE)
+                support_count = sum(d['count'] for d in skill_ratings if d['rating'] == UserSkillRatings.CAN_DO_WITH_SUPPORT)
+
+                desired_skills_analysis[skill] = {
+                    'total_with_skill': total_with_skill,
+                    'specialists_count': specialists_count,
+                    'independent_count': independent_count,
+                    'support_count': support_count,
+                    'coverage_percentage': round((total_with_skill / len(capable_user_ids) * 100), 1)
+                }
+
+        return {
             'specialists': specialists,
             'independent_only': independent_only,
             'support_only': support_only,
             'missing_skills': missing_skills,
-            'total_capable': len(specialist_ids) + independent_only.count() + support_only.count(),
+            'total_capable': len(capable_user_ids),
             'desired_skills_analysis': desired_skills_analysis
         }
 
-        # Cache for 5 minutes
-        cache.set(cache_key, result, 300)
-        return result
-
     def get_team_by_skill(self):
         """Get team members grouped by skill and competency level"""
         team_data = {}
@@ -622,8 +605,6 @@ class Service(models.Model):
     def clear_cache(self):
         """Clear all cached data for this service"""
         from django.core.cache import cache
-        # Clear service readiness cache
-        cache.delete(f"service_readiness_{self.id}_{self.skillsRequired.count()}_{self.skillsDesired.count()}")
         # Clear analytics cache
         cache.delete(f"service_analytics_{self.id}_{self.phases.count()}")
         # Clear skills coverage cache
@@ -637,4 +618,46 @@ class Service(models.Model):
         # Clear cache when service is updated
         if self.pk:
             self.clear_cache()
-        return super().save(*args, **kwargs)
\ No newline at end of file
+        return super().save(*args, **kwargs)
+
+class ServiceReadinessQuerySet(models.QuerySet):
+    def capable(self):
+        """Rows for users who hold every required skill (any tier)."""
+        return self.filter(tier__gte=UserSkillRatings.CAN_DO_WITH_SUPPORT)
+
+
+class ServiceReadiness(models.Model):
+    """Materialised competency of a user for a service.
+
+    One row per (service, user) where the user holds at least one of the
+    service's required skills at "Can Do With Support" or better. ``tier`` is
+    the weakest rating across ALL required skills (a UserSkillRatings value),
+    or TIER_INCOMPLETE while any required skill is missing. Kept current by
+    ``jobtracker.service_readiness``; inactive users are filtered at read time.
+    """
+
+    TIER_INCOMPLETE = 0
+
+    service = models.ForeignKey(
+        Service, related_name="readiness", on_delete=models.CASCADE
+    )
+    user = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        related_name="service_readiness",
+        on_delete=models.CASCADE,
+    )
+    tier = models.PositiveSmallIntegerField(default=TIER_INCOMPLETE)
+    missing_skills = models.PositiveSmallIntegerField(default=0)
+    missing_qualifications = models.PositiveSmallIntegerField(default=0)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    objects = ServiceReadinessQuerySet.as_manager()
+
+    class Meta:
+        unique_together = (("service", "user"),)
+        indexes = [
+            models.Index(fields=["service", "tier"], name="jt_readiness_service_tier_idx"),
+        ]
+
+    def __str__(self):
+        return "{} - {}: {}".format(self.service, self.user, self.tier)
@@ -16,9 +16,7 @@ from chaotica_utils.views.common import log_system_activity
 from chaotica_utils.middleware.common import get_current_user
 from django.core.exceptions import ValidationError
 from django.utils import timezone as dj_timezone
-from business_duration import businessDuration
 from decimal import Decimal
-import zoneinfo
 from simple_history.models import HistoricalRecords
 from django.db.models.functions import Lower
 
@@ -109,7 +107,76 @@ class TimeSlotComment(models.Model):
         return "{}-{} {}".format(self.start, self.end, self.comment)
 
 
+def _slot_message(verb, slot):
+    return "Slot {}: {} ({}) {} to {}".format(
+        verb,
+        slot.user.get_full_name(),
+        slot.get_deliveryRole_display(),
+        dj_timezone.localtime(slot.start).strftime("%Y-%m-%d"),
+        dj_timezone.localtime(slot.end).strftime("%Y-%m-%d"),
+    )
+
+
+class TimeSlotManager(models.Manager):
+
+    def bulk_schedule(self, slots, actor=None, action_type=None):
+        """Create many unsaved TimeSlots at once.
+
+        The same side effects as calling ``save()`` on each, batched: one insert
+        for the slots (and their history), one for the activity notes, one
+        occupancy sync, one date/status recompute per affected phase and a single
+        ScheduleAction (default CREATE) attributed to ``actor``.
+
+        Returns ``(created_slots, action)``.
+        """
+        from simple_history.utils import bulk_create_with_history
+        from django.db import transaction
+        from chaotica_utils.views.common import log_system_activity_many
+        from .. import occupancy, schedule_history
+        from .schedule_action import ScheduleActionType
+
+        slots = list(slots)
+        for slot in slots:
+            if slot.start > slot.end:
+                raise ValidationError("End time must come after the start")
+        if not slots:
+            return [], None
+
+        with transaction.atomic():
+            created = bulk_create_with_history(
+                slots, self.model, default_user=actor if getattr(actor, "pk", None) else None
+            )
+            occupancy.sync_slots([slot.pk for slot in created])
+
+            # Activity log for delivery slots, on both the job and the phase
+            phases = {}
+            entries = []
+            for slot in slots:
+                if slot.slot_type_id == DefaultTimeSlotTypes.DELIVERY and slot.phase_id:
+                    phases.setdefault(slot.phase_id, slot.phase)
+                    msg = _slot_message("created", slot)
+                    entries.append((slot.phase.job, msg))
+                    entries.append((slot.phase, msg))
+            log_system_activity_many(entries, author=get_current_user())
+
+            # Once per phase: first booking moves it to tentative; refresh dates
+            for phase in phases.values():
+                if (
+                    phase.status == PhaseStatuses.PENDING_SCHED
+                    and phase.can_to_sched_tentative()
+                ):
+                    phase.to_sched_tentative()
+                phase.save()
+
+        action = schedule_history.record_creates(
+            actor, created, action_type=action_type or ScheduleActionType.CREATE
+        )
+        return created, action
+
+
 class TimeSlot(models.Model):
+    objects = TimeSlotManager()
+
     start = models.DateTimeField()
     end = models.DateTimeField()
     updated = models.DateTimeField(auto_now=True)
@@ -337,112 +404,15 @@ class TimeSlot(models.Model):
             )
         return data
     
-    def _get_business_tz(self):
-        """Resolve timezone for business hours: org unit → user pref → UTC."""
-        org = self.user.unit_memberships.first()
-        if org and getattr(org.unit, 'businessHours_timezone', None):
-            return zoneinfo.ZoneInfo(org.unit.businessHours_timezone)
-        if self.user.pref_timezone:
-            return zoneinfo.ZoneInfo(self.user.pref_timezone)
-        return zoneinfo.ZoneInfo('UTC')
-
     def get_business_hours(self):
         """
         Calculate business hours for a timeslot, accounting for lunch breaks.
         Returns the number of billable hours, excluding non-business hours and lunch breaks.
+        See jobtracker.business_hours.slot_hours for many slots at once.
         """
-        import datetime
-
-        unit = "hour"
-        org = self.user.unit_memberships.first()
-
-        # Resolve the timezone that business hours are defined in, and convert
-        # slot times to that timezone so wall-clock comparisons are correct
-        # across DST transitions.
-        local_tz = self._get_business_tz()
-        local_start = self.start.astimezone(local_tz)
-        local_end = self.end.astimezone(local_tz)
-
-        # Get business hours boundaries
-        if org:
-            business_start_time = org.unit.businessHours_startTime
-            business_end_time = org.unit.businessHours_endTime
-            lunch_start_time = org.unit.businessHours_lunch_startTime
-            lunch_end_time = org.unit.businessHours_lunch_endTime
-        else:
-            # Default business hours if no organization
-            business_start_time = datetime.time(9, 0)  # 9:00 AM
-            business_end_time = datetime.time(17, 30)  # 5:30 PM
-            lunch_start_time = datetime.time(12, 0)  # 12:00 PM
-            lunch_end_time = datetime.time(13, 0)    # 1:00 PM
-
-        # Calculate lunch duration from start and end times (pure clock-time arithmetic)
-        lunch_duration = (
-            lunch_end_time.hour * 60 + lunch_end_time.minute
-            - lunch_start_time.hour * 60 - lunch_start_time.minute
-        ) / 60.0  # in hours
-
-        # Calculate raw business hours using local-time datetimes
-        if org:
-            raw_hours = businessDuration(
-                local_start,
-                local_end,
-                unit=unit,
-                starttime=business_start_time,
-                endtime=business_end_time,
-            )
-        else:
-            raw_hours = businessDuration(local_start, local_end, unit=unit)
-
-        # Count the number of lunch breaks to subtract
-        lunch_breaks_count = 0
-
-        # For multi-day slots, we need to count lunch breaks for each day
-        current_date = local_start.date()
-        end_date = local_end.date()
-
-        while current_date <= end_date:
-            # Create datetime objects for this day's business hours and lunch period
-            # Using local_tz so wall-clock times are correct for DST
-            day_business_start = datetime.datetime.combine(
-                current_date, business_start_time
-            ).replace(tzinfo=local_tz)
-            day_business_end = datetime.datetime.combine(
-                current_date, business_end_time
-            ).replace(tzinfo=local_tz)
-            day_lunch_start = datetime.datetime.combine(
-                current_date, lunch_start_time
-            ).replace(tzinfo=local_tz)
-            day_lunch_end = datetime.datetime.combine(
-                current_date, lunch_end_time
-            ).replace(tzinfo=local_tz)
-
-            # Check if this day's timeslot overlaps with lunch
-            day_slot_start = max(local_start, day_business_start) if current_date == local_start.date() else day_business_start
-            day_slot_end = min(local_end, day_business_end) if current_date == local_end.date() else day_business_end
-
-            # Only count lunch if the day's business hours aren't empty
-            if day_slot_start < day_slot_end:
-                # Check if lunch overlaps with today's business hours for this slot
-                if (day_slot_start < day_lunch_end and day_slot_end > day_lunch_start):
-                    # Calculate how much of lunch break is within the slot
-                    lunch_overlap_start = max(day_slot_start, day_lunch_start)
-                    lunch_overlap_end = min(day_slot_end, day_lunch_end)
-                    lunch_overlap_hours = (lunch_overlap_end - lunch_overlap_start).total_seconds() / 3600
-
-                    # Add the overlapping portion to our count (usually 1.0 for a full day)
-                    if lunch_duration:
-                        lunch_breaks_count += lunch_overlap_hours / lunch_duration
-
-            # Move to next day
-            current_date += datetime.timedelta(days=1)
-
-        # Subtract lunch breaks from raw business hours
-        adjusted_hours = raw_hours - lunch_breaks_count
-
-        # Ensure we don't return negative hours
-        return Decimal(max(0, adjusted_hours))
-    
+        from ..business_hours import calendar_for_user
+
+        return calendar_for_user(self.user).hours_between(self.start, self.end)
 
     def cost(self):
         # Only support a single cost field at the moment... :(
@@ -526,7 +496,7 @@ class TimeSlot(models.Model):
         if self.is_delivery() and self.phase:
             current_user = get_current_user()
             if is_new:
-                msg = f"Slot created: {self.user.get_full_name()} ({self.get_deliveryRole_display()}) {dj_timezone.localtime(self.start).strftime('%Y-%m-%d')} to {dj_timezone.localtime(self.end).strftime('%Y-%m-%d')}"
+                msg = _slot_message("created", self)
             else:
                 # Check what changed and build a descriptive message
                 changes = []
@@ -555,3 +525,31 @@ class TimeSlot(models.Model):
                                 
             # Lets update the dates in case...
             self.phase.save()
+
+
+class TimeSlotDay(models.Model):
+    """One calendar day covered by a TimeSlot.
+
+    The per-user, per-day occupancy store behind bulk utilisation: see
+    :mod:`jobtracker.occupancy`. Rows are derived data — maintained on slot
+    save (deletes cascade) and rebuilt with ``manage.py rebuild_slot_occupancy``.
+    """
+
+    slot = models.ForeignKey(
+        TimeSlot, related_name="days", on_delete=models.CASCADE
+    )
+    user = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        related_name="occupied_days",
+        on_delete=models.CASCADE,
+    )
+    date = models.DateField()
+
+    class Meta:
+        unique_together = ["slot", "date"]
+        indexes = [
+            models.Index(fields=["user", "date"], name="jt_slotday_user_date_idx"),
+        ]
+
+    def __str__(self):
+        return "{} {} (slot {})".format(self.user_id, self.date, self.slot_id)
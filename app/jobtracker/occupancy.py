@@ -0,0 +1,119 @@
+"""Per-user, per-day occupancy store for utilisation maths.
+
+Every TimeSlot is expanded once, at write time, into one
+:class:`~jobtracker.models.TimeSlotDay` row per calendar day it covers. Bulk
+utilisation (``User.objects.calculate_bulk_utilization``) then sums occupied
+days straight out of the store instead of walking every slot day by day on each
+scheduler/dashboard/assistant hit.
+
+Only the slot's *days* are stored. Whether a day is tentative, confirmed or
+non-delivery is read through the slot's phase at query time, and working days /
+holidays are applied at query time too, so phase status transitions, org
+working-day changes and Holiday edits never leave the store stale.
+
+The store is kept current by the TimeSlot ``post_save`` handler in
+:mod:`jobtracker.signals.occupancy` (deletes cascade). Code that bypasses
+``save()`` (``QuerySet.update``) must call :func:`sync_slots` itself.
+``manage.py rebuild_slot_occupancy`` rebuilds it from scratch.
+"""
+from datetime import timedelta
+
+from django.utils import timezone
+
+from .models import TimeSlot, TimeSlotDay
+
+REBUILD_CHUNK_SIZE = 500
+
+
+def _local_date(value):
+    """Calendar date of ``value`` in the site's default timezone.
+
+    Deliberately *not* the request's active timezone, so the store is the same
+    whoever triggered the write.
+    """
+    if timezone.is_aware(value):
+        value = timezone.localtime(value, timezone.get_default_timezone())
+    return value.date()
+
+
+def slot_dates(start, end):
+    """Every calendar date from ``start`` to ``end`` inclusive."""
+    current = _local_date(start)
+    last = _local_date(end)
+    dates = []
+    while current <= last:
+        dates.append(current)
+        current += timedelta(days=1)
+    return dates
+
+
+def _day_rows(slot_id, user_id, start, end):
+    return [
+        TimeSlotDay(slot_id=slot_id, user_id=user_id, date=day)
+        for day in slot_dates(start, end)
+    ]
+
+
+def sync_slot(slot):
+    """Re-expand a single (saved) slot into the store."""
+    TimeSlotDay.objects.filter(slot_id=slot.pk).delete()
+    TimeSlotDay.objects.bulk_create(
+        _day_rows(slot.pk, slot.user_id, slot.start, slot.end)
+    )
+
+
+def sync_slots(slot_ids):
+    """Re-expand many slots at once, e.g. after a ``QuerySet.update`` shift/swap."""
+    slot_ids = [pk for pk in slot_ids if pk]
+    if not slot_ids:
+        return
+    TimeSlotDay.objects.filter(slot_id__in=slot_ids).delete()
+    rows = []
+    for pk, user_id, start, end in TimeSlot.objects.filter(
+        pk__in=slot_ids
+    ).values_list("pk", "user_id", "start", "end"):
+        rows.extend(_day_rows(pk, user_id, start, end))
+    TimeSlotDay.objects.bulk_create(rows, batch_size=REBUILD_CHUNK_SIZE)
+
+
+def rebuild(user_ids=None, chunk_size=REBUILD_CHUNK_SIZE):
+    """Rebuild the store from TimeSlot, optionally only for ``user_ids``.
+
+    Returns ``(slots, days)`` written.
+    """
+    slots = TimeSlot.objects.all()
+    days = TimeSlotDay.objects.all()
+    if user_ids is not None:
+        slots = slots.filter(user_id__in=user_ids)
+        days = days.filter(user_id__in=user_ids)
+    days.delete()
+
+    slot_count = 0
+    day_count = 0
+    rows = []
+    for pk, user_id, start, end in slots.values_list(
+        "pk", "user_id", "start", "end"
+    ).iterator(chunk_size=chunk_size):
+        rows.extend(_day_rows(pk, user_id, start, end))
+        slot_count += 1
+        if len(rows) >= chunk_size:
+            TimeSlotDay.objects.bulk_create(rows)
+            day_count += len(rows)
+            rows = []
+    if rows:
+        TimeSlotDay.objects.bulk_create(rows)
+        day_count += len(rows)
+    return slot_count, day_count
+
+
+def occupied_days(user_ids, start_date, end_date):
+    """Occupied (user, day) rows in ``[start_date, end_date]`` with the phase
+    state needed to classify them.
+
+    Yields ``(user_id, date, phase_id, phase_status)`` tuples; ``phase_id`` is
+    None for non-delivery (internal/project/leave) slots.
+    """
+    return TimeSlotDay.objects.filter(
+        user_id__in=user_ids,
+        date__range=(start_date, end_date),
+    ).values_list("user_id", "date", "slot__phase_id", "slot__phase__status")
@@ -0,0 +1,130 @@
+"""Per-user cache of the organisational units a user holds a permission on.
+
+Scoping a query to "the units ``user`` holds ``perm`` on" is a guardian
+``get_objects_for_user`` call (several permission-table queries), and nearly
+every scheduler, reporting and API request makes at least one. This caches, per
+user, the unit ids for each permission asked about and the ids of the users
+whose schedule they may view, so all of those call sites share one lookup.
+
+Invalidation is by generation tokens folded into every key, as in
+:mod:`jobtracker.schedule_cache`:
+
+* a per-user token, rotated when that user's own grants change (guardian object
+  permissions, Django permissions or group membership);
+* a global token, rotated when a change can affect other users: unit membership,
+  units being added or removed, group permissions, and the role/permission sync
+  tasks.
+
+The signal side lives in :mod:`jobtracker.signals.permission_scope`. Entries
+also expire after :data:`SCOPE_CACHE_TIMEOUT`.
+"""
+import uuid
+
+from django.core.cache import cache
+from guardian.shortcuts import get_objects_for_user
+
+from .models import OrganisationalUnit, OrganisationalUnitMember
+
+SCOPE_CACHE_TIMEOUT = 60 * 5
+
+_GLOBAL_VERSION_KEY = "perm_scope_ver"
+_VERSION_KEY = "perm_scope_ver_{}"
+_ENTRY_KEY = "perm_scope_{}_{}_{}"
+
+_SCHEDULE_PERM = "jobtracker.view_users_schedule"
+_SCHEDULE_MEMBERS = "schedule_members"
+
+
+def invalidate_users(user_ids):
+    """Drop the cached scope of ``user_ids`` by rotating their generation."""
+    user_ids = {u for u in user_ids if u}
+    if user_ids:
+        cache.set_many(
+            {_VERSION_KEY.format(u): uuid.uuid4().hex for u in user_ids}, timeout=None
+        )
+
+
+def invalidate_all():
+    """Drop every user's cached scope."""
+    cache.set(_GLOBAL_VERSION_KEY, uuid.uuid4().hex, timeout=None)
+
+
+def _entry_key(user_id):
+    user_key = _VERSION_KEY.format(user_id)
+    found = cache.get_many([_GLOBAL_VERSION_KEY, user_key])
+    missing = {}
+    for key in (_GLOBAL_VERSION_KEY, user_key):
+        if key not in found:
+            # Never fall back to a fixed default: an evicted token must not
+            # resurrect entries written under an older generation.
+            missing[key] = uuid.uuid4().hex
+    if missing:
+        cache.set_many(missing, timeout=None)
+        found.update(missing)
+    return _ENTRY_KEY.format(user_id, found[_GLOBAL_VERSION_KEY], found[user_key])
+
+
+def _cached(user, name, compute):
+    """``compute()`` memoised under ``name`` in ``user``'s scope entry."""
+    if not getattr(user, "pk", None):
+        return compute()
+    key = _entry_key(user.pk)
+    scope = cache.get(key) or {}
+    if name in scope:
+        return scope[name]
+    value = compute()
+    # Re-read: ``compute`` may itself have cached another name in this entry.
+    scope = cache.get(key) or {}
+    scope[name] = value
+    cache.set(key, scope, SCOPE_CACHE_TIMEOUT)
+    return value
+
+
+def _compute_unit_ids(user, perm, accept_global_perms):
+    app_label, _, _ = perm.rpartition(".")
+    if app_label and app_label != OrganisationalUnit._meta.app_label:
+        # Not a unit permission, so no unit can grant it.
+        return frozenset()
+    return frozenset(
+        get_objects_for_user(
+            user,
+            perm,
+            klass=OrganisationalUnit,
+            accept_global_perms=accept_global_perms,
+        ).values_list("pk", flat=True)
+    )
+
+
+def unit_ids(user, perm, accept_global_perms=True):
+    """Ids of the units ``user`` holds ``perm`` on.
+
+    Same answer as ``get_objects_for_user(user, perm, klass=OrganisationalUnit,
+    accept_global_perms=...)``: a global grant (or superuser) covers every unit.
+    """
+    return _cached(
+        user,
+        (perm, accept_global_perms),
+        lambda: _compute_unit_ids(user, perm, accept_global_perms),
+    )
+
+
+def has_unit_perm(user, perm, unit):
+    """Whether ``user`` holds ``perm`` on ``unit`` itself (object-level only)."""
+    return unit.pk in unit_ids(user, perm, accept_global_perms=False)
+
+
+def viewable_user_ids(user, include_self=True):
+    """Ids of the users whose schedule ``user`` may view: every member of a unit
+    they hold ``view_users_schedule`` on, plus (by default) themselves."""
+    members = _cached(
+        user,
+        _SCHEDULE_MEMBERS,
+        lambda: frozenset(
+            OrganisationalUnitMember.objects.filter(
+                unit_id__in=unit_ids(user, _SCHEDULE_PERM)
+            ).values_list("member_id", flat=True)
+        ),
+    )
+    if include_self and getattr(user, "pk", None):
+        return members | {user.pk}
+    return members
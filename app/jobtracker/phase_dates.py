@@ -0,0 +1,98 @@
+"""Set-based recompute of the stored, schedule-derived phase dates.
+
+A phase's ``_start_date`` is the day of its first delivery slot and its
+``_due_to_techqa`` / ``_due_to_presqa`` / ``_delivery_date`` are the day its
+last delivery or reporting slot ends plus the ``DAYS_TO_TQA`` / ``DAYS_TO_PQA``
+/ ``DAYS_TO_DELIVERY`` offsets. :func:`recompute` derives them for many phases
+from one grouped aggregate and writes them back with one ``bulk_update``;
+``Phase.update_stored_dates`` uses the same aggregate for a single phase.
+
+As before, a phase with no qualifying slots keeps whatever dates it had.
+"""
+from datetime import timedelta
+
+from constance import config
+from django.db.models import Max, Min, Q
+
+from .enums import TimeSlotDeliveryRole
+
+STORED_FIELDS = ["_start_date", "_due_to_techqa", "_due_to_presqa", "_delivery_date"]
+CHUNK_SIZE = 500
+
+
+def slot_bounds(phase_ids):
+    """``{phase_id: (first delivery start, last delivery/reporting end)}``."""
+    from .models import TimeSlot
+
+    return {
+        row["phase_id"]: (row["first_start"], row["last_end"])
+        for row in TimeSlot.objects.filter(
+            phase_id__in=phase_ids,
+            deliveryRole__in=[TimeSlotDeliveryRole.DELIVERY, TimeSlotDeliveryRole.REPORTING],
+        )
+        .values("phase_id")
+        .annotate(
+            first_start=Min("start", filter=Q(deliveryRole=TimeSlotDeliveryRole.DELIVERY)),
+            last_end=Max("end"),
+        )
+        .order_by()
+    }
+
+
+def _offsets():
+    return (
+        timedelta(days=config.DAYS_TO_TQA),
+        timedelta(days=config.DAYS_TO_PQA),
+        timedelta(days=config.DAYS_TO_DELIVERY),
+    )
+
+
+def apply_bounds(phase, first_start, last_end, offsets=None):
+    """Set ``phase``'s stored dates from its slot bounds; True if any changed."""
+    before = [getattr(phase, name) for name in STORED_FIELDS]
+    if first_start is not None:
+        phase._start_date = first_start.date()
+    if last_end is not None:
+        to_tqa, to_pqa, to_delivery = offsets or _offsets()
+        last_day = last_end.date()
+        phase._due_to_techqa = last_day + to_tqa
+        phase._due_to_presqa = last_day + to_pqa
+        phase._delivery_date = last_day + to_delivery
+    return before != [getattr(phase, name) for name in STORED_FIELDS]
+
+
+def recompute(phase_ids):
+    """Recompute and persist the stored dates of ``phase_ids``.
+
+    Returns the number of phases whose dates changed. Changed phases are
+    re-queued for workflow progression (``bulk_update`` skips ``post_save``).
+    """
+    from .models import Phase
+    from . import workflow_queue
+
+    phase_ids = list({pk for pk in phase_ids if pk})
+    if not phase_ids:
+        return 0
+    bounds = slot_bounds(phase_ids)
+    offsets = _offsets()
+    changed = []
+    for phase in Phase.objects.filter(pk__in=bounds).only(
+        "pk", "status", "desired_start_date", *STORED_FIELDS
+    ):
+        if apply_bounds(phase, *bounds[phase.pk], offsets=offsets):
+            changed.append(phase)
+    if changed:
+        Phase.objects.bulk_update(changed, STORED_FIELDS, batch_size=CHUNK_SIZE)
+        workflow_queue.sync_phases(changed)
+    return len(changed)
+
+
+def recompute_all(chunk_size=CHUNK_SIZE):
+    """Recompute every phase's stored dates, ``chunk_size`` phases at a time."""
+    from .models import Phase
+
+    changed = 0
+    ids = list(Phase.objects.order_by("pk").values_list("pk", flat=True))
+    for i in range(0, len(ids), chunk_size):
+        changed += recompute(ids[i : i + chunk_size])
+    return changed
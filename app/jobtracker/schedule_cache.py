@@ -0,0 +1,189 @@
+"""Per-user, per-month cache of serialised scheduler slots.
+
+Panning/zooming the timeline re-requests overlapping windows for the same set
+of people, and most of the cost is ``TimeSlot.get_schedule_json`` (titles,
+colours and ``reverse()`` calls for every slot). This caches those dicts per
+``(user, calendar month, render variant)`` so a pan across already-seen months
+costs a cache read plus the per-request filtering in
+:func:`jobtracker.utils.get_scheduler_slots`.
+
+Invalidation is by a per-user generation token folded into every key:
+
+* :func:`jobtracker.schedule_history.record` bumps the users touched by each
+  :class:`~jobtracker.models.ScheduleAction` once its transaction commits;
+* the TimeSlot signals in :mod:`jobtracker.signals.schedule_cache` cover writes
+  made outside the scheduler (e.g. leave), and phase status/title changes that
+  alter how existing slots render.
+
+Entries also expire after :data:`SLOT_CACHE_TIMEOUT`, which bounds staleness
+from rarer upstream edits (client or job renames).
+"""
+import hashlib
+import uuid
+from collections import defaultdict
+from datetime import date, datetime, timedelta
+
+from django.core.cache import cache
+from django.db import transaction
+from django.utils import timezone
+
+from .models import TimeSlot
+
+SLOT_CACHE_TIMEOUT = 60 * 15
+
+_VERSION_KEY = "sched_slots_ver_{}"
+_ENTRY_KEY = "sched_slots_v2_{}_{}_{}_{}"
+
+
+def _version_key(user_id):
+    return _VERSION_KEY.format(user_id)
+
+
+def invalidate_users(user_ids):
+    """Drop every cached month for ``user_ids`` by rotating their generation."""
+    user_ids = {u for u in user_ids if u}
+    if user_ids:
+        cache.set_many(
+            {_version_key(u): uuid.uuid4().hex for u in user_ids}, timeout=None
+        )
+
+
+def invalidate_users_on_commit(user_ids):
+    """:func:`invalidate_users` once the current transaction commits.
+
+    Rotating earlier would let a concurrent read rebuild from the pre-commit
+    rows and store them under the new token for the full timeout.
+    """
+    user_ids = {u for u in user_ids if u}
+    if user_ids:
+        transaction.on_commit(lambda: invalidate_users(user_ids))
+
+
+def invalidate_action(action):
+    """Invalidate the users referenced by a ScheduleAction, on commit."""
+    invalidate_users_on_commit(action._affected_user_ids())
+
+
+def user_versions(user_ids):
+    """Current generation token per user (created on first use)."""
+    keys = {_version_key(u): u for u in user_ids}
+    found = cache.get_many(list(keys))
+    versions = {keys[k]: v for k, v in found.items()}
+    missing = {u: uuid.uuid4().hex for u in user_ids if u not in versions}
+    if missing:
+        # Never fall back to a fixed default: an evicted token must not
+        # resurrect entries written under an older generation.
+        cache.set_many(
+            {_version_key(u): v for u, v in missing.items()}, timeout=None
+        )
+        versions.update(missing)
+    return versions
+
+
+def _months(start, end):
+    """First-of-month dates covering ``[start, end]``."""
+    current = date(start.year, start.month, 1)
+    months = []
+    while current <= end:
+        months.append(current)
+        current = (current + timedelta(days=32)).replace(day=1)
+    return months
+
+
+def _month_bounds(month):
+    tz = timezone.get_default_timezone()
+    first = timezone.make_aware(datetime.combine(month, datetime.min.time()), tz)
+    following = (month + timedelta(days=32)).replace(day=1)
+    last = timezone.make_aware(datetime.combine(following, datetime.min.time()), tz)
+    return first, last
+
+
+def render_variant(schedule_colours, compressed_view):
+    """Short digest of everything request-independent that changes the JSON."""
+    raw = repr((sorted(schedule_colours.items()), bool(compressed_view)))
+    return hashlib.md5(raw.encode(), usedforsecurity=False).hexdigest()[:12]
+
+
+def _serialise(slot, schedule_colours, compressed_view):
+    return {
+        "job_id": slot.phase.job_id if slot.phase_id else None,
+        "phase_id": slot.phase_id,
+        "json": slot.get_schedule_json(
+            schedule_colours=schedule_colours, compressed_view=compressed_view
+        ),
+    }
+
+
+def _build_month(user_ids, month, schedule_colours, compressed_view):
+    """Serialise every slot of ``user_ids`` touching ``month``, grouped by user."""
+    first, last = _month_bounds(month)
+    entries = defaultdict(list)
+    for slot in TimeSlot.objects.filter(
+        user_id__in=user_ids, end__gte=first, start__lt=last
+    ).prefetch_related(
+        "phase",
+        "phase__job",
+        "phase__job__client",
+        "project",
+        "slot_type",
+        "user",
+        "leaverequest",
+    ):
+        entries[slot.user_id].append(
+            _serialise(slot, schedule_colours, compressed_view)
+        )
+    return entries
+
+
+def get_slot_entries(user_ids, start, end, schedule_colours, compressed_view=False):
+    """Cached slot entries for ``user_ids`` overlapping ``[start, end]``.
+
+    Each entry is ``{"job_id": ..., "phase_id": ..., "json": get_schedule_json()}``;
+    the ``json`` dict is shared with the cache layer, so callers must copy
+    before mutating.
+    Slots spanning several months are returned once.
+    """
+    user_ids = list(user_ids)
+    if not user_ids:
+        return []
+    variant = render_variant(schedule_colours, compressed_view)
+    versions = user_versions(user_ids)
+    tz = timezone.get_default_timezone()
+    months = _months(
+        timezone.localtime(start, tz).date(), timezone.localtime(end, tz).date()
+    )
+
+    keys = {}
+    for month in months:
+        for user_id in user_ids:
+            key = _ENTRY_KEY.format(
+                user_id, month.strftime("%Y%m"), variant, versions[user_id]
+            )
+            keys[key] = (user_id, month)
+    found = cache.get_many(list(keys))
+
+    # Rebuild the misses, one query per month that has any.
+    missing_by_month = defaultdict(list)
+    for key, (user_id, month) in keys.items():
+        if key not in found:
+            missing_by_month[month].append((key, user_id))
+    for month, missing in missing_by_month.items():
+        built = _build_month(
+            [user_id for _, user_id in missing], month, schedule_colours, compressed_view
+        )
+        fresh = {key: built.get(user_id, []) for key, user_id in missing}
+        cache.set_many(fresh, timeout=SLOT_CACHE_TIMEOUT)
+        found.update(fresh)
+
+    seen = set()
+    entries = []
+    for key in keys:
+        for entry in found.get(key, []):
+            data = entry["json"]
+            if data["id"] in seen:
+                continue
+            if data["end"] < start or data["start"] > end:
+                continue
+            seen.add(data["id"])
+            entries.append(entry)
+    return entries
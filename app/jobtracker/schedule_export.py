@@ -1,10 +1,12 @@
 import io
 import json
 import math
+import tempfile
+from array import array
 from collections import defaultdict
-from datetime import timedelta
+from datetime import date, timedelta
 from django.db.models import Q
-from django.http import HttpResponse
+from django.http import FileResponse, HttpResponse
 from constance import config
 
 from .enums import TimeSlotDeliveryRole
@@ -18,10 +20,6 @@ PHX_INK = "#141824"
 PHX_SECONDARY = "#525b75"
 
 
-def _next_day(d):
-    return d + timedelta(days=1)
-
-
 def _est_lines(text, width_chars):
     """Estimate how many wrapped lines a string needs at a given column width.
 
@@ -265,26 +263,211 @@ def build_team_xlsx(job, phase=None):
     return response
 
 
-def build_schedule_xlsx(timeslots, filename, title=None, header_rows=None):
-    """
-    Build a themed three-sheet XLSX schedule export.
+# Cell codes in a ScheduleMatrix row: free, unavailable, or a booked label id
+# offset by _BOOKED.
+FREE = 0
+UNAVAILABLE = 1
+_BOOKED = 2
 
-    "Overview"  a client-ready cover sheet: title, key stats and a colour key.
-    "Schedule"  a grid of resources (rows) x dates (columns). Booked cells carry
-                the phase + delivery type in the same colours as the on-screen
-                scheduler; days a resource is committed elsewhere (other work,
-                leave, internal) are marked Unavailable so gaps read as free.
-    "Summary"   one row per phase with the full hours breakdown and team.
 
-    ``title``       optional heading shown on the Overview sheet.
-    ``header_rows`` optional list of (label, value) tuples shown as key stats.
+class ScheduleMatrix:
+    """Dense resources x days grid for the schedule export.
+
+    Each row is an ``array`` of cell codes, so a unit's quarter costs a few
+    bytes per cell rather than a dict entry per booked day. Booked labels are
+    interned with their colours: every distinct ``(text, bg, fg)`` — including
+    the "A / B" text of a day booked on two phases — is stored once and its
+    wrapped-line estimate computed once.
     """
-    import xlsxwriter
+
+    def __init__(self, users, first_day, last_day):
+        self.users = list(users)
+        self.first_day = first_day
+        self.days = [
+            first_day + timedelta(days=i)
+            for i in range((last_day - first_day).days + 1)
+        ]
+        self.row_of = {user.pk: i for i, user in enumerate(self.users)}
+        self.rows = [array("I", [FREE]) * len(self.days) for _ in self.users]
+        self.labels = []
+        self._label_ids = {}
+        self._lines = []
+
+    def _intern(self, text, bg, fg):
+        key = (text, bg, fg)
+        label_id = self._label_ids.get(key)
+        if label_id is None:
+            label_id = self._label_ids[key] = len(self.labels)
+            self.labels.append(key)
+            self._lines.append(_est_lines(text, GRID_COL_WIDTH))
+        return label_id + _BOOKED
+
+    def _span(self, user_pk, start, end):
+        row = self.row_of.get(user_pk)
+        if row is None:
+            return None, range(0)
+        first = max(0, (start - self.first_day).days)
+        last = min(len(self.days) - 1, (end - self.first_day).days)
+        return self.rows[row], range(first, last + 1)
+
+    def book(self, user_pk, start, end, text, bg, fg):
+        """Book ``text`` on each day of ``[start, end]``; a day already booked
+        with other text shows both, in the first booking's colours."""
+        cells, span = self._span(user_pk, start, end)
+        code = None
+        for i in span:
+            current = cells[i]
+            if current < _BOOKED:
+                code = code or self._intern(text, bg, fg)
+                cells[i] = code
+                continue
+            existing, ex_bg, ex_fg = self.labels[current - _BOOKED]
+            if text not in existing:
+                cells[i] = self._intern(existing + " / " + text, ex_bg, ex_fg)
+
+    def mark_unavailable(self, user_pk, start, end):
+        """Mark the free days of ``[start, end]`` unavailable."""
+        cells, span = self._span(user_pk, start, end)
+        for i in span:
+            if cells[i] == FREE:
+                cells[i] = UNAVAILABLE
+
+    def mark_non_working(self, user_pk, working_weekdays, holidays):
+        """Mark free weekend/holiday days unavailable (``working_weekdays`` are
+        ISO weekday numbers, Monday = 1)."""
+        cells = self.rows[self.row_of[user_pk]]
+        for i, day in enumerate(self.days):
+            if cells[i] == FREE and (
+                day.isoweekday() not in working_weekdays or day in holidays
+            ):
+                cells[i] = UNAVAILABLE
+
+    def label(self, code):
+        return self.labels[code - _BOOKED]
+
+    def row_lines(self, row):
+        """Wrapped-line estimate of the tallest booked cell in ``row``."""
+        return max(
+            (self._lines[code - _BOOKED] for code in set(self.rows[row]) if code >= _BOOKED),
+            default=1,
+        )
+
+
+def _slot_label(slot):
+    role = slot.get_deliveryRole_display()
+    phase_label = "{}: {}".format(slot.phase.get_id(), slot.phase.title[:24])
+    return "{} ({})".format(phase_label, role) if role and role != "None" else phase_label
+
+
+def build_schedule_matrix(slots_list, colours):
+    """Build the :class:`ScheduleMatrix` for an export: the exported delivery
+    bookings, plus "unavailable" for each resource's non-working days and days
+    they're committed to anything not being exported."""
     from .models import TimeSlot, OrganisationalUnitMember
     from chaotica_utils.models import Holiday
 
-    output = io.BytesIO()
-    workbook = xlsxwriter.Workbook(output, {"remove_timezone": True})
+    users = {}
+    min_date = None
+    max_date = None
+    for slot in slots_list:
+        if slot.user:
+            users[slot.user.pk] = slot.user
+        start_d = slot.start.date()
+        end_d = slot.end.date()
+        if min_date is None or start_d < min_date:
+            min_date = start_d
+        if max_date is None or end_d > max_date:
+            max_date = end_d
+    sorted_users = sorted(users.values(), key=lambda u: (u.last_name, u.first_name))
+    if min_date is None:
+        return ScheduleMatrix([], date.today(), date.today() - timedelta(days=1))
+    # Continuous range so days with no bookings still appear as columns.
+    matrix = ScheduleMatrix(sorted_users, min_date, max_date)
+
+    for slot in slots_list:
+        if not slot.user or not slot.phase:
+            continue
+        bg = slot.get_schedule_slot_colour(schedule_colours=colours)
+        matrix.book(
+            slot.user.pk,
+            slot.start.date(),
+            slot.end.date(),
+            _slot_label(slot),
+            bg,
+            slot.get_schedule_slot_text_colour(bg),
+        )
+
+    if not sorted_users:
+        return matrix
+
+    # Unavailable days: any day a resource can't take new client work — their
+    # non-working days (weekends/bank holidays per the org calendar) plus days
+    # they're already committed elsewhere. Always generic ("Unavailable") so the
+    # export never names other work/leave and behaves the same everywhere.
+    user_pks = list(users.keys())
+
+    # Per-user working weekdays (org unit calendar, else the org default).
+    default_working = set(json.loads(config.DEFAULT_WORKING_DAYS))
+    user_working = {}
+    memberships = (
+        OrganisationalUnitMember.objects.filter(member_id__in=user_pks)
+        .select_related("unit")
+        .order_by("member_id", "id")
+    )
+    for m in memberships:
+        if m.member_id not in user_working and m.unit and m.unit.businessHours_days:
+            user_working[m.member_id] = set(m.unit.businessHours_days)
+
+    # Per-user bank holidays (their country + global) across the range.
+    countries = {str(u.country) for u in sorted_users if u.country}
+    holidays = Holiday.objects.filter(
+        Q(country__in=countries) | Q(country__isnull=True),
+        date__range=(min_date, max_date),
+    ).values("country", "date")
+    holidays_by_country = defaultdict(set)
+    global_holidays = set()
+    for h in holidays:
+        if not h["country"]:
+            global_holidays.add(h["date"])
+        else:
+            holidays_by_country[str(h["country"])].add(h["date"])
+
+    for u in sorted_users:
+        hols = holidays_by_country.get(str(u.country), set()) if u.country else set()
+        matrix.mark_non_working(
+            u.pk, user_working.get(u.pk, default_working), hols | global_holidays
+        )
+
+    # Days committed to other work.
+    exported_pks = {s.pk for s in slots_list}
+    other_slots = (
+        TimeSlot.objects.filter(
+            user_id__in=user_pks,
+            start__date__lte=max_date,
+            end__date__gte=min_date,
+        )
+        .exclude(pk__in=exported_pks)
+        .values_list("user_id", "start", "end")
+    )
+    for user_id, start, end in other_slots.iterator(chunk_size=2000):
+        matrix.mark_unavailable(user_id, start.date(), end.date())
+    return matrix
+
+
+def write_schedule_xlsx(timeslots, output, title=None, header_rows=None):
+    """Write the schedule export (see :func:`build_schedule_xlsx`) to the
+    file-like ``output``.
+
+    The workbook is written in xlsxwriter's ``constant_memory`` mode, row by
+    row from a :class:`ScheduleMatrix`, so memory stays flat however many
+    resources and days are exported; ``output`` can be a temporary or storage
+    file for exports run outside the request.
+    """
+    import xlsxwriter
+
+    workbook = xlsxwriter.Workbook(
+        output, {"remove_timezone": True, "constant_memory": True}
+    )
     colours = _schedule_colours()
 
     # --- Shared formats ---
@@ -351,121 +534,17 @@ def build_schedule_xlsx(timeslots, filename, title=None, header_rows=None):
         return booked_formats[key]
 
     # --- Build data structures ---
-    slots_list = list(timeslots.select_related("user", "phase", "phase__service", "phase__job"))
-    exported_pks = {s.pk for s in slots_list}
-
-    users = {}
-    min_date = None
-    max_date = None
-    for slot in slots_list:
-        if slot.user:
-            users[slot.user.pk] = slot.user
-        start_d = slot.start.date()
-        end_d = slot.end.date()
-        if min_date is None or start_d < min_date:
-            min_date = start_d
-        if max_date is None or end_d > max_date:
-            max_date = end_d
-
-    # Continuous range so days with no bookings still appear as columns.
-    sorted_dates = []
-    if min_date and max_date:
-        d = min_date
-        while d <= max_date:
-            sorted_dates.append(d)
-            d = _next_day(d)
-    sorted_users = sorted(users.values(), key=lambda u: (u.last_name, u.first_name))
-
-    # Booked cells: (user_pk, date) -> label, and -> (bg, fg)
-    cell_map = defaultdict(str)
-    cell_colour = {}
-    for slot in slots_list:
-        if not slot.user or not slot.phase:
-            continue
-        role = slot.get_deliveryRole_display()
-        phase_label = "{}: {}".format(slot.phase.get_id(), slot.phase.title[:24])
-        label = "{} ({})".format(phase_label, role) if role and role != "None" else phase_label
-        bg = slot.get_schedule_slot_colour(schedule_colours=colours)
-        fg = slot.get_schedule_slot_text_colour(bg)
-        d = slot.start.date()
-        end_d = slot.end.date()
-        while d <= end_d:
-            key = (slot.user.pk, d)
-            if cell_map[key] and label not in cell_map[key]:
-                cell_map[key] += " / " + label
-            elif not cell_map[key]:
-                cell_map[key] = label
-                cell_colour[key] = (bg, fg)
-            d = _next_day(d)
-
-    # Unavailable days: any day a resource can't take new client work — their
-    # non-working days (weekends/bank holidays per the org calendar) plus days
-    # they're already committed elsewhere. Always generic ("Unavailable") so the
-    # export never names other work/leave and behaves the same everywhere.
-    busy_days = set()
-    user_pks = list(users.keys())
-    if sorted_users and sorted_dates:
-        # Per-user working weekdays (org unit calendar, else the org default).
-        default_working = set(json.loads(config.DEFAULT_WORKING_DAYS))
-        user_working = {}
-        memberships = (
-            OrganisationalUnitMember.objects.filter(member_id__in=user_pks)
-            .select_related("unit")
-            .order_by("member_id", "id")
-        )
-        for m in memberships:
-            if m.member_id not in user_working and m.unit and m.unit.businessHours_days:
-                user_working[m.member_id] = set(m.unit.businessHours_days)
-        for pk in user_pks:
-            user_working.setdefault(pk, set(default_working))
-
-        # Per-user bank holidays (their country + global) across the range.
-        countries = {str(u.country) for u in sorted_users if u.country}
-        holidays = Holiday.objects.filter(
-            Q(country__in=countries) | Q(country__isnull=True),
-            date__range=(min_date, max_date),
-        ).values("country", "date")
-        holidays_by_country = defaultdict(set)
-        global_holidays = set()
-        for h in holidays:
-            if not h["country"]:
-                global_holidays.add(h["date"])
-            else:
-                holidays_by_country[str(h["country"])].add(h["date"])
-        user_holidays = {}
-        for u in sorted_users:
-            hs = set(holidays_by_country.get(str(u.country), set())) if u.country else set()
-            hs |= global_holidays
-            user_holidays[u.pk] = hs
-
-        # Non-working days (consistent for everyone).
-        for u in sorted_users:
-            working = user_working.get(u.pk, default_working)
-            hols = user_holidays.get(u.pk, set())
-            for d in sorted_dates:
-                key = (u.pk, d)
-                if key in cell_map:
-                    continue
-                if (d.weekday() + 1) not in working or d in hols:
-                    busy_days.add(key)
-
-        # Days committed to other work.
-        other_slots = (
-            TimeSlot.objects.filter(
-                user_id__in=user_pks,
-                start__date__lte=max_date,
-                end__date__gte=min_date,
-            )
-            .exclude(pk__in=exported_pks)
+    slots_list = list(
+        timeslots.select_related(
+            "user",
+            "phase",
+            "phase__service",
+            "phase__job__client",
+            "phase__project_lead",
+            "phase__report_author",
         )
-        for slot in other_slots:
-            d = max(slot.start.date(), min_date)
-            end_d = min(slot.end.date(), max_date)
-            while d <= end_d:
-                key = (slot.user_id, d)
-                if key not in cell_map:
-                    busy_days.add(key)
-                d = _next_day(d)
+    )
+    matrix = build_schedule_matrix(slots_list, colours)
 
     # =========================================================
     # Sheet 1: Overview (cover)
@@ -477,8 +556,8 @@ def build_schedule_xlsx(timeslots, filename, title=None, header_rows=None):
     ov.set_column(2, 2, 3)
 
     r = 0
-    ov.merge_range(r, 0, r, 3, title or "Schedule", title_fmt)
     ov.set_row(r, 26)
+    ov.merge_range(r, 0, r, 3, title or "Schedule", title_fmt)
     r += 2
 
     if header_rows:
@@ -506,7 +585,7 @@ def build_schedule_xlsx(timeslots, filename, title=None, header_rows=None):
                 "bg_color": swatch, "border": 1, "border_color": PHX_BORDER,
             })
         else:
-            sw_fmt = workbook.add_format({"border": 1, "border_color": PHX_BORDER})
+            sw_fmt = empty_fmt
         ov.write_blank(r, 0, None, sw_fmt)
         ov.write(r, 1, desc, label_fmt)
         r += 1
@@ -516,29 +595,28 @@ def build_schedule_xlsx(timeslots, filename, title=None, header_rows=None):
     # =========================================================
     ws = workbook.add_worksheet("Schedule")
     ws.set_column(0, 0, 24)
-    ws.write(0, 0, "Resource", grid_hdr_fmt)
-    for col, d in enumerate(sorted_dates, start=1):
-        fmt = weekend_date_fmt if d.weekday() >= 5 else date_fmt
-        ws.write_datetime(0, col, d, fmt)
-        ws.set_column(col, col, GRID_COL_WIDTH)
+    if matrix.days:
+        ws.set_column(1, len(matrix.days), GRID_COL_WIDTH)
     ws.freeze_panes(1, 1)
+    ws.write(0, 0, "Resource", grid_hdr_fmt)
+    weekend = [d.weekday() >= 5 for d in matrix.days]
+    for col, d in enumerate(matrix.days, start=1):
+        ws.write_datetime(0, col, d, weekend_date_fmt if weekend[col - 1] else date_fmt)
 
-    for i, user in enumerate(sorted_users):
+    for i, user in enumerate(matrix.users):
         row = 1 + i
+        ws.set_row(row, _row_height(matrix.row_lines(i)))
         ws.write(row, 0, user.get_full_name(), resource_fmt)
-        max_lines = 1
-        for col, d in enumerate(sorted_dates, start=1):
-            key = (user.pk, d)
-            if key in cell_map:
-                bg, fg = cell_colour.get(key, (PHX_PRIMARY, "white"))
-                ws.write(row, col, cell_map[key], booked_fmt(bg, fg))
-                max_lines = max(max_lines, _est_lines(cell_map[key], GRID_COL_WIDTH))
-            elif key in busy_days:
-                ws.write(row, col, "Unavailable", unavail_fmt)
+        for col, code in enumerate(matrix.rows[i], start=1):
+            if code >= _BOOKED:
+                text, bg, fg = matrix.label(code)
+                ws.write_string(row, col, text, booked_fmt(bg, fg))
+            elif code == UNAVAILABLE:
+                ws.write_string(row, col, "Unavailable", unavail_fmt)
             else:
-                fmt = weekend_empty_fmt if d.weekday() >= 5 else empty_fmt
-                ws.write_blank(row, col, None, fmt)
-        ws.set_row(row, _row_height(max_lines))
+                ws.write_blank(
+                    row, col, None, weekend_empty_fmt if weekend[col - 1] else empty_fmt
+                )
 
     # =========================================================
     # Sheet 3: Summary
@@ -552,9 +630,9 @@ def build_schedule_xlsx(timeslots, filename, title=None, header_rows=None):
         "Oversight Days", "Debrief Days", "Contingency Days", "Other Days",
         "Lead", "Author",
     ]
+    ws2.set_column(0, len(summary_cols) - 1, SUMMARY_COL_WIDTH)
     for col, name in enumerate(summary_cols):
         ws2.write(0, col, name, summary_header_fmt)
-        ws2.set_column(col, col, SUMMARY_COL_WIDTH)
 
     phases_seen = {}
     for slot in slots_list:
@@ -585,22 +663,41 @@ def build_schedule_xlsx(timeslots, filename, title=None, header_rows=None):
             phase.project_lead.get_full_name() if phase.project_lead else "",
             phase.report_author.get_full_name() if phase.report_author else "",
         ]
-        for col, value in enumerate(values):
-            ws2.write(row, col, value, summary_cell_fmt)
         # Size the row for the widest wrapping text column (job / phase / service).
         max_lines = max(
             _est_lines(values[1], SUMMARY_COL_WIDTH),
             _est_lines(phase.title, SUMMARY_COL_WIDTH),
-            _est_lines(str(phase.service) if phase.service else "", SUMMARY_COL_WIDTH),
+            _est_lines(values[4], SUMMARY_COL_WIDTH),
         )
         ws2.set_row(row, _row_height(max_lines))
+        for col, value in enumerate(values):
+            ws2.write(row, col, value, summary_cell_fmt)
 
     workbook.close()
-    output.seek(0)
 
-    response = HttpResponse(
-        output.getvalue(),
+
+def build_schedule_xlsx(timeslots, filename, title=None, header_rows=None):
+    """
+    Build a themed three-sheet XLSX schedule export.
+
+    "Overview"  a client-ready cover sheet: title, key stats and a colour key.
+    "Schedule"  a grid of resources (rows) x dates (columns). Booked cells carry
+                the phase + delivery type in the same colours as the on-screen
+                scheduler; days a resource is committed elsewhere (other work,
+                leave, internal) are marked Unavailable so gaps read as free.
+    "Summary"   one row per phase with the full hours breakdown and team.
+
+    ``title``       optional heading shown on the Overview sheet.
+    ``header_rows`` optional list of (label, value) tuples shown as key stats.
+
+    The workbook is spooled to a temporary file and streamed back.
+    """
+    output = tempfile.TemporaryFile()
+    write_schedule_xlsx(timeslots, output, title=title, header_rows=header_rows)
+    output.seek(0)
+    return FileResponse(
+        output,
+        as_attachment=True,
+        filename="{}.xlsx".format(filename),
         content_type="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
     )
-    response["Content-Disposition"] = 'attachment; filename="{}.xlsx"'.format(filename)
-    return response
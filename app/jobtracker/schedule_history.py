@@ -18,6 +18,7 @@ from .models import (
     TimeSlotComment,
     Phase,
 )
+from . import schedule_cache
 
 logger = logging.getLogger(__name__)
 
@@ -173,6 +174,7 @@ def record(actor, action_type, items_before, items_after):
         summary=_summarise(action_type, payload),
         payload=payload,
     )
+    schedule_cache.invalidate_action(action)
     _broadcast(action)
     return action
 
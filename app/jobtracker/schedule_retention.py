@@ -0,0 +1,158 @@
+"""Compaction and retention for the ScheduleAction log.
+
+:func:`jobtracker.schedule_history.record` stores full before/after snapshots
+for every scheduler mutation. Two passes keep the table that the history panel
+and undo read from small:
+
+* :func:`compact` squashes chains of MOVEs by one actor over exactly the same
+  slots, with nothing else touching those slots in between, into the chain's
+  first action (before of the first, after of the last). Only actions older
+  than :data:`COMPACT_AFTER` are squashed, so a user's recent undo steps are
+  left as they made them.
+* :func:`archive` moves actions older than ``SCHEDULE_HISTORY_RETENTION_DAYS``
+  into :class:`~jobtracker.models.ScheduleActionArchive` with compressed payloads.
+
+:func:`export_actions` yields hot and archived actions alike for audit export
+(``manage.py export_schedule_history``).
+"""
+import logging
+from datetime import timedelta
+
+from constance import config
+from django.db import transaction
+from django.utils import timezone
+
+from .models import ScheduleAction, ScheduleActionArchive, ScheduleActionType
+from .schedule_history import _summarise
+
+logger = logging.getLogger(__name__)
+
+COMPACT_AFTER = timedelta(days=1)
+# How far back a compaction run looks for chains to extend
+COMPACT_LOOKBACK = timedelta(days=7)
+BATCH_SIZE = 500
+
+
+def _keys(action):
+    return frozenset((item["model"], item["pk"]) for item in action.payload)
+
+
+def _squashable(action):
+    return (
+        action.action_type == ScheduleActionType.MOVE
+        and action.actor_id
+        and not action.reverted
+    )
+
+
+def squash_payload(first, last):
+    """Before of ``first``, after of ``last``; slots moved back where they
+    started drop out."""
+    after = {(item["model"], item["pk"]): item["after"] for item in last}
+    payload = []
+    for item in first:
+        final = after[(item["model"], item["pk"])]
+        if final != item["before"]:
+            payload.append({**item, "after": final})
+    return payload
+
+
+def _chains(actions):
+    """Group squashable actions into chains, in commit order."""
+    last_touch = {}
+    open_chains = {}
+    chains = []
+    for action in actions:
+        keys = _keys(action)
+        if _squashable(action):
+            chain = open_chains.get((action.actor_id, keys))
+            if chain is None or any(last_touch.get(k) != chain[-1].pk for k in keys):
+                chain = open_chains[(action.actor_id, keys)] = []
+                chains.append(chain)
+            chain.append(action)
+        for key in keys:
+            last_touch[key] = action.pk
+    return [chain for chain in chains if len(chain) > 1]
+
+
+def compact(now=None):
+    """Squash MOVE chains older than :data:`COMPACT_AFTER`.
+
+    Returns the number of actions removed.
+    """
+    now = now or timezone.now()
+    actions = ScheduleAction.objects.filter(
+        created__lt=now - COMPACT_AFTER,
+        created__gte=now - COMPACT_AFTER - COMPACT_LOOKBACK,
+    ).order_by("pk")
+    removed = 0
+    for chain in _chains(actions.iterator(chunk_size=BATCH_SIZE)):
+        head, tail = chain[0], chain[1:]
+        payload = squash_payload(head.payload, chain[-1].payload)
+        with transaction.atomic():
+            ScheduleAction.objects.filter(pk__in=[a.pk for a in tail]).delete()
+            removed += len(tail)
+            if payload:
+                head.payload = payload
+                head.created = chain[-1].created
+                head.summary = _summarise(ScheduleActionType.MOVE, payload)
+                head.save(update_fields=["payload", "created", "summary"])
+            else:
+                head.delete()
+                removed += 1
+    return removed
+
+
+def archive(now=None):
+    """Move actions past the retention window to the archive table.
+
+    Returns the number archived; a retention of 0 days keeps everything hot.
+    """
+    days = config.SCHEDULE_HISTORY_RETENTION_DAYS
+    if not days or days <= 0:
+        return 0
+    cutoff = (now or timezone.now()) - timedelta(days=days)
+    archived = 0
+    while True:
+        batch = list(
+            ScheduleAction.objects.filter(created__lt=cutoff).order_by("pk")[:BATCH_SIZE]
+        )
+        if not batch:
+            break
+        with transaction.atomic():
+            ScheduleActionArchive.objects.bulk_create(
+                [ScheduleActionArchive.from_action(a) for a in batch],
+                ignore_conflicts=True,
+            )
+            ScheduleAction.objects.filter(pk__in=[a.pk for a in batch]).delete()
+        archived += len(batch)
+    return archived
+
+
+def _export_row(obj, archived):
+    return {
+        "action_id": obj.action_id if archived else obj.pk,
+        "created": obj.created.isoformat(),
+        "actor_id": obj.actor_id,
+        "action_type": obj.action_type,
+        "job_id": obj.job_id,
+        "phase_id": obj.phase_id,
+        "summary": obj.summary,
+        "reverted": obj.reverted,
+        "reverted_by_id": obj.reverted_by_id,
+        "archived": archived,
+        "payload": obj.payload,
+    }
+
+
+def export_actions(start=None, end=None):
+    """Yield archived then hot actions created in ``[start, end)`` as dicts,
+    oldest first within each table."""
+    for model, archived in ((ScheduleActionArchive, True), (ScheduleAction, False)):
+        qs = model.objects.order_by("created")
+        if start:
+            qs = qs.filter(created__gte=start)
+        if end:
+            qs = qs.filter(created__lt=end)
+        for obj in qs.iterator(chunk_size=BATCH_SIZE):
+            yield _export_row(obj, archived)
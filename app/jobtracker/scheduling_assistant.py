@@ -4,9 +4,9 @@ Pure logic (no HTTP) so it is independently testable. Given a service (its
 required/desired skills + qualifications), a required number of working days and
 a search window, it produces a ranked list of candidates scored transparently on:
 
-  * skill competency tier for the service  (Service.get_service_readiness_breakdown)
+  * skill competency tier for the service  (ServiceReadiness, jobtracker.service_readiness)
   * earliest available run of N working days (mirrors views.scheduler.working_day_runs,
-    but bulk-computes holidays once by country to avoid a per-user query)
+    answered from per-user free-run indexes, see jobtracker.availability)
   * availability % over the window          (User.objects.calculate_bulk_utilization)
   * client onboarding status                (ClientOnboarding.status)
   * required/desired qualifications held     (QualificationRecord, AWARDED)
@@ -16,12 +16,16 @@ a search window, it produces a ranked list of candidates scored transparently on
 Each signal keeps its raw 0..1 value, weight and a human label so the UI can show
 *why* someone was suggested. Signals are individually toggleable via ``weights``:
 a signal with weight 0 is dropped from the score (skill and availability always on).
+
+Several services/phases can be ranked in one pass (``rank_candidates_for_services``):
+the pool's data is loaded once for all of them, which is also what
+``propose_job_staffing`` builds its one-person-per-phase proposal on.
 """
 
 from __future__ import annotations
 
 import math
-from dataclasses import dataclass, field
+from dataclasses import dataclass, field, replace
 from datetime import date, datetime, timedelta
 
 from django.utils import timezone
@@ -107,38 +111,21 @@ def _aware(d, end=False):
     return timezone.make_aware(datetime.combine(d, t))
 
 
-def _expand_days(start_dt, end_dt):
-    """Yield each date in [start_dt.date(), end_dt.date()] inclusive."""
-    cur = start_dt.date()
-    last = end_dt.date()
-    while cur <= last:
-        yield cur
-        cur += timedelta(days=1)
+@dataclass
+class RankRequest:
+    """One service to rank for in :func:`rank_candidates_for_services`.
 
+    Fields mirror the keyword arguments of :func:`rank_candidates_for_service`.
+    """
 
-def _find_window(business_days, holidays, occupied, search_start, search_end, required):
-    """First run of ``required`` bookable working days in [search_start, search_end].
-
-    A day is bookable if it is an org business day, not a holiday and not occupied.
-    Non-working days don't break or count toward a run (a booking may span a
-    weekend). Returns (start_date, end_date, run_len_working_days). If no run is
-    long enough returns (None, None, longest_run_seen)."""
-    run = []  # working-day dates in the current unbroken run
-    best_len = 0
-    cur, last = search_start, search_end
-    while cur <= last:
-        is_business = (cur.weekday() + 1) in business_days and cur not in holidays
-        if is_business:
-            if cur in occupied:
-                best_len = max(best_len, len(run))
-                run = []
-            else:
-                run.append(cur)
-                if len(run) >= required:
-                    return run[0], run[-1], len(run)
-        cur += timedelta(days=1)
-    best_len = max(best_len, len(run))
-    return None, None, best_len
+    service: object
+    required_working_days: int
+    search_start: date
+    search_end: date | None = None
+    client: object = None
+    unit: object = None
+    pinned_ids: set | None = None
+    role_map: dict | None = None
 
 
 def rank_candidates_for_service(
@@ -171,73 +158,106 @@ def rank_candidates_for_service(
 
     Returns a list[Candidate] sorted best-first (pinned/on-phase first).
     """
+    request = RankRequest(
+        service=service,
+        required_working_days=required_working_days,
+        search_start=search_start,
+        search_end=search_end,
+        client=client,
+        unit=unit,
+        pinned_ids=pinned_ids,
+        role_map=role_map,
+    )
+    return rank_candidates_for_services(
+        [request], candidate_pool=candidate_pool, weights=weights
+    )[0]
+
+
+def _ids_by_service(through, field, service_ids):
+    """``{service_id: {related_id, ...}}`` for a Service M2M, in one query."""
+    ids = {sid: set() for sid in service_ids}
+    for sid, rid in through.objects.filter(service_id__in=service_ids).values_list(
+        "service_id", field
+    ):
+        ids[sid].add(rid)
+    return ids
+
+
+def rank_candidates_for_services(requests, *, candidate_pool=None, weights=None):
+    """Rank candidates for several services (e.g. every phase of a job) at once.
+
+    The candidate pool's data — skills, occupancy, utilisation, onboarding,
+    qualifications, job levels and holidays — is loaded once for the union of
+    all requests and scored against each request's service, client and window.
+
+    Args:
+        requests: list of :class:`RankRequest`.
+        candidate_pool / weights: as for :func:`rank_candidates_for_service`.
+
+    Returns one list[Candidate] per request, in the same order.
+    """
+    return _rank(requests, candidate_pool=candidate_pool, weights=weights)[0]
+
+
+def _rank(requests, *, candidate_pool=None, weights=None):
+    """:func:`rank_candidates_for_services` plus the ``{user_id: FreeRunIndex}``
+    built over the union window, for callers that search further windows."""
+    from django.db.models import Count, Q
+
     from chaotica_utils.models import User, Holiday
     from chaotica_utils.models.job_levels import JobLevel, UserJobLevel
-    from .models import TimeSlot, ClientOnboarding
+    from .models import TimeSlot, ClientOnboarding, Service, QualificationRecord
     from .enums import QualificationStatus
+    from . import availability, service_readiness
 
-    required_working_days = max(1, int(required_working_days or 1))
-    if search_end is None:
-        search_end = search_start + timedelta(days=DEFAULT_HORIZON_DAYS)
-    horizon_days = max(1, (search_end - search_start).days)
+    if not requests:
+        return [], {}
     active_weights = _active_weights(weights)
-    pinned_ids = {int(u) for u in pinned_ids} if pinned_ids else set()
-    role_map = role_map or {}
-
-    # --- 1. Skill tiers from a single readiness call ---------------------------
-    required_skill_count = service.skillsRequired.count()
     pool_ids = None
     if candidate_pool is not None:
         pool_ids = set(candidate_pool.values_list("id", flat=True))
 
-    # Tier = competency for the WHOLE service: a user must hold ALL required
-    # skills, and their tier is the *weakest* of those ratings (specialist only
-    # if every required skill is specialist). Computed directly from UserSkill in
-    # one query (avoids the buggy/cached readiness helper).
-    tier_by_id = None
-    if required_skill_count:
-        from collections import defaultdict
-        from .models.skill import UserSkill
-        from .enums import UserSkillRatings
-
-        required_skill_ids = set(service.skillsRequired.values_list("id", flat=True))
-        skill_q = UserSkill.objects.filter(
-            skill_id__in=required_skill_ids, user__is_active=True
+    requests = [
+        replace(
+            req,
+            required_working_days=max(1, int(req.required_working_days or 1)),
+            search_end=req.search_end
+            or req.search_start + timedelta(days=DEFAULT_HORIZON_DAYS),
+            pinned_ids={int(u) for u in req.pinned_ids} if req.pinned_ids else set(),
+            role_map=req.role_map or {},
         )
-        if pool_ids is not None:
-            # Keep pinned (on-phase) people in scope even if outside the pool.
-            skill_q = skill_q.filter(user_id__in=(pool_ids | pinned_ids))
-
-        ratings_by_user = defaultdict(dict)
-        for uid, sid, rating in skill_q.values_list("user_id", "skill_id", "rating"):
-            # Keep the highest rating recorded for a skill (defensive; unique_together
-            # should make one row per (user, skill)).
-            if rating > ratings_by_user[uid].get(sid, -1):
-                ratings_by_user[uid][sid] = rating
-
-        tier_by_id = {}
-        for uid, sk in ratings_by_user.items():
-            if not required_skill_ids.issubset(sk.keys()):
-                continue  # missing at least one required skill -> can't deliver
-            min_rating = min(sk[s] for s in required_skill_ids)
-            if min_rating >= UserSkillRatings.SPECIALIST:
-                tier_by_id[uid] = 3
-            elif min_rating >= UserSkillRatings.CAN_DO_ALONE:
-                tier_by_id[uid] = 2
-            elif min_rating >= UserSkillRatings.CAN_DO_WITH_SUPPORT:
-                tier_by_id[uid] = 1
-            # NO_EXPERIENCE in a required skill -> excluded
-
-    # --- 2. Candidate id set (intersect tiers with the permission-scoped pool) --
-    if tier_by_id is not None:
-        cand_ids = set(tier_by_id.keys())
-        if pool_ids is not None:
-            cand_ids &= pool_ids
-    else:
-        # Service defines no required skills -> no competency constraint.
-        if pool_ids is not None:
+        for req in requests
+    ]
+    all_pinned = set().union(*(req.pinned_ids for req in requests))
+
+    # --- 1. Skill tiers from the materialised readiness rows -------------------
+    service_ids = {req.service.pk for req in requests}
+    skills_by_service = _ids_by_service(
+        Service.skillsRequired.through, "skill_id", service_ids
+    )
+    tier_scope = None
+    if pool_ids is not None:
+        # Keep pinned (on-phase) people in scope even if outside the pool.
+        tier_scope = pool_ids | all_pinned
+    tiers_by_service = service_readiness.tiers_by_service(
+        [sid for sid, skill_ids in skills_by_service.items() if skill_ids],
+        tier_scope,
+    )
+
+    # --- 2. Candidate id set per request ----------------------------------------
+    plans = []
+    for req in requests:
+        tier_by_id = None
+        if skills_by_service[req.service.pk]:
+            tier_by_id = tiers_by_service[req.service.pk]
+            cand_ids = set(tier_by_id.keys())
+            if pool_ids is not None:
+                cand_ids &= pool_ids
+        elif pool_ids is not None:
+            # Service defines no required skills -> no competency constraint.
             cand_ids = set(pool_ids)
-        elif unit is not None:
+        elif req.unit is not None:
+            unit = req.unit
             cand_ids = set(
                 unit.get_activeMembers().values_list("pk", flat=True)
                 if hasattr(unit, "get_activeMembers")
@@ -247,75 +267,85 @@ def rank_candidates_for_service(
             )
         else:
             cand_ids = set()
+        # Always surface people already on the phase, even if they'd otherwise be
+        # filtered out (wrong unit, missing a skill, etc.).
+        cand_ids |= req.pinned_ids
+        plans.append((req, tier_by_id, cand_ids))
 
-    # Always surface people already on the phase, even if they'd otherwise be
-    # filtered out (wrong unit, missing a skill, etc.).
-    cand_ids |= pinned_ids
-
-    if not cand_ids:
-        return []
+    all_ids = set().union(*(cand_ids for _, _, cand_ids in plans))
+    if not all_ids:
+        return [[] for _ in requests], {}
 
-    pool_qs = (
-        User.objects.filter(pk__in=cand_ids)
-        .prefetch_related(
+    users = list(
+        User.objects.filter(pk__in=all_ids).prefetch_related(
             "unit_memberships__unit",
             "job_level_history__job_level",
         )
     )
 
-    # --- 3. Bulk loads (one query each, avoid N+1) -----------------------------
-    start_dt, end_dt = _aware(search_start), _aware(search_end, end=True)
+    # --- 3. Bulk loads over the union window (one query each, avoid N+1) -------
+    window_start = min(req.search_start for req in requests)
+    window_end = max(req.search_end for req in requests)
 
-    # Occupied working days per user (any slot blocks a run, like the booking
-    # "around" mode). One query for everyone.
-    occupied_by_user = {uid: set() for uid in cand_ids}
-    for uid, s, e in TimeSlot.objects.filter(
-        user_id__in=cand_ids, end__gte=start_dt, start__lte=end_dt
-    ).values_list("user_id", "start", "end"):
-        occupied_by_user[uid].update(_expand_days(s, e))
-
-    # Availability / utilisation over the window. One aggregate pass.
-    util = User.objects.calculate_bulk_utilization(pool_qs, start_dt, end_dt)
-    by_user = util.get("by_user", {})
+    # Availability / utilisation per request window, from one occupancy load.
+    utilisation = User.objects.calculate_bulk_utilization_windows(
+        User.objects.filter(pk__in=all_ids),
+        [(_aware(req.search_start), _aware(req.search_end, end=True)) for req in requests],
+    )
 
     # Client onboarding. One query.
-    onboarding_by_user = {}
-    client_needs_onboarding = bool(client and getattr(client, "onboarding_required", False))
-    if client:
-        for ob in ClientOnboarding.objects.filter(client=client, user_id__in=cand_ids):
-            onboarding_by_user[ob.user_id] = ob.status()
+    client_ids = {req.client.pk for req in requests if req.client}
+    onboarding = {}
+    if client_ids:
+        for ob in ClientOnboarding.objects.filter(
+            client_id__in=client_ids, user_id__in=all_ids
+        ).select_related("client"):
+            onboarding[(ob.client_id, ob.user_id)] = ob.status()
 
     # Service delivery history. One aggregate query.
-    from django.db.models import Count
-
-    history_by_user = {}
+    history = {}
     for row in (
-        TimeSlot.objects.filter(user_id__in=cand_ids, phase__service=service)
-        .values("user_id")
+        TimeSlot.objects.filter(user_id__in=all_ids, phase__service_id__in=service_ids)
+        .values("user_id", "phase__service_id")
         .annotate(n=Count("phase", distinct=True))
     ):
-        history_by_user[row["user_id"]] = row["n"]
+        history[(row["phase__service_id"], row["user_id"])] = row["n"]
 
-    # Qualifications. One query, matched against the service's required/desired.
-    required_qual_ids = set(service.qualificationsRequired.values_list("id", flat=True))
-    desired_qual_ids = set(service.qualificationsDesired.values_list("id", flat=True))
-    relevant_qual_ids = required_qual_ids | desired_qual_ids
-    held_quals_by_user = {uid: {} for uid in cand_ids}
+    # Qualifications. One query, matched against each service's required/desired.
+    required_quals_by_service = _ids_by_service(
+        Service.qualificationsRequired.through, "qualification_id", service_ids
+    )
+    desired_quals_by_service = _ids_by_service(
+        Service.qualificationsDesired.through, "qualification_id", service_ids
+    )
+    relevant_qual_ids = set().union(
+        *required_quals_by_service.values(), *desired_quals_by_service.values()
+    )
+    held_quals_by_user = {uid: {} for uid in all_ids}
     if relevant_qual_ids:
-        from .models import QualificationRecord
-
         for rec in QualificationRecord.objects.filter(
-            user_id__in=cand_ids,
+            user_id__in=all_ids,
             status=QualificationStatus.AWARDED,
             qualification_id__in=relevant_qual_ids,
         ).select_related("qualification"):
             held_quals_by_user.setdefault(rec.user_id, {})[rec.qualification_id] = rec.qualification
 
+    # Required qualifications, evaluated once (used per candidate for the
+    # missing-quals list).
+    required_quals = {}
+    all_required_qual_ids = set().union(*required_quals_by_service.values())
+    if all_required_qual_ids:
+        from .models import Qualification
+
+        required_quals = {
+            q.pk: q for q in Qualification.objects.filter(pk__in=all_required_qual_ids)
+        }
+
     # Current job level per user. One query (get_current_level is per-call, so we
     # bulk-load here to avoid an N+1 over the candidate pool).
     level_by_user = {}
     for lvl in (
-        UserJobLevel.objects.filter(user_id__in=cand_ids, is_current=True)
+        UserJobLevel.objects.filter(user_id__in=all_ids, is_current=True)
         .select_related("job_level")
     ):
         level_by_user[lvl.user_id] = lvl
@@ -326,32 +356,24 @@ def rank_candidates_for_service(
         or 1
     )
 
-    # Required qualifications, evaluated once (used per candidate for the
-    # missing-quals list).
-    required_quals = list(service.qualificationsRequired.all())
-
     # Bulk holiday fetch by country (avoids a per-user holiday query).
-    countries = {u.country for u in pool_qs}
-    from django.db.models import Q as _Q
-
+    countries = {u.country for u in users}
     holidays_by_country = {}
     global_holidays = set()
     for country, hdate in Holiday.objects.filter(
-        _Q(country__in=[c for c in countries if c]) | _Q(country__isnull=True),
-        date__gte=search_start,
-        date__lte=search_end,
+        Q(country__in=[c for c in countries if c]) | Q(country__isnull=True),
+        date__gte=window_start,
+        date__lte=window_end,
     ).values_list("country", "date"):
         if country is None:
             global_holidays.add(hdate)
         else:
             holidays_by_country.setdefault(country, set()).add(hdate)
 
-    # --- 4. Build candidates ----------------------------------------------------
-    candidates = []
-    for user in pool_qs:
-        uid = user.pk
-        tier = tier_by_id.get(uid) if tier_by_id is not None else 0
-
+    # Free-run index per user (any slot blocks a run, like the booking "around"
+    # mode). Cached per user; misses are built from one occupancy query.
+    calendars = {}
+    for user in users:
         membership = user.unit_memberships.first()
         business_days = (
             membership.unit.businessHours_days
@@ -359,78 +381,100 @@ def rank_candidates_for_service(
             else [1, 2, 3, 4, 5]
         )
         holidays = set(holidays_by_country.get(user.country, set())) | global_holidays
-
-        w_start, w_end, run_len = _find_window(
-            business_days,
-            holidays,
-            occupied_by_user.get(uid, set()),
-            search_start,
-            search_end,
-            required_working_days,
+        calendars[user.pk] = (business_days, holidays)
+    indexes = availability.indexes_for_users(calendars, window_start, window_end)
+
+    # --- 4. Build candidates per request ----------------------------------------
+    results = []
+    for (req, tier_by_id, cand_ids), util in zip(plans, utilisation):
+        by_user = util.get("by_user", {})
+        horizon_days = max(1, (req.search_end - req.search_start).days)
+        client_needs_onboarding = bool(
+            req.client and getattr(req.client, "onboarding_required", False)
         )
+        required_qual_ids = required_quals_by_service[req.service.pk]
+        desired_qual_ids = desired_quals_by_service[req.service.pk]
+
+        candidates = []
+        for user in users:
+            uid = user.pk
+            if uid not in cand_ids:
+                continue
+            tier = tier_by_id.get(uid) if tier_by_id is not None else 0
+
+            w_start, w_end, run_len = indexes[uid].earliest(
+                req.required_working_days,
+                on_or_after=req.search_start,
+                until=req.search_end,
+            )
 
-        stat = by_user.get(uid, {})
-        avail_pct = stat.get("available_percentage") or 0
-        util_pct = stat.get("utilisation_percentage") or 0
-
-        onboarding_status = onboarding_by_user.get(uid)
-        if onboarding_status is None:
-            onboarding_status = "pending" if client_needs_onboarding else "n_a"
-
-        held = held_quals_by_user.get(uid, {})
-        matched_required = [held[q] for q in required_qual_ids if q in held]
-        missing_required = [q for q in required_qual_ids if q not in held]
-        matched_desired = [held[q] for q in desired_qual_ids if q in held]
-
-        history_count = history_by_user.get(uid, 0)
-
-        current_level = level_by_user.get(uid)
-        seniority_order = current_level.job_level.order if current_level else 999
-        seniority_label = str(current_level.job_level) if current_level else "No Level"
-
-        c = Candidate(
-            user=user,
-            tier=tier,
-            tier_label=_TIER_LABELS.get(tier, "Unknown"),
-            earliest_start=w_start,
-            earliest_end=w_end,
-            run_length=run_len,
-            availability_pct=round(avail_pct, 1),
-            utilisation_pct=round(util_pct, 1),
-            onboarding_status=onboarding_status,
-            matched_quals=matched_required + matched_desired,
-            missing_quals=[q for q in required_quals if q.id in missing_required],
-            history_count=history_count,
-            seniority_order=seniority_order,
-            seniority_label=seniority_label,
-            on_phase=uid in pinned_ids,
-            phase_roles=role_map.get(uid, []),
-        )
-        _score_candidate(
-            c,
-            active_weights=active_weights,
-            tier_by_id=tier_by_id,
-            search_start=search_start,
-            horizon_days=horizon_days,
-            required_qual_ids=required_qual_ids,
-            desired_qual_ids=desired_qual_ids,
-            matched_required=matched_required,
-            matched_desired=matched_desired,
-            max_order=max_order,
-        )
-        candidates.append(c)
-
-    # People already on the phase float to the top (regardless of score), then
-    # everyone else by score.
-    candidates.sort(
-        key=lambda c: (
-            not c.on_phase,
-            -c.score,
-            (c.earliest_start or date.max),
-            c.seniority_order,
+            stat = by_user.get(uid, {})
+            avail_pct = stat.get("available_percentage") or 0
+            util_pct = stat.get("utilisation_percentage") or 0
+
+            onboarding_status = (
+                onboarding.get((req.client.pk, uid)) if req.client else None
+            )
+            if onboarding_status is None:
+                onboarding_status = "pending" if client_needs_onboarding else "n_a"
+
+            held = held_quals_by_user.get(uid, {})
+            matched_required = [held[q] for q in required_qual_ids if q in held]
+            missing_required = [q for q in required_qual_ids if q not in held]
+            matched_desired = [held[q] for q in desired_qual_ids if q in held]
+
+            history_count = history.get((req.service.pk, uid), 0)
+
+            current_level = level_by_user.get(uid)
+            seniority_order = current_level.job_level.order if current_level else 999
+            seniority_label = str(current_level.job_level) if current_level else "No Level"
+
+            c = Candidate(
+                user=user,
+                tier=tier,
+                tier_label=_TIER_LABELS.get(tier, "Unknown"),
+                earliest_start=w_start,
+                earliest_end=w_end,
+                run_length=run_len,
+                availability_pct=round(avail_pct, 1),
+                utilisation_pct=round(util_pct, 1),
+                onboarding_status=onboarding_status,
+                matched_quals=matched_required + matched_desired,
+                missing_quals=[
+                    q for qid, q in required_quals.items() if qid in missing_required
+                ],
+                history_count=history_count,
+                seniority_order=seniority_order,
+                seniority_label=seniority_label,
+                on_phase=uid in req.pinned_ids,
+                phase_roles=req.role_map.get(uid, []),
+            )
+            _score_candidate(
+                c,
+                active_weights=active_weights,
+                tier_by_id=tier_by_id,
+                search_start=req.search_start,
+                horizon_days=horizon_days,
+                required_qual_ids=required_qual_ids,
+                desired_qual_ids=desired_qual_ids,
+                matched_required=matched_required,
+                matched_desired=matched_desired,
+                max_order=max_order,
+            )
+            candidates.append(c)
+
+        # People already on the phase float to the top (regardless of score), then
+        # everyone else by score.
+        candidates.sort(
+            key=lambda c: (
+                not c.on_phase,
+                -c.score,
+                (c.earliest_start or date.max),
+                c.seniority_order,
+            )
         )
-    )
-    return candidates
+        results.append(candidates)
+    return results, indexes
 
 
 def _score_candidate(
@@ -558,11 +602,8 @@ def phase_delivery_day_stats(phase):
     }
 
 
-def rank_candidates_for_phase(phase, *, required_working_days=None, search_start=None, candidate_pool=None, weights=None):
-    """Derive inputs from a phase and rank its candidate deliverers.
-
-    ``required_working_days`` / ``search_start`` may be supplied to override the
-    values otherwise derived from the phase (scoped hours / desired start)."""
+def _phase_request(phase, *, required_working_days=None, search_start=None):
+    """RankRequest for ``phase``: service, scoped length, window, pinned people."""
     today = timezone.now().date()
     required = required_working_days or phase_required_working_days(phase)
     search_start = search_start or phase.start_date or today
@@ -581,37 +622,155 @@ def rank_candidates_for_phase(phase, *, required_working_days=None, search_start
 
     role_map = assigned_role_map(phase.job, phase) if phase.job_id else {}
 
-    return rank_candidates_for_service(
+    return RankRequest(
         service=phase.service,
         required_working_days=required,
         search_start=search_start,
         search_end=search_start + timedelta(days=DEFAULT_HORIZON_DAYS),
         client=phase.job.client if phase.job_id else None,
         unit=phase.job.unit if phase.job_id else None,
-        candidate_pool=candidate_pool,
-        weights=weights,
         pinned_ids=on_phase_ids,
         role_map=role_map,
     )
 
 
+def rank_candidates_for_phase(phase, *, required_working_days=None, search_start=None, candidate_pool=None, weights=None):
+    """Derive inputs from a phase and rank its candidate deliverers.
+
+    ``required_working_days`` / ``search_start`` may be supplied to override the
+    values otherwise derived from the phase (scoped hours / desired start)."""
+    request = _phase_request(
+        phase, required_working_days=required_working_days, search_start=search_start
+    )
+    return rank_candidates_for_services(
+        [request], candidate_pool=candidate_pool, weights=weights
+    )[0]
+
+
+def rank_candidates_for_phases(phases, *, candidate_pool=None, weights=None):
+    """Rank candidates for every phase in one pass: ``{phase: list[Candidate]}``.
+
+    Phases without a service are skipped."""
+    phases = [p for p in phases if p.service_id]
+    requests = [_phase_request(phase) for phase in phases]
+    ranked = rank_candidates_for_services(
+        requests, candidate_pool=candidate_pool, weights=weights
+    )
+    return dict(zip(phases, ranked))
+
+
 def rank_candidates_for_job(job, *, required_working_days=None, candidate_pool=None, weights=None):
     """Job / indicative-services discovery: one ranked list per indicative service."""
     today = timezone.now().date()
     required = required_working_days or DEFAULT_JOB_DEFAULT_DAYS
-    results = {}
-    for service in job.indicative_services.all():
-        results[service] = rank_candidates_for_service(
+    services = list(job.indicative_services.all())
+    requests = [
+        RankRequest(
             service=service,
             required_working_days=required,
             search_start=today,
             search_end=today + timedelta(days=DEFAULT_HORIZON_DAYS),
             client=job.client,
             unit=job.unit,
-            candidate_pool=candidate_pool,
-            weights=weights,
         )
-    return results
+        for service in services
+    ]
+    ranked = rank_candidates_for_services(
+        requests, candidate_pool=candidate_pool, weights=weights
+    )
+    return dict(zip(services, ranked))
+
+
+@dataclass
+class StaffingProposal:
+    phase: object
+    candidate: Candidate | None  # None when nobody has a free run in the window
+    start: date | None
+    end: date | None
+    required_working_days: int
+    alternatives: list = field(default_factory=list)  # next-best free candidates
+
+
+def _overlaps(start, end, booked):
+    return next((b for b in booked if start <= b[1] and b[0] <= end), None)
+
+
+def _free_window(index, required, search_start, search_end, booked):
+    """Earliest ``required``-day run in ``index`` that avoids ``booked`` ranges."""
+    on_or_after = search_start
+    while on_or_after <= search_end:
+        start, end, _ = index.earliest(required, on_or_after=on_or_after, until=search_end)
+        if start is None:
+            return None, None
+        clash = _overlaps(start, end, booked)
+        if clash is None:
+            return start, end
+        # Any window starting before the clash ends would overlap it too.
+        on_or_after = clash[1] + timedelta(days=1)
+    return None, None
+
+
+def propose_job_staffing(job, *, phases=None, candidate_pool=None, weights=None, alternatives=3):
+    """Greedy "staff the whole job" proposal: one person per phase.
+
+    Every phase is ranked in a single :func:`rank_candidates_for_services` pass.
+    Phases are then filled earliest-start first (the scarcest phase first on a
+    tie), each taking its best-ranked candidate who still has a free run once
+    the windows already proposed to them are excluded, so nobody is
+    double-booked across phases.
+
+    Returns a list[StaffingProposal] in the order the phases were filled.
+    """
+    if phases is None:
+        from .enums import PhaseStatuses
+
+        phases = job.phases.filter(status__lt=PhaseStatuses.DELIVERED).order_by("phase_number")
+    phases = [p for p in phases if p.service_id]
+    requests = [_phase_request(phase) for phase in phases]
+    ranked, indexes = _rank(requests, candidate_pool=candidate_pool, weights=weights)
+
+    order = sorted(
+        range(len(phases)),
+        key=lambda i: (
+            requests[i].search_start,
+            sum(1 for c in ranked[i] if c.earliest_start),
+            phases[i].pk,
+        ),
+    )
+    booked = {}  # user_id -> [(start, end)] proposed so far
+    proposals = []
+    for i in order:
+        req = requests[i]
+        required = max(1, int(req.required_working_days or 1))
+        proposal = StaffingProposal(
+            phase=phases[i],
+            candidate=None,
+            start=None,
+            end=None,
+            required_working_days=required,
+        )
+        for candidate in ranked[i]:
+            index = indexes.get(candidate.user.pk)
+            if index is None:
+                continue
+            start, end = _free_window(
+                index, required, req.search_start, req.search_end,
+                booked.get(candidate.user.pk, ()),
+            )
+            if start is None:
+                continue
+            if proposal.candidate is None:
+                proposal.candidate, proposal.start, proposal.end = candidate, start, end
+            elif len(proposal.alternatives) < alternatives:
+                proposal.alternatives.append((candidate, start, end))
+            else:
+                break
+        if proposal.candidate is not None:
+            booked.setdefault(proposal.candidate.user.pk, []).append(
+                (proposal.start, proposal.end)
+            )
+        proposals.append(proposal)
+    return proposals
 
 
 # --------------------------------------------------------------------------- #
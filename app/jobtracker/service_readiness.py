@@ -0,0 +1,199 @@
+"""Materialised service readiness (:class:`~jobtracker.models.ServiceReadiness`).
+
+Service pages, the scheduling assistant and reporting all need "who can deliver
+this service, at what tier". Recomputing that means aggregating UserSkill over
+each service's required skills on every request, so instead one row per
+(service, user) holds the tier plus how many required skills/qualifications
+the user is missing, and readers filter it in one indexed query.
+
+Rows are refreshed incrementally by the signals in
+:mod:`jobtracker.signals.service_readiness`:
+
+* UserSkill / QualificationRecord changes refresh that user for the services
+  requiring the skill/qualification;
+* required skill/qualification M2M changes, and skill/qualification deletes,
+  refresh the services affected.
+
+Writes bypassing signals (queryset ``update()``) call :func:`refresh_users`
+directly. ``task_refresh_service_readiness`` rebuilds everything nightly as a
+backstop.
+"""
+from django.db import transaction
+from django.utils import timezone
+
+from .enums import QualificationStatus, UserSkillRatings
+from .models import QualificationRecord, Service, ServiceReadiness, UserSkill
+
+
+def compute(required_skills, required_quals, ratings, awarded):
+    """Readiness rows from plain data.
+
+    Args:
+        required_skills: ``{service_id: {skill_id, ...}}``.
+        required_quals: ``{service_id: {qualification_id, ...}}``.
+        ratings: ``{user_id: {skill_id: rating}}``, ratings below "Can Do With
+            Support" already dropped.
+        awarded: ``{user_id: {qualification_id, ...}}`` (AWARDED records).
+
+    Returns ``{(service_id, user_id): (tier, missing_skills, missing_quals)}``.
+    """
+    rows = {}
+    for service_id, skill_ids in required_skills.items():
+        if not skill_ids:
+            continue
+        qual_ids = required_quals.get(service_id, set())
+        for user_id, held in ratings.items():
+            met = skill_ids & held.keys()
+            if not met:
+                continue
+            missing = len(skill_ids) - len(met)
+            tier = (
+                min(held[s] for s in skill_ids)
+                if not missing
+                else ServiceReadiness.TIER_INCOMPLETE
+            )
+            rows[(service_id, user_id)] = (
+                tier,
+                missing,
+                len(qual_ids - awarded.get(user_id, set())),
+            )
+    return rows
+
+
+def _ids_by_service(through, field, service_ids=None):
+    qs = through.objects.all()
+    if service_ids is not None:
+        qs = qs.filter(service_id__in=service_ids)
+    ids = {}
+    for service_id, related_id in qs.values_list("service_id", field):
+        ids.setdefault(service_id, set()).add(related_id)
+    return ids
+
+
+def _load(service_ids=None, user_ids=None):
+    """:func:`compute` over the current data for the given scope (None = all)."""
+    required_skills = _ids_by_service(
+        Service.skillsRequired.through, "skill_id", service_ids
+    )
+    if not required_skills:
+        return {}
+    required_quals = _ids_by_service(
+        Service.qualificationsRequired.through,
+        "qualification_id",
+        list(required_skills),
+    )
+
+    skill_q = UserSkill.objects.filter(
+        skill_id__in=set().union(*required_skills.values()),
+        rating__gte=UserSkillRatings.CAN_DO_WITH_SUPPORT,
+    )
+    if user_ids is not None:
+        skill_q = skill_q.filter(user_id__in=user_ids)
+    ratings = {}
+    for user_id, skill_id, rating in skill_q.values_list("user_id", "skill_id", "rating"):
+        ratings.setdefault(user_id, {})[skill_id] = rating
+
+    awarded = {}
+    all_qual_ids = set().union(*required_quals.values())
+    if ratings and all_qual_ids:
+        for user_id, qual_id in QualificationRecord.objects.filter(
+            user_id__in=list(ratings),
+            qualification_id__in=all_qual_ids,
+            status=QualificationStatus.AWARDED,
+        ).values_list("user_id", "qualification_id"):
+            awarded.setdefault(user_id, set()).add(qual_id)
+
+    return compute(required_skills, required_quals, ratings, awarded)
+
+
+def refresh(service_ids=None, user_ids=None):
+    """Recompute rows for ``service_ids`` x ``user_ids`` (None = all) and write
+    only the difference. Returns ``(written, deleted)``."""
+    if service_ids is not None:
+        service_ids = list(service_ids)
+    if user_ids is not None:
+        user_ids = list(user_ids)
+    if service_ids == [] or user_ids == []:
+        return 0, 0
+
+    with transaction.atomic():
+        rows = _load(service_ids, user_ids)
+        existing = ServiceReadiness.objects.all()
+        if service_ids is not None:
+            existing = existing.filter(service_id__in=service_ids)
+        if user_ids is not None:
+            existing = existing.filter(user_id__in=user_ids)
+        have = {
+            (service_id, user_id): (pk, values)
+            for pk, service_id, user_id, *values in existing.values_list(
+                "pk", "service_id", "user_id",
+                "tier", "missing_skills", "missing_qualifications",
+            )
+        }
+
+        stale = [pk for key, (pk, _) in have.items() if key not in rows]
+        if stale:
+            ServiceReadiness.objects.filter(pk__in=stale).delete()
+
+        now = timezone.now()
+        changed = [
+            ServiceReadiness(
+                service_id=service_id,
+                user_id=user_id,
+                tier=tier,
+                missing_skills=missing_skills,
+                missing_qualifications=missing_quals,
+                updated_at=now,
+            )
+            for (service_id, user_id), (tier, missing_skills, missing_quals) in rows.items()
+            if have.get((service_id, user_id), (None, None))[1]
+            != [tier, missing_skills, missing_quals]
+        ]
+        if changed:
+            ServiceReadiness.objects.bulk_create(
+                changed,
+                update_conflicts=True,
+                unique_fields=["service", "user"],
+                update_fields=[
+                    "tier", "missing_skills", "missing_qualifications", "updated_at",
+                ],
+            )
+    return len(changed), len(stale)
+
+
+def refresh_users(user_ids, service_ids=None):
+    return refresh(service_ids=service_ids, user_ids=user_ids)
+
+
+def refresh_services(service_ids):
+    return refresh(service_ids=service_ids)
+
+
+def services_requiring_skills(skill_ids):
+    return set(
+        Service.skillsRequired.through.objects.filter(
+            skill_id__in=skill_ids
+        ).values_list("service_id", flat=True)
+    )
+
+
+def services_requiring_qualifications(qualification_ids):
+    return set(
+        Service.qualificationsRequired.through.objects.filter(
+            qualification_id__in=qualification_ids
+        ).values_list("service_id", flat=True)
+    )
+
+
+def tiers_by_service(service_ids, user_ids=None):
+    """``{service_id: {user_id: tier}}`` for active users able to deliver each
+    service (tier "Can Do With Support" or better), from one query."""
+    tiers = {service_id: {} for service_id in service_ids}
+    qs = ServiceReadiness.objects.capable().filter(
+        service_id__in=list(tiers), user__is_active=True
+    )
+    if user_ids is not None:
+        qs = qs.filter(user_id__in=user_ids)
+    for service_id, user_id, tier in qs.values_list("service_id", "user_id", "tier"):
+        tiers[service_id][user_id] = tier
+    return tiers
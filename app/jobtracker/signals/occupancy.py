@@ -0,0 +1,15 @@
+from django.db.models.signals import post_save
+from django.dispatch import receiver
+from ..models import TimeSlot
+from .. import occupancy
+
+
+@receiver(post_save, sender=TimeSlot)
+def sync_occupancy_on_timeslot_save(sender, instance, raw=False, **kwargs):
+    """Re-expand the slot into the per-day occupancy store.
+
+    Deletes need no handler: TimeSlotDay rows cascade with their slot.
+    """
+    if raw:
+        return
+    occupancy.sync_slot(instance)
@@ -0,0 +1,79 @@
+from django.contrib.auth.models import Group
+from django.db.models.signals import m2m_changed, post_delete, post_save
+from django.dispatch import receiver
+from guardian.models import GroupObjectPermission, UserObjectPermission
+
+from chaotica_utils.models import User
+from ..models import OrganisationalUnit, OrganisationalUnitMember
+from .. import permission_scope
+
+
+@receiver(post_save, sender=UserObjectPermission)
+@receiver(post_delete, sender=UserObjectPermission)
+def invalidate_scope_on_user_perm(sender, instance, **kwargs):
+    """Covers assign_perm/remove_perm, including OrganisationalUnit.sync_permissions."""
+    permission_scope.invalidate_users([instance.user_id])
+
+
+@receiver(post_save, sender=GroupObjectPermission)
+@receiver(post_delete, sender=GroupObjectPermission)
+def invalidate_scope_on_group_perm(sender, instance, **kwargs):
+    permission_scope.invalidate_all()
+
+
+# User fields that change what guardian grants regardless of stored permissions
+_SCOPE_USER_FIELDS = {"is_superuser", "is_active"}
+
+
+@receiver(post_save, sender=User)
+def invalidate_scope_on_user_flags(
+    sender, instance, created, update_fields=None, raw=False, **kwargs
+):
+    """Superusers see every unit and inactive users none, so a user's scope is
+    stale once either flag flips. Saves limited to other fields (e.g. the
+    ``last_login`` update on every login) are ignored."""
+    if created or raw:
+        return
+    if update_fields is not None and not _SCOPE_USER_FIELDS.intersection(update_fields):
+        return
+    permission_scope.invalidate_users([instance.pk])
+
+
+@receiver(m2m_changed, sender=User.groups.through)
+@receiver(m2m_changed, sender=User.user_permissions.through)
+def invalidate_scope_on_user_grants(sender, instance, action, reverse, pk_set, **kwargs):
+    if not action.startswith("post_"):
+        return
+    if reverse:
+        # Changed from the group/permission side: any of its users may be hit.
+        permission_scope.invalidate_all()
+    else:
+        permission_scope.invalidate_users([instance.pk])
+
+
+@receiver(m2m_changed, sender=Group.permissions.through)
+def invalidate_scope_on_group_grants(sender, action, **kwargs):
+    """Global roles (Group.sync_global_permissions) grant through groups."""
+    if action.startswith("post_"):
+        permission_scope.invalidate_all()
+
+
+@receiver(post_save, sender=OrganisationalUnitMember)
+@receiver(post_delete, sender=OrganisationalUnitMember)
+def invalidate_scope_on_membership(sender, instance, raw=False, **kwargs):
+    """Membership changes who everyone viewing the unit's schedule can see."""
+    if raw:
+        return
+    permission_scope.invalidate_all()
+
+
+@receiver(post_save, sender=OrganisationalUnit)
+def invalidate_scope_on_unit_created(sender, instance, created, raw=False, **kwargs):
+    """A new unit is in scope for everyone holding a global grant."""
+    if created and not raw:
+        permission_scope.invalidate_all()
+
+
+@receiver(post_delete, sender=OrganisationalUnit)
+def invalidate_scope_on_unit_deleted(sender, instance, **kwargs):
+    permission_scope.invalidate_all()
@@ -0,0 +1,29 @@
+from django.db.models.signals import post_save, post_delete
+from django.dispatch import receiver
+from ..models import TimeSlot, Phase
+from .. import schedule_cache
+
+
+@receiver(post_save, sender=TimeSlot)
+def invalidate_slot_cache_on_timeslot_save(sender, instance, raw=False, **kwargs):
+    """Covers slot writes made outside the scheduler (e.g. approved leave)."""
+    if raw:
+        return
+    schedule_cache.invalidate_users_on_commit([instance.user_id])
+
+
+@receiver(post_delete, sender=TimeSlot)
+def invalidate_slot_cache_on_timeslot_delete(sender, instance, **kwargs):
+    schedule_cache.invalidate_users_on_commit([instance.user_id])
+
+
+@receiver(post_save, sender=Phase)
+def invalidate_slot_cache_on_phase_change(sender, instance, created, raw=False, **kwargs):
+    """A status/title change re-colours/re-titles every slot on the phase."""
+    if created or raw:
+        return
+    if not instance.tracker.has_changed("status") and not instance.tracker.has_changed("title"):
+        return
+    schedule_cache.invalidate_users_on_commit(
+        set(instance.timeslots.values_list("user_id", flat=True))
+    )
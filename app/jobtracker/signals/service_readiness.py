@@ -0,0 +1,64 @@
+from django.db.models.signals import m2m_changed, post_delete, post_save, pre_delete
+from django.dispatch import receiver
+
+from ..models import Qualification, QualificationRecord, Service, Skill, UserSkill
+from .. import service_readiness
+
+
+@receiver(post_save, sender=UserSkill)
+@receiver(post_delete, sender=UserSkill)
+def refresh_readiness_on_userskill(sender, instance, raw=False, **kwargs):
+    if raw:
+        return
+    service_ids = service_readiness.services_requiring_skills([instance.skill_id])
+    if service_ids:
+        service_readiness.refresh_users([instance.user_id], service_ids)
+
+
+@receiver(post_save, sender=QualificationRecord)
+@receiver(post_delete, sender=QualificationRecord)
+def refresh_readiness_on_qualification_record(sender, instance, raw=False, **kwargs):
+    if raw:
+        return
+    service_ids = service_readiness.services_requiring_qualifications(
+        [instance.qualification_id]
+    )
+    if service_ids:
+        service_readiness.refresh_users([instance.user_id], service_ids)
+
+
+def _requiring(instance):
+    if isinstance(instance, Skill):
+        return service_readiness.services_requiring_skills([instance.pk])
+    return service_readiness.services_requiring_qualifications([instance.pk])
+
+
+@receiver(m2m_changed, sender=Service.skillsRequired.through)
+@receiver(m2m_changed, sender=Service.qualificationsRequired.through)
+def refresh_readiness_on_requirements(sender, instance, action, reverse, pk_set, **kwargs):
+    """Required skills/qualifications changed, from either side of the M2M."""
+    if not reverse:
+        if action.startswith("post_"):
+            service_readiness.refresh_services([instance.pk])
+        return
+    # Changed from the skill/qualification side: pk_set holds service ids,
+    # except on clear, where the services are captured beforehand.
+    if action == "pre_clear":
+        instance._readiness_service_ids = _requiring(instance)
+    elif action == "post_clear":
+        service_readiness.refresh_services(getattr(instance, "_readiness_service_ids", ()))
+    elif action in ("post_add", "post_remove"):
+        service_readiness.refresh_services(pk_set or ())
+
+
+@receiver(pre_delete, sender=Skill)
+@receiver(pre_delete, sender=Qualification)
+def capture_readiness_services(sender, instance, **kwargs):
+    """The M2M rows go with the skill/qualification without an m2m_changed."""
+    instance._readiness_service_ids = _requiring(instance)
+
+
+@receiver(post_delete, sender=Skill)
+@receiver(post_delete, sender=Qualification)
+def refresh_readiness_on_requirement_delete(sender, instance, **kwargs):
+    service_readiness.refresh_services(getattr(instance, "_readiness_service_ids", ()))
@@ -1,21 +1,20 @@
 from django.db.models.signals import post_save, post_delete
 from django.dispatch import receiver
-from django.core.cache import cache
-from ..models import UserSkill, Skill, SkillCategory
-import logging
-
-logger = logging.getLogger(__name__)
+from ..models import (
+    UserSkill,
+    Skill,
+    SkillCategory,
+    OrganisationalUnit,
+    OrganisationalUnitRole,
+    Team,
+)
+from .. import skill_matrix
 
 
 def clear_skill_matrix_cache():
     """Clear all skill matrix cache entries"""
-    # Clear filter options cache
-    cache.delete('skill_matrix_filter_options')
-
-    # Clear all matrix data caches (we can't enumerate all keys, so we use a pattern)
-    # In production, you might want to use Redis and its pattern deletion feature
-    # For now, we'll just log that cache should be cleared
-    logger.info("Skill matrix cache invalidation triggered")
+    # Rotating the generation orphans every cached matrix at once
+    skill_matrix.invalidate()
 
 
 @receiver(post_save, sender=UserSkill)
@@ -51,4 +50,15 @@ def clear_cache_on_category_save(sender, instance, **kwargs):
 @receiver(post_delete, sender=SkillCategory)
 def clear_cache_on_category_delete(sender, instance, **kwargs):
     """Clear skill matrix cache when a category is deleted"""
-    clear_skill_matrix_cache()
\ No newline at end of file
+    clear_skill_matrix_cache()
+
+
+@receiver(post_save, sender=OrganisationalUnit)
+@receiver(post_delete, sender=OrganisationalUnit)
+@receiver(post_save, sender=Team)
+@receiver(post_delete, sender=Team)
+@receiver(post_save, sender=OrganisationalUnitRole)
+@receiver(post_delete, sender=OrganisationalUnitRole)
+def clear_filter_options_on_change(sender, instance, **kwargs):
+    """Clear the skill matrix filter choices when a unit, team or role changes"""
+    skill_matrix.invalidate_filter_options()
@@ -0,0 +1,32 @@
+from django.db.models.signals import post_save
+from django.dispatch import receiver
+from ..models import Phase, Job
+from ..enums import JobStatuses
+from .. import workflow_queue
+
+
+@receiver(post_save, sender=Phase)
+def sync_workflow_queue_on_phase_save(sender, instance, created, raw=False, **kwargs):
+    """Re-queue the phase's automatic transitions when its status or dates move."""
+    if raw:
+        return
+    tracker = instance.tracker
+    if not created and not tracker.has_changed("status") and not (
+        tracker.has_changed("desired_start_date") or tracker.has_changed("_start_date")
+    ):
+        return
+    workflow_queue.sync_phase(instance)
+    if (
+        not created
+        and tracker.has_changed("status")
+        and instance.job.status == JobStatuses.IN_PROGRESS
+    ):
+        workflow_queue.queue_job_check(instance.job_id)
+
+
+@receiver(post_save, sender=Job)
+def sync_workflow_queue_on_job_save(sender, instance, created, raw=False, **kwargs):
+    if raw:
+        return
+    if created or instance.tracker.has_changed("status"):
+        workflow_queue.sync_job(instance)
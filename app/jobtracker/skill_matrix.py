@@ -0,0 +1,177 @@
+"""Cached, array-backed skill matrix.
+
+The skills matrix page used to rebuild a users x categories x skills tree of
+dicts (and ``UserSkill`` instances) on every load. Instead the ratings live in
+a :class:`SkillMatrix` - user ids x skill ids -> one byte per cell - built from
+a single ``values_list`` over ``UserSkill`` and cached together with the
+category/skill headers. Each filter combination slices that one entry rather
+than caching its own copy.
+
+Invalidation is by a generation token folded into the cache key: the
+UserSkill, Skill and SkillCategory signals in
+:mod:`jobtracker.signals.skill_cache` call :func:`invalidate`. Entries also
+expire after :data:`MATRIX_CACHE_TIMEOUT`.
+"""
+import uuid
+
+from django.core.cache import cache
+from django.db.models import Prefetch
+
+from .enums import UserSkillRatings
+from .models import Skill, SkillCategory, UserSkill
+
+MATRIX_CACHE_TIMEOUT = 60 * 30
+
+FILTER_OPTIONS_KEY = "skill_matrix_filter_options"
+_VERSION_KEY = "skill_matrix_ver"
+_ENTRY_KEY = "skill_matrix_data_{}"
+
+
+def invalidate():
+    """Drop the cached matrix (and filter options) by rotating the generation."""
+    cache.set(_VERSION_KEY, uuid.uuid4().hex, timeout=None)
+    invalidate_filter_options()
+
+
+def invalidate_filter_options():
+    """Drop the cached unit/team/category/role filter choices."""
+    cache.delete(FILTER_OPTIONS_KEY)
+
+
+def _version():
+    version = cache.get(_VERSION_KEY)
+    if version is None:
+        # Never fall back to a fixed default: an evicted token must not
+        # resurrect an entry written under an older generation.
+        version = uuid.uuid4().hex
+        cache.set(_VERSION_KEY, version, timeout=None)
+    return version
+
+
+class SkillMatrix:
+    """Ratings for ``user_ids`` x ``skill_ids``, one byte per cell, row-major.
+
+    The low bits of a cell hold the :class:`~jobtracker.enums.UserSkillRatings`
+    value and :attr:`INTERESTED` flags interest in improving. Users or skills
+    not in the matrix read as no experience, not interested.
+    """
+
+    INTERESTED = 0x80
+    RATING_MASK = 0x7F
+
+    def __init__(self, user_ids, skill_ids, cells=None):
+        self.user_ids = tuple(user_ids)
+        self.skill_ids = tuple(skill_ids)
+        size = len(self.user_ids) * len(self.skill_ids)
+        self.cells = bytes(cells) if cells is not None else bytes(size)
+        if len(self.cells) != size:
+            raise ValueError("cells must hold one byte per user x skill")
+        self._index()
+
+    def _index(self):
+        self._users = {pk: i for i, pk in enumerate(self.user_ids)}
+        self._skills = {pk: i for i, pk in enumerate(self.skill_ids)}
+
+    def __getstate__(self):
+        return (self.user_ids, self.skill_ids, self.cells)
+
+    def __setstate__(self, state):
+        self.user_ids, self.skill_ids, self.cells = state
+        self._index()
+
+    @classmethod
+    def from_rows(cls, skill_ids, rows):
+        """Build from ``(user_id, skill_id, rating, interested)`` rows; rows for
+        skills outside ``skill_ids`` are ignored."""
+        skills = {pk: i for i, pk in enumerate(skill_ids)}
+        by_user = {}
+        for user_id, skill_id, rating, interested in rows:
+            if skill_id in skills:
+                by_user.setdefault(user_id, []).append(
+                    (skills[skill_id], rating | (cls.INTERESTED if interested else 0))
+                )
+        width = len(skills)
+        user_ids = sorted(by_user)
+        cells = bytearray(len(user_ids) * width)
+        for row, user_id in enumerate(user_ids):
+            offset = row * width
+            for column, cell in by_user[user_id]:
+                cells[offset + column] = cell
+        return cls(user_ids, skill_ids, cells)
+
+    def row(self, user_id):
+        """The cells for ``user_id``, in :attr:`skill_ids` order."""
+        width = len(self.skill_ids)
+        i = self._users.get(user_id)
+        if i is None:
+            return bytes(width)
+        return self.cells[i * width:(i + 1) * width]
+
+    def cell(self, user_id, skill_id):
+        i, j = self._users.get(user_id), self._skills.get(skill_id)
+        if i is None or j is None:
+            return 0
+        return self.cells[i * len(self.skill_ids) + j]
+
+    def rating(self, user_id, skill_id):
+        return self.cell(user_id, skill_id) & self.RATING_MASK
+
+    def interested(self, user_id, skill_id):
+        return bool(self.cell(user_id, skill_id) & self.INTERESTED)
+
+    def slice(self, user_ids=None, skill_ids=None):
+        """A matrix restricted to (and ordered by) ``user_ids`` / ``skill_ids``."""
+        user_ids = self.user_ids if user_ids is None else tuple(user_ids)
+        if skill_ids is None:
+            skill_ids = self.skill_ids
+            cells = b"".join(self.row(pk) for pk in user_ids)
+        else:
+            skill_ids = tuple(skill_ids)
+            columns = [self._skills.get(pk) for pk in skill_ids]
+            cells = bytearray()
+            for pk in user_ids:
+                row = self.row(pk)
+                cells.extend(0 if j is None else row[j] for j in columns)
+        return SkillMatrix(user_ids, skill_ids, cells)
+
+    def row_dict(self, user_id):
+        """``{skill_id: {"rating", "interested"}}`` for ``user_id``."""
+        return {
+            skill_id: {
+                "rating": cell & self.RATING_MASK,
+                "interested": bool(cell & self.INTERESTED),
+            }
+            for skill_id, cell in zip(self.skill_ids, self.row(user_id))
+        }
+
+
+def build():
+    """``{"matrix": SkillMatrix, "categories": [...]}`` for every skill, with
+    categories (and their prefetched skills) in display order."""
+    categories = list(
+        SkillCategory.objects.prefetch_related(
+            Prefetch(
+                "skills",
+                queryset=Skill.objects.only("id", "name", "slug", "description", "category"),
+            )
+        ).only("id", "name", "slug").order_by("name")
+    )
+    skill_ids = [skill.pk for category in categories for skill in category.skills.all()]
+    rows = UserSkill.objects.exclude(
+        rating=UserSkillRatings.NO_EXPERIENCE, interested_in_improving_skill=False
+    ).values_list("user_id", "skill_id", "rating", "interested_in_improving_skill")
+    return {
+        "matrix": SkillMatrix.from_rows(skill_ids, rows),
+        "categories": categories,
+    }
+
+
+def get_matrix_data():
+    """The current :func:`build` result, and whether it came from the cache."""
+    key = _ENTRY_KEY.format(_version())
+    data = cache.get(key)
+    if data is not None:
+        return data, True
+    data = build()
+    cache.set(key, data, MATRIX_CACHE_TIMEOUT)
+    return data, False
@@ -1,10 +1,11 @@
 import logging
-from datetime import date
 from django_cron import CronJobBase, Schedule
 from django.db.models import Q
 from django.utils import timezone
-from .enums import PhaseStatuses, JobStatuses, QualificationStatus
-from .models.phase import Phase, Job
+from constance import config
+from .enums import PhaseStatuses, QualificationStatus
+from .models.phase import Phase
+from . import workflow_queue
 
 logger = logging.getLogger(__name__)
 
@@ -15,45 +16,19 @@ class task_progress_workflows(CronJobBase):
     code = 'jobtracker.task_progress_workflows'
 
     def do(self):
-        # Lets work through the different times we want to auto-progress!
-
-        ## Move to checks if scheduling confirmed and < 5 days to start...
-        for phase in Phase.objects.filter(status=PhaseStatuses.SCHEDULED_CONFIRMED):
-            if phase.start_date:
-                days_to_start = phase.start_date - date.today()
-                if days_to_start.days < 7:
-                    # Ok, we're in the time range... lets try and move!
-                    if phase.can_to_pre_checks():
-                        phase.to_pre_checks()
-                        phase.save()
-
-        # Lets see if we can auto-start any phases!
-        for phase in Phase.objects.filter(status=PhaseStatuses.READY_TO_BEGIN):
-            if phase.start_date and date.today() >= phase.start_date:
-                # Ok, today is the day!
-                if phase.can_to_in_progress():
-                    phase.to_in_progress()
-                    phase.save()
-
-        # # Lets see if we can finish any jobs
-        for job in Job.objects.filter(status=JobStatuses.IN_PROGRESS).filter(phases__status__gte=PhaseStatuses.DELIVERED):
-            # Check there's no phases LTE DELIVERED
-            can_progress = True
-            for phase in job.phases.all():
-                if phase.status < PhaseStatuses.DELIVERED or phase.status == PhaseStatuses.POSTPONED:
-                    can_progress = False
-            if can_progress:
-                if job.can_to_complete():
-                    job.to_complete()
-                    job.save()
-
-        # # Lets see if we can archive any?
-        # for phase in Phase.objects.filter(
-        #     Q(status=PhaseStatuses.DELIVERED) | Q(status=PhaseStatuses.CANCELLED)
-        # ):
-        #     if phase.can_to_archived():
-        #         phase.to_archived()
-        #         phase.save()
+        # Only the transitions that have come due are examined; see
+        # jobtracker.workflow_queue for how the queue is maintained.
+        stats = workflow_queue.process_due()
+        if stats["examined"]:
+            logger.info(
+                "Workflow queue: examined %d, transitioned %d, failed %d",
+                stats["examined"],
+                stats["transitioned"],
+                stats["failed"],
+            )
+        return "Examined {examined}, transitioned {transitioned}, failed {failed}".format(
+            **stats
+        )
         
 
 class task_fire_job_notifications(CronJobBase):
@@ -68,42 +43,57 @@ class task_fire_job_notifications(CronJobBase):
         # - Report late to PQA
         # - Report late to Delivery
 
+        # Only phases that are late and haven't been notified within the
+        # resend window are fetched; the *_last_fired fields record each send.
+
         ## Phase pre-checks are late
-        for phase in Phase.objects.filter(
-            status=PhaseStatuses.PRE_CHECKS
+        for phase in _late_phases(
+            Phase.objects.late_prechecks(),
+            "notifications_prechecks_late_last_fired",
+            config.PRECHECK_LATE_HOURS,
         ):
-            # Check if we're past the start date...
-            if phase.is_prechecks_late:
-                phase.fire_late_prechecks_notification()
+            phase.fire_late_prechecks_notification()
 
         ## Report late to TQA
-        for phase in Phase.objects.filter(
-            Q(status=PhaseStatuses.IN_PROGRESS) | Q(status=PhaseStatuses.PENDING_TQA)
+        for phase in _late_phases(
+            Phase.objects.filter(
+                Q(status=PhaseStatuses.IN_PROGRESS) | Q(status=PhaseStatuses.PENDING_TQA)
+            ).late_to_tqa(),
+            "notifications_late_tqa_last_fired",
+            config.TQA_LATE_HOURS,
         ):
-            if phase.is_tqa_late:
-                # Ok, it's late. Lets fire a notification!
-                phase.fire_late_to_tqa_notification()
+            phase.fire_late_to_tqa_notification()
 
         ## Report late to PQA
-        for phase in Phase.objects.filter(
-            Q(status=PhaseStatuses.PENDING_PQA)
-            | Q(status=PhaseStatuses.QA_TECH)
-            | Q(status=PhaseStatuses.QA_TECH_AUTHOR_UPDATES)
+        for phase in _late_phases(
+            Phase.objects.filter(
+                Q(status=PhaseStatuses.PENDING_PQA)
+                | Q(status=PhaseStatuses.QA_TECH)
+                | Q(status=PhaseStatuses.QA_TECH_AUTHOR_UPDATES)
+            ).late_to_pqa(),
+            "notifications_late_pqa_last_fired",
+            config.PQA_LATE_HOURS,
         ):
-            if phase.is_pqa_late:
-                # Ok, it's late. Lets fire a notification!
-                phase.fire_late_to_pqa_notification()
-
-        ## Report late to PQA
-        for phase in Phase.objects.filter(
-            Q(status=PhaseStatuses.PENDING_PQA)
-            | Q(status=PhaseStatuses.QA_PRES)
-            | Q(status=PhaseStatuses.QA_PRES_AUTHOR_UPDATES)
-            | Q(status=PhaseStatuses.COMPLETED)
+            phase.fire_late_to_pqa_notification()
+
+        ## Report late to Delivery
+        for phase in _late_phases(
+            Phase.objects.filter(
+                Q(status=PhaseStatuses.PENDING_PQA)
+                | Q(status=PhaseStatuses.QA_PRES)
+                | Q(status=PhaseStatuses.QA_PRES_AUTHOR_UPDATES)
+                | Q(status=PhaseStatuses.COMPLETED)
+            ).late_to_delivery(),
+            "notifications_late_delivery_last_fired",
+            config.DELIVERY_LATE_HOURS,
         ):
-            if phase.is_delivery_late:
-                # Ok, it's late. Lets fire a notification!
-                phase.fire_late_to_delivery_notification()
+            phase.fire_late_to_delivery_notification()
+
+
+def _late_phases(queryset, last_fired_field, hours):
+    return queryset.notification_due(last_fired_field, hours).select_related(
+        "job", "job__client"
+    )
 
 
 class task_fire_onboarding_reminders(CronJobBase):
@@ -136,6 +126,42 @@ class task_check_qualification_expiry(CronJobBase):
             lapse_date__isnull=False,
             lapse_date__lte=today,
         )
+        user_ids = set(lapsed.values_list("user_id", flat=True))
         count = lapsed.update(status=QualificationStatus.LAPSED)
         if count:
             logger.info("Auto-lapsed %d qualification record(s).", count)
+            # update() skips the signals that keep readiness current
+            from . import service_readiness
+
+            service_readiness.refresh_users(user_ids)
+
+
+class task_compact_schedule_history(CronJobBase):
+    RUN_AT_TIMES = ["2:30"]
+    schedule = Schedule(run_at_times=RUN_AT_TIMES)
+    code = "jobtracker.task_compact_schedule_history"
+
+    def do(self):
+        from . import schedule_retention
+
+        squashed = schedule_retention.compact()
+        archived = schedule_retention.archive()
+        message = "Squashed {} and archived {} schedule action(s)".format(squashed, archived)
+        logger.info(message)
+        return message
+
+
+class task_refresh_service_readiness(CronJobBase):
+    RUN_AT_TIMES = ["3:00"]
+    schedule = Schedule(run_at_times=RUN_AT_TIMES)
+    code = "jobtracker.task_refresh_service_readiness"
+
+    def do(self):
+        from . import service_readiness
+
+        written, deleted = service_readiness.refresh()
+        message = "Refreshed service readiness: {} row(s) written, {} deleted".format(
+            written, deleted
+        )
+        logger.info(message)
+        return message
@@ -3,6 +3,7 @@
 //   SCHEDULER_CONFIG = {
 //     scope: 'global'|'job'|'phase',
 //     membersUrl, slotsUrl,
+//     weeksUrl,                         // optional week-bucketed slots endpoint
 //     changeDateUrl, changeCommentDateUrl,
 //     createUrls: {assign_phase, assign_project, assign_internal, add_comment, clear},
 //     createExtraParams: '',            // e.g. '&job=5&phase=12'
@@ -359,11 +360,28 @@
         isComment: !!e.is_comment,
         canEdit: canEdit,
         editUrl: canEdit ? e.edit_url : null,
-        userId: e.userId
+        userId: e.userId,
+        src: e                    // source event, for merging partial live deltas
       }
     };
   }
 
+  // Shared background events (holidays) are sent once with every row they
+  // cover in `resourceIds`; vis-timeline needs one background item per group.
+  function mapEvents(rows) {
+    var out = [];
+    rows.forEach(function (e) {
+      if (e.resourceIds) {
+        e.resourceIds.forEach(function (rid) {
+          out.push(mapEvent($.extend({}, e, { resourceId: rid })));
+        });
+      } else {
+        out.push(mapEvent(e));
+      }
+    });
+    return out;
+  }
+
   // ---- Track which time ranges have actually been fetched ----
   var loadedRanges = [];
   var unloadedIds = [];
@@ -423,36 +441,132 @@
     if (rm.length) items.remove(rm);
   }
 
+  function visibleRows(data) {
+    // Optionally drop out-of-scope ("other") slots so the view isn't noisy.
+    return showOthers ? data : data.filter(function (e) { return !e.out_of_scope; });
+  }
+
+  // Replace everything loaded for [s, en] with `data`: stale items go, the rest
+  // are upserted (events repeated across week chunks collapse onto one id).
+  function applySlots(data, s, en) {
+    var byId = {};
+    mapEvents(visibleRows(data)).forEach(function (m) { byId[m.id] = m; });
+    var mapped = Object.keys(byId).map(function (id) { return byId[id]; });
+    var stale = items.getIds().filter(function (id) {
+      id = String(id);
+      if (id.indexOf('__sel__') === 0 || id.indexOf('unloaded-') === 0) return false;
+      return !byId[id];
+    });
+    if (stale.length) items.remove(stale);
+    items.update(mapped);
+    loadedRanges = [];
+    addLoadedRange(s.getTime(), en.getTime());
+    renderUnloaded();
+  }
+
   function loadSlots() {
-    loading(true);
     var w = timeline.getWindow();
     var span = w.end - w.start;
     var s = new Date(w.start.getTime() - span);
     var en = new Date(w.end.getTime() + span);
+    if (CFG.weeksUrl) { loadSlotWeeks(s, en); return; }
+    loading(true);
     $.ajax({
       url: buildUrl(slotsUrl, s.toISOString(), en.toISOString()),
       method: 'GET',
-      success: function (data) {
-        // Optionally drop out-of-scope ("other") slots so the view isn't noisy.
-        var rows = showOthers ? data : data.filter(function (e) { return !e.out_of_scope; });
-        var mapped = rows.map(mapEvent);
-        var keep = {};
-        mapped.forEach(function (m) { keep[m.id] = true; });
-        var stale = items.getIds().filter(function (id) {
-          id = String(id);
-          if (id.indexOf('__sel__') === 0 || id.indexOf('unloaded-') === 0) return false;
-          return !keep[id];
-        });
-        if (stale.length) items.remove(stale);
-        items.update(mapped);
-        loadedRanges = [];
-        addLoadedRange(s.getTime(), en.getTime());
-        renderUnloaded();
-      },
+      success: function (data) { applySlots(data, s, en); },
       complete: function () { loading(false); }
     });
   }
 
+  // ---- Week-bucketed loading (weeksUrl) ----
+  // Chunks are held per resource page + ISO week along with the server's ETag;
+  // the ETags are sent back as `known` so unchanged weeks return without events.
+  var weekChunks = {};          // page -> {week: {etag, events}}
+  var streamNextLoad = false;   // set by Fit: a wide window arrives week by week
+  var weeksRequest = 0;
+
+  function weeksUrlFor(page, s, en, stream) {
+    var held = weekChunks[page] || {};
+    var known = Object.keys(held).map(function (k) { return k + ':' + held[k].etag; }).join(',');
+    var url = buildUrl(CFG.weeksUrl, s.toISOString(), en.toISOString()) + '&page=' + page;
+    if (known) url += '&known=' + encodeURIComponent(known);
+    if (stream) url += '&stream=1';
+    return url;
+  }
+
+  function takeChunk(page, fresh, chunk) {
+    var kept = chunk.not_modified ? (weekChunks[page] || {})[chunk.week] : chunk;
+    if (!kept) return [];
+    fresh[chunk.week] = { etag: kept.etag, events: kept.events };
+    return kept.events;
+  }
+
+  // Newline-delimited JSON over fetch(), handing each parsed line to onLine.
+  function streamLines(url, onLine, onDone, onFail) {
+    fetch(url, { credentials: 'same-origin' }).then(function (resp) {
+      if (!resp.ok || !resp.body) throw new Error('HTTP ' + resp.status);
+      var reader = resp.body.getReader();
+      var decoder = new TextDecoder();
+      var buf = '';
+      function pump() {
+        return reader.read().then(function (r) {
+          buf += decoder.decode(r.value || new Uint8Array(0), { stream: !r.done });
+          var lines = buf.split('\n');
+          buf = lines.pop();
+          lines.forEach(function (l) { if (l) onLine(JSON.parse(l)); });
+          if (!r.done) return pump();
+          if (buf) onLine(JSON.parse(buf));
+          onDone();
+        });
+      }
+      return pump();
+    }).catch(onFail);
+  }
+
+  function loadSlotWeeks(s, en) {
+    var req = ++weeksRequest;
+    var stream = streamNextLoad && !!window.fetch && !!window.TextDecoder;
+    streamNextLoad = false;
+    var events = [];
+    loading(true);
+    function finish(ok) {
+      loading(false);
+      if (ok && req === weeksRequest) applySlots(events, s, en);
+    }
+    function nextPage(page) {
+      if (req !== weeksRequest) { loading(false); return; }   // superseded by a newer load
+      var fresh = {};
+      function pageDone(header) {
+        weekChunks[page] = fresh;
+        if (header && header.has_next) nextPage(page + 1); else finish(true);
+      }
+      if (stream) {
+        var header = null;
+        streamLines(weeksUrlFor(page, s, en, true), function (line) {
+          if (!header) { header = line; return; }
+          var chunkEvents = takeChunk(page, fresh, line);
+          events = events.concat(chunkEvents);
+          // Progressive render; stale items are only dropped once all pages land.
+          if (req === weeksRequest) items.update(mapEvents(visibleRows(chunkEvents)));
+        }, function () { pageDone(header); }, function () { finish(false); });
+      } else {
+        $.ajax({
+          url: weeksUrlFor(page, s, en, false),
+          method: 'GET',
+          success: function (resp) {
+            resp.weeks.forEach(function (chunk) {
+              events = events.concat(takeChunk(page, fresh, chunk));
+            });
+            pageDone(resp);
+          },
+          error: function () { finish(false); }
+        });
+      }
+    }
+    nextPage(1);
+  }
+
   // ---- Drag / resize / move-to-another-user ----
   function onItemMove(item, callback) {
     var meta = item._meta || {};
@@ -741,6 +855,7 @@
   // to the buffer makes repeated Fit creep outward as more data streams in.
   function fitToData() {
     loading(true);
+    streamNextLoad = true;
     var url = slotsUrl + (slotsUrl.indexOf('?') >= 0 ? '&' : '?') + 'bounds=1' + (filterParams ? '&' + filterParams : '');
     $.ajax({
       url: url, method: 'GET',
@@ -1070,19 +1185,50 @@
     refreshTimer = setTimeout(function () { refreshCards(); loadMembers(); loadHistory(); }, 400);
   }
 
+  // Compact (v2) WebSocket deltas omit what can be rebuilt here: slot type
+  // names and text colours come once per frame in delta.types / delta.colours,
+  // and a move/shift/swap only sends the changed start/end/userId (`p`).
+  function expandUpsert(delta, r) {
+    var e;
+    if (r.p) {
+      var cur = items.get((r.is_comment ? 'cmt-' : 'slot-') + r.id);
+      if (!cur || !cur._meta || !cur._meta.src) return null;  // not loaded here
+      e = $.extend({}, cur._meta.src, r);
+      delete e.p;
+    } else {
+      e = $.extend({}, r);
+      if (r.c) {
+        e.backgroundColor = e.color = r.c;
+        e.textColor = (delta.colours || {})[r.c];
+      }
+      if (r.slot_type_ID != null) e.slot_type_name = (delta.types || {})[r.slot_type_ID];
+      if (r.is_comment) e.icon = 'far fa-comment-dots';
+    }
+    e.resourceId = e.userId;
+    return e;
+  }
+
   function applyDelta(delta) {
     if (!delta) return;
-    if (delta.action_id) {
-      if (appliedActions[delta.action_id]) return;   // already applied (own echo)
-      appliedActions[delta.action_id] = true;
+    var ids = delta.action_ids || (delta.action_id ? [delta.action_id] : []);
+    if (ids.length) {
+      var fresh = ids.filter(function (id) { return !appliedActions[id]; });
+      if (!fresh.length) return;                     // already applied (own echo)
+      fresh.forEach(function (id) { appliedActions[id] = true; });
     }
-    var touched = false;
+    var touched = false, missing = false;
     (delta.upserts || []).forEach(function (e) {
+      if (delta.v === 2) {
+        e = expandUpsert(delta, e);
+        if (!e) { missing = true; return; }
+      }
       // Skip background/holiday rows we didn't originate here.
       var mapped = mapEvent(e);
       items.update(mapped);
       touched = true;
     });
+    // A partial update for a slot we never loaded (e.g. moved into view)
+    if (missing) loadSlots();
     (delta.removals || []).forEach(function (r) {
       var vid = (r.is_comment ? 'cmt-' : 'slot-') + r.id;
       if (items.get(vid)) { items.remove(vid); touched = true; }
@@ -1090,26 +1236,52 @@
     if (touched) refreshDebounced();
   }
 
-  // ---- WebSocket transport (with ?since= polling fallback) ----
+  // ---- WebSocket transport (with ?since= long-poll fallback) ----
+  //   The first poll asks for actions since page load; the server answers with
+  //   an action-id cursor, and later polls long-poll (`wait`) after it.
   var liveConnected = false;
   var ws = null;
+  var polling = false;
   var pollTimer = null;
+  var pollXhr = null;
+  var pollCursor = null;
   var lastPoll = new Date().toISOString();
   var wsRetry = null;
+  var LONG_POLL_WAIT = 20;
 
+  function pollOnce() {
+    if (!polling) return;
+    var q = scopeQuery();
+    var params = pollCursor === null
+      ? 'since=' + encodeURIComponent(lastPoll)
+      : 'after=' + pollCursor + '&wait=' + LONG_POLL_WAIT;
+    pollXhr = $.ajax({
+      url: HIST.sinceUrl + '?' + params + (q ? '&' + q : ''),
+      dataType: 'json',
+      timeout: (LONG_POLL_WAIT + 10) * 1000
+    }).done(function (data) {
+      pollXhr = null;
+      if (data) {                           // 204: nothing new within the wait
+        (data.deltas || []).forEach(applyDelta);
+        if (data.cursor !== undefined && data.cursor !== null) pollCursor = data.cursor;
+      }
+      if (polling) pollTimer = setTimeout(pollOnce, 250);
+    }).fail(function () {
+      pollXhr = null;
+      if (polling) pollTimer = setTimeout(pollOnce, 5000);
+    });
+  }
   function startPolling() {
-    if (pollTimer || !HIST.sinceUrl) return;
-    pollTimer = setInterval(function () {
-      var q = scopeQuery();
-      $.get(HIST.sinceUrl + '?since=' + encodeURIComponent(lastPoll) + (q ? '&' + q : ''),
-        function (data) {
-          if (!data) return;
-          (data.deltas || []).forEach(applyDelta);
-          if (data.now) lastPoll = data.now;
-        });
-    }, 5000);
+    if (polling || !HIST.sinceUrl) return;
+    polling = true;
+    pollOnce();
+  }
+  function stopPolling() {
+    polling = false;
+    clearTimeout(pollTimer);
+    pollTimer = null;
+    if (pollXhr) { pollXhr.abort(); pollXhr = null; }
   }
-  function stopPolling() { if (pollTimer) { clearInterval(pollTimer); pollTimer = null; } }
 
   function connectWs() {
     if (!CFG.wsUrl || !('WebSocket' in window)) { startPolling(); return; }
@@ -0,0 +1,64 @@
+from datetime import date, datetime, timedelta
+
+from django.core.cache import cache
+from django.test import SimpleTestCase, TestCase, override_settings
+from django.utils import timezone
+
+from chaotica_utils.models import User
+from jobtracker.availability import FreeRunIndex, indexes_for_users
+from jobtracker.enums import DefaultTimeSlotTypes
+from jobtracker.models import TimeSlot, TimeSlotType
+from .test_schedule_cache import LOCMEM
+
+WEEKDAYS = [1, 2, 3, 4, 5]
+# 2026-03-02 is a Monday
+MONDAY = date(2026, 3, 2)
+
+
+def _day(offset):
+    return MONDAY + timedelta(days=offset)
+
+
+class FreeRunIndexTests(SimpleTestCase):
+    def test_weekend_does_not_break_a_run(self):
+        index = FreeRunIndex(MONDAY, _day(27), WEEKDAYS, set(), set())
+        # Thursday + Friday + Monday
+        self.assertEqual(index.earliest(3, on_or_after=_day(3)), (_day(3), _day(7), 3))
+
+    def test_occupied_day_breaks_a_run(self):
+        # Wednesday of week one is booked; holidays are skipped, not breaks
+        index = FreeRunIndex(MONDAY, _day(27), WEEKDAYS, {_day(8)}, {_day(2)})
+        self.assertEqual(index.earliest(2), (_day(0), _day(1), 2))
+        self.assertEqual(index.earliest(5), (_day(3), _day(10), 5))
+
+    def test_reports_longest_run_when_nothing_fits(self):
+        occupied = {_day(2), _day(9), _day(16)}
+        index = FreeRunIndex(MONDAY, _day(20), WEEKDAYS, set(), occupied)
+        self.assertEqual(index.earliest(6), (None, None, 4))
+        # Clipped to the requested range
+        self.assertEqual(index.earliest(6, on_or_after=_day(4), until=_day(7)), (None, None, 2))
+        self.assertEqual(index.earliest(1, on_or_after=_day(5), until=_day(6)), (None, None, 0))
+
+
+@override_settings(CACHES=LOCMEM)
+class AvailabilityIndexCacheTests(TestCase):
+    def test_slot_change_rebuilds_cached_index(self):
+        cache.clear()
+        user = User.objects.create_user(email="avail@test.com", password="pw12345")
+        calendars = {user.pk: (WEEKDAYS, set())}
+        self.assertEqual(
+            indexes_for_users(calendars, MONDAY, _day(13))[user.pk].earliest(1)[0], MONDAY
+        )
+        with self.assertNumQueries(0):
+            indexes_for_users(calendars, MONDAY, _day(13))
+
+        with self.captureOnCommitCallbacks(execute=True):
+            TimeSlot.objects.create(
+                user=user,
+                slot_type=TimeSlotType.get_builtin_object(DefaultTimeSlotTypes.UNASSIGNED),
+                start=timezone.make_aware(datetime.combine(MONDAY, datetime.min.time()) + timedelta(hours=9)),
+                end=timezone.make_aware(datetime.combine(MONDAY, datetime.min.time()) + timedelta(hours=17)),
+            )
+        self.assertEqual(
+            indexes_for_users(calendars, MONDAY, _day(13))[user.pk].earliest(1)[0], _day(1)
+        )
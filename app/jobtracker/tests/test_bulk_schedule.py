@@ -0,0 +1,99 @@
+from datetime import date, datetime, timedelta
+
+from django.core.exceptions import ValidationError
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+
+from chaotica_utils.models import Note, User
+from jobtracker.models import (
+    Client,
+    Job,
+    Phase,
+    OrganisationalUnit,
+    ScheduleAction,
+    TimeSlot,
+    TimeSlotDay,
+    TimeSlotType,
+)
+from jobtracker.enums import DefaultTimeSlotTypes, PhaseStatuses, TimeSlotDeliveryRole
+
+
+def _aware(day, hour):
+    return timezone.make_aware(datetime.combine(day, datetime.min.time()).replace(hour=hour))
+
+
+class BulkScheduleTests(TestCase):
+    def setUp(self):
+        super().setUp()
+        self.actor = User.objects.create_user(email="bulk@test.com", password="pw12345")
+        self.job = Job.objects.create(
+            unit=OrganisationalUnit.objects.create(name="Bulk Unit"),
+            client=Client.objects.create(name="Bulk Client"),
+            title="Bulk Job",
+            created_by=self.actor,
+            account_manager=self.actor,
+        )
+        self.phase = Phase.objects.create(job=self.job, title="Phase 1")
+        self.phase.status = PhaseStatuses.PENDING_SCHED
+        self.phase.save()
+        self.delivery_type = TimeSlotType.get_builtin_object(DefaultTimeSlotTypes.DELIVERY)
+        self.monday = date(2031, 3, 3)
+
+    def _slots(self, count, phase=None):
+        phase = phase or self.phase
+        users = [
+            User.objects.create_user(email=f"bulk{phase.pk}_{i}@test.com", password="pw12345")
+            for i in range(count)
+        ]
+        return [
+            TimeSlot(
+                user=user,
+                phase=phase,
+                slot_type=self.delivery_type,
+                deliveryRole=TimeSlotDeliveryRole.DELIVERY,
+                start=_aware(self.monday, 9),
+                end=_aware(self.monday + timedelta(days=2), 17),
+            )
+            for user in users
+        ]
+
+    def test_side_effects_are_applied_once(self):
+        notes_before = Note.objects.count()
+        created, action = TimeSlot.objects.bulk_schedule(self._slots(3), actor=self.actor)
+
+        self.assertEqual(len(created), 3)
+        self.assertTrue(all(slot.pk for slot in created))
+        self.assertEqual(ScheduleAction.objects.count(), 1)
+        self.assertEqual(len(action.payload), 3)
+        # Occupancy store and activity log (job + phase note per slot, plus
+        # the phase's "Moved to Schedule Tentative" note)
+        self.assertEqual(
+            TimeSlotDay.objects.filter(slot__in=[s.pk for s in created]).count(), 9
+        )
+        self.assertEqual(Note.objects.count() - notes_before, 7)
+        # First booking moves the phase on and refreshes its stored dates
+        self.phase.refresh_from_db()
+        self.assertEqual(self.phase.status, PhaseStatuses.SCHEDULED_TENTATIVE)
+        self.assertEqual(self.phase.start_date, self.monday)
+
+    def test_query_count_does_not_scale_with_slots(self):
+        def run(count):
+            phase = Phase.objects.create(job=self.job, title=f"Phase {count}")
+            slots = self._slots(count, phase=phase)
+            with CaptureQueriesContext(connection) as ctx:
+                TimeSlot.objects.bulk_schedule(slots, actor=self.actor)
+            return len(ctx.captured_queries)
+
+        # Throwaway call pays the one-time warm-up (config rows, content types)
+        run(2)
+        small = run(2)
+        self.assertLessEqual(run(10), small + 2)
+
+    def test_rejects_inverted_slots(self):
+        slot = self._slots(1)[0]
+        slot.start, slot.end = slot.end, slot.start
+        with self.assertRaises(ValidationError):
+            TimeSlot.objects.bulk_schedule([slot], actor=self.actor)
+        self.assertFalse(TimeSlot.objects.exists())
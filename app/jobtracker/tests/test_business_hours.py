@@ -0,0 +1,65 @@
+import datetime
+import zoneinfo
+from decimal import Decimal
+from types import SimpleNamespace
+
+from django.test import SimpleTestCase
+
+from jobtracker.business_hours import BusinessCalendar, hours_between_many
+
+LONDON = zoneinfo.ZoneInfo("Europe/London")
+
+
+def _unit(start=datetime.time(9, 0), end=datetime.time(17, 30), tz="Europe/London"):
+    return SimpleNamespace(
+        businessHours_startTime=start,
+        businessHours_endTime=end,
+        businessHours_lunch_startTime=datetime.time(12, 0),
+        businessHours_lunch_endTime=datetime.time(13, 0),
+        businessHours_timezone=tz,
+    )
+
+
+def _at(day, hour, minute=0, tz=LONDON):
+    return datetime.datetime(2026, 3, day, hour, minute, tzinfo=tz)
+
+
+class BusinessCalendarTests(SimpleTestCase):
+    def setUp(self):
+        super().setUp()
+        self.calendar = BusinessCalendar.for_unit(_unit())
+
+    def test_full_day_subtracts_lunch(self):
+        # 2026-03-02 is a Monday
+        self.assertEqual(self.calendar.hours_between(_at(2, 9), _at(2, 17, 30)), Decimal("7.5"))
+
+    def test_afternoon_only_has_no_lunch(self):
+        self.assertEqual(self.calendar.hours_between(_at(2, 13), _at(2, 17, 30)), Decimal("4.5"))
+
+    def test_multi_day_skips_weekend_hours(self):
+        # Monday 09:00 -> Wednesday 17:30
+        self.assertEqual(self.calendar.hours_between(_at(2, 9), _at(4, 17, 30)), Decimal("22.5"))
+        # Saturday and Sunday only
+        self.assertEqual(self.calendar.hours_between(_at(7, 9), _at(8, 17, 30)), Decimal(0))
+
+    def test_converts_to_unit_timezone(self):
+        utc = datetime.timezone.utc
+        # 08:00-16:30 UTC is 09:00-17:30 in Berlin
+        berlin = BusinessCalendar.for_unit(_unit(tz="Europe/Berlin"))
+        self.assertEqual(berlin.hours_between(_at(2, 8, tz=utc), _at(2, 16, 30, tz=utc)), Decimal("7.5"))
+
+    def test_no_unit_counts_whole_day(self):
+        calendar = BusinessCalendar.for_unit(None)
+        utc = datetime.timezone.utc
+        self.assertEqual(calendar.hours_between(_at(2, 8, tz=utc), _at(2, 18, tz=utc)), Decimal(9))
+
+    def test_calendars_are_shared_and_batched(self):
+        self.assertIs(BusinessCalendar.for_unit(_unit()), self.calendar)
+        self.assertEqual(
+            hours_between_many([
+                (_at(2, 9), _at(2, 17, 30), _unit()),
+                (_at(2, 9), _at(2, 17), _unit(end=datetime.time(17, 0))),
+                (_at(2, 17), _at(2, 9), _unit()),
+            ]),
+            [Decimal("7.5"), Decimal(7), Decimal(0)],
+        )
@@ -0,0 +1,114 @@
+from django.contrib.auth.models import Permission
+from django.core.cache import cache
+from django.test import TestCase, override_settings
+from guardian.shortcuts import assign_perm, remove_perm
+
+from chaotica_utils.models import User
+from jobtracker import permission_scope
+from jobtracker.models import OrganisationalUnit, OrganisationalUnitMember
+from .test_schedule_cache import LOCMEM
+
+
+@override_settings(CACHES=LOCMEM)
+class PermissionScopeTests(TestCase):
+    def setUp(self):
+        super().setUp()
+        cache.clear()
+        # The first user created is a superuser; keep it out of the way.
+        User.objects.create_user(email="admin@test.com", password="pw12345")
+        self.user = User.objects.create_user(email="scope@test.com", password="pw12345")
+        self.other = User.objects.create_user(email="other@test.com", password="pw12345")
+        self.unit = OrganisationalUnit.objects.create(name="Unit A")
+        self.unit_b = OrganisationalUnit.objects.create(name="Unit B")
+
+    def _user(self):
+        """A fresh instance, so guardian's per-instance perm cache can't mask ours."""
+        return User.objects.get(pk=self.user.pk)
+
+    def test_unit_ids_cached_until_grant_changes(self):
+        assign_perm("jobtracker.can_view_jobs", self.user, self.unit)
+        user = self._user()
+        self.assertEqual(
+            permission_scope.unit_ids(user, "jobtracker.can_view_jobs"), {self.unit.pk}
+        )
+        with self.assertNumQueries(0):
+            permission_scope.unit_ids(user, "jobtracker.can_view_jobs")
+
+        assign_perm("jobtracker.can_view_jobs", self.user, self.unit_b)
+        self.assertEqual(
+            permission_scope.unit_ids(self._user(), "jobtracker.can_view_jobs"),
+            {self.unit.pk, self.unit_b.pk},
+        )
+        remove_perm("jobtracker.can_view_jobs", self.user, self.unit)
+        self.assertEqual(
+            permission_scope.unit_ids(self._user(), "jobtracker.can_view_jobs"),
+            {self.unit_b.pk},
+        )
+
+    def test_superuser_flag_change_invalidates(self):
+        self.assertEqual(
+            permission_scope.unit_ids(self._user(), "jobtracker.can_view_jobs"), set()
+        )
+        self.user.is_superuser = True
+        self.user.save()
+        self.assertEqual(
+            permission_scope.unit_ids(self._user(), "jobtracker.can_view_jobs"),
+            {self.unit.pk, self.unit_b.pk},
+        )
+        self.user.is_superuser = False
+        self.user.save(update_fields=["is_superuser"])
+        self.assertEqual(
+            permission_scope.unit_ids(self._user(), "jobtracker.can_view_jobs"), set()
+        )
+
+    def test_global_grant_covers_every_unit_but_not_has_unit_perm(self):
+        self.user.user_permissions.add(Permission.objects.get(codename="can_view_jobs"))
+        user = self._user()
+        self.assertEqual(
+            permission_scope.unit_ids(user, "jobtracker.can_view_jobs"),
+            {self.unit.pk, self.unit_b.pk},
+        )
+        self.assertFalse(
+            permission_scope.has_unit_perm(user, "jobtracker.can_view_jobs", self.unit)
+        )
+
+        # A unit created later is in scope straight away.
+        unit_c = OrganisationalUnit.objects.create(name="Unit C")
+        self.assertIn(
+            unit_c.pk, permission_scope.unit_ids(user, "jobtracker.can_view_jobs")
+        )
+
+    def test_non_unit_permission_has_no_units(self):
+        self.assertEqual(
+            permission_scope.unit_ids(self._user(), "chaotica_utils.manage_user"),
+            frozenset(),
+        )
+
+    def test_viewable_user_ids_follow_membership(self):
+        assign_perm("jobtracker.view_users_schedule", self.user, self.unit)
+        user = self._user()
+        self.assertEqual(permission_scope.viewable_user_ids(user), {self.user.pk})
+        self.assertEqual(
+            permission_scope.viewable_user_ids(user, include_self=False), frozenset()
+        )
+
+        membership = OrganisationalUnitMember.objects.create(
+            unit=self.unit, member=self.other
+        )
+        self.assertEqual(
+            permission_scope.viewable_user_ids(user), {self.user.pk, self.other.pk}
+        )
+        membership.delete()
+        self.assertEqual(permission_scope.viewable_user_ids(user), {self.user.pk})
+
+    def test_invalidation_rotates_entry_keys(self):
+        key = permission_scope._entry_key(self.user.pk)
+        permission_scope.invalidate_all()
+        key_after_all = permission_scope._entry_key(self.user.pk)
+        self.assertNotEqual(key_after_all, key)
+
+        # Another user's grants changing leaves this user's entry alone.
+        permission_scope.invalidate_users([self.other.pk])
+        self.assertEqual(permission_scope._entry_key(self.user.pk), key_after_all)
+        permission_scope.invalidate_users([self.user.pk])
+        self.assertNotEqual(permission_scope._entry_key(self.user.pk), key_after_all)
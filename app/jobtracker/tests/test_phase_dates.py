@@ -0,0 +1,121 @@
+from datetime import date, datetime, timedelta
+
+from constance import config
+from django.test import TestCase
+from django.utils import timezone
+
+from chaotica_utils.models import User
+from jobtracker.models import (
+    Client,
+    DueTransition,
+    Job,
+    OrganisationalUnit,
+    Phase,
+    TimeSlot,
+    TimeSlotType,
+)
+from jobtracker.enums import DefaultTimeSlotTypes, PhaseStatuses, TimeSlotDeliveryRole
+from jobtracker import phase_dates
+
+
+def _aware(day, hour):
+    return timezone.make_aware(datetime.combine(day, datetime.min.time()).replace(hour=hour))
+
+
+class PhaseDatesTests(TestCase):
+    def setUp(self):
+        super().setUp()
+        self.user = User.objects.create_user(email="dates@test.com", password="pw12345")
+        self.job = Job.objects.create(
+            unit=OrganisationalUnit.objects.create(name="Dates Unit"),
+            client=Client.objects.create(name="Dates Client"),
+            title="Dates Job",
+            created_by=self.user,
+            account_manager=self.user,
+        )
+        self.slot_type = TimeSlotType.get_builtin_object(DefaultTimeSlotTypes.DELIVERY)
+        self.monday = date(2031, 3, 3)
+
+    def _phase_with_slots(self, title, offset_days=0):
+        phase = Phase.objects.create(job=self.job, title=title)
+        start = self.monday + timedelta(days=offset_days)
+        # bulk_create keeps the stored dates stale until recomputed
+        TimeSlot.objects.bulk_create(
+            [
+                TimeSlot(
+                    user=self.user,
+                    phase=phase,
+                    slot_type=self.slot_type,
+                    deliveryRole=TimeSlotDeliveryRole.DELIVERY,
+                    start=_aware(start, 9),
+                    end=_aware(start + timedelta(days=1), 17),
+                ),
+                TimeSlot(
+                    user=self.user,
+                    phase=phase,
+                    slot_type=self.slot_type,
+                    deliveryRole=TimeSlotDeliveryRole.REPORTING,
+                    start=_aware(start + timedelta(days=2), 9),
+                    end=_aware(start + timedelta(days=3), 17),
+                ),
+            ]
+        )
+        return phase
+
+    def _expected(self, offset_days):
+        start = self.monday + timedelta(days=offset_days)
+        last = start + timedelta(days=3)
+        return (
+            start,
+            last + timedelta(days=config.DAYS_TO_TQA),
+            last + timedelta(days=config.DAYS_TO_PQA),
+            last + timedelta(days=config.DAYS_TO_DELIVERY),
+        )
+
+    def _stored(self, phase):
+        phase.refresh_from_db()
+        return (
+            phase._start_date,
+            phase._due_to_techqa,
+            phase._due_to_presqa,
+            phase._delivery_date,
+        )
+
+    def test_recompute_matches_update_stored_dates(self):
+        phases = [self._phase_with_slots(f"Phase {i}", offset_days=7 * i) for i in range(3)]
+        empty = Phase.objects.create(job=self.job, title="No slots")
+
+        self.assertEqual(phase_dates.recompute([p.pk for p in phases] + [empty.pk]), 3)
+        for i, phase in enumerate(phases):
+            self.assertEqual(self._stored(phase), self._expected(7 * i))
+            phase.update_stored_dates()
+            self.assertEqual(
+                (phase._start_date, phase._due_to_techqa, phase._due_to_presqa, phase._delivery_date),
+                self._expected(7 * i),
+            )
+        self.assertEqual(self._stored(empty), (None, None, None, None))
+
+        # Nothing moved, nothing written
+        self.assertEqual(phase_dates.recompute([p.pk for p in phases]), 0)
+
+    def test_shifted_slots_requeue_workflow(self):
+        phase = self._phase_with_slots("Phase 1")
+        phase_dates.recompute([phase.pk])
+        Phase.objects.filter(pk=phase.pk).update(status=PhaseStatuses.READY_TO_BEGIN)
+
+        TimeSlot.objects.filter(phase=phase).update(
+            start=_aware(self.monday + timedelta(days=14), 9),
+            end=_aware(self.monday + timedelta(days=15), 17),
+        )
+        self.assertEqual(phase_dates.recompute([phase.pk]), 1)
+        row = DueTransition.objects.get(phase=phase)
+        self.assertEqual(row.transition, DueTransition.TO_IN_PROGRESS)
+        self.assertEqual(
+            timezone.localtime(row.due_at).date(), self.monday + timedelta(days=14)
+        )
+
+    def test_recompute_all(self):
+        phases = [self._phase_with_slots(f"Phase {i}", offset_days=i) for i in range(3)]
+        self.assertEqual(phase_dates.recompute_all(chunk_size=2), 3)
+        for i, phase in enumerate(phases):
+            self.assertEqual(self._stored(phase)[0], self.monday + timedelta(days=i))
@@ -0,0 +1,84 @@
+from datetime import timedelta
+
+from django.test import TestCase
+from django.utils import timezone
+
+from chaotica_utils.models import User
+from jobtracker.models import Client, Job, OrganisationalUnit, Phase
+from jobtracker.enums import PhaseStatuses
+
+
+class PhaseLatenessQuerySetTests(TestCase):
+    """The late_* querysets must agree with the is_*_late properties."""
+
+    def setUp(self):
+        super().setUp()
+        user = User.objects.create_user(email="late@test.com", password="pw12345")
+        self.job = Job.objects.create(
+            unit=OrganisationalUnit.objects.create(name="Late Unit"),
+            client=Client.objects.create(name="Late Client"),
+            title="Late Job",
+            created_by=user,
+            account_manager=user,
+        )
+        self.today = timezone.now().today().date()
+        past, future = self.today - timedelta(days=3), self.today + timedelta(days=3)
+        sent_late = timezone.now()
+        cases = [
+            # (status, field values)
+            (PhaseStatuses.PRE_CHECKS, {"desired_start_date": past}),
+            (PhaseStatuses.PRE_CHECKS, {"desired_start_date": future}),
+            (PhaseStatuses.PRE_CHECKS, {"_start_date": past}),
+            (PhaseStatuses.IN_PROGRESS, {"due_to_techqa_set": past}),
+            (PhaseStatuses.IN_PROGRESS, {"_due_to_techqa": past, "due_to_techqa_set": future}),
+            (PhaseStatuses.IN_PROGRESS, {"due_to_techqa_set": past, "number_of_reports": 0}),
+            (
+                PhaseStatuses.QA_TECH,
+                {"due_to_techqa_set": past, "actual_sent_to_tqa_date": sent_late},
+            ),
+            (PhaseStatuses.QA_TECH, {"due_to_presqa_set": past}),
+            (PhaseStatuses.QA_PRES, {"_due_to_presqa": past}),
+            (
+                PhaseStatuses.COMPLETED,
+                {"desired_delivery_date": past, "report_to_be_left_on_client_site": True},
+            ),
+            (PhaseStatuses.COMPLETED, {"_delivery_date": past}),
+            (PhaseStatuses.DELIVERED, {"_delivery_date": past, "actual_delivery_date": sent_late}),
+            (PhaseStatuses.DELIVERED, {"_delivery_date": future, "actual_delivery_date": sent_late}),
+        ]
+        for i, (status, fields) in enumerate(cases):
+            phase = Phase.objects.create(job=self.job, title=f"Phase {i}")
+            Phase.objects.filter(pk=phase.pk).update(status=status, **fields)
+
+    def _expected(self, prop):
+        return {p.pk for p in Phase.objects.all() if getattr(p, prop)}
+
+    def _actual(self, queryset):
+        return set(queryset.values_list("pk", flat=True))
+
+    def test_querysets_match_properties(self):
+        for prop, queryset in (
+            ("is_prechecks_late", Phase.objects.late_prechecks()),
+            ("is_tqa_late", Phase.objects.late_to_tqa()),
+            ("is_pqa_late", Phase.objects.late_to_pqa()),
+            ("is_delivery_late", Phase.objects.late_to_delivery()),
+        ):
+            with self.subTest(prop=prop):
+                expected = self._expected(prop)
+                self.assertTrue(expected)
+                self.assertEqual(self._actual(queryset), expected)
+
+    def test_recently_notified_phases_are_skipped(self):
+        late = Phase.objects.late_to_tqa()
+        pks = self._actual(late)
+        Phase.objects.filter(pk__in=pks).update(
+            notifications_late_tqa_last_fired=timezone.now() - timedelta(hours=1)
+        )
+        self.assertEqual(
+            self._actual(late.notification_due("notifications_late_tqa_last_fired", 24)),
+            set(),
+        )
+        self.assertEqual(
+            self._actual(late.notification_due("notifications_late_tqa_last_fired", 0)),
+            pks,
+        )
@@ -1,9 +1,11 @@
+from datetime import timedelta
+
 from asgiref.sync import async_to_sync
 from channels.layers import get_channel_layer
-from django.test import override_settings
+from django.test import SimpleTestCase, override_settings
 
-from jobtracker import schedule_history
-from jobtracker.models import TimeSlot
+from jobtracker import broadcast, schedule_history
+from jobtracker.models import ScheduleActionType, TimeSlot
 from .test_schedule_history import ScheduleHistoryBase
 
 
@@ -49,7 +51,7 @@ class BroadcastTests(ScheduleHistoryBase):
         for channel in ("obs-global", "obs-job"):
             msg = async_to_sync(layer.receive)(channel)
             self.assertEqual(msg["type"], "schedule.delta")
-            self.assertEqual(msg["delta"]["action_id"], action.pk)
+            self.assertEqual(msg["delta"]["action_ids"], [action.pk])
             self.assertEqual(msg["delta"]["upserts"][0]["id"], slot.pk)
 
     def test_internal_change_only_hits_global(self):
@@ -59,3 +61,83 @@ class BroadcastTests(ScheduleHistoryBase):
         schedule_history.record_creates(self.actor, [slot])
         msg = async_to_sync(layer.receive)("obs-global2")
         self.assertEqual(msg["type"], "schedule.delta")
+
+
+@override_settings(
+    CHANNEL_LAYERS={"default": {"BACKEND": "channels.layers.InMemoryChannelLayer"}}
+)
+class CompactDeltaTests(ScheduleHistoryBase):
+    def test_create_sends_dictionaries_once(self):
+        slots = [self._delivery_slot(), self._delivery_slot()]
+        action = schedule_history.record_creates(self.actor, slots)
+        delta = broadcast.build_compact_delta(action)
+        self.assertEqual(delta["v"], broadcast.DELTA_VERSION)
+        self.assertEqual(delta["users"], [self.actor.pk])
+        self.assertEqual(len(delta["types"]), 1)
+        self.assertEqual(len(delta["colours"]), 1)
+        for upsert in delta["upserts"]:
+            self.assertIn(upsert["c"], delta["colours"])
+            self.assertNotIn("slot_type_name", upsert)
+            self.assertNotIn("textColor", upsert)
+
+    def test_move_is_partial_and_query_free(self):
+        slot = self._delivery_slot()
+        before = schedule_history.snapshot(slot)
+        slot.start += timedelta(days=1)
+        slot.end += timedelta(days=1)
+        slot.save()
+        action = schedule_history.record(
+            self.actor, ScheduleActionType.MOVE, [before], [schedule_history.snapshot(slot)]
+        )
+        with self.assertNumQueries(0):
+            delta = broadcast.build_compact_delta(action)
+        self.assertEqual(
+            delta["upserts"],
+            [
+                {
+                    "id": slot.pk,
+                    "p": 1,
+                    "userId": self.actor.pk,
+                    "start": slot.start.isoformat(),
+                    "end": slot.end.isoformat(),
+                }
+            ],
+        )
+
+
+def _delta(action_id, upserts=(), removals=()):
+    return {
+        "v": 2,
+        "action_ids": [action_id],
+        "users": sorted({u["userId"] for u in upserts}),
+        "types": {},
+        "colours": {},
+        "upserts": list(upserts),
+        "removals": list(removals),
+    }
+
+
+class CoalesceDeltaTests(SimpleTestCase):
+    def test_last_state_wins(self):
+        full = {"id": 1, "userId": 5, "start": "a", "end": "b", "title": "T"}
+        merged = broadcast.coalesce_deltas(
+            [
+                _delta(1, upserts=[full, {"id": 2, "userId": 5, "title": "gone"}]),
+                _delta(2, upserts=[{"id": 1, "p": 1, "userId": 6, "start": "c"}]),
+                _delta(3, removals=[{"is_comment": False, "id": 2}]),
+            ]
+        )
+        self.assertEqual(merged["action_ids"], [1, 2, 3])
+        self.assertEqual(
+            merged["upserts"],
+            [{"id": 1, "userId": 6, "start": "c", "end": "b", "title": "T"}],
+        )
+        self.assertEqual(merged["removals"], [{"is_comment": False, "id": 2}])
+        self.assertEqual(merged["users"], [6])
+
+    def test_filter_turns_hidden_upserts_into_removals(self):
+        delta = _delta(1, upserts=[{"id": 1, "userId": 5}, {"id": 2, "userId": 6}])
+        self.assertIs(broadcast.filter_compact_delta(delta, {5, 6, 7}), delta)
+        out = broadcast.filter_compact_delta(delta, {5})
+        self.assertEqual(out["upserts"], [{"id": 1, "userId": 5}])
+        self.assertEqual(out["removals"], [{"is_comment": False, "id": 2}])
@@ -0,0 +1,124 @@
+from datetime import timedelta
+from django.core.cache import cache
+from django.test import TestCase, override_settings
+from django.utils import timezone
+
+from chaotica_utils.models import User
+from jobtracker.models import (
+    Client,
+    Job,
+    Phase,
+    OrganisationalUnit,
+    TimeSlot,
+    TimeSlotType,
+    ScheduleActionType,
+)
+from jobtracker.enums import DefaultTimeSlotTypes, PhaseStatuses, TimeSlotDeliveryRole
+from jobtracker import schedule_cache, schedule_history
+
+LOCMEM = {"default": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache"}}
+COLOURS = {
+    "SCHEDULE_COLOR_PHASE_CONFIRMED_AWAY": "#111111",
+    "SCHEDULE_COLOR_PHASE_CONFIRMED": "#222222",
+    "SCHEDULE_COLOR_PHASE_AWAY": "#333333",
+    "SCHEDULE_COLOR_PHASE": "#444444",
+    "SCHEDULE_COLOR_PROJECT": "#555555",
+    "SCHEDULE_COLOR_INTERNAL": "#666666",
+}
+
+
+@override_settings(CACHES=LOCMEM)
+class ScheduleCacheTests(TestCase):
+    def setUp(self):
+        super().setUp()
+        cache.clear()
+        self.user = User.objects.create_user(email="cache@test.com", password="pw12345")
+        self.unit = OrganisationalUnit.objects.create(name="Test Unit")
+        self.client_obj = Client.objects.create(name="Test Client")
+        self.job = Job.objects.create(
+            unit=self.unit,
+            client=self.client_obj,
+            title="Test Job",
+            created_by=self.user,
+            account_manager=self.user,
+        )
+        self.phase = Phase.objects.create(job=self.job, title="Phase 1")
+        self.start = timezone.now().replace(microsecond=0)
+        self.end = self.start + timedelta(hours=8)
+        self.slot = TimeSlot.objects.create(
+            user=self.user,
+            slot_type=TimeSlotType.get_builtin_object(DefaultTimeSlotTypes.DELIVERY),
+            phase=self.phase,
+            deliveryRole=TimeSlotDeliveryRole.DELIVERY,
+            start=self.start,
+            end=self.end,
+        )
+        self.window = (self.start - timedelta(days=1), self.end + timedelta(days=1))
+
+    def _entries(self):
+        return schedule_cache.get_slot_entries([self.user.pk], *self.window, COLOURS)
+
+    def test_second_read_is_served_from_cache(self):
+        first = self._entries()
+        self.assertEqual([e["json"]["id"] for e in first], [self.slot.pk])
+        self.assertEqual(first[0]["job_id"], self.job.pk)
+        self.assertEqual(first[0]["phase_id"], self.phase.pk)
+        with self.assertNumQueries(0):
+            self.assertEqual(self._entries(), first)
+
+    def test_recorded_action_invalidates(self):
+        self._entries()
+        before = schedule_history.snapshot(self.slot)
+        TimeSlot.objects.filter(pk=self.slot.pk).update(end=self.end + timedelta(hours=1))
+        self.slot.refresh_from_db()
+        with self.captureOnCommitCallbacks(execute=True):
+            schedule_history.record(
+                self.user, ScheduleActionType.UPDATE, [before], [schedule_history.snapshot(self.slot)]
+            )
+        self.assertEqual(self._entries()[0]["json"]["end"], self.slot.end)
+
+    def test_phase_status_change_invalidates(self):
+        self.assertTrue(self._entries()[0]["json"].get("is_tentative"))
+        self.phase.status = PhaseStatuses.SCHEDULED_CONFIRMED
+        with self.captureOnCommitCallbacks(execute=True):
+            self.phase.save()
+        self.assertFalse(self._entries()[0]["json"].get("is_tentative", False))
+
+    def test_invalidation_waits_for_commit(self):
+        self._entries()
+        with self.captureOnCommitCallbacks() as callbacks:
+            self.phase.status = PhaseStatuses.SCHEDULED_CONFIRMED
+            self.phase.save()
+            # Still in the writing transaction: the old token is kept
+            self.assertTrue(self._entries()[0]["json"].get("is_tentative"))
+        self.assertTrue(callbacks)
+
+    def test_user_merge_invalidates_both_users(self):
+        keeper = User.objects.create_user(email="keeper@test.com", password="pw12345")
+
+        def keeper_entries():
+            return schedule_cache.get_slot_entries([keeper.pk], *self.window, COLOURS)
+
+        self.assertEqual(keeper_entries(), [])
+        self._entries()
+        old_versions = schedule_cache.user_versions([keeper.pk, self.user.pk])
+        with self.captureOnCommitCallbacks(execute=True):
+            keeper.merge(self.user)
+        self.assertEqual([e["json"]["id"] for e in keeper_entries()], [self.slot.pk])
+        new_versions = schedule_cache.user_versions([keeper.pk, self.user.pk])
+        self.assertNotEqual(old_versions[keeper.pk], new_versions[keeper.pk])
+        self.assertNotEqual(old_versions[self.user.pk], new_versions[self.user.pk])
+
+    def test_window_filtering_spans_months(self):
+        late = self.start + timedelta(days=45)
+        window = (self.start - timedelta(days=1), late + timedelta(days=1))
+        other = TimeSlot.objects.create(
+            user=self.user,
+            slot_type=TimeSlotType.get_builtin_object(DefaultTimeSlotTypes.UNASSIGNED),
+            start=late,
+            end=late + timedelta(hours=4),
+        )
+        ids = [e["json"]["id"] for e in schedule_cache.get_slot_entries([self.user.pk], *window, COLOURS)]
+        self.assertEqual(sorted(ids), sorted([self.slot.pk, other.pk]))
+        ids = [e["json"]["id"] for e in self._entries()]
+        self.assertEqual(ids, [self.slot.pk])
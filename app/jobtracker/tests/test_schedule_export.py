@@ -0,0 +1,83 @@
+import io
+from datetime import date, timedelta
+from types import SimpleNamespace
+
+import openpyxl
+from django.test import SimpleTestCase, override_settings
+
+from chaotica_utils.models import User
+from jobtracker.models import TimeSlot
+from jobtracker.schedule_export import (
+    FREE,
+    UNAVAILABLE,
+    ScheduleMatrix,
+    build_schedule_xlsx,
+    write_schedule_xlsx,
+)
+from .test_schedule_history import ScheduleHistoryBase
+
+
+class ScheduleMatrixTests(SimpleTestCase):
+    def setUp(self):
+        self.users = [SimpleNamespace(pk=1), SimpleNamespace(pk=2)]
+        self.monday = date(2031, 3, 3)
+        self.matrix = ScheduleMatrix(self.users, self.monday, self.monday + timedelta(days=6))
+
+    def test_overlapping_bookings_share_interned_labels(self):
+        m = self.matrix
+        m.book(1, self.monday, self.monday + timedelta(days=2), "A", "#111", "white")
+        m.book(1, self.monday + timedelta(days=1), self.monday + timedelta(days=1), "B", "#222", "black")
+        m.book(2, self.monday, self.monday, "A", "#111", "white")
+
+        row = m.rows[0]
+        self.assertEqual(m.label(row[0]), ("A", "#111", "white"))
+        # Overlap keeps the first booking's colours
+        self.assertEqual(m.label(row[1]), ("A / B", "#111", "white"))
+        self.assertEqual(row[2], row[0])
+        self.assertEqual(m.rows[1][0], row[0])
+        self.assertEqual(len(m.labels), 2)
+
+    def test_unavailable_only_marks_free_days(self):
+        m = self.matrix
+        m.book(1, self.monday, self.monday, "A", "#111", "white")
+        # Clipped to the exported range
+        m.mark_unavailable(1, self.monday - timedelta(days=3), self.monday + timedelta(days=1))
+        m.mark_non_working(2, {1, 2, 3, 4, 5}, {self.monday})
+        m.mark_unavailable(99, self.monday, self.monday)
+
+        self.assertEqual(m.label(m.rows[0][0])[0], "A")
+        self.assertEqual(m.rows[0][1], UNAVAILABLE)
+        self.assertEqual(m.rows[0][2], FREE)
+        self.assertEqual(
+            list(m.rows[1]),
+            [UNAVAILABLE, FREE, FREE, FREE, FREE, UNAVAILABLE, UNAVAILABLE],
+        )
+
+
+@override_settings(
+    CHANNEL_LAYERS={"default": {"BACKEND": "channels.layers.InMemoryChannelLayer"}}
+)
+class ScheduleExportTests(ScheduleHistoryBase):
+    def test_grid_marks_bookings_and_other_work(self):
+        # Rows are labelled by full name; keep them distinct
+        User.objects.filter(pk=self.actor.pk).update(first_name="Ada", last_name="Actor")
+        User.objects.filter(pk=self.other.pk).update(first_name="Otto", last_name="Other")
+        self._delivery_slot()
+        self._delivery_slot(user=self.other)
+        self._internal_slot(user=self.other)
+
+        output = io.BytesIO()
+        write_schedule_xlsx(TimeSlot.objects.filter(phase=self.phase), output, title="Test")
+        output.seek(0)
+        grid = openpyxl.load_workbook(output)["Schedule"]
+        cells = {row[0].value: row[1].value for row in grid.iter_rows(min_row=2)}
+        self.assertEqual(len(cells), 2)
+        for value in cells.values():
+            self.assertIn(self.phase.get_id(), value)
+
+    def test_export_response(self):
+        self._delivery_slot()
+        resp = build_schedule_xlsx(TimeSlot.objects.filter(phase=self.phase), "schedule-test")
+        self.assertEqual(resp.status_code, 200)
+        self.assertIn("schedule-test.xlsx", resp["Content-Disposition"])
+        self.assertEqual(b"".join(resp.streaming_content)[:2], b"PK")
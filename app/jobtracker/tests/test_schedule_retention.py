@@ -0,0 +1,79 @@
+from datetime import timedelta
+
+from constance.test import override_config
+from django.test import override_settings
+from django.utils import timezone
+
+from jobtracker import schedule_history, schedule_retention
+from jobtracker.models import ScheduleAction, ScheduleActionArchive, ScheduleActionType
+from .test_schedule_cache import LOCMEM
+from .test_schedule_history import ScheduleHistoryBase
+
+
+@override_settings(
+    CHANNEL_LAYERS={"default": {"BACKEND": "channels.layers.InMemoryChannelLayer"}},
+    CACHES=LOCMEM,
+)
+class ScheduleRetentionTests(ScheduleHistoryBase):
+    def _move(self, slot, days, actor=None):
+        before = schedule_history.snapshot(slot)
+        slot.start += timedelta(days=days)
+        slot.end += timedelta(days=days)
+        slot.save()
+        action = schedule_history.record(
+            actor or self.actor,
+            ScheduleActionType.MOVE,
+            [before],
+            [schedule_history.snapshot(slot)],
+        )
+        # Old enough to be compacted
+        ScheduleAction.objects.filter(pk=action.pk).update(
+            created=timezone.now() - timedelta(days=2)
+        )
+        return action
+
+    def test_consecutive_moves_squash_into_first(self):
+        slot = self._delivery_slot()
+        original = schedule_history.snapshot(slot)
+        first = self._move(slot, 1)
+        self._move(slot, 1)
+        self._move(slot, 1)
+
+        self.assertEqual(schedule_retention.compact(), 2)
+        action = ScheduleAction.objects.get()
+        self.assertEqual(action.pk, first.pk)
+        self.assertEqual(action.payload[0]["before"], original["fields"])
+        self.assertEqual(action.payload[0]["after"], schedule_history.snapshot(slot)["fields"])
+
+    def test_other_actor_breaks_the_chain(self):
+        slot = self._delivery_slot()
+        self._move(slot, 1)
+        self._move(slot, 1, actor=self.other)
+        self._move(slot, 1)
+        self.assertEqual(schedule_retention.compact(), 0)
+        self.assertEqual(ScheduleAction.objects.count(), 3)
+
+    def test_moved_back_chain_is_dropped(self):
+        slot = self._delivery_slot()
+        self._move(slot, 3)
+        self._move(slot, -3)
+        self.assertEqual(schedule_retention.compact(), 2)
+        self.assertFalse(ScheduleAction.objects.exists())
+
+    @override_config(SCHEDULE_HISTORY_RETENTION_DAYS=30)
+    def test_archive_moves_old_actions_to_cold_table(self):
+        old = schedule_history.record_creates(self.actor, [self._internal_slot()])
+        recent = schedule_history.record_creates(self.actor, [self._internal_slot()])
+        ScheduleAction.objects.filter(pk=old.pk).update(
+            created=timezone.now() - timedelta(days=31)
+        )
+
+        self.assertEqual(schedule_retention.archive(), 1)
+        self.assertEqual(list(ScheduleAction.objects.values_list("pk", flat=True)), [recent.pk])
+        cold = ScheduleActionArchive.objects.get()
+        self.assertEqual(cold.action_id, old.pk)
+        self.assertEqual(cold.payload, old.payload)
+
+        exported = list(schedule_retention.export_actions())
+        self.assertEqual([row["action_id"] for row in exported], [old.pk, recent.pk])
+        self.assertEqual([row["archived"] for row in exported], [True, False])
@@ -1,24 +1,37 @@
 import json
+from unittest import mock
+from asgiref.sync import async_to_sync, iscoroutinefunction
+from django.core.cache import cache
 from django.test import RequestFactory, override_settings
 from guardian.shortcuts import assign_perm
 
-from jobtracker import schedule_history
+from jobtracker import broadcast, schedule_history
 from jobtracker.models import TimeSlot
 from jobtracker.views import scheduler as sched_views
+from .test_schedule_cache import LOCMEM
 from .test_schedule_history import ScheduleHistoryBase
 
 
+# Deltas and viewable-user sets are cached; keep them per-test.
 @override_settings(
-    CHANNEL_LAYERS={"default": {"BACKEND": "channels.layers.InMemoryChannelLayer"}}
+    CHANNEL_LAYERS={"default": {"BACKEND": "channels.layers.InMemoryChannelLayer"}},
+    CACHES=LOCMEM,
 )
 class HistoryViewTests(ScheduleHistoryBase):
     def setUp(self):
         super().setUp()
+        cache.clear()
         self.rf = RequestFactory()
 
     def _get(self, view, path, params, user):
         req = self.rf.get(path, params)
         req.user = user
+        if iscoroutinefunction(view):
+            async def auser():
+                return user
+
+            req.auser = auser
+            return async_to_sync(view)(req)
         return view(req)
 
     def _post(self, view, path, data, user):
@@ -104,3 +117,67 @@ class HistoryViewTests(ScheduleHistoryBase):
         self.assertEqual(len(data["deltas"]), 1)
         self.assertEqual(data["deltas"][0]["upserts"][0]["id"], slot.pk)
         self.assertIn("now", data)
+
+    def test_since_cursor_fast_path_and_catch_up(self):
+        schedule_history.record_creates(self.actor, [self._delivery_slot()])
+        resp = self._get(
+            sched_views.view_scheduler_slots_since,
+            "/scheduler/timeslots/since", {"job": self.job.pk}, self.actor,
+        )
+        cursor = json.loads(resp.content)["cursor"]
+
+        # Nothing newer than the scope head: no content, no ScheduleAction query
+        resp = self._get(
+            sched_views.view_scheduler_slots_since,
+            "/scheduler/timeslots/since", {"job": self.job.pk, "after": cursor}, self.actor,
+        )
+        self.assertEqual(resp.status_code, 204)
+
+        slot = self._delivery_slot()
+        action = schedule_history.record_creates(self.actor, [slot])
+        resp = self._get(
+            sched_views.view_scheduler_slots_since,
+            "/scheduler/timeslots/since",
+            {"job": self.job.pk, "after": cursor, "wait": 5},
+            self.actor,
+        )
+        data = json.loads(resp.content)
+        self.assertEqual(data["cursor"], action.pk)
+        self.assertEqual([d["action_ids"] for d in data["deltas"]], [[action.pk]])
+        self.assertEqual(data["deltas"][0]["upserts"][0]["id"], slot.pk)
+
+    def test_since_wait_returns_once_head_moves(self):
+        schedule_history.record_creates(self.actor, [self._delivery_slot()])
+        resp = self._get(
+            sched_views.view_scheduler_slots_since,
+            "/scheduler/timeslots/since", {"job": self.job.pk}, self.actor,
+        )
+        cursor = json.loads(resp.content)["cursor"]
+        action = schedule_history.record_creates(self.actor, [self._delivery_slot()])
+
+        # The head reads as the cursor on the first check, then the commit lands
+        with mock.patch.object(sched_views, "SINCE_LONG_POLL_INTERVAL", 0), mock.patch.object(
+            broadcast, "scope_head", side_effect=[cursor, cursor, action.pk, action.pk]
+        ):
+            resp = self._get(
+                sched_views.view_scheduler_slots_since,
+                "/scheduler/timeslots/since",
+                {"job": self.job.pk, "after": cursor, "wait": 5},
+                self.actor,
+            )
+        self.assertEqual(json.loads(resp.content)["cursor"], action.pk)
+
+    def test_since_wait_times_out_with_no_content(self):
+        resp = self._get(
+            sched_views.view_scheduler_slots_since,
+            "/scheduler/timeslots/since", {"job": self.job.pk}, self.actor,
+        )
+        cursor = json.loads(resp.content)["cursor"]
+        with mock.patch.object(sched_views, "SINCE_LONG_POLL_INTERVAL", 0.01):
+            resp = self._get(
+                sched_views.view_scheduler_slots_since,
+                "/scheduler/timeslots/since",
+                {"job": self.job.pk, "after": cursor, "wait": 1},
+                self.actor,
+            )
+        self.assertEqual(resp.status_code, 204)
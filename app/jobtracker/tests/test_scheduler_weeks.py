@@ -0,0 +1,74 @@
+import json
+from datetime import date, datetime, timedelta
+
+from django.core.cache import cache
+from django.test import SimpleTestCase, TestCase, override_settings
+from django.utils import timezone
+
+from chaotica_utils.models import Holiday, User
+from jobtracker.utils import iso_weeks, _scheduler_events, _week_chunks
+from .test_schedule_cache import COLOURS, LOCMEM
+
+
+def _aware(day, hour=9):
+    return timezone.make_aware(datetime.combine(day, datetime.min.time()) + timedelta(hours=hour))
+
+
+class SchedulerWeekBucketTests(SimpleTestCase):
+    def test_iso_weeks_span_year_boundary(self):
+        weeks = iso_weeks(_aware(date(2026, 12, 30)), _aware(date(2027, 1, 6)))
+        self.assertEqual([w[0] for w in weeks], ["2026-W53", "2027-W01"])
+        self.assertEqual(weeks[0][1], date(2026, 12, 28))
+        self.assertEqual(weeks[1][2], date(2027, 1, 10))
+
+    def test_chunks_repeat_spanning_events_and_honour_known(self):
+        weeks = iso_weeks(_aware(date(2026, 3, 2)), _aware(date(2026, 3, 15)))
+        events = [
+            {"id": 1, "start": _aware(date(2026, 3, 3)), "end": _aware(date(2026, 3, 3), 17)},
+            {"id": 2, "start": _aware(date(2026, 3, 6)), "end": _aware(date(2026, 3, 10), 17)},
+            {"id": 3, "start": date(2026, 3, 13), "end": date(2026, 3, 13), "allDay": True},
+        ]
+        calls = []
+
+        def build(start, end):
+            calls.append((start, end))
+            return events
+
+        chunks = [json.loads(c) for c in _week_chunks(build, weeks, {}, 1)]
+        self.assertEqual(len(calls), 2)
+        self.assertEqual([c["week"] for c in chunks], ["2026-W10", "2026-W11"])
+        self.assertEqual([e["id"] for e in chunks[0]["events"]], [1, 2])
+        self.assertEqual([e["id"] for e in chunks[1]["events"]], [2, 3])
+
+        known = {chunks[0]["week"]: chunks[0]["etag"], chunks[1]["week"]: "stale"}
+        again = [json.loads(c) for c in _week_chunks(build, weeks, known, 2)]
+        self.assertEqual(
+            again[0], {"week": "2026-W10", "etag": chunks[0]["etag"], "not_modified": True}
+        )
+        self.assertEqual(again[1]["etag"], chunks[1]["etag"])
+        self.assertIn("events", again[1])
+
+
+@override_settings(CACHES=LOCMEM)
+class SchedulerHolidayEventTests(TestCase):
+    def test_one_shared_event_per_holiday(self):
+        cache.clear()
+        gb = [
+            User.objects.create_user(email="gb{}@test.com".format(i), password="pw12345", country="GB")
+            for i in range(3)
+        ]
+        us = User.objects.create_user(email="us@test.com", password="pw12345", country="US")
+        day = date(2026, 5, 4)
+        gb_hol = Holiday.objects.create(date=day, country="GB", reason="Early May")
+        Holiday.objects.create(date=day, country="FR", reason="Not ours")
+
+        events = _scheduler_events(
+            User.objects.filter(pk__in=[u.pk for u in gb + [us]]),
+            _aware(day, 0),
+            _aware(day, 23),
+            COLOURS,
+        )
+        holidays = [e for e in events if e.get("allDay")]
+        self.assertEqual(len(holidays), 1)
+        self.assertEqual(holidays[0]["id"], gb_hol.pk)
+        self.assertEqual(sorted(holidays[0]["resourceIds"]), sorted(u.pk for u in gb))
@@ -12,6 +12,8 @@ from chaotica_utils.models import User
 from jobtracker.models.skill import SkillCategory, Skill, UserSkill
 from jobtracker.models.service import Service
 from jobtracker.models.timeslot import TimeSlot, TimeSlotType
+from jobtracker.models import Client, Job, Phase, OrganisationalUnit
+from jobtracker.availability import FreeRunIndex
 from jobtracker.enums import UserSkillRatings
 from jobtracker import scheduling_assistant as sa
 
@@ -201,6 +203,78 @@ class RankCandidatesForServiceTests(TestCase):
         )
         self.assertEqual(cands, [])
 
+    def test_batch_matches_single_service_ranking(self):
+        other = Service.objects.create(name="Gadget Assessment")
+        other.skillsRequired.add(self.skill_a)
+        requests = [
+            sa.RankRequest(
+                service=service,
+                required_working_days=3,
+                search_start=self.start,
+                search_end=self.start + timedelta(days=30),
+            )
+            for service in (self.service, other)
+        ]
+        batch = sa.rank_candidates_for_services(requests, candidate_pool=self.pool)
+        for req, ranked in zip(requests, batch):
+            single = sa.rank_candidates_for_service(
+                service=req.service,
+                required_working_days=3,
+                search_start=self.start,
+                search_end=self.start + timedelta(days=30),
+                candidate_pool=self.pool,
+            )
+            self.assertEqual(
+                [(c.user.pk, c.score, c.earliest_start) for c in ranked],
+                [(c.user.pk, c.score, c.earliest_start) for c in single],
+            )
+        # The partial user only qualifies for the single-skill service.
+        self.assertIn(self.partial.pk, {c.user.pk for c in batch[1]})
+
+    def test_batch_query_count_does_not_scale_with_requests(self):
+        def rank(n):
+            requests = [
+                sa.RankRequest(
+                    service=self.service,
+                    required_working_days=1 + i,
+                    search_start=self.start + timedelta(days=i),
+                )
+                for i in range(n)
+            ]
+            cache.clear()
+            with CaptureQueriesContext(connection) as ctx:
+                sa.rank_candidates_for_services(requests, candidate_pool=self.pool)
+            return len(ctx.captured_queries)
+
+        # Throwaway call pays the one-time warm-up queries
+        rank(1)
+        single = rank(1)
+        self.assertLessEqual(rank(8), single + 2)
+
+    def test_job_proposal_never_double_books(self):
+        unit = OrganisationalUnit.objects.create(name="Assist Unit")
+        job = Job.objects.create(
+            unit=unit,
+            client=Client.objects.create(name="Assist Client"),
+            title="Assist Job",
+            created_by=self.specialist,
+            account_manager=self.specialist,
+        )
+        phases = [
+            Phase.objects.create(job=job, title=f"Phase {i}", service=self.service)
+            for i in range(3)
+        ]
+        proposals = sa.propose_job_staffing(job, phases=phases, candidate_pool=self.pool)
+        self.assertEqual(len(proposals), 3)
+        booked = {}
+        for proposal in proposals:
+            self.assertIsNotNone(proposal.candidate)
+            for start, end in booked.get(proposal.candidate.user.pk, []):
+                self.assertTrue(proposal.end < start or proposal.start > end)
+            booked.setdefault(proposal.candidate.user.pk, []).append(
+                (proposal.start, proposal.end)
+            )
+
 
 class ServiceCompetencyTests(TestCase):
     """Regression tests for Service competency helpers — the support tier used to
@@ -359,3 +433,33 @@ class PhaseDeliveryDayStatsTests(SimpleTestCase):
         self.assertEqual(st["remaining"], -4)
         self.assertTrue(st["over"])
         self.assertEqual(st["over_by"], 4)
+
+
+class FreeWindowTests(SimpleTestCase):
+    MONDAY = date(2026, 3, 2)
+
+    def test_skips_windows_already_proposed(self):
+        index = FreeRunIndex(
+            self.MONDAY, self.MONDAY + timedelta(days=27), [1, 2, 3, 4, 5], set(), set()
+        )
+        end = self.MONDAY + timedelta(days=27)
+        booked = [(self.MONDAY + timedelta(days=1), self.MONDAY + timedelta(days=2))]
+        # Monday alone is free but a 2-day run starting then hits the booking.
+        self.assertEqual(
+            sa._free_window(index, 2, self.MONDAY, end, booked),
+            (self.MONDAY + timedelta(days=3), self.MONDAY + timedelta(days=4)),
+        )
+        self.assertEqual(
+            sa._free_window(index, 1, self.MONDAY, end, booked),
+            (self.MONDAY, self.MONDAY),
+        )
+
+    def test_none_when_bookings_fill_the_window(self):
+        index = FreeRunIndex(
+            self.MONDAY, self.MONDAY + timedelta(days=4), [1, 2, 3, 4, 5], set(), set()
+        )
+        booked = [(self.MONDAY, self.MONDAY + timedelta(days=4))]
+        self.assertEqual(
+            sa._free_window(index, 1, self.MONDAY, self.MONDAY + timedelta(days=4), booked),
+            (None, None),
+        )
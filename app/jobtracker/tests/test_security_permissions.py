@@ -7,7 +7,9 @@ superuser (first user created), so these tests create dedicated NON-superuser
 users with explicit guardian perms to actually exercise the gates.
 """
 import json
+from asgiref.sync import async_to_sync, iscoroutinefunction
 from django.core.exceptions import PermissionDenied
+from django.core.cache import cache
 from django.test import RequestFactory, override_settings
 from guardian.shortcuts import assign_perm, remove_perm
 
@@ -15,6 +17,7 @@ from chaotica_utils.models import User
 from jobtracker import schedule_history
 from jobtracker.models import TimeSlot
 from jobtracker.views import scheduler as sched_views
+from .test_schedule_cache import LOCMEM
 from .test_schedule_history import ScheduleHistoryBase
 
 
@@ -23,12 +26,15 @@ def _reload(user):
     return User.objects.get(pk=user.pk)
 
 
+# Deltas and viewable-user sets are cached; keep them per-test.
 @override_settings(
-    CHANNEL_LAYERS={"default": {"BACKEND": "channels.layers.InMemoryChannelLayer"}}
+    CHANNEL_LAYERS={"default": {"BACKEND": "channels.layers.InMemoryChannelLayer"}},
+    CACHES=LOCMEM,
 )
 class SchedulerPermissionTests(ScheduleHistoryBase):
     def setUp(self):
         super().setUp()
+        cache.clear()
         self.rf = RequestFactory()
         # A scheduler: may view + schedule the unit.
         self.scheduler = User.objects.create_user(
@@ -45,6 +51,12 @@ class SchedulerPermissionTests(ScheduleHistoryBase):
     def _get(self, view, path, params, user):
         req = self.rf.get(path, params)
         req.user = user
+        if iscoroutinefunction(view):
+            async def auser():
+                return user
+
+            req.auser = auser
+            return async_to_sync(view)(req)
         return view(req)
 
     def _post(self, view, path, data, user):
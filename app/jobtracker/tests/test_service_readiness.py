@@ -0,0 +1,79 @@
+from django.test import TestCase
+
+from chaotica_utils.models import User
+from jobtracker import service_readiness
+from jobtracker.enums import QualificationStatus, UserSkillRatings as R
+from jobtracker.models import (
+    AwardingBody,
+    Qualification,
+    QualificationRecord,
+    Service,
+    ServiceReadiness,
+)
+from jobtracker.models.skill import Skill, SkillCategory, UserSkill
+
+
+class ServiceReadinessTests(TestCase):
+    """ServiceReadiness rows are kept current by signals."""
+
+    def setUp(self):
+        category = SkillCategory.objects.create(name="Readiness")
+        self.a = Skill.objects.create(name="Skill A", category=category)
+        self.b = Skill.objects.create(name="Skill B", category=category)
+        self.qual = Qualification.objects.create(
+            awarding_body=AwardingBody.objects.create(name="CREST"),
+            name="Certified Tester", short_name="CCT",
+        )
+        self.service = Service.objects.create(name="Readiness Service")
+        self.service.skillsRequired.add(self.a, self.b)
+        self.service.qualificationsRequired.add(self.qual)
+
+        self.ready = User.objects.create_user(email="ready@x.com", password="x")
+        self.partial = User.objects.create_user(email="partial@x.com", password="x")
+        UserSkill.objects.create(user=self.ready, skill=self.a, rating=R.SPECIALIST)
+        UserSkill.objects.create(user=self.ready, skill=self.b, rating=R.CAN_DO_ALONE)
+        UserSkill.objects.create(user=self.partial, skill=self.a, rating=R.SPECIALIST)
+
+    def _row(self, user):
+        return ServiceReadiness.objects.filter(service=self.service, user=user).values_list(
+            "tier", "missing_skills", "missing_qualifications"
+        ).first()
+
+    def test_rows_follow_skills_and_qualifications(self):
+        self.assertEqual(self._row(self.ready), (R.CAN_DO_ALONE, 0, 1))
+        self.assertEqual(self._row(self.partial), (ServiceReadiness.TIER_INCOMPLETE, 1, 1))
+
+        QualificationRecord.objects.create(
+            user=self.ready, qualification=self.qual, status=QualificationStatus.AWARDED
+        )
+        self.assertEqual(self._row(self.ready), (R.CAN_DO_ALONE, 0, 0))
+
+        UserSkill.objects.filter(user=self.ready, skill=self.b).get().delete()
+        self.assertEqual(self._row(self.ready), (ServiceReadiness.TIER_INCOMPLETE, 1, 0))
+
+    def test_requirement_changes_refresh_service(self):
+        self.service.skillsRequired.remove(self.b)
+        self.assertEqual(self._row(self.partial), (R.SPECIALIST, 0, 1))
+
+        # From the skill side of the M2M
+        self.b.services_skill_required.add(self.service)
+        self.assertEqual(self._row(self.partial), (ServiceReadiness.TIER_INCOMPLETE, 1, 1))
+
+        self.b.delete()
+        self.assertEqual(self._row(self.partial), (R.SPECIALIST, 0, 1))
+
+    def test_full_refresh_matches_incremental(self):
+        self.assertEqual(service_readiness.refresh(), (0, 0))
+
+    def test_tiers_by_service_and_breakdown(self):
+        self.assertEqual(
+            service_readiness.tiers_by_service([self.service.pk]),
+            {self.service.pk: {self.ready.pk: R.CAN_DO_ALONE}},
+        )
+        breakdown = self.service.get_service_readiness_breakdown()
+        self.assertEqual(list(breakdown["independent_only"]), [self.ready])
+        self.assertEqual(list(breakdown["missing_skills"]), [self.partial])
+
+        self.ready.is_active = False
+        self.ready.save()
+        self.assertEqual(service_readiness.tiers_by_service([self.service.pk]), {self.service.pk: {}})
@@ -0,0 +1,85 @@
+import pickle
+
+from django.core.cache import cache
+from django.test import TestCase, override_settings
+
+from chaotica_utils.models import User
+from jobtracker import skill_matrix
+from jobtracker.enums import UserSkillRatings
+from jobtracker.models import OrganisationalUnit, Team
+from jobtracker.models.skill import Skill, SkillCategory, UserSkill
+from jobtracker.skill_matrix import SkillMatrix
+
+LOCMEM = {"default": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache"}}
+
+
+class SkillMatrixArrayTests(TestCase):
+    def test_from_rows_and_slice(self):
+        matrix = SkillMatrix.from_rows(
+            [10, 20, 30],
+            [
+                (1, 10, UserSkillRatings.SPECIALIST, False),
+                (2, 30, UserSkillRatings.CAN_DO_ALONE, True),
+                (2, 99, UserSkillRatings.SPECIALIST, False),  # unknown skill
+            ],
+        )
+        self.assertEqual(len(matrix.cells), 2 * 3)
+        self.assertEqual(matrix.rating(1, 10), UserSkillRatings.SPECIALIST)
+        self.assertEqual(matrix.rating(2, 30), UserSkillRatings.CAN_DO_ALONE)
+        self.assertTrue(matrix.interested(2, 30))
+        self.assertEqual(matrix.rating(3, 10), UserSkillRatings.NO_EXPERIENCE)
+
+        sliced = matrix.slice([2, 3], [30, 10])
+        self.assertEqual(sliced.user_ids, (2, 3))
+        self.assertEqual(sliced.row_dict(2)[30], {"rating": 2, "interested": True})
+        self.assertEqual(sliced.row(3), bytes(2))
+
+        restored = pickle.loads(pickle.dumps(sliced))
+        self.assertEqual(restored.rating(2, 30), UserSkillRatings.CAN_DO_ALONE)
+
+
+@override_settings(CACHES=LOCMEM)
+class SkillMatrixCacheTests(TestCase):
+    def setUp(self):
+        super().setUp()
+        cache.clear()
+        self.user = User.objects.create_user(email="skills@example.com", password="pw12345")
+        self.category = SkillCategory.objects.create(name="Web")
+        self.skill = Skill.objects.create(name="XSS", category=self.category)
+        self.user_skill = UserSkill.objects.create(
+            user=self.user, skill=self.skill, rating=UserSkillRatings.CAN_DO_WITH_SUPPORT
+        )
+
+    def test_cached_until_skills_change(self):
+        data, from_cache = skill_matrix.get_matrix_data()
+        self.assertFalse(from_cache)
+        self.assertEqual(
+            data["matrix"].rating(self.user.pk, self.skill.pk),
+            UserSkillRatings.CAN_DO_WITH_SUPPORT,
+        )
+        self.assertEqual(data["categories"], [self.category])
+
+        with self.assertNumQueries(0):
+            _, from_cache = skill_matrix.get_matrix_data()
+        self.assertTrue(from_cache)
+
+        self.user_skill.rating = UserSkillRatings.SPECIALIST
+        self.user_skill.save()
+        data, from_cache = skill_matrix.get_matrix_data()
+        self.assertFalse(from_cache)
+        self.assertEqual(
+            data["matrix"].rating(self.user.pk, self.skill.pk), UserSkillRatings.SPECIALIST
+        )
+
+    def test_new_skill_invalidates(self):
+        skill_matrix.get_matrix_data()
+        other = Skill.objects.create(name="SQLi", category=self.category)
+        data, from_cache = skill_matrix.get_matrix_data()
+        self.assertFalse(from_cache)
+        self.assertIn(other.pk, data["matrix"].skill_ids)
+
+    def test_unit_and_team_changes_clear_filter_options(self):
+        for model in (OrganisationalUnit, Team):
+            cache.set(skill_matrix.FILTER_OPTIONS_KEY, {"all_units": []})
+            model.objects.create(name=f"New {model.__name__}")
+            self.assertIsNone(cache.get(skill_matrix.FILTER_OPTIONS_KEY))
@@ -0,0 +1,117 @@
+from datetime import datetime, timedelta, date
+from django.test import TestCase
+from django.utils import timezone
+
+from chaotica_utils.models import User
+from jobtracker.models import (
+    Client,
+    Job,
+    Phase,
+    OrganisationalUnit,
+    TimeSlot,
+    TimeSlotDay,
+    TimeSlotType,
+)
+from jobtracker.enums import DefaultTimeSlotTypes, PhaseStatuses, TimeSlotDeliveryRole
+from jobtracker import occupancy
+
+
+def _aware(day, hour):
+    return timezone.make_aware(datetime.combine(day, datetime.min.time()).replace(hour=hour))
+
+
+class OccupancyBase(TestCase):
+    def setUp(self):
+        super().setUp()
+        self.user = User.objects.create_user(email="occ@test.com", password="pw12345")
+        self.unit = OrganisationalUnit.objects.create(name="Test Unit")
+        self.client_obj = Client.objects.create(name="Test Client")
+        self.job = Job.objects.create(
+            unit=self.unit,
+            client=self.client_obj,
+            title="Test Job",
+            created_by=self.user,
+            account_manager=self.user,
+        )
+        self.phase = Phase.objects.create(job=self.job, title="Phase 1")
+        self.delivery_type = TimeSlotType.get_builtin_object(DefaultTimeSlotTypes.DELIVERY)
+        self.internal_type = TimeSlotType.get_builtin_object(DefaultTimeSlotTypes.UNASSIGNED)
+        # A Monday, well clear of any seeded holidays.
+        self.monday = date(2031, 3, 3)
+
+    def _slot(self, first_day, days, slot_type=None, phase=None):
+        return TimeSlot.objects.create(
+            user=self.user,
+            slot_type=slot_type or self.internal_type,
+            phase=phase,
+            deliveryRole=TimeSlotDeliveryRole.DELIVERY if phase else TimeSlotDeliveryRole.NA,
+            start=_aware(first_day, 9),
+            end=_aware(first_day + timedelta(days=days - 1), 17),
+        )
+
+
+class OccupancyStoreTests(OccupancyBase):
+    def test_save_expands_slot_into_days(self):
+        slot = self._slot(self.monday, 3)
+        self.assertEqual(
+            sorted(slot.days.values_list("date", flat=True)),
+            [self.monday + timedelta(days=i) for i in range(3)],
+        )
+
+    def test_move_replaces_days(self):
+        slot = self._slot(self.monday, 2)
+        slot.start += timedelta(days=7)
+        slot.end += timedelta(days=7)
+        slot.save()
+        self.assertEqual(
+            sorted(slot.days.values_list("date", flat=True)),
+            [self.monday + timedelta(days=7), self.monday + timedelta(days=8)],
+        )
+
+    def test_delete_cascades(self):
+        slot = self._slot(self.monday, 2)
+        slot.delete()
+        self.assertFalse(TimeSlotDay.objects.filter(user=self.user).exists())
+
+    def test_sync_slots_after_queryset_update(self):
+        slot = self._slot(self.monday, 1)
+        TimeSlot.objects.filter(pk=slot.pk).update(
+            start=slot.start + timedelta(days=1), end=slot.end + timedelta(days=1)
+        )
+        occupancy.sync_slots([slot.pk])
+        self.assertEqual(
+            list(slot.days.values_list("date", flat=True)),
+            [self.monday + timedelta(days=1)],
+        )
+
+    def test_rebuild(self):
+        self._slot(self.monday, 5)
+        TimeSlotDay.objects.all().delete()
+        slots, days = occupancy.rebuild()
+        self.assertEqual((slots, days), (1, 5))
+
+
+class BulkUtilisationTests(OccupancyBase):
+    def test_counts_from_store(self):
+        # Mon-Wed internal, Thu-Fri tentative delivery.
+        self._slot(self.monday, 3)
+        self._slot(
+            self.monday + timedelta(days=3), 2,
+            slot_type=self.delivery_type, phase=self.phase,
+        )
+        self.phase.refresh_from_db()
+        self.assertLess(self.phase.status, PhaseStatuses.SCHEDULED_CONFIRMED)
+
+        stats = User.objects.calculate_bulk_utilization(
+            User.objects.filter(pk=self.user.pk),
+            _aware(self.monday, 0),
+            timezone.make_aware(
+                datetime.combine(self.monday + timedelta(days=6), datetime.max.time())
+            ),
+        )["by_user"][self.user.pk]
+        self.assertEqual(stats["total_days"], 7)
+        self.assertEqual(stats["scheduled_days"], 5)
+        self.assertEqual(stats["non_delivery_days"], 3)
+        self.assertEqual(stats["tentative_days"], 2)
+        self.assertEqual(stats["confirmed_days"], 0)
+        self.assertEqual(stats["available_days"], stats["working_days"] - 5)
@@ -0,0 +1,90 @@
+from datetime import date, timedelta
+
+from django.test import SimpleTestCase, TestCase
+from django.utils import timezone
+
+from chaotica_utils.models import User
+from jobtracker.models import Client, DueTransition, Job, OrganisationalUnit, Phase
+from jobtracker.enums import JobStatuses, PhaseStatuses
+from jobtracker import workflow_queue
+
+
+class PhaseDueTests(SimpleTestCase):
+    def test_due_times(self):
+        start = date(2026, 3, 9)
+        transition, due = workflow_queue.phase_due(PhaseStatuses.SCHEDULED_CONFIRMED, start)
+        self.assertEqual(transition, DueTransition.TO_PRE_CHECKS)
+        self.assertEqual(timezone.localtime(due).date(), date(2026, 3, 3))
+        transition, due = workflow_queue.phase_due(PhaseStatuses.READY_TO_BEGIN, start)
+        self.assertEqual(transition, DueTransition.TO_IN_PROGRESS)
+        self.assertEqual(timezone.localtime(due).date(), start)
+
+    def test_nothing_due_without_start_or_for_other_statuses(self):
+        self.assertIsNone(workflow_queue.phase_due(PhaseStatuses.READY_TO_BEGIN, None))
+        self.assertIsNone(workflow_queue.phase_due(PhaseStatuses.IN_PROGRESS, date(2026, 3, 9)))
+
+
+class WorkflowQueueTests(TestCase):
+    def setUp(self):
+        super().setUp()
+        self.user = User.objects.create_user(email="queue@test.com", password="pw12345")
+        self.job = Job.objects.create(
+            unit=OrganisationalUnit.objects.create(name="Queue Unit"),
+            client=Client.objects.create(name="Queue Client"),
+            title="Queue Job",
+            created_by=self.user,
+            account_manager=self.user,
+        )
+        self.start = timezone.now().date() + timedelta(days=20)
+        self.phase = Phase.objects.create(
+            job=self.job, title="Phase 1", desired_start_date=self.start
+        )
+
+    def _rows(self):
+        return list(
+            DueTransition.objects.filter(phase=self.phase).values_list("transition", flat=True)
+        )
+
+    def test_status_and_date_changes_maintain_the_queue(self):
+        self.assertEqual(self._rows(), [])
+        self.phase.status = PhaseStatuses.SCHEDULED_CONFIRMED
+        self.phase.save()
+        self.assertEqual(self._rows(), [DueTransition.TO_PRE_CHECKS])
+
+        self.phase.desired_start_date = self.start + timedelta(days=7)
+        self.phase.save()
+        row = DueTransition.objects.get(phase=self.phase)
+        self.assertEqual(timezone.localtime(row.due_at).date(), self.start + timedelta(days=1))
+
+        self.phase.status = PhaseStatuses.IN_PROGRESS
+        self.phase.save()
+        self.assertEqual(self._rows(), [])
+
+    def test_only_due_rows_are_examined(self):
+        self.phase.status = PhaseStatuses.SCHEDULED_CONFIRMED
+        self.phase.save()
+        Phase.objects.create(job=self.job, title="Phase 2")  # no start date: never queued
+
+        stats = workflow_queue.process_due()
+        self.assertEqual(stats, {"examined": 0, "transitioned": 0, "failed": 0})
+
+        due_at = DueTransition.objects.get(phase=self.phase).due_at
+        stats = workflow_queue.process_due(now=due_at)
+        self.assertEqual(stats["examined"], 1)
+        self.assertEqual(stats["transitioned"], 1)
+        self.phase.refresh_from_db()
+        self.assertEqual(self.phase.status, PhaseStatuses.PRE_CHECKS)
+        self.assertEqual(self._rows(), [])
+
+    def test_job_queued_for_completion_check(self):
+        self.job.status = JobStatuses.IN_PROGRESS
+        self.job.save()
+        self.assertTrue(
+            DueTransition.objects.filter(
+                job=self.job, transition=DueTransition.TO_COMPLETE
+            ).exists()
+        )
+        # Phase not delivered yet: the check is consumed without completing
+        stats = workflow_queue.process_due()
+        self.assertEqual((stats["examined"], stats["transitioned"]), (1, 0))
+        self.assertFalse(DueTransition.objects.filter(job=self.job).exists())
@@ -90,6 +90,11 @@ urlpatterns = [
     path(
         "scheduler/timeslots", views.view_scheduler_slots, name="view_scheduler_slots"
     ),
+    path(
+        "scheduler/timeslots/weeks",
+        views.view_scheduler_slot_weeks,
+        name="view_scheduler_slot_weeks",
+    ),
     path(
         "scheduler/filter/default/set",
         views.set_scheduler_filter_default,
@@ -279,6 +284,11 @@ urlpatterns = [
         views.job_scheduling_assistant,
         name="job_scheduling_assistant",
     ),
+    path(
+        "job/<str:slug>/scheduling-assistant/proposal",
+        views.job_staffing_proposal,
+        name="job_staffing_proposal",
+    ),
     path(
         "job/<str:slug>/schedule/members",
         views.view_job_schedule_members,
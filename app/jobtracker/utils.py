@@ -1,5 +1,9 @@
+import hashlib
+import json
 import logging
 import os
+from collections import defaultdict
+from datetime import datetime, timedelta
 from django.conf import settings
 from django.contrib.auth import REDIRECT_FIELD_NAME
 from django.core.exceptions import ObjectDoesNotExist, PermissionDenied
@@ -8,23 +12,33 @@ from django.shortcuts import render
 from django.template import loader
 from chaotica_utils.views import page_defaults
 from guardian.conf import settings as guardian_settings
-from .models import Job, Phase, OrganisationalUnit, TimeSlot
+from . import permission_scope
 from .forms import SchedulerFilter
-from django.http import JsonResponse, HttpResponse
+from django.http import (
+    JsonResponse,
+    HttpResponse,
+    HttpResponseBadRequest,
+    HttpResponseNotModified,
+    StreamingHttpResponse,
+)
+from django.core.paginator import Paginator
+from django.core.serializers.json import DjangoJSONEncoder
 from django.db.models import Q
+from django.utils import timezone
+from django.utils.http import parse_etags, quote_etag
 from chaotica_utils.models import User, UserJobLevel
-from guardian.shortcuts import get_objects_for_user
 from .models import (
     Job,
     TimeSlot,
     UserSkill,
     Phase,
+    OrganisationalUnit,
     OrganisationalUnitMember,
     OrganisationalUnitRole,
     TimeSlotComment,
 )
 from .enums import UserSkillRatings
-import logging
+from . import schedule_cache
 from chaotica_utils.utils import (
     clean_fullcalendar_datetime, is_ajax
 )
@@ -69,13 +83,18 @@ def viewable_schedule_user_pks(user):
     (:func:`_filter_users_on_query`) so the live/polled delta layers only ever
     hand a user slot data they could already see in the calendar. Always includes
     the user themselves."""
-    pks = set()
-    for org_unit in get_objects_for_user(user, "jobtracker.view_users_schedule"):
-        for member in org_unit.get_allMembers():
-            pks.add(member.pk)
-    if getattr(user, "pk", None):
-        pks.add(user.pk)
-    return pks
+    return set(permission_scope.viewable_user_ids(user))
+
+
+# Seconds a user's viewable set is reused by the live/polled delta layers
+VIEWABLE_CACHE_TIMEOUT = permission_scope.SCOPE_CACHE_TIMEOUT
+
+
+def cached_viewable_schedule_user_pks(user):
+    """:func:`viewable_schedule_user_pks` from the permission-scope cache
+    (:mod:`jobtracker.permission_scope`), which is dropped whenever permissions
+    or unit memberships change."""
+    return permission_scope.viewable_user_ids(user)
 
 
 def get_unit_40x_or_None(
@@ -132,11 +151,13 @@ def get_unit_40x_or_None(
             if unit:
                 if any_perm:
                     has_permissions = any(
-                        request.user.has_perm(perm, unit) for perm in perms
+                        permission_scope.has_unit_perm(request.user, perm, unit)
+                        for perm in perms
                     )
                 else:
                     has_permissions = all(
-                        request.user.has_perm(perm, unit) for perm in perms
+                        permission_scope.has_unit_perm(request.user, perm, unit)
+                        for perm in perms
                     )
 
     if not has_permissions:
@@ -173,16 +194,10 @@ def _filter_users_on_query(request, cleaned_data=None):
     show_inactive_users = cleaned_data.get("show_inactive_users")
 
     # Starting users filter
-    users_pk = []
     # This pre-loads which users we can see the schedule of.
     # It's actually not ideal because if we view a job/phase,
     # but say we don't have permission to see the schedule of someone - we can't see a complete schedule for that job
-    for org_unit in get_objects_for_user(
-        request.user, "jobtracker.view_users_schedule"
-    ):
-        for user in org_unit.get_allMembers():
-            if user.pk not in users_pk:
-                users_pk.append(user.pk)
+    users_pk = permission_scope.viewable_user_ids(request.user, include_self=False)
 
     onboarded_to = cleaned_data.get("onboarded_to")
     if onboarded_to:
@@ -551,11 +566,10 @@ def get_scheduler_members(request, filtered_users = None, start = None, end = No
     return JsonResponse(data, safe=False)
 
 
-def get_scheduler_slots(request, filtered_users = None, start = None, end = None, use_filter_form=True, scope_phases=None, hard_scope=True):
-    data = []
+def _scheduler_selection(request, use_filter_form=True):
+    """Parse the SchedulerFilter on ``request``: ``(cleaned_data, selected_phases)``."""
     selected_phases = []
     cleaned_data = None
-
     if use_filter_form:
         filter_form = SchedulerFilter(request.GET)
         if filter_form.is_valid():
@@ -567,6 +581,94 @@ def get_scheduler_slots(request, filtered_users = None, start = None, end = None
             phases = cleaned_data.get("phases", [])
             for phase in phases:
                 selected_phases.append(phase)
+    return cleaned_data, selected_phases
+
+
+def _scheduler_colours():
+    return {
+        "SCHEDULE_COLOR_PHASE_CONFIRMED_AWAY": str(
+            config.SCHEDULE_COLOR_PHASE_CONFIRMED_AWAY
+        ),
+        "SCHEDULE_COLOR_PHASE_CONFIRMED": str(config.SCHEDULE_COLOR_PHASE_CONFIRMED),
+        "SCHEDULE_COLOR_PHASE_AWAY": str(config.SCHEDULE_COLOR_PHASE_AWAY),
+        "SCHEDULE_COLOR_PHASE": str(config.SCHEDULE_COLOR_PHASE),
+        "SCHEDULE_COLOR_PROJECT": str(config.SCHEDULE_COLOR_PROJECT),
+        "SCHEDULE_COLOR_INTERNAL": str(config.SCHEDULE_COLOR_INTERNAL),
+        "SCHEDULE_COLOR_COMMENT": str(config.SCHEDULE_COLOR_COMMENT),
+    }
+
+
+def _scheduler_events(
+    filtered_users,
+    start,
+    end,
+    schedule_colours,
+    compressed_view=False,
+    selected_phases=(),
+    scope_phase_ids=None,
+    hard_scope=True,
+):
+    """Slot, holiday and comment events for ``filtered_users`` over ``[start, end]``."""
+    data = []
+
+    # Load the timeslots. Serialised slots come from the per-user, per-month
+    # cache; only the per-request highlighting/scoping is applied here.
+    selected_phase_ids = {p.pk for p in selected_phases if isinstance(p, Phase)}
+    selected_job_ids = {j.pk for j in selected_phases if isinstance(j, Job)}
+    for entry in schedule_cache.get_slot_entries(
+        filtered_users.values_list("pk", flat=True),
+        start,
+        end,
+        schedule_colours,
+        compressed_view=compressed_view,
+    ):
+        phase_id = entry["phase_id"]
+        if scope_phase_ids is not None and hard_scope and phase_id not in scope_phase_ids:
+            # Hard job/phase scope — restrict to that job/phase's slots only.
+            continue
+        slot_json = dict(entry["json"])
+        if selected_phases:
+            if phase_id and (
+                phase_id not in selected_phase_ids
+                and entry["job_id"] not in selected_job_ids
+            ):
+                slot_json["display"] = "background"
+        # Soft-scope: keep the member's other commitments visible but faded so
+        # it's clear which blocks belong to this job/phase (vs. context).
+        if scope_phase_ids is not None and not hard_scope and phase_id not in scope_phase_ids:
+            slot_json["out_of_scope"] = True
+        data.append(slot_json)
+
+    # Add the holidays: one shared background event per holiday listing every
+    # resource in that country, rather than a copy per user.
+    users_by_country = defaultdict(list)
+    for user_pk, country in filtered_users.values_list("pk", "country"):
+        users_by_country[country or ""].append(user_pk)
+    for hol in Holiday.objects.filter(date__gte=start.date(), date__lte=end.date()):
+        resource_ids = users_by_country.get(str(hol.country or ""))
+        if resource_ids:
+            data.append(
+                {
+                    "title": str(hol),
+                    "start": hol.date,
+                    "end": hol.date,
+                    "allDay": True,
+                    "display": "background",
+                    "id": hol.pk,
+                    "resourceIds": resource_ids,
+                }
+            )
+
+    # Add the comments
+    for comment in TimeSlotComment.objects.filter(
+        user__in=filtered_users, end__gte=start, start__lte=end
+    ).select_related("user"):
+        data.append(comment.get_schedule_json(schedule_colours=schedule_colours))
+    return data
+
+
+def get_scheduler_slots(request, filtered_users = None, start = None, end = None, use_filter_form=True, scope_phases=None, hard_scope=True):
+    cleaned_data, selected_phases = _scheduler_selection(request, use_filter_form)
 
     if filtered_users is None:
         filtered_users = _filter_users_on_query(request, cleaned_data).prefetch_related(
@@ -593,71 +695,160 @@ def get_scheduler_slots(request, filtered_users = None, start = None, end = None
     if not end:
         end = clean_fullcalendar_datetime(request.GET.get("end", None))
 
-    schedule_colours = {
-        "SCHEDULE_COLOR_PHASE_CONFIRMED_AWAY": str(
-            config.SCHEDULE_COLOR_PHASE_CONFIRMED_AWAY
-        ),
-        "SCHEDULE_COLOR_PHASE_CONFIRMED": str(config.SCHEDULE_COLOR_PHASE_CONFIRMED),
-        "SCHEDULE_COLOR_PHASE_AWAY": str(config.SCHEDULE_COLOR_PHASE_AWAY),
-        "SCHEDULE_COLOR_PHASE": str(config.SCHEDULE_COLOR_PHASE),
-        "SCHEDULE_COLOR_PROJECT": str(config.SCHEDULE_COLOR_PROJECT),
-        "SCHEDULE_COLOR_INTERNAL": str(config.SCHEDULE_COLOR_INTERNAL),
-        "SCHEDULE_COLOR_COMMENT": str(config.SCHEDULE_COLOR_COMMENT),
-    }
-
     compressed_view = cleaned_data.get("compressed_view", False) if cleaned_data else False
 
     scope_phase_ids = set(p.pk for p in scope_phases) if scope_phases is not None else None
 
-    # Load the timeslots
-    slot_qs = TimeSlot.objects.filter(
-        user__in=filtered_users, end__gte=start, start__lte=end
+    data = _scheduler_events(
+        filtered_users,
+        start,
+        end,
+        _scheduler_colours(),
+        compressed_view=compressed_view,
+        selected_phases=selected_phases,
+        scope_phase_ids=scope_phase_ids,
+        hard_scope=hard_scope,
     )
-    if scope_phase_ids is not None and hard_scope:
-        # Hard job/phase scope — restrict to that job/phase's slots only.
-        slot_qs = slot_qs.filter(phase_id__in=scope_phase_ids)
-    for slot in slot_qs.prefetch_related(
-        "phase",
-        "phase__job",
-        "phase__job__client",
-        "project",
-        "slot_type",
-        "user",
-        "leaverequest",
-    ):
-        slot_json = slot.get_schedule_json(schedule_colours=schedule_colours, compressed_view=compressed_view)
-        if selected_phases:
-            if slot.phase and (
-                slot.phase not in selected_phases
-                and slot.phase.job not in selected_phases
-            ):
-                slot_json["display"] = "background"
-        # Soft-scope: keep the member's other commitments visible but faded so
-        # it's clear which blocks belong to this job/phase (vs. context).
-        if scope_phase_ids is not None and not hard_scope and slot.phase_id not in scope_phase_ids:
-            slot_json["out_of_scope"] = True
-        data.append(slot_json)
+    return JsonResponse(data, safe=False)
 
-    # Add the holidays
-    holidays = Holiday.objects.filter(date__gte=start.date(), date__lte=end.date())
-    for user in filtered_users:
-        for hol in holidays:
-            if user.country == hol.country:
-                data.append(
-                    {
-                        "title": str(hol),
-                        "start": hol.date,
-                        "end": hol.date,
-                        "allDay": True,
-                        "display": "background",
-                        "id": hol.pk,
-                        "resourceId": user.pk,
-                    }
+
+# Week-bucketed loading. The timeline asks for a window and a page of resources
+# and gets the events back in ISO-week chunks, each with its own ETag. Chunks the
+# client already holds (sent back as ``known=<week>:<etag>,...``) come back as
+# ``{"week", "etag", "not_modified": true}`` with no events, so a pan or a
+# post-change refresh only re-sends the weeks that actually differ.
+SCHEDULER_WEEKS_PAGE_SIZE = 100
+SCHEDULER_WEEKS_MAX_PAGE_SIZE = 500
+# Weeks built per query round when streaming (``stream=1``), so the first
+# chunks of a very wide window (e.g. after Fit) reach the client early.
+SCHEDULER_WEEKS_STREAM_BATCH = 4
+
+
+def iso_weeks(start, end):
+    """``(key, first_day, last_day)`` for each ISO week touching ``[start, end]``."""
+    tz = timezone.get_default_timezone()
+    first = timezone.localtime(start, tz).date()
+    last = timezone.localtime(end, tz).date()
+    monday = first - timedelta(days=first.weekday())
+    weeks = []
+    while monday <= last:
+        year, week, _ = monday.isocalendar()
+        weeks.append(("{}-W{:02d}".format(year, week), monday, monday + timedelta(days=6)))
+        monday += timedelta(days=7)
+    return weeks
+
+
+def _event_days(event):
+    tz = timezone.get_default_timezone()
+    days = []
+    for value in (event["start"], event["end"] or event["start"]):
+        if isinstance(value, datetime):
+            value = timezone.localtime(value, tz).date()
+        days.append(value)
+    return days
+
+
+def _week_chunks(build, weeks, known, batch):
+    """Yield the JSON text of each week's chunk, building ``batch`` weeks at a time.
+
+    ``build(start, end)`` returns the events for an aware datetime range; events
+    spanning several weeks are repeated in each so every chunk stands alone.
+    """
+    tz = timezone.get_default_timezone()
+    for i in range(0, len(weeks), batch):
+        group = weeks[i:i + batch]
+        start = timezone.make_aware(datetime.combine(group[0][1], datetime.min.time()), tz)
+        end = timezone.make_aware(datetime.combine(group[-1][2], datetime.max.time()), tz)
+        events = [(_event_days(e), e) for e in build(start, end)]
+        for key, first_day, last_day in group:
+            week_events = sorted(
+                (e for (s, f), e in events if s <= last_day and f >= first_day),
+                key=lambda e: (bool(e.get("allDay")), bool(e.get("is_comment")), str(e["id"]), str(e.get("resourceId", e.get("resourceIds")))),
+            )
+            body = json.dumps(week_events, cls=DjangoJSONEncoder)
+            etag = hashlib.md5(body.encode(), usedforsecurity=False).hexdigest()[:16]
+            if known.get(key) == etag:
+                yield json.dumps({"week": key, "etag": etag, "not_modified": True})
+            else:
+                yield '{{"week": "{}", "start": "{}", "end": "{}", "etag": "{}", "events": {}}}'.format(
+                    key, first_day.isoformat(), last_day.isoformat(), etag, body
                 )
 
-    # Add the comments
-    for comment in TimeSlotComment.objects.filter(
-        user__in=filtered_users, end__gte=start, start__lte=end
-    ).select_related("user"):
-        data.append(comment.get_schedule_json(schedule_colours=schedule_colours))
-    return JsonResponse(data, safe=False)
\ No newline at end of file
+
+def get_scheduler_slot_weeks(request):
+    """Week-bucketed, resource-paged variant of :func:`get_scheduler_slots`.
+
+    Query parameters (on top of the usual SchedulerFilter fields):
+
+    * ``start`` / ``end`` — the window, widened to whole ISO weeks;
+    * ``page`` / ``page_size`` — which slice of the filtered resources to load;
+    * ``known`` — ``<week>:<etag>`` pairs the client already holds for this page;
+    * ``stream=1`` — emit newline-delimited JSON (a header line, then one line per
+      week) as each batch of weeks is built, instead of a single document.
+
+    The non-streamed response carries an ETag over the whole page, so a repeat
+    request with ``If-None-Match`` gets a 304.
+    """
+    cleaned_data, selected_phases = _scheduler_selection(request)
+    start = clean_fullcalendar_datetime(request.GET.get("start", None))
+    end = clean_fullcalendar_datetime(request.GET.get("end", None))
+    if not start or not end or end < start:
+        return HttpResponseBadRequest()
+    try:
+        page_size = min(
+            max(int(request.GET.get("page_size", SCHEDULER_WEEKS_PAGE_SIZE)), 1),
+            SCHEDULER_WEEKS_MAX_PAGE_SIZE,
+        )
+    except ValueError:
+        return HttpResponseBadRequest()
+
+    filtered_users = _filter_users_on_query(request, cleaned_data).order_by("pk")
+    paginator = Paginator(filtered_users, page_size)
+    page = paginator.get_page(request.GET.get("page"))
+    page_users = User.objects.filter(pk__in=[u.pk for u in page.object_list])
+
+    known = {}
+    for pair in request.GET.get("known", "").split(","):
+        week, _, etag = pair.partition(":")
+        if etag:
+            known[week] = etag
+
+    schedule_colours = _scheduler_colours()
+    compressed_view = cleaned_data.get("compressed_view", False) if cleaned_data else False
+
+    def build(window_start, window_end):
+        return _scheduler_events(
+            page_users,
+            window_start,
+            window_end,
+            schedule_colours,
+            compressed_view=compressed_view,
+            selected_phases=selected_phases,
+        )
+
+    header = {
+        "page": page.number,
+        "num_pages": paginator.num_pages,
+        "has_next": page.has_next(),
+        "resources": [u.pk for u in page.object_list],
+    }
+    weeks = iso_weeks(start, end)
+
+    if request.GET.get("stream"):
+        def lines():
+            yield json.dumps(header) + "\n"
+            for chunk in _week_chunks(build, weeks, known, SCHEDULER_WEEKS_STREAM_BATCH):
+                yield chunk + "\n"
+
+        return StreamingHttpResponse(lines(), content_type="application/x-ndjson")
+
+    chunks = list(_week_chunks(build, weeks, known, len(weeks) or 1))
+    body = json.dumps(header)[:-1] + ', "weeks": [' + ", ".join(chunks) + "]}"
+    etag = quote_etag(hashlib.md5(body.encode(), usedforsecurity=False).hexdigest())
+    if etag in parse_etags(request.headers.get("If-None-Match", "")):
+        response = HttpResponseNotModified()
+    else:
+        response = HttpResponse(body, content_type="application/json")
+    response["ETag"] = etag
+    response["Cache-Control"] = "private, no-cache"
+    return response
@@ -34,6 +34,7 @@ from ..forms import (
 )
 from ..mixins import PrefetchRelatedMixin
 from ..models import TimeSlot
+from .. import business_hours
 from ..enums import TimeSlotDeliveryRole
 from django.utils import timezone
 from decimal import Decimal
@@ -505,8 +506,8 @@ class ClientFrameworkDetailView(
         )
 
         # Pre-compute business hours once per slot to avoid repeated calculation
-        for slot in all_slots:
-            slot._cached_hours = slot.get_business_hours()
+        for slot, hours in zip(all_slots, business_hours.slot_hours(all_slots)):
+            slot._cached_hours = hours
 
         # Pre-compute summary stats so the template doesn't call model methods
         # (which would each re-query the database independently)
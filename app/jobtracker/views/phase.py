@@ -1529,6 +1529,51 @@ def job_scheduling_assistant(request, slug):
     return JsonResponse(data)
 
 
+@job_permission_required_or_403("jobtracker.view_job_schedule", (Job, "slug", "slug"))
+def job_staffing_proposal(request, slug):
+    """Propose one person per open phase of a job (JSON), ranking every phase in
+    one pass and never proposing the same person for overlapping windows."""
+    from ..scheduling_assistant import propose_job_staffing
+
+    job = get_object_or_404(Job, slug=slug)
+    pool, _ = _assistant_scoped_pool(request)
+    weights, _ = _assistant_weights(request)
+    proposals = propose_job_staffing(
+        job,
+        candidate_pool=pool,
+        weights=weights,
+        alternatives=max(0, _assistant_int(request, "alternatives", 3)),
+    )
+
+    def _person(candidate, start, end):
+        return {
+            "id": candidate.user.pk,
+            "name": str(candidate.user),
+            "score": candidate.score,
+            "tier_label": candidate.tier_label,
+            "on_phase": candidate.on_phase,
+            "start": start.isoformat(),
+            "end": end.isoformat(),
+        }
+
+    return JsonResponse(
+        {
+            "proposals": [
+                {
+                    "phase": p.phase.pk,
+                    "phase_title": str(p.phase),
+                    "required_days": p.required_working_days,
+                    "proposed": (
+                        _person(p.candidate, p.start, p.end) if p.candidate else None
+                    ),
+                    "alternatives": [_person(*alt) for alt in p.alternatives],
+                }
+                for p in proposals
+            ]
+        }
+    )
+
+
 @job_permission_required_or_403("jobtracker.can_schedule_job", (Phase, "slug", "slug"))
 def phase_scheduling_assistant_plan(request, job_slug, slug):
     """Draft a split team for a phase from a set of selected people.
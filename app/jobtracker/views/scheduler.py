@@ -39,14 +39,19 @@ from ..enums import UserSkillRatings, TimeSlotDeliveryRole, PhaseStatuses, Defau
 from ..models import ScheduleAction, ScheduleActionType
 from ..utils import (
     get_scheduler_slots,
+    get_scheduler_slot_weeks,
     get_scheduler_members,
     assigned_role_map,
     job_assigned_role_map,
     phase_assigned_role_map,
     can_view_job_schedule,
-    viewable_schedule_user_pks,
+    cached_viewable_schedule_user_pks,
 )
 from .. import schedule_history
+from .. import broadcast
+from .. import occupancy
+from .. import business_hours
+from .. import phase_dates
 import logging
 from django.contrib.auth.decorators import login_required
 from chaotica_utils.utils import (
@@ -59,7 +64,9 @@ from chaotica_utils.utils import (
 from chaotica_utils.models import Holiday
 from django.contrib import messages
 from django.utils.html import escape
+import asyncio
 import time
+from asgiref.sync import sync_to_async
 from constance import config
 
 
@@ -291,6 +298,11 @@ def view_scheduler_slots(request):
     return get_scheduler_slots(request)
 
 
+@login_required
+def view_scheduler_slot_weeks(request):
+    return get_scheduler_slot_weeks(request)
+
+
 @login_required
 def view_scheduler_members(request):
     return get_scheduler_members(request)
@@ -357,7 +369,7 @@ def _scope_history_qs(request, source):
         if not job or not can_view_job_schedule(request.user, job):
             return qs.none(), None
         return qs.filter(job_id=job_id), None
-    return qs, viewable_schedule_user_pks(request.user)
+    return qs, cached_viewable_schedule_user_pks(request.user)
 
 
 @login_required
@@ -427,25 +439,85 @@ def schedule_action_undo(request):
     )
 
 
-@login_required
-def view_scheduler_slots_since(request):
-    """Polling fallback for the live layer: return ScheduleAction deltas committed
-    to this scope since ``since`` (ISO), chronological, so a client without a live
-    WebSocket can still apply add/update/remove deltas instead of full reloads."""
+# Longest a ?wait= long-poll may hold the request, and how often it re-checks
+# the scope's cached head while waiting
+SINCE_LONG_POLL_MAX = 25
+SINCE_LONG_POLL_INTERVAL = 1
+SINCE_PAGE_SIZE = 200
+
+
+def _slots_since_payload(request, cursor):
+    """Sync body of :func:`view_scheduler_slots_since`.
+
+    Returns ``(payload, group)``: the JSON payload, or None when ``cursor`` is
+    already at the scope's head, and the scope's broadcast group."""
     from django.utils import timezone as _tz
 
-    since = clean_datetime(request.GET.get("since"))
     qs, viewable = _scope_history_qs(request, request.GET)
-    if since:
-        qs = qs.filter(created__gt=since)
-    actions = list(qs[:200])
+    group = broadcast.scope_group(
+        job_id=clean_int(request.GET.get("job")),
+        phase_id=clean_int(request.GET.get("phase")),
+    )
+    if qs.query.is_empty():
+        # Scope not authorised
+        return {"deltas": [], "cursor": cursor, "now": _tz.now().isoformat()}, group
+    if cursor is None:
+        since = clean_datetime(request.GET.get("since"))
+        recent = qs.filter(created__gt=since) if since else qs
+        actions = list(reversed(recent[:SINCE_PAGE_SIZE]))
+        if actions:
+            cursor = actions[-1].pk
+        else:
+            cursor = qs.order_by("-pk").values_list("pk", flat=True).first() or 0
+    else:
+        actions = []
+        head = broadcast.scope_head(group)
+        if head is None or head > cursor:
+            actions = list(qs.filter(pk__gt=cursor).order_by("pk")[:SINCE_PAGE_SIZE])
+            if not actions:
+                broadcast.seed_scope_head(group, cursor)
+        if not actions:
+            return None, group
+        cursor = actions[-1].pk
+
     deltas = [
-        schedule_history.filter_delta_for_users(
-            schedule_history.build_delta(a), viewable
+        delta
+        for delta in (
+            broadcast.filter_compact_delta(d, viewable)
+            for d in broadcast.cached_deltas(actions)
         )
-        for a in reversed(actions)
+        if delta["upserts"] or delta["removals"]
     ]
-    return JsonResponse({"deltas": deltas, "now": _tz.now().isoformat()})
+    return {"deltas": deltas, "cursor": cursor, "now": _tz.now().isoformat()}, group
+
+
+@login_required
+async def view_scheduler_slots_since(request):
+    """Polling fallback for the live layer: return ScheduleAction deltas committed
+    to this scope after the ``after`` action-id cursor (or, on a client's first
+    poll, since the ``since`` ISO time), chronological, so a client without a
+    live WebSocket can still apply add/update/remove deltas instead of full
+    reloads. The response's ``cursor`` is passed back as ``after`` next time.
+
+    Deltas come from the per-action cache in :mod:`jobtracker.broadcast`. A
+    cursor poll with nothing newer than the scope's cached head returns 204
+    without touching the ScheduleAction table; with ``wait=<seconds>`` it
+    instead waits (up to :data:`SINCE_LONG_POLL_MAX`) until something lands.
+    The view is async so a waiting poll only re-reads the cached head and
+    doesn't hold a worker thread."""
+    cursor = clean_int(request.GET.get("after"))
+    payload, group = await sync_to_async(_slots_since_payload)(request, cursor)
+    if payload is None:
+        wait = min(max(clean_int(request.GET.get("wait")) or 0, 0), SINCE_LONG_POLL_MAX)
+        deadline = time.monotonic() + wait
+        while payload is None and time.monotonic() < deadline:
+            await asyncio.sleep(SINCE_LONG_POLL_INTERVAL)
+            head = await sync_to_async(broadcast.scope_head)(group)
+            if head is None or head > cursor:
+                payload, group = await sync_to_async(_slots_since_payload)(request, cursor)
+    if payload is None:
+        return HttpResponse(status=204)
+    return JsonResponse(payload)
 
 
 @login_required
@@ -865,9 +937,14 @@ def _run_batch_create(request, users, build_slot, evaluate, force):
 
     # Save clean (+ forced bypassable); skip blocked.
     to_save = clean + (needs_confirm if force else [])
-    for _u, s, _e in to_save:
-        s.save()
-    data["_saved_slots"] = [s for _u, s, _e in to_save]
+    instances = [s for _u, s, _e in to_save]
+    if instances and all(isinstance(s, TimeSlot) for s in instances):
+        # One insert, one phase recompute and one ScheduleAction for the batch
+        TimeSlot.objects.bulk_schedule(instances, actor=request.user)
+    else:
+        for s in instances:
+            s.save()
+        data["_saved_slots"] = instances
     data["form_is_valid"] = True
     if batch:
         summary = "Booked {} {}.".format(len(to_save), "person" if len(to_save) == 1 else "people")
@@ -1009,16 +1086,17 @@ def _create_delivery_single(request, base, force):
     if overlap_mode == "around":
         occupied = _occupied_dates(base.user, base.start, base.end)
         runs = working_day_runs(base.user, base.start, base.end, occupied)
-        saved = []
-        for run_start, run_end in runs:
-            clone = _clone(_slot_dt(base.user, run_start, "start"),
-                           _slot_dt(base.user, run_end, "end"))
-            clone.save()
-            saved.append(clone)
+        TimeSlot.objects.bulk_schedule(
+            [
+                _clone(_slot_dt(base.user, run_start, "start"),
+                       _slot_dt(base.user, run_end, "end"))
+                for run_start, run_end in runs
+            ],
+            actor=request.user,
+        )
         created = len(runs)
         return {
             "form_is_valid": True,
-            "_saved_slots": saved,
             "summary": (
                 "Booked {} slot{} around existing commitments.".format(created, "" if created == 1 else "s")
                 if created else "No free working days in that range — nothing booked."
@@ -1030,16 +1108,15 @@ def _create_delivery_single(request, base, force):
             base.start, base.end,
             slot_type_pks=[DefaultTimeSlotTypes.DELIVERY, DefaultTimeSlotTypes.INTERNAL_PROJECT],
         )
-        base.save()
+        TimeSlot.objects.bulk_schedule([base], actor=request.user)
         return {
             "form_is_valid": True,
-            "_saved_slots": [base],
             "summary": "Cleared overlapping delivery/project work and booked the range.",
         }
 
     # over (default) — book the whole range on top of existing slots
-    base.save()
-    return {"form_is_valid": True, "_saved_slots": [base]}
+    TimeSlot.objects.bulk_schedule([base], actor=request.user)
+    return {"form_is_valid": True}
 
 
 @unit_permission_required_or_403("jobtracker.can_schedule_job")
@@ -1572,10 +1649,10 @@ def get_user_schedule_breakdown(job, phase=None):
     from decimal import Decimal
 
     if phase:
-        slots = TimeSlot.objects.filter(phase=phase).select_related("user", "phase")
+        slots = list(TimeSlot.objects.filter(phase=phase).select_related("user", "phase"))
         hours_in_day = phase.get_hours_in_day()
     else:
-        slots = TimeSlot.objects.filter(phase__job=job).select_related("user", "phase")
+        slots = list(TimeSlot.objects.filter(phase__job=job).select_related("user", "phase"))
         hours_in_day = job.get_hours_in_day()
 
     role_names = dict(TimeSlotDeliveryRole.CHOICES)
@@ -1588,14 +1665,13 @@ def get_user_schedule_breakdown(job, phase=None):
     user_data = {}
     user_objects = {}
     user_dates = {}  # user_id -> {min_start, max_end}
-    for slot in slots:
+    for slot, hours in zip(slots, business_hours.slot_hours(slots)):
         uid = slot.user_id
         user_data.setdefault(uid, {})
         user_objects.setdefault(uid, slot.user)
         cell = user_data[uid].setdefault(
             slot.deliveryRole, {"hours": Decimal(0), "confirmed": Decimal(0), "tentative": Decimal(0)}
         )
-        hours = slot.get_business_hours()
         cell["hours"] += hours
         if slot.is_confirmed():
             cell["confirmed"] += hours
@@ -1682,7 +1758,7 @@ def get_user_phase_breakdown(job):
     import datetime
     from decimal import Decimal
 
-    slots = (
+    slots = list(
         TimeSlot.objects.filter(phase__job=job)
         .select_related("user", "phase")
     )
@@ -1699,7 +1775,7 @@ def get_user_phase_breakdown(job):
 
     # {user_id: {phase_id: {role_id: {hours, confirmed, tentative}}}}
     data = {}
-    for slot in slots:
+    for slot, hours in zip(slots, business_hours.slot_hours(slots)):
         if not slot.phase_id:
             continue
         cell = (
@@ -1710,7 +1786,6 @@ def get_user_phase_breakdown(job):
                 {"hours": Decimal(0), "confirmed": Decimal(0), "tentative": Decimal(0)},
             )
         )
-        hours = slot.get_business_hours()
         cell["hours"] += hours
         if slot.is_confirmed():
             cell["confirmed"] += hours
@@ -1983,8 +2058,7 @@ def _base_slot_qs(job, phase):
 
 def _refresh_phase_dates(phase_ids):
     """Re-derive stored phase dates after a bulk slot change."""
-    for ph in Phase.objects.filter(pk__in=[p for p in phase_ids if p]):
-        ph.save()
+    phase_dates.recompute(phase_ids)
 
 
 def _handle_shift(request, job, phase, template):
@@ -2005,6 +2079,7 @@ def _handle_shift(request, job, phase, template):
             affected_pks = list(qs.values_list("pk", flat=True))
             before = [schedule_history.snapshot(s) for s in TimeSlot.objects.filter(pk__in=affected_pks)]
             count = qs.update(start=F("start") + delta, end=F("end") + delta)
+            occupancy.sync_slots(affected_pks)
             _refresh_phase_dates(affected)
             schedule_history.record(
                 request.user, ScheduleActionType.MOVE,
@@ -2045,6 +2120,7 @@ def _handle_swap(request, job, phase, scheduled_users, template):
             before = [schedule_history.snapshot(s) for s in TimeSlot.objects.filter(pk__in=all_ids)]
             TimeSlot.objects.filter(pk__in=a_ids).update(user=b)
             TimeSlot.objects.filter(pk__in=b_ids).update(user=a)
+            occupancy.sync_slots(all_ids)
             schedule_history.record(
                 request.user, ScheduleActionType.MOVE,
                 before, [schedule_history.snapshot(s) for s in TimeSlot.objects.filter(pk__in=all_ids)],
@@ -4,18 +4,17 @@ from django.views.generic.detail import DetailView
 from django.views.generic.edit import CreateView, UpdateView, DeleteView
 from django.views.generic import TemplateView
 from django.urls import reverse_lazy
-from django.db.models import Prefetch
 from django.core.cache import cache
 from django.utils.decorators import method_decorator
 from django.views.decorators.cache import cache_page
 from chaotica_utils.views import ChaoticaBaseView
 from chaotica_utils.models import User
 from chaotica_utils.utils import get_sentinel_user
-from ..models import Skill, SkillCategory, UserSkill
+from ..models import Skill, SkillCategory
 from ..forms import SkillForm, SkillCatForm
 from ..mixins import PrefetchRelatedMixin
 from ..enums import UserSkillRatings
-import hashlib
+from .. import skill_matrix
 import logging
 
 
@@ -131,11 +130,6 @@ class SkillMatrixView(PermissionRequiredMixin, ChaoticaBaseView, TemplateView):
     accept_global_perms = True
     return_403 = True
 
-    def get_cache_key(self, filters):
-        """Generate a unique cache key based on filters"""
-        filter_str = f"{filters.get('unit', '')}-{filters.get('team', '')}-{filters.get('category', '')}-{filters.get('role', '')}"
-        return f"skill_matrix_{hashlib.md5(filter_str.encode()).hexdigest()}"
-
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
 
@@ -145,113 +139,59 @@ class SkillMatrixView(PermissionRequiredMixin, ChaoticaBaseView, TemplateView):
         category_filter = self.request.GET.get('category')
         role_filter = self.request.GET.get('role')
 
-        # Create filters dict for cache key
-        filters = {
-            'unit': unit_filter,
-            'team': team_filter,
-            'category': category_filter,
-            'role': role_filter
-        }
-
-        # Try to get from cache first
-        cache_key = self.get_cache_key(filters)
-        # cached_data = cache.get(cache_key)
-        cached_data = None
-
-        if cached_data is not None:
-            # Use cached data if available
-            context.update(cached_data)
-            context['from_cache'] = True
-            return context
+        # Ratings and headers for every skill, sliced per filter below
+        data, from_cache = skill_matrix.get_matrix_data()
 
         # Start with active users
         users_query = User.objects.filter(
-            is_active=True, groups__isnull=False,)
+            is_active=True, groups__isnull=False,).distinct()
 
         # Apply unit filter
         if unit_filter:
             users_query = users_query.filter(
                 unit_memberships__unit__slug=unit_filter,
                 unit_memberships__left_date__isnull=True
-            ).distinct()
+            )
 
         # Apply team filter
         if team_filter:
             users_query = users_query.filter(
                 teams__team__slug=team_filter,
                 teams__left_at__isnull=True
-            ).distinct()
+            )
 
         # Apply org role filter
         if role_filter:
             users_query = users_query.filter(
                 unit_memberships__roles__id=role_filter,
                 unit_memberships__left_date__isnull=True
-            ).distinct()
-
-        # Get users with their skills - optimize with select_related and only()
-        users = users_query.select_related().prefetch_related(
-            Prefetch(
-                'skills',
-                queryset=UserSkill.objects.select_related('skill', 'skill__category').only(
-                    'skill', 'rating', 'interested_in_improving_skill', 'user'
-                )
             )
-        ).get_default_order()
 
-        # Get all skills organized by category (with optional category filter)
-        categories_query = SkillCategory.objects.all()
-        if category_filter:
-            categories_query = categories_query.filter(slug=category_filter)
+        users = list(users_query.get_default_order())
 
-        categories = categories_query.prefetch_related(
-            Prefetch(
-                'skills',
-                queryset=Skill.objects.only('id', 'name', 'slug', 'description', 'category')
-            )
-        ).only('id', 'name', 'slug').order_by('name')
+        # Skills organized by category (with optional category filter)
+        categories = data['categories']
+        if category_filter:
+            categories = [c for c in categories if c.slug == category_filter]
+        skill_ids = [skill.id for category in categories for skill in category.skills.all()]
 
         # Build matrix data
-        matrix_data = []
-        for user in users:
-            user_skills = {us.skill.id: us for us in user.skills.all()}
-            user_row = {
-                'user': user,
-                'skills': {}
-            }
-
-            for category in categories:
-                for skill in category.skills.all():
-                    user_skill = user_skills.get(skill.id)
-                    user_row['skills'][skill.id] = {
-                        'skill': skill,
-                        'user_skill': user_skill,
-                        'rating': user_skill.rating if user_skill else UserSkillRatings.NO_EXPERIENCE,
-                        'interested': user_skill.interested_in_improving_skill if user_skill else False
-                    }
-
-            matrix_data.append(user_row)
+        matrix = data['matrix'].slice([user.pk for user in users], skill_ids)
+        matrix_data = [
+            {'user': user, 'skills': matrix.row_dict(user.pk)} for user in users
+        ]
 
         # Get filter options for the template
         from ..models import OrganisationalUnit, Team, OrganisationalUnitRole
 
-        # Prepare cacheable data
-        cacheable_data = {
+        context.update({
             'matrix_data': matrix_data,
-            'categories': list(categories),  # Convert to list for caching
+            'categories': categories,
             'rating_choices': UserSkillRatings.CHOICES,
-        }
-
-        # Cache the matrix data for 5 minutes
-        # cache.set(cache_key, cacheable_data, 300)
-
-        # Add non-cacheable data
-        context.update(cacheable_data)
+        })
 
         # Filter options (these change less frequently, cache separately)
-        filter_options_key = 'skill_matrix_filter_options'
-        # filter_options = cache.get(filter_options_key)
-        filter_options = None
+        filter_options = cache.get(skill_matrix.FILTER_OPTIONS_KEY)
 
         if filter_options is None:
             filter_options = {
@@ -261,7 +201,7 @@ class SkillMatrixView(PermissionRequiredMixin, ChaoticaBaseView, TemplateView):
                 'all_org_roles': list(OrganisationalUnitRole.objects.all().order_by('name').values('name', 'id')),
             }
             # Cache filter options for 30 minutes
-            # cache.set(filter_options_key, filter_options, 1800)
+            cache.set(skill_matrix.FILTER_OPTIONS_KEY, filter_options, 1800)
 
         context.update(filter_options)
 
@@ -270,7 +210,7 @@ class SkillMatrixView(PermissionRequiredMixin, ChaoticaBaseView, TemplateView):
         context['current_team'] = team_filter
         context['current_category'] = category_filter
         context['current_role'] = role_filter
-        context['from_cache'] = False
+        context['from_cache'] = from_cache
 
         return context
 
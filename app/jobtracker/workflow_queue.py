@@ -0,0 +1,190 @@
+"""Due-transition queue for the automatic workflow progression cron.
+
+``task_progress_workflows`` used to walk every SCHEDULED_CONFIRMED and
+READY_TO_BEGIN phase and every IN_PROGRESS job (with its phases) each minute to
+see whether anything could move on. Instead, each automatic transition is
+queued as a :class:`~jobtracker.models.DueTransition` row with the time it
+becomes due, and the cron only pops rows whose ``due_at`` has passed:
+
+* a SCHEDULED_CONFIRMED phase is due for pre-checks
+  :data:`PRE_CHECKS_LEAD_DAYS` days before it starts;
+* a READY_TO_BEGIN phase is due to start on its start date;
+* an IN_PROGRESS job is checked for completion when it starts or whenever one
+  of its phases changes status.
+
+Rows are kept current by the Phase/Job ``post_save`` handlers in
+:mod:`jobtracker.signals.workflow_queue`. Code that changes phase dates or
+statuses without ``save()`` (``QuerySet.update``/``bulk_update``) must call
+:func:`sync_phases` itself. ``manage.py rebuild_workflow_queue`` rebuilds the
+queue from scratch.
+"""
+import logging
+from datetime import datetime, timedelta
+
+from django.utils import timezone
+
+from .enums import JobStatuses, PhaseStatuses
+from .models import DueTransition, Job, Phase
+
+logger = logging.getLogger(__name__)
+
+# Pre-checks open once the phase is less than a week away
+PRE_CHECKS_LEAD_DAYS = 6
+# Retry delay after a transition raised
+RETRY_INTERVAL = timedelta(minutes=15)
+BATCH_SIZE = 500
+
+
+def _midnight(day):
+    return timezone.make_aware(datetime.combine(day, datetime.min.time()))
+
+
+def phase_due(status, start_date):
+    """``(transition, due_at)`` queued for a phase, or None."""
+    if not start_date:
+        return None
+    if status == PhaseStatuses.SCHEDULED_CONFIRMED:
+        return (
+            DueTransition.TO_PRE_CHECKS,
+            _midnight(start_date - timedelta(days=PRE_CHECKS_LEAD_DAYS)),
+        )
+    if status == PhaseStatuses.READY_TO_BEGIN:
+        return DueTransition.TO_IN_PROGRESS, _midnight(start_date)
+    return None
+
+
+def sync_phases(phases):
+    """Re-queue the automatic transitions of ``phases`` from their current state."""
+    phases = list(phases)
+    if not phases:
+        return
+    DueTransition.objects.filter(phase__in=phases).delete()
+    rows = []
+    for phase in phases:
+        due = phase_due(phase.status, phase.start_date)
+        if due:
+            rows.append(DueTransition(phase=phase, transition=due[0], due_at=due[1]))
+    DueTransition.objects.bulk_create(rows)
+
+
+def sync_phase(phase):
+    sync_phases([phase])
+
+
+def queue_job_check(job_id, when=None):
+    """Check ``job_id`` for completion at ``when`` (default: now)."""
+    DueTransition.objects.update_or_create(
+        job_id=job_id,
+        transition=DueTransition.TO_COMPLETE,
+        defaults={"due_at": when or timezone.now()},
+    )
+
+
+def sync_job(job):
+    if job.status == JobStatuses.IN_PROGRESS:
+        queue_job_check(job.pk)
+    else:
+        DueTransition.objects.filter(job=job).delete()
+
+
+def rebuild():
+    """Rebuild the whole queue from phase and job state.
+
+    Returns ``(phases, jobs)`` queued.
+    """
+    DueTransition.objects.all().delete()
+    phases = Phase.objects.filter(
+        status__in=[PhaseStatuses.SCHEDULED_CONFIRMED, PhaseStatuses.READY_TO_BEGIN]
+    )
+    for phase_batch in _batched(phases.iterator(chunk_size=BATCH_SIZE)):
+        sync_phases(phase_batch)
+    now = timezone.now()
+    jobs = DueTransition.objects.bulk_create(
+        [
+            DueTransition(job_id=pk, transition=DueTransition.TO_COMPLETE, due_at=now)
+            for pk in Job.objects.filter(status=JobStatuses.IN_PROGRESS).values_list(
+                "pk", flat=True
+            )
+        ],
+        batch_size=BATCH_SIZE,
+    )
+    return DueTransition.objects.filter(phase__isnull=False).count(), len(jobs)
+
+
+def _batched(iterable):
+    batch = []
+    for item in iterable:
+        batch.append(item)
+        if len(batch) >= BATCH_SIZE:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+
+def _job_can_complete(job):
+    statuses = [phase.status for phase in job.phases.all()]
+    return (
+        any(status >= PhaseStatuses.DELIVERED for status in statuses)
+        and all(
+            status >= PhaseStatuses.DELIVERED and status != PhaseStatuses.POSTPONED
+            for status in statuses
+        )
+    )
+
+
+def _apply(row):
+    """Attempt ``row``'s transition; True if it happened."""
+    if row.transition == DueTransition.TO_COMPLETE:
+        job = row.job
+        if _job_can_complete(job) and job.can_to_complete():
+            job.to_complete()
+            job.save()
+            return True
+        return False
+
+    phase = row.phase
+    if row.transition == DueTransition.TO_PRE_CHECKS:
+        if phase.can_to_pre_checks():
+            phase.to_pre_checks()
+            phase.save()
+            return True
+    elif row.transition == DueTransition.TO_IN_PROGRESS:
+        if phase.can_to_in_progress():
+            phase.to_in_progress()
+            phase.save()
+            return True
+    return False
+
+
+def process_due(now=None):
+    """Apply every transition due at ``now``.
+
+    Rows are consumed whether or not the transition applies: a phase or job
+    that changes state again is re-queued by its save. Rows whose transition
+    raises are retried after :data:`RETRY_INTERVAL`.
+
+    Returns ``{"examined", "transitioned", "failed"}`` counts.
+    """
+    now = now or timezone.now()
+    stats = {"examined": 0, "transitioned": 0, "failed": 0}
+    due = list(
+        DueTransition.objects.filter(due_at__lte=now)
+        .select_related("phase", "phase__job", "job")
+        .prefetch_related("job__phases")
+        .order_by("due_at")[:BATCH_SIZE]
+    )
+    for row in due:
+        stats["examined"] += 1
+        try:
+            transitioned = _apply(row)
+        except Exception:
+            logger.exception("Workflow transition %s failed", row)
+            stats["failed"] += 1
+            DueTransition.objects.filter(pk=row.pk).update(due_at=now + RETRY_INTERVAL)
+            continue
+        if transitioned:
+            stats["transitioned"] += 1
+        # The transition's own save may already have re-queued this target
+        DueTransition.objects.filter(pk=row.pk, due_at__lte=now).delete()
+    return stats
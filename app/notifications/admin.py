@@ -7,8 +7,10 @@ from django.shortcuts import get_object_or_404
 
 from .models import (
     Notification,
+    NotificationFanout,
     NotificationSubscription,
     NotificationCategory,
+    RuleApplication,
     SubscriptionRule,
     GlobalRoleCriteria,
     OrgUnitRoleCriteria,
@@ -193,6 +195,24 @@ class NotificationAdmin(admin.ModelAdmin):
                 failed += 1
         self.message_user(request, f"{sent} email(s) sent, {failed} failed.")
 
+@admin.register(NotificationFanout)
+class NotificationFanoutAdmin(admin.ModelAdmin):
+    list_display = [
+        "title", "notification_type", "entity_type", "entity_id",
+        "attempts", "failed_at", "created_at",
+    ]
+    list_filter = ["notification_type"]
+    search_fields = ["title", "message"]
+    readonly_fields = ["attempts", "retry_at", "failed_at", "error_message"]
+
+
+@admin.register(RuleApplication)
+class RuleApplicationAdmin(admin.ModelAdmin):
+    list_display = ["rule", "status", "processed", "added", "removed", "created_at", "completed_at"]
+    list_filter = ["status"]
+    readonly_fields = ["processed", "added", "removed", "error_message", "completed_at"]
+
+
 @admin.register(NotificationCategory)
 class NotificationCategoryAdmin(admin.ModelAdmin):
     list_display = ['name', 'description']
@@ -1,6 +1,7 @@
 from chaotica_utils.models import User
 
 _CRITERIA_REGISTRY = {}
+_BATCH_CRITERIA_REGISTRY = {}
 
 
 def register_criteria(name):
@@ -13,11 +14,68 @@ def register_criteria(name):
     return decorator
 
 
+def register_batch_criteria(name):
+    """Decorator to register the batch form of a criteria function.
+
+    A batch form takes ``(entities, params)`` for entities of one type and
+    returns ``{entity.pk: set of user ids}``, answering for the whole batch in a
+    few queries.
+    """
+
+    def decorator(func):
+        _BATCH_CRITERIA_REGISTRY[name] = func
+        return func
+
+    return decorator
+
+
 def get_criteria_function(name):
     """Get a registered criteria function"""
     return _CRITERIA_REGISTRY.get(name)
 
 
+def get_batch_criteria_function(name):
+    """Get the batch form of a criteria function, falling back to calling the
+    single-entity function once per entity"""
+    batch_func = _BATCH_CRITERIA_REGISTRY.get(name)
+    if batch_func:
+        return batch_func
+    func = _CRITERIA_REGISTRY.get(name)
+    if not func:
+        return None
+
+    def fallback(entities, params=None):
+        return {
+            entity.pk: set(func(entity, params).values_list("pk", flat=True))
+            for entity in entities
+        }
+
+    return fallback
+
+
+def _active_user_ids(user_ids):
+    return set(
+        User.objects.filter(pk__in=user_ids, is_active=True).values_list("pk", flat=True)
+    )
+
+
+def _job_attr_id(entity, attr):
+    """``<attr>_id`` of the entity, or of its job (as the single forms resolve
+    ``entity.unit`` / ``entity.job.unit``)."""
+    if hasattr(entity, attr):
+        return getattr(entity, f"{attr}_id", None)
+    if hasattr(entity, "job") and hasattr(entity.job, attr):
+        return getattr(entity.job, f"{attr}_id", None)
+    return None
+
+
+def _group_ids(rows):
+    grouped = {}
+    for key, user_id in rows:
+        grouped.setdefault(key, set()).add(user_id)
+    return grouped
+
+
 @register_criteria("unit_members")
 def unit_members(entity, params=None):
     """Return all members of the organizational unit"""
@@ -33,6 +91,20 @@ def unit_members(entity, params=None):
     return User.objects.none()
 
 
+@register_batch_criteria("unit_members")
+def unit_members_batch(entities, params=None):
+    from jobtracker.models import OrganisationalUnitMember
+
+    unit_by_entity = {entity.pk: _job_attr_id(entity, "unit") for entity in entities}
+    members = _group_ids(
+        OrganisationalUnitMember.objects.filter(
+            unit_id__in={u for u in unit_by_entity.values() if u},
+            member__is_active=True,
+        ).values_list("unit_id", "member_id")
+    )
+    return {pk: members.get(unit_id, set()) for pk, unit_id in unit_by_entity.items()}
+
+
 @register_criteria("timeslot_assignees")
 def timeslot_assignees(entity, params=None):
     """Return all users scheduled on the job or phase"""
@@ -101,6 +173,27 @@ def user(entity, params=None):
     return User.objects.none()
 
 
+@register_batch_criteria("user")
+def user_batch(entities, params=None):
+    user_field = "user"
+    if params and "user_field" in params:
+        user_field = params["user_field"]
+
+    user_by_entity = {}
+    for entity in entities:
+        if hasattr(entity, f"{user_field}_id"):
+            user_by_entity[entity.pk] = getattr(entity, f"{user_field}_id")
+        elif hasattr(entity, user_field):
+            user_by_entity[entity.pk] = getattr(entity, user_field).pk
+    active = _active_user_ids({u for u in user_by_entity.values() if u})
+    return {
+        entity.pk: {user_by_entity[entity.pk]} & active
+        if entity.pk in user_by_entity
+        else set()
+        for entity in entities
+    }
+
+
 @register_criteria("job_support_team")
 def job_support_team(entity, params=None):
     """Return all members of a job's support team"""
@@ -112,17 +205,33 @@ def job_support_team(entity, params=None):
     elif hasattr(entity, "job"):
         job = entity.job
 
-    if job and hasattr(job, "job_support_roles"):
-        support_team_users = [
-            role.user for role in job.job_support_roles.all() if role.user
-        ]
+    if job and hasattr(job, "supporting_team"):
         return User.objects.filter(
-            id__in=[user.id for user in support_team_users], is_active=True
-        )
+            job_support_roles__job=job, is_active=True
+        ).distinct()
 
     return User.objects.none()
 
 
+@register_batch_criteria("job_support_team")
+def job_support_team_batch(entities, params=None):
+    from jobtracker.models import Job, JobSupportTeamRole
+
+    job_by_entity = {}
+    for entity in entities:
+        if isinstance(entity, Job):
+            job_by_entity[entity.pk] = entity.pk
+        elif hasattr(entity, "job"):
+            job_by_entity[entity.pk] = entity.job_id
+    team = _group_ids(
+        JobSupportTeamRole.objects.filter(
+            job_id__in={j for j in job_by_entity.values() if j},
+            user__is_active=True,
+        ).values_list("job_id", "user_id")
+    )
+    return {entity.pk: team.get(job_by_entity.get(entity.pk), set()) for entity in entities}
+
+
 @register_criteria("team_members")
 def team_members(entity, params=None):
     """Return all members of a team"""
@@ -171,6 +280,22 @@ def same_client_job_leads(entity, params=None):
     return User.objects.filter(id__in=project_leads, is_active=True).distinct()
 
 
+@register_batch_criteria("same_client_job_leads")
+def same_client_job_leads_batch(entities, params=None):
+    from jobtracker.models import Phase
+
+    client_by_entity = {entity.pk: _job_attr_id(entity, "client") for entity in entities}
+    leads = _group_ids(
+        Phase.objects.filter(
+            job__client_id__in={c for c in client_by_entity.values() if c},
+            project_lead__is_active=True,
+        )
+        .exclude(job__status__in=[4, 5])  # Exclude deleted/archived
+        .values_list("job__client_id", "project_lead_id")
+    )
+    return {pk: leads.get(client_id, set()) for pk, client_id in client_by_entity.items()}
+
+
 @register_criteria("client_tech_account_managers")
 def client_tech_account_managers(entity, params=None):
     """Return client technical account managers"""
@@ -0,0 +1,165 @@
+"""Batch delivery of pending notification emails.
+
+``Notification.send_email`` resolves the entity, looks up and compiles the
+template, opens an SMTP connection and saves the row, once per notification.
+That falls behind when a burst of notifications lands at once, so
+``task_send_email_notifications`` uses :func:`deliver_pending` instead:
+
+* each ``(email template, entity)`` pair is resolved once per batch - the
+  template is looked up and compiled once per slug, and the entity fetched once
+  per ``(entity_type, entity_id)`` - leaving only the per-recipient render;
+* messages go out over a few reused SMTP connections, one message at a time
+  so a failure only holds back that message, on a bounded pool of
+  :data:`MAX_WORKERS` threads;
+* delivered rows are marked emailed with one UPDATE per batch.
+
+As with ``send_email``, a notification nobody can be emailed about (inactive
+user, no valid address, email disabled) is marked emailed without sending, and
+one whose render or send fails stays pending for the next run.
+"""
+import logging
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from django.core.mail import get_connection
+
+from .email import build_email_message, get_email_renderer, valid_recipients
+from .models import Notification
+from .utils import get_entity_object
+
+logger = logging.getLogger(__name__)
+
+# Notifications read, rendered and marked per batch
+BATCH_SIZE = 200
+# Messages sent over one SMTP connection
+MESSAGES_PER_CONNECTION = 50
+# Concurrent SMTP connections
+MAX_WORKERS = 4
+
+
+class DeliveryStats:
+    """Counts for a :func:`deliver_pending` run."""
+
+    def __init__(self):
+        self.sent = 0
+        self.skipped = 0
+        self.failed = 0
+        self.seconds = 0.0
+
+    @property
+    def per_second(self):
+        return self.sent / self.seconds if self.seconds else 0.0
+
+    def __str__(self):
+        return (
+            f"Sent {self.sent} notification email(s), skipped {self.skipped}, "
+            f"failed {self.failed} in {self.seconds:.1f}s "
+            f"({self.per_second:.1f}/s)"
+        )
+
+
+def pending_notifications():
+    return (
+        Notification.objects.filter(is_emailed=False, should_email=True)
+        .select_related("user")
+        .order_by("pk")
+    )
+
+
+def _send_chunk(messages):
+    """Send ``(pk, message)`` pairs over one SMTP connection, one message at a
+    time so a bad message only fails itself. Returns ``(sent_pks, failed)``."""
+    sent = []
+    failed = 0
+    connection = get_connection()
+    connection.open()
+    try:
+        for pk, message in messages:
+            try:
+                connection.send_messages([message])
+            except Exception as e:
+                # Left pending; the next run retries just this one.
+                failed += 1
+                logger.error(f"Failed to send notification email {pk}: {e}")
+                continue
+            sent.append(pk)
+    finally:
+        try:
+            connection.close()
+        except Exception as e:
+            # Everything above has already been handed over
+            logger.warning(f"Failed to close SMTP connection: {e}")
+    return sent, failed
+
+
+def _build_messages(notifications, stats):
+    """``(messages, done_pks)`` for a batch: a message per sendable
+    notification and the pks of those to mark emailed without sending."""
+    renderers = {}
+    entities = {}
+    messages = []
+    done = []
+    for notification in notifications:
+        recipients = valid_recipients([notification.user.email_address()])
+        if not (notification.can_email() and recipients):
+            stats.skipped += 1
+            done.append(notification.pk)
+            continue
+        try:
+            slug = notification.email_template
+            if slug not in renderers:
+                renderers[slug] = get_email_renderer(slug)
+            entity_key = (notification.entity_type, notification.entity_id)
+            if entity_key not in entities:
+                entities[entity_key] = get_entity_object(*entity_key)
+            subject, html, text = renderers[slug](
+                notification.email_context(entities[entity_key])
+            )
+        except Exception as e:
+            stats.failed += 1
+            logger.error(f"Failed to render email for {notification}: {e}")
+            continue
+        message = build_email_message(subject, html, text, recipients)
+        messages.append((notification.pk, message))
+    return messages, done
+
+
+def deliver_pending(batch_size=BATCH_SIZE, max_workers=MAX_WORKERS, max_seconds=None):
+    """Send every pending notification email; returns a :class:`DeliveryStats`.
+
+    Stops starting new batches after ``max_seconds`` (if given).
+    """
+    stats = DeliveryStats()
+    started = time.monotonic()
+    last_pk = 0
+    with ThreadPoolExecutor(max_workers=max_workers) as pool:
+        while max_seconds is None or time.monotonic() - started < max_seconds:
+            batch = list(pending_notifications().filter(pk__gt=last_pk)[:batch_size])
+            if not batch:
+                break
+            last_pk = batch[-1].pk
+
+            messages, done = _build_messages(batch, stats)
+            chunks = [
+                messages[i:i + MESSAGES_PER_CONNECTION]
+                for i in range(0, len(messages), MESSAGES_PER_CONNECTION)
+            ]
+            futures = [
+                (chunk, pool.submit(_send_chunk, chunk)) for chunk in chunks
+            ]
+            for chunk, future in futures:
+                try:
+                    sent, failed = future.result()
+                except Exception as e:
+                    # Couldn't connect: the whole chunk stays pending.
+                    stats.failed += len(chunk)
+                    logger.error(f"Failed to send {len(chunk)} notification email(s): {e}")
+                    continue
+                stats.sent += len(sent)
+                stats.failed += failed
+                done.extend(sent)
+
+            if done:
+                Notification.objects.filter(pk__in=done).update(is_emailed=True)
+    stats.seconds = time.monotonic() - started
+    return stats
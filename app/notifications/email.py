@@ -10,29 +10,64 @@ without an @" guard).
 import logging
 
 import django.core.mail
-from django.template.loader import render_to_string
+from django.core.mail import EmailMultiAlternatives
+from django.template.loader import get_template
 from constance import config
 
 logger = logging.getLogger(__name__)
 
 
-def render_email(slug, context):
-    """Render an email by slug. Returns ``(subject, html, text)``.
+def get_email_renderer(slug):
+    """Resolve and compile the email for ``slug`` once.
 
-    Uses the active DB template if present, else the filesystem template at
-    ``slug`` (identical to the historical behaviour).
+    Returns a ``render(context)`` callable giving ``(subject, html, text)``, so
+    a batch sending the same email to many recipients looks the template up and
+    compiles it only once.
     """
     from .models import EmailTemplate
 
     template = EmailTemplate.objects.filter(slug=slug, is_active=True).first()
     if template is not None:
-        return template.render(context)
+        return template.compile()
 
     # Filesystem fallback - unchanged legacy behaviour.
-    html = render_to_string(slug, context)
-    subject = str(context.get('title', ''))
-    text = str(context.get('message', ''))
-    return subject, html, text
+    compiled = get_template(slug)
+
+    def render(context):
+        html = compiled.render(context)
+        subject = str(context.get('title', ''))
+        text = str(context.get('message', ''))
+        return subject, html, text
+
+    return render
+
+
+def render_email(slug, context):
+    """Render an email by slug. Returns ``(subject, html, text)``.
+
+    Uses the active DB template if present, else the filesystem template at
+    ``slug`` (identical to the historical behaviour).
+    """
+    return get_email_renderer(slug)(context)
+
+
+def valid_recipients(recipients):
+    """The recipients worth sending to (skips blanks and addresses without an @)."""
+    return [r for r in recipients if r and '@' in r]
+
+
+def build_email_message(subject, html, text, recipients, connection=None):
+    """The message ``send_templated_email`` sends, for sending in bulk with
+    ``connection.send_messages``."""
+    message = EmailMultiAlternatives(
+        subject=subject,
+        body=text,
+        from_email=None,  # falls back to DEFAULT_FROM_EMAIL
+        to=recipients,
+        connection=connection,
+    )
+    message.attach_alternative(html, 'text/html')
+    return message
 
 
 def send_templated_email(slug, context, recipients, fail_silently=False):
@@ -45,7 +80,7 @@ def send_templated_email(slug, context, recipients, fail_silently=False):
     if not config.EMAIL_ENABLED:
         return False
 
-    valid = [r for r in recipients if r and '@' in r]
+    valid = valid_recipients(recipients)
     if not valid:
         return False
 
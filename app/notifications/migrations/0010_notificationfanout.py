@@ -0,0 +1,32 @@
+# Generated by Django 5.2.12 on 2026-10-18 11:40
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('notifications', '0009_seed_email_templates'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='NotificationFanout',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('notification_type', models.IntegerField()),
+                ('title', models.CharField(max_length=255)),
+                ('message', models.TextField(blank=True)),
+                ('link', models.URLField(blank=True, max_length=255, null=True)),
+                ('email_template', models.CharField(blank=True, default='', max_length=255)),
+                ('entity_id', models.IntegerField(blank=True, null=True)),
+                ('entity_type', models.CharField(blank=True, max_length=100, null=True)),
+                ('metadata', models.JSONField(blank=True, default=dict)),
+                ('user_ids', models.JSONField(blank=True, help_text='Explicit recipients. If empty, the subscribers at send time.', null=True)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+            ],
+            options={
+                'ordering': ['created_at'],
+            },
+        ),
+    ]
@@ -0,0 +1,33 @@
+# Generated by Django 5.2.12 on 2026-10-18 21:05
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('notifications', '0011_ruleapplication'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='notificationfanout',
+            name='attempts',
+            field=models.PositiveSmallIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='notificationfanout',
+            name='retry_at',
+            field=models.DateTimeField(blank=True, help_text='Not retried before this time.', null=True),
+        ),
+        migrations.AddField(
+            model_name='notificationfanout',
+            name='failed_at',
+            field=models.DateTimeField(blank=True, help_text='Set once the last attempt has failed.', null=True),
+        ),
+        migrations.AddField(
+            model_name='notificationfanout',
+            name='error_message',
+            field=models.TextField(blank=True, default=''),
+        ),
+    ]
@@ -119,18 +119,34 @@ class EmailTemplate(models.Model):
 
         Returns a ``(subject, html, text)`` tuple.
         """
-        render_ctx = dict(context)
-        render_ctx.setdefault('action_label', self.action_label)
+        return self.compile()(context)
 
-        subject = Template(self.subject or '{{ title }}').render(Context(render_ctx)).strip()
-        if not subject:
-            subject = str(render_ctx.get('title', ''))
+    def compile(self):
+        """Compile the subject, body and text once.
 
-        html = Template(self.build_source()).render(Context(render_ctx))
+        Returns a ``render(context)`` callable giving ``(subject, html, text)``,
+        for rendering the same template for many recipients.
+        """
+        subject_tpl = Template(self.subject or '{{ title }}')
+        html_tpl = Template(self.build_source())
+        text_tpl = Template(self.body_text) if self.body_text else None
+        action_label = self.action_label
+
+        def render(context):
+            render_ctx = dict(context)
+            render_ctx.setdefault('action_label', action_label)
+
+            subject = subject_tpl.render(Context(render_ctx)).strip()
+            if not subject:
+                subject = str(render_ctx.get('title', ''))
+
+            html = html_tpl.render(Context(render_ctx))
+
+            if text_tpl is not None:
+                text = text_tpl.render(Context(render_ctx))
+            else:
+                text = str(render_ctx.get('message', ''))
 
-        if self.body_text:
-            text = Template(self.body_text).render(Context(render_ctx))
-        else:
-            text = str(render_ctx.get('message', ''))
+            return subject, html, text
 
-        return subject, html, text
+        return render
@@ -117,33 +117,43 @@ class Notification(models.Model):
         return '%(time)s ago' % {'time': timesince(self.timestamp).split(', ')[0]}
 
 
+    def can_email(self):
+        """Whether this notification's user should be emailed at all."""
+        return (
+            not isinstance(self.user, AnonymousUser) # Don't do the anon user!
+            and self.user.is_active  # User must be active
+            and config.EMAIL_ENABLED  # Emails must be enabled
+        )
+
+    def email_context(self, obj):
+        """Template context for this notification's email; ``obj`` is the
+        resolved entity (see ``notifications.utils.get_entity_object``)."""
+        return {
+            'user': self.user,
+            'notification': self,
+            'title': self.title,
+            'message': self.message,
+            'link': self.link,
+            'metadata': self.metadata,
+            'obj': obj,
+            'SITE_DOMAIN': settings.SITE_DOMAIN,
+            'SITE_PROTO': settings.SITE_PROTO,
+            'icon': self.icon,
+            'action_link': self.link,
+        }
+
     def send_email(self, resend=False):
         from ..utils import get_entity_object
         try:
             if (
-                not isinstance(self.user, AnonymousUser) # Don't do the anon user!
-                and self.user.is_active  # User must be active
-                and config.EMAIL_ENABLED  # Emails must be enabled
+                self.can_email()
                 and (
                     self.is_emailed == False or resend == True
                 )  # Either we've not already sent it or we're resending it
             ):
-                context = {
-                    'user': self.user,
-                    'notification': self,
-                    'title': self.title,
-                    'message': self.message,
-                    'link': self.link,
-                    'metadata': self.metadata,
-                    'obj': get_entity_object(self.entity_type, self.entity_id),
-                }
-                context["SITE_DOMAIN"] = settings.SITE_DOMAIN
-                context["SITE_PROTO"] = settings.SITE_PROTO
-                context["title"] = self.title
-                context["message"] = self.message
-                context["icon"] = self.icon
-                context["action_link"] = self.link
-                context["user"] = self.user
+                context = self.email_context(
+                    get_entity_object(self.entity_type, self.entity_id)
+                )
 
                 # Render (DB template if present, else the filesystem template)
                 # and send. If they have no valid email, this is a no-op and we
@@ -156,4 +166,37 @@ class Notification(models.Model):
             self.is_emailed = True
             self.save()
         except Exception as e:
-            logger.error(f"Failed to send email to {self.user.email_address()} - {self}: {str(e)}")
\ No newline at end of file
+            logger.error(f"Failed to send email to {self.user.email_address()} - {self}: {str(e)}")
+
+class NotificationFanout(models.Model):
+    """A ``send_notifications`` call queued for the background task, so the
+    request that triggered it doesn't create every recipient's notification
+    (see ``notifications.utils.process_deferred_fanouts``)."""
+    notification_type = models.IntegerField()
+    title = models.CharField(max_length=255)
+    message = models.TextField(blank=True)
+    link = models.URLField(max_length=255, blank=True, null=True)
+    email_template = models.CharField(max_length=255, blank=True, default="")
+    entity_id = models.IntegerField(null=True, blank=True)
+    entity_type = models.CharField(max_length=100, null=True, blank=True)
+    metadata = models.JSONField(default=dict, blank=True)
+    user_ids = models.JSONField(
+        null=True,
+        blank=True,
+        help_text="Explicit recipients. If empty, the subscribers at send time.",
+    )
+    attempts = models.PositiveSmallIntegerField(default=0)
+    retry_at = models.DateTimeField(
+        null=True, blank=True, help_text="Not retried before this time."
+    )
+    failed_at = models.DateTimeField(
+        null=True, blank=True, help_text="Set once the last attempt has failed."
+    )
+    error_message = models.TextField(blank=True, default="")
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        ordering = ['created_at']
+
+    def __str__(self):
+        return f"{self.title} ({self.created_at})"
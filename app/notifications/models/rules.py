@@ -20,6 +20,11 @@ class GlobalRoleCriteria(BaseRuleCriteria):
         role_name = settings.GLOBAL_GROUP_PREFIX + self.get_role_display()
         return User.objects.filter(groups__name=role_name, is_active=True)
 
+    def get_matching_user_ids(self, entities):
+        # Not entity specific: one query for the whole batch
+        user_ids = set(self.get_matching_users(None).values_list("pk", flat=True))
+        return {entity.pk: user_ids for entity in entities}
+
     def __str__(self):
         return f"Global Role: {self.get_role_display()}"
 
@@ -69,6 +74,47 @@ class OrgUnitRoleCriteria(BaseRuleCriteria):
 
         return users
 
+    def get_matching_user_ids(self, entities):
+        from chaotica_utils.models import User, LeaveRequest
+        from jobtracker.models import OrganisationalUnitMember
+
+        # Units per entity, resolved as get_matching_users does
+        units = {}
+        members = {}
+        for entity in entities:
+            if isinstance(entity, User):
+                members[entity.pk] = entity.pk
+            elif isinstance(entity, LeaveRequest):
+                members[entity.pk] = entity.user_id
+            elif hasattr(entity, "unit"):
+                units[entity.pk] = {entity.unit_id} if entity.unit_id else set()
+            elif hasattr(entity, "job") and hasattr(entity.job, "unit"):
+                units[entity.pk] = {entity.job.unit_id} if entity.job.unit_id else set()
+        if members:
+            member_units = {}
+            for member_id, unit_id in OrganisationalUnitMember.objects.filter(
+                member_id__in=set(members.values())
+            ).values_list("member_id", "unit_id"):
+                member_units.setdefault(member_id, set()).add(unit_id)
+            for pk, member_id in members.items():
+                units[pk] = member_units.get(member_id, set())
+
+        # Users with the role in each unit
+        role_holders = {}
+        for unit_id, member_id in OrganisationalUnitMember.objects.filter(
+            unit_id__in=set().union(*units.values()),
+            roles=self.unit_role,
+            member__is_active=True,
+        ).values_list("unit_id", "member_id"):
+            role_holders.setdefault(unit_id, set()).add(member_id)
+
+        return {
+            entity.pk: set().union(
+                *(role_holders.get(u, set()) for u in units.get(entity.pk, ()))
+            )
+            for entity in entities
+        }
+
     def __str__(self):
         return f"Org Unit Role: {self.unit_role.name}"
 
@@ -141,6 +187,55 @@ class JobRoleCriteria(BaseRuleCriteria):
 
         return User.objects.none()
 
+    # role_id -> Job user field (Scoped By is the scoped_by M2M)
+    ROLE_FIELDS = {
+        0: "account_manager",
+        1: "dep_account_manager",
+        2: "created_by",
+        3: "primary_poc",
+        5: "scoped_signed_off_by",
+    }
+
+    def get_matching_user_ids(self, entities):
+        from chaotica_utils.models import User
+        from jobtracker.models import Job
+
+        job_by_entity = {}
+        for entity in entities:
+            job = (
+                entity
+                if hasattr(entity, "account_manager")
+                else getattr(entity, "job", None)
+            )
+            if job:
+                job_by_entity[entity.pk] = job
+
+        candidates = {}
+        if self.role_id == 4:  # Scoped by
+            for job_id, user_id in Job.objects.filter(
+                pk__in={job.pk for job in job_by_entity.values()},
+                scoped_by__isnull=False,
+            ).values_list("pk", "scoped_by"):
+                candidates.setdefault(job_id, set()).add(user_id)
+        elif self.role_id in self.ROLE_FIELDS:
+            field = self.ROLE_FIELDS[self.role_id]
+            for job in job_by_entity.values():
+                user_id = getattr(job, f"{field}_id", None)
+                if user_id:
+                    candidates[job.pk] = {user_id}
+
+        active = set(
+            User.objects.filter(
+                pk__in=set().union(*candidates.values()), is_active=True
+            ).values_list("pk", flat=True)
+        )
+        return {
+            entity.pk: candidates.get(job_by_entity[entity.pk].pk, set()) & active
+            if entity.pk in job_by_entity
+            else set()
+            for entity in entities
+        }
+
     def __str__(self):
         return f"Job Role: {self.role_display}"
 
@@ -194,5 +289,37 @@ class PhaseRoleCriteria(BaseRuleCriteria):
 
         return User.objects.none()
 
+    # role_id -> Phase user field
+    ROLE_FIELDS = {
+        0: "project_lead",
+        1: "report_author",
+        2: "techqa_by",
+        3: "presqa_by",
+    }
+
+    def get_matching_user_ids(self, entities):
+        from chaotica_utils.models import User
+
+        field = self.ROLE_FIELDS.get(self.role_id)
+        candidates = {}
+        for entity in entities:
+            # Only phases have a project lead
+            if field and hasattr(entity, "project_lead"):
+                user_id = getattr(entity, f"{field}_id", None)
+                if user_id:
+                    candidates[entity.pk] = user_id
+
+        active = set(
+            User.objects.filter(
+                pk__in=set(candidates.values()), is_active=True
+            ).values_list("pk", flat=True)
+        )
+        return {
+            entity.pk: {candidates[entity.pk]} & active
+            if entity.pk in candidates
+            else set()
+            for entity in entities
+        }
+
     def __str__(self):
         return f"Phase Role: {self.role_display}"
@@ -1,7 +1,6 @@
 from django.db import models
 from notifications.enums import NotificationTypes
 from itertools import chain
-from .main import NotificationSubscription
 
 
 class SubscriptionRule(models.Model):
@@ -43,33 +42,13 @@ class SubscriptionRule(models.Model):
     def update_existing_subscriptions(self):
         """
         Update all existing subscriptions that were created by this rule.
-        This is called when a rule is modified.
+        This is called when a rule is modified; the work is queued for
+        ``task_apply_subscription_rules`` rather than done in the request.
         """
-        from notifications.utils import apply_rule_to_all_entities, get_entities_by_type_and_ids
-        
-        # Get all subscriptions created by this rule
-        existing_subscriptions = NotificationSubscription.objects.filter(
-            created_by_rule=True,
-            rule_id=self.id
-        )
-        
-        # Get unique entity identifiers
-        entity_types = existing_subscriptions.values_list('entity_type', flat=True).distinct()
-        
-        # For each entity type, get all IDs and reapply the rule
-        for entity_type in entity_types:
-            entity_ids = existing_subscriptions.filter(entity_type=entity_type).values_list('entity_id', flat=True).distinct()
-            
-            # Get the actual entities
-            entities = get_entities_by_type_and_ids(entity_type, entity_ids)
-            
-            # Delete existing subscriptions created by this rule
-            existing_subscriptions.filter(entity_type=entity_type).delete()
-            
-            # Reapply the rule to each entity
-            for entity in entities:
-                apply_rule_to_all_entities(self, entity)
-    
+        from notifications.rule_application import enqueue
+
+        return enqueue(self)
+
     def get_all_criteria(self):
         """Get all criteria from all related sets"""
         # Combine all criteria types into a single list
@@ -82,6 +61,52 @@ class SubscriptionRule(models.Model):
         ))
 
 
+class RuleApplication(models.Model):
+    """A queued (re)application of a SubscriptionRule to every entity it covers.
+
+    Processed a chunk at a time by ``task_apply_subscription_rules`` (see
+    ``notifications.rule_application``); ``entity_type_index`` and
+    ``last_entity_id`` record how far it has got, so it resumes where it left
+    off.
+    """
+    STATUS_QUEUED = 'queued'
+    STATUS_COMPLETE = 'complete'
+    STATUS_FAILED = 'failed'
+    STATUS_CHOICES = (
+        (STATUS_QUEUED, 'Queued'),
+        (STATUS_COMPLETE, 'Complete'),
+        (STATUS_FAILED, 'Failed'),
+    )
+
+    rule = models.ForeignKey(
+        SubscriptionRule, on_delete=models.CASCADE, related_name="applications"
+    )
+    entity_types = models.JSONField(default=list)
+    entity_type_index = models.PositiveSmallIntegerField(default=0)
+    last_entity_id = models.BigIntegerField(default=0)
+    status = models.CharField(max_length=10, choices=STATUS_CHOICES, default=STATUS_QUEUED)
+    processed = models.PositiveIntegerField(default=0)
+    added = models.PositiveIntegerField(default=0)
+    removed = models.PositiveIntegerField(default=0)
+    error_message = models.TextField(blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+    completed_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        ordering = ['created_at']
+
+    def __str__(self):
+        return f"{self.rule} ({self.get_status_display()})"
+
+    @property
+    def entity_type(self):
+        """The entity type being worked through, or None once all are done."""
+        if self.entity_type_index < len(self.entity_types):
+            return self.entity_types[self.entity_type_index]
+        return None
+
+
 class BaseRuleCriteria(models.Model):
     """Abstract base class for subscription rule criteria"""
     rule = models.ForeignKey(
@@ -119,6 +144,16 @@ class BaseRuleCriteria(models.Model):
         """Return QuerySet of users matching this criteria for the given entity"""
         raise NotImplementedError("Subclasses must implement this method")
 
+    def get_matching_user_ids(self, entities):
+        """Return ``{entity.pk: set of user ids}`` for entities of one type.
+
+        Subclasses override this to answer for the whole batch in a few queries.
+        """
+        return {
+            entity.pk: set(self.get_matching_users(entity).values_list("pk", flat=True))
+            for entity in entities
+        }
+
 
 
 class DynamicRuleCriteria(BaseRuleCriteria):
@@ -135,6 +170,14 @@ class DynamicRuleCriteria(BaseRuleCriteria):
         if criteria_func:
             return criteria_func(entity, self.parameters)
         return User.objects.none()
+
+    def get_matching_user_ids(self, entities):
+        from ..criteria_registry import get_batch_criteria_function
+
+        batch_func = get_batch_criteria_function(self.criteria_name)
+        if batch_func:
+            return batch_func(entities, self.parameters)
+        return {entity.pk: set() for entity in entities}
     
     def __str__(self):
         return f"Dynamic Criteria: {self.criteria_name}"
\ No newline at end of file
@@ -0,0 +1,244 @@
+"""Chunked, resumable application of subscription rules.
+
+Re-applying a rule used to walk every entity it covers in the request that
+edited it, evaluating each criterion once per entity. Instead :func:`enqueue`
+records a :class:`~notifications.models.RuleApplication` and
+``task_apply_subscription_rules`` works through it :data:`CHUNK_SIZE` entities
+at a time:
+
+* criteria answer for a whole chunk at once (``get_matching_user_ids`` and the
+  batch forms in ``notifications.criteria_registry``);
+* only the difference is written - missing subscriptions are bulk created and
+  the rule's subscriptions that no longer match are deleted, so unchanged ones
+  (and the user's email/in-app settings on them) are left alone;
+* each chunk commits together with the cursor, so an interrupted run resumes
+  from the last committed chunk.
+"""
+import logging
+import time
+
+from django.db import transaction
+from django.db.models import Q, QuerySet
+from django.utils import timezone
+
+from .enums import NotificationTypes
+from .models import (
+    NotificationOptOut,
+    NotificationSubscription,
+    RuleApplication,
+)
+from .utils import get_all_entities_by_type
+
+logger = logging.getLogger(__name__)
+
+# Entities evaluated and written per chunk
+CHUNK_SIZE = 200
+
+# Relations the criteria read for each entity type
+ENTITY_SELECT_RELATED = {
+    "Phase": ["job"],
+}
+
+
+def rule_entity_types(rule):
+    """The entity types ``rule``'s notification type is raised for."""
+    entity_types = []
+    if rule.notification_type in NotificationTypes.LEAVE_EVENTS:
+        entity_types.append("LeaveRequest")
+    if rule.notification_type in NotificationTypes.JOB_EVENTS:
+        entity_types.append("Job")
+    if rule.notification_type in NotificationTypes.PHASE_EVENTS:
+        entity_types.append("Phase")
+    return entity_types
+
+
+def rule_criteria(rule):
+    return [
+        *rule.globalrolecriteria_criteria.all(),
+        *rule.orgunitrolecriteria_criteria.all(),
+        *rule.jobrolecriteria_criteria.all(),
+        *rule.phaserolecriteria_criteria.all(),
+        *rule.dynamicrulecriteria_criteria.all(),
+    ]
+
+
+def matching_user_ids(rule, entities, criteria=None):
+    """``{entity.pk: set of user ids}`` matching any of ``rule``'s criteria."""
+    if criteria is None:
+        criteria = rule_criteria(rule)
+    matches = {entity.pk: set() for entity in entities}
+    for criterion in criteria:
+        for pk, user_ids in criterion.get_matching_user_ids(entities).items():
+            matches[pk] |= user_ids
+    return matches
+
+
+def apply_to_entities(rule, entity_type, entities, criteria=None):
+    """Bring ``rule``'s subscriptions on ``entities`` (all of ``entity_type``)
+    in line with its criteria, respecting opt-outs. Returns ``(added, removed)``.
+    """
+    if not entities:
+        return 0, 0
+    wanted = matching_user_ids(rule, entities, criteria)
+    entity_ids = list(wanted)
+
+    opted_out = set(
+        NotificationOptOut.objects.filter(
+            notification_type=rule.notification_type,
+            entity_type=entity_type,
+            entity_id__in=entity_ids,
+        ).values_list("entity_id", "user_id")
+    )
+    want = {
+        (entity_id, user_id)
+        for entity_id, user_ids in wanted.items()
+        for user_id in user_ids
+    } - opted_out
+
+    existing = NotificationSubscription.objects.filter(
+        notification_type=rule.notification_type,
+        entity_type=entity_type,
+        entity_id__in=entity_ids,
+    )
+    # Any subscription (another rule's, or the user's own) already covers a pair
+    have = set(existing.values_list("entity_id", "user_id"))
+    mine = set(
+        existing.filter(rule=rule, created_by_rule=True).values_list("entity_id", "user_id")
+    )
+
+    to_add = want - have
+    if to_add:
+        now = timezone.now()
+        NotificationSubscription.objects.bulk_create(
+            [
+                NotificationSubscription(
+                    user_id=user_id,
+                    notification_type=rule.notification_type,
+                    entity_type=entity_type,
+                    entity_id=entity_id,
+                    created_by_rule=True,
+                    rule=rule,
+                    created_at=now,
+                )
+                for entity_id, user_id in to_add
+            ],
+            ignore_conflicts=True,
+        )
+
+    to_remove = mine - want
+    if to_remove:
+        by_entity = {}
+        for entity_id, user_id in to_remove:
+            by_entity.setdefault(entity_id, []).append(user_id)
+        query = Q()
+        for entity_id, user_ids in by_entity.items():
+            query |= Q(entity_id=entity_id, user_id__in=user_ids)
+        existing.filter(query, rule=rule, created_by_rule=True).delete()
+    return len(to_add), len(to_remove)
+
+
+def enqueue(rule, entity_types=None):
+    """Queue a full (re)application of ``rule``; reuses a queued one that
+    hasn't started yet."""
+    entity_types = entity_types or rule_entity_types(rule)
+    application = RuleApplication.objects.filter(
+        rule=rule,
+        status=RuleApplication.STATUS_QUEUED,
+        entity_type_index=0,
+        last_entity_id=0,
+    ).first()
+    if application is not None:
+        application.entity_types = entity_types
+        application.save(update_fields=["entity_types", "updated_at"])
+        return application
+    return RuleApplication.objects.create(rule=rule, entity_types=entity_types)
+
+
+def advance(application, criteria=None):
+    """Apply the next chunk of ``application`` (in memory - the caller saves)."""
+    rule = application.rule
+    if not rule.is_active:
+        application.status = RuleApplication.STATUS_COMPLETE
+        application.completed_at = timezone.now()
+        return
+
+    entity_type = application.entity_type
+    if entity_type is None:
+        # Every type done: drop subscriptions on types the rule doesn't cover
+        removed, _ = (
+            NotificationSubscription.objects.filter(rule=rule, created_by_rule=True)
+            .exclude(entity_type__in=rule_entity_types(rule))
+            .delete()
+        )
+        application.removed += removed
+        application.status = RuleApplication.STATUS_COMPLETE
+        application.completed_at = timezone.now()
+        return
+
+    entities = get_all_entities_by_type(entity_type)
+    chunk = []
+    if isinstance(entities, QuerySet):
+        chunk = list(
+            entities.select_related(*ENTITY_SELECT_RELATED.get(entity_type, ()))
+            .filter(pk__gt=application.last_entity_id)
+            .order_by("pk")[:CHUNK_SIZE]
+        )
+    if chunk:
+        added, removed = apply_to_entities(rule, entity_type, chunk, criteria)
+        application.processed += len(chunk)
+        application.added += added
+        application.removed += removed
+        application.last_entity_id = chunk[-1].pk
+
+    if len(chunk) < CHUNK_SIZE:
+        # Type done: drop the rule's subscriptions on entities it no longer covers
+        stale = NotificationSubscription.objects.filter(
+            rule=rule, created_by_rule=True, entity_type=entity_type
+        )
+        if isinstance(entities, QuerySet):
+            stale = stale.exclude(entity_id__in=entities.values("pk"))
+        removed, _ = stale.delete()
+        application.removed += removed
+        application.entity_type_index += 1
+        application.last_entity_id = 0
+
+
+def apply_all(rule, entity_types=None):
+    """Apply ``rule`` to everything it covers now, in chunks, without queueing."""
+    application = RuleApplication(
+        rule=rule, entity_types=entity_types or rule_entity_types(rule)
+    )
+    criteria = rule_criteria(rule)
+    while application.status == RuleApplication.STATUS_QUEUED:
+        advance(application, criteria)
+    return application
+
+
+def run_pending(max_seconds=None):
+    """Work through queued applications a chunk at a time, oldest first.
+    Returns the number of chunks processed; stops claiming new chunks after
+    ``max_seconds`` (if given)."""
+    started = time.monotonic()
+    chunks = 0
+    while max_seconds is None or time.monotonic() - started < max_seconds:
+        with transaction.atomic():
+            application = (
+                RuleApplication.objects.select_for_update(skip_locked=True)
+                .select_related("rule")
+                .filter(status=RuleApplication.STATUS_QUEUED)
+                .order_by("created_at")
+                .first()
+            )
+            if application is None:
+                break
+            try:
+                with transaction.atomic():
+                    advance(application)
+            except Exception as e:
+                logger.error(f"Applying {application} failed: {e}", exc_info=True)
+                application.status = RuleApplication.STATUS_FAILED
+                application.error_message = str(e)
+                application.completed_at = timezone.now()
+            application.save()
+        chunks += 1
+    return chunks
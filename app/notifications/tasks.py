@@ -1,31 +1,51 @@
 from django_cron import CronJobBase, Schedule
-from django.core import management
-from django.conf import settings
-from .models import Notification
 import logging
-import io
-from logging import StreamHandler
 
         
 class task_send_email_notifications(CronJobBase):
     RUN_EVERY_MINS = 1
+    # Stop starting new batches after this long so ticks don't pile up
+    MAX_SECONDS = 50
     schedule = Schedule(run_every_mins=RUN_EVERY_MINS)
     code = 'notifications.task_send_email_notifications'
 
     def do(self):
-        # Create a string buffer and a handler to capture logs
-        log_stream = io.StringIO()
-        handler = StreamHandler(log_stream)
-        handler.setLevel(logging.INFO)
-        formatter = logging.Formatter('%(asctime)s - %(name)s - %(levelname)s - %(message)s')
-        handler.setFormatter(formatter)
-        
-        # Get the logger for the rm_sync module
-        logger = logging.getLogger('notifications')
-        logger.addHandler(handler)
+        from .delivery import deliver_pending
 
+        logger = logging.getLogger('notifications')
         logger.info("Starting notification send run")
+        stats = deliver_pending(max_seconds=self.MAX_SECONDS)
+        logger.info(str(stats))
+        return str(stats)
+
+
+class task_process_notification_fanouts(CronJobBase):
+    """Create the notifications queued by send_notifications(defer=True)."""
+
+    RUN_EVERY_MINS = 1
+    # Stop claiming new fan-outs after this long so ticks don't pile up
+    MAX_SECONDS = 50
+    schedule = Schedule(run_every_mins=RUN_EVERY_MINS)
+    code = 'notifications.task_process_notification_fanouts'
+
+    def do(self):
+        from .utils import process_deferred_fanouts
+
+        stats = process_deferred_fanouts(max_seconds=self.MAX_SECONDS)
+        return "Processed {processed} notification fan-out(s), {failed} failed".format(**stats)
+
+
+class task_apply_subscription_rules(CronJobBase):
+    """Work through queued subscription rule applications, a chunk at a time."""
+
+    RUN_EVERY_MINS = 1
+    # Stop claiming new chunks after this long so ticks don't pile up
+    MAX_SECONDS = 50
+    schedule = Schedule(run_every_mins=RUN_EVERY_MINS)
+    code = 'notifications.task_apply_subscription_rules'
+
+    def do(self):
+        from .rule_application import run_pending
 
-        for notification in Notification.objects.filter(is_emailed=False, should_email=True):
-            logger.info(f"Sending {str(notification)}")
-            notification.send_email()
\ No newline at end of file
+        chunks = run_pending(max_seconds=self.MAX_SECONDS)
+        return f"Processed {chunks} subscription rule chunk(s)"
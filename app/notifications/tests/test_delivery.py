@@ -0,0 +1,90 @@
+from smtplib import SMTPException
+from unittest import mock
+
+from constance.test import override_config
+from django.core import mail
+from django.test import TestCase
+
+from chaotica_utils.models import User
+from notifications import delivery
+from notifications.models import EmailTemplate, Notification
+
+
+@override_config(EMAIL_ENABLED=True)
+class DeliverPendingTests(TestCase):
+    def setUp(self):
+        self.alice = User.objects.create_user(email="alice@example.com", password="pw12345")
+        self.bob = User.objects.create_user(email="bob@example.com", password="pw12345")
+        EmailTemplate.objects.create(
+            slug="emails/test_delivery.html", name="Test", subject="{{ title }}",
+            body_html="Hi {{ user.email }}: {{ message }}", extends_base=False,
+        )
+
+    def _notify(self, user, **kwargs):
+        return Notification.objects.create(
+            user=user, title="Phase late", message="It is late",
+            should_email=True, email_template="emails/test_delivery.html",
+            entity_type="User", entity_id=self.alice.pk, **kwargs
+        )
+
+    def test_sends_batch_and_marks_rows(self):
+        first, second = self._notify(self.alice), self._notify(self.bob)
+        with mock.patch.object(
+            delivery, "get_email_renderer", wraps=delivery.get_email_renderer
+        ) as renderer, mock.patch.object(
+            delivery, "get_entity_object", wraps=delivery.get_entity_object
+        ) as entity:
+            stats = delivery.deliver_pending()
+
+        self.assertEqual(stats.sent, 2)
+        self.assertEqual(renderer.call_count, 1)
+        self.assertEqual(entity.call_count, 1)
+        sent = {m.to[0]: m for m in mail.outbox}
+        self.assertEqual(sorted(sent), ["alice@example.com", "bob@example.com"])
+        # Rendered per recipient from the one compiled template
+        self.assertIn("Hi bob@example.com: It is late", sent["bob@example.com"].alternatives[0][0])
+        for n in (first, second):
+            n.refresh_from_db()
+            self.assertTrue(n.is_emailed)
+
+    def test_inactive_user_marked_without_sending(self):
+        self.bob.is_active = False
+        self.bob.save()
+        n = self._notify(self.bob)
+        stats = delivery.deliver_pending()
+        self.assertEqual((stats.sent, stats.skipped), (0, 1))
+        self.assertEqual(mail.outbox, [])
+        n.refresh_from_db()
+        self.assertTrue(n.is_emailed)
+
+    def test_failed_send_left_pending(self):
+        n = self._notify(self.alice)
+        with mock.patch.object(delivery, "_send_chunk", side_effect=SMTPException("down")):
+            stats = delivery.deliver_pending()
+        self.assertEqual((stats.sent, stats.failed), (0, 1))
+        n.refresh_from_db()
+        self.assertFalse(n.is_emailed)
+
+    def test_failed_message_does_not_hold_back_chunk(self):
+        first, second, third = (
+            self._notify(self.alice), self._notify(self.bob), self._notify(self.alice)
+        )
+        connection = mock.MagicMock()
+        connection.send_messages.side_effect = [1, SMTPException("bad recipient"), 1]
+        with mock.patch.object(delivery, "get_connection", return_value=connection):
+            stats = delivery.deliver_pending()
+
+        self.assertEqual((stats.sent, stats.failed), (2, 1))
+        connection.open.assert_called_once()
+        self.assertEqual(connection.send_messages.call_count, 3)
+        for n, emailed in ((first, True), (second, False), (third, True)):
+            n.refresh_from_db()
+            self.assertEqual(n.is_emailed, emailed)
+
+    @override_config(EMAIL_ENABLED=False)
+    def test_email_disabled_marks_without_sending(self):
+        n = self._notify(self.alice)
+        delivery.deliver_pending()
+        self.assertEqual(mail.outbox, [])
+        n.refresh_from_db()
+        self.assertTrue(n.is_emailed)
@@ -0,0 +1,108 @@
+from unittest import mock
+
+from django.test import TestCase
+from django.utils import timezone
+
+from chaotica_utils.models import Note, User
+from notifications.enums import NotificationTypes
+from notifications.models import Notification, NotificationFanout, NotificationSubscription
+from notifications import utils
+from notifications.utils import AppNotification, process_deferred_fanouts, send_notifications
+
+
+class NotificationFanoutTests(TestCase):
+    def setUp(self):
+        self.users = [
+            User.objects.create_user(email=f"user{i}@example.com", password="pw12345")
+            for i in range(4)
+        ]
+        self.entity = self.users[0]
+        # users 0-2 subscribed in-app, only 0 and 1 by email; user 3 inactive
+        for i, user in enumerate(self.users):
+            NotificationSubscription.objects.create(
+                user=user,
+                notification_type=NotificationTypes.SYSTEM,
+                entity_type="User",
+                entity_id=self.entity.pk,
+                in_app_enabled=True,
+                email_enabled=i < 2,
+            )
+        self.users[3].is_active = False
+        self.users[3].save()
+
+    def _notification(self):
+        return AppNotification(
+            NotificationTypes.SYSTEM,
+            "Something happened",
+            message="Details",
+            email_template="emails/notification.html",
+            entity_type="User",
+            entity_id=self.entity.pk,
+        )
+
+    def test_fans_out_to_subscribers_in_bulk(self):
+        send_notifications(self._notification(), defer=False)
+        emailed = dict(Notification.objects.values_list("user_id", "should_email"))
+        self.assertEqual(
+            emailed,
+            {self.users[0].pk: True, self.users[1].pk: True, self.users[2].pk: False},
+        )
+        notes = Note.objects.filter(is_system_note=True, content__contains="notification sent to")
+        self.assertEqual(notes.count(), 1)
+        self.assertIn("sent to 3 recipient(s)", notes.get().content)
+
+    def test_specific_users(self):
+        send_notifications(
+            self._notification(),
+            specific_users=User.objects.filter(pk=self.users[2].pk),
+            defer=False,
+        )
+        notification = Notification.objects.get()
+        self.assertEqual(notification.user, self.users[2])
+        self.assertTrue(notification.should_email)
+
+    def test_deferred_fanout_is_processed_later(self):
+        send_notifications(self._notification(), specific_users=self.users[1], defer=True)
+        self.assertFalse(Notification.objects.exists())
+        self.assertEqual(NotificationFanout.objects.count(), 1)
+
+        self.assertEqual(process_deferred_fanouts(), {"processed": 1, "failed": 0})
+        self.assertEqual(Notification.objects.get().user, self.users[1])
+        self.assertFalse(NotificationFanout.objects.exists())
+
+    def test_deferred_fanout_stores_model_metadata_as_pks(self):
+        notification = self._notification()
+        notification.metadata = {"user": self.users[1], "when": object(), "note": "x"}
+        send_notifications(notification, specific_users=self.users[1], defer=True)
+        self.assertEqual(
+            NotificationFanout.objects.get().metadata,
+            {"user": self.users[1].pk, "note": "x"},
+        )
+
+        self.assertEqual(process_deferred_fanouts(), {"processed": 1, "failed": 0})
+        self.assertEqual(Notification.objects.get().user, self.users[1])
+
+    def test_failed_fanout_is_kept_and_retried(self):
+        send_notifications(self._notification(), specific_users=self.users[1], defer=True)
+        with mock.patch.object(
+            utils, "fan_out_notification", side_effect=Exception("database went away")
+        ):
+            self.assertEqual(process_deferred_fanouts(), {"processed": 0, "failed": 1})
+        fanout = NotificationFanout.objects.get()
+        self.assertEqual(fanout.attempts, 1)
+        self.assertIsNone(fanout.failed_at)
+        self.assertIn("database went away", fanout.error_message)
+
+        # Backing off: not claimed again until retry_at
+        self.assertEqual(process_deferred_fanouts(), {"processed": 0, "failed": 0})
+        NotificationFanout.objects.update(retry_at=timezone.now())
+        self.assertEqual(process_deferred_fanouts(), {"processed": 1, "failed": 0})
+        self.assertEqual(Notification.objects.get().user, self.users[1])
+
+    def test_fanout_marked_failed_after_max_attempts(self):
+        send_notifications(self._notification(), specific_users=self.users[1], defer=True)
+        NotificationFanout.objects.update(attempts=utils.FANOUT_MAX_ATTEMPTS - 1)
+        with mock.patch.object(utils, "fan_out_notification", side_effect=Exception("boom")):
+            self.assertEqual(process_deferred_fanouts(), {"processed": 0, "failed": 1})
+        self.assertIsNotNone(NotificationFanout.objects.get().failed_at)
+        self.assertEqual(process_deferred_fanouts(), {"processed": 0, "failed": 0})
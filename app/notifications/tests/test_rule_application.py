@@ -0,0 +1,105 @@
+from unittest import mock
+
+from django.test import TestCase
+
+from chaotica_utils.models import User
+from jobtracker.models import Client, Job, OrganisationalUnit, OrganisationalUnitMember, Phase
+from notifications import rule_application
+from notifications.criteria_registry import get_batch_criteria_function, get_criteria_function
+from notifications.enums import NotificationTypes
+from notifications.models import (
+    JobRoleCriteria,
+    NotificationOptOut,
+    NotificationSubscription,
+    RuleApplication,
+    SubscriptionRule,
+)
+
+
+class RuleApplicationTests(TestCase):
+    def setUp(self):
+        self.am1 = User.objects.create_user(email="am1@example.com", password="pw12345")
+        self.am2 = User.objects.create_user(email="am2@example.com", password="pw12345")
+        self.unit = OrganisationalUnit.objects.create(name="Unit")
+        self.client_obj = Client.objects.create(name="Client")
+        self.jobs = [
+            Job.objects.create(
+                unit=self.unit, client=self.client_obj, title=f"Job {i}",
+                created_by=self.am1, account_manager=self.am1,
+            )
+            for i in range(2)
+        ]
+        self.rule = SubscriptionRule.objects.create(
+            name="Account managers", notification_type=NotificationTypes.JOB_STATUS_CHANGE
+        )
+        JobRoleCriteria.objects.create(rule=self.rule, role_id=0)
+
+    def _subscribed(self):
+        return set(
+            NotificationSubscription.objects.filter(rule=self.rule).values_list(
+                "entity_id", "user_id"
+            )
+        )
+
+    def test_run_pending_diff_applies(self):
+        application = rule_application.enqueue(self.rule)
+        self.assertEqual(application.entity_types, ["Job"])
+        rule_application.run_pending()
+        application.refresh_from_db()
+        self.assertEqual(application.status, RuleApplication.STATUS_COMPLETE)
+        self.assertEqual(application.added, 2)
+        self.assertEqual(self._subscribed(), {(j.pk, self.am1.pk) for j in self.jobs})
+
+        Job.objects.filter(pk=self.jobs[0].pk).update(account_manager=self.am2)
+        untouched = NotificationSubscription.objects.get(
+            rule=self.rule, entity_id=self.jobs[1].pk
+        )
+        rule_application.enqueue(self.rule)
+        rule_application.run_pending()
+        self.assertEqual(
+            self._subscribed(),
+            {(self.jobs[0].pk, self.am2.pk), (self.jobs[1].pk, self.am1.pk)},
+        )
+        # Unchanged subscriptions are left in place
+        self.assertTrue(NotificationSubscription.objects.filter(pk=untouched.pk).exists())
+
+    def test_resumes_from_cursor(self):
+        application = rule_application.enqueue(self.rule)
+        with mock.patch.object(rule_application, "CHUNK_SIZE", 1):
+            rule_application.advance(application)
+            application.save()
+            self.assertEqual(application.last_entity_id, self.jobs[0].pk)
+            self.assertEqual(self._subscribed(), {(self.jobs[0].pk, self.am1.pk)})
+
+            rule_application.run_pending()
+        application.refresh_from_db()
+        self.assertEqual(application.status, RuleApplication.STATUS_COMPLETE)
+        self.assertEqual(application.processed, 2)
+        self.assertEqual(self._subscribed(), {(j.pk, self.am1.pk) for j in self.jobs})
+
+    def test_respects_opt_outs(self):
+        NotificationOptOut.objects.create(
+            user=self.am1,
+            notification_type=self.rule.notification_type,
+            entity_type="Job",
+            entity_id=self.jobs[0].pk,
+        )
+        rule_application.apply_all(self.rule)
+        self.assertEqual(self._subscribed(), {(self.jobs[1].pk, self.am1.pk)})
+
+    def test_batch_criteria_match_single_forms(self):
+        OrganisationalUnitMember.objects.create(unit=self.unit, member=self.am2)
+        phase = Phase.objects.create(job=self.jobs[0], title="Phase")
+        phase = Phase.objects.select_related("job").get(pk=phase.pk)
+        for name in ("unit_members", "same_client_job_leads", "job_support_team"):
+            single = get_criteria_function(name)
+            batch = get_batch_criteria_function(name)
+            for entities in (self.jobs, [phase]):
+                self.assertEqual(
+                    batch(entities),
+                    {
+                        e.pk: set(single(e).values_list("pk", flat=True))
+                        for e in entities
+                    },
+                    name,
+                )
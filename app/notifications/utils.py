@@ -1,15 +1,23 @@
 from .models import (
     NotificationSubscription,
     Notification,
+    NotificationFanout,
     NotificationOptOut,
     SubscriptionRule,
 )
+from constance import config
 from django.conf import settings as django_settings
+from django.db import transaction
 from django.utils import timezone
 from chaotica_utils.utils import ext_reverse
 from jobtracker.enums import JobStatuses, PhaseStatuses
-from django.db.models import QuerySet
+from django.db.models import Model, Q, QuerySet
 from .enums import NotificationTypes
+import json
+import logging
+from datetime import timedelta
+
+logger = logging.getLogger(__name__)
 
 
 class AppNotification:
@@ -46,113 +54,222 @@ class AppNotification:
         self.entity_id = entity_id
         self.metadata.update(kwargs)
 
-    def get_subscribers(self):
-        """Get all users who should receive this notification"""
-        from chaotica_utils.models.user import User
-
-        # Start with specific entity subscriptions
-
-        if self.entity_id and self.entity_type:
-            specific_subscribers = NotificationSubscription.objects.filter(
+    def _subscriber_ids(self, **enabled):
+        if not (self.entity_id and self.entity_type):
+            return set()
+        return set(
+            NotificationSubscription.objects.filter(
                 notification_type=self.notification_type,
                 entity_id=self.entity_id,
                 entity_type=self.entity_type,
-                in_app_enabled=True,
-            ).values_list("user__id", flat=True)
-        else:
-            specific_subscribers = []
+                user__is_active=True,
+                **enabled,
+            ).values_list("user_id", flat=True)
+        )
 
-        # Combine both sets
-        subscriber_ids = set(specific_subscribers)  # | set(general_subscribers)
+    def subscriber_ids(self):
+        """Ids of the active users who should receive this notification"""
+        return self._subscriber_ids(in_app_enabled=True)
 
-        return User.objects.filter(id__in=subscriber_ids, is_active=True)
+    def email_subscriber_ids(self):
+        """Ids of the active users who should receive this notification by email"""
+        return self._subscriber_ids(email_enabled=True)
+
+    def get_subscribers(self):
+        """Get all users who should receive this notification"""
+        from chaotica_utils.models.user import User
+
+        return User.objects.filter(id__in=self.subscriber_ids())
 
     def get_email_subscribers(self):
         """Get all users who should receive this notification by email"""
         from chaotica_utils.models.user import User
 
-        # Similar to get_subscribers but checking email_enabled
-        if self.entity_id and self.entity_type:
-            specific_subscribers = NotificationSubscription.objects.filter(
-                notification_type=self.notification_type,
-                entity_id=self.entity_id,
-                entity_type=self.entity_type,
-                email_enabled=True,
-            ).values_list("user__id", flat=True)
-        else:
-            specific_subscribers = []
+        return User.objects.filter(id__in=self.email_subscriber_ids())
 
-        # general_subscribers = NotificationSubscription.objects.filter(
-        #     notification_type=self.notification_type,
-        #     entity_id__isnull=True,
-        #     email_enabled=True,
-        # ).values_list("user_id", flat=True)
 
-        subscriber_ids = set(specific_subscribers)  # | set(general_subscribers)
+# Notifications inserted per INSERT by fan_out_notification
+FANOUT_BATCH_SIZE = 500
+# A fan-out that raises is retried this many times, backing off by
+# FANOUT_RETRY_INTERVAL per attempt, before it is marked failed
+FANOUT_MAX_ATTEMPTS = 5
+FANOUT_RETRY_INTERVAL = timedelta(minutes=5)
 
-        return User.objects.filter(id__in=subscriber_ids, is_active=True)
 
+def _user_ids(users):
+    """Ids for a User, an iterable of Users or a QuerySet of them."""
+    if isinstance(users, QuerySet):
+        return set(users.values_list("pk", flat=True))
+    if hasattr(users, "pk"):
+        return {users.pk}
+    return {user.pk for user in users}
 
-def send_notifications(notification, specific_users=None, extra_recipients=None):
+
+def _json_safe_metadata(metadata):
+    """Copy of ``metadata`` that a fan-out row can store: model instances become
+    their pk and any other value JSON can't encode is dropped."""
+    safe = {}
+    for key, value in (metadata or {}).items():
+        if isinstance(value, Model):
+            value = value.pk
+        try:
+            json.dumps(value)
+        except (TypeError, ValueError):
+            continue
+        safe[key] = value
+    return safe
+
+
+def send_notifications(notification, specific_users=None, extra_recipients=None, defer=None):
     """
     Send notifications to users
 
     Args:
         notification (AppNotification): Notification to send
         specific_users (User or QuerySet, optional): Specific user or users to notify. If None, uses subscription system.
+        defer (bool, optional): Queue the fan-out for ``task_process_notification_fanouts``
+            rather than doing it now. Defaults to ``config.NOTIFICATION_FANOUT_DEFERRED``.
     """
-    from chaotica_utils.views.common import log_system_activity
-
-    # Determine recipients
+    user_ids = None
     if specific_users is not None:
         # Legacy usage: specific users were provided
-        if isinstance(specific_users, QuerySet):
-            recipients = specific_users
-        else:
-            recipients = [specific_users]
-    else:
-        # Use the subscription system
-        recipients = notification.get_subscribers()
-
-    email_recipients = []
-    if notification.email_template:
-        if specific_users is not None:
-            # Legacy usage
-            email_recipients = recipients
-        else:
-            # Use subscription system for emails
-            email_recipients = notification.get_email_subscribers()
+        user_ids = _user_ids(specific_users)
 
-    choices_dict = dict(NotificationTypes.CHOICES)
-    notification_type_name = choices_dict.get(
-        notification.notification_type, "Unknown"
-    )
-    entity = get_entity_object(
-        entity_id=notification.entity_id, entity_type=notification.entity_type
-    )
-
-    # Create in-app notifications
-    for user in recipients:
-        _ = Notification.objects.create(
-            user=user,
+    if defer is None:
+        defer = config.NOTIFICATION_FANOUT_DEFERRED
+    if defer:
+        NotificationFanout.objects.create(
             notification_type=notification.notification_type,
             title=notification.title,
             message=notification.message,
             link=notification.action_link,
+            email_template=notification.email_template or "",
             entity_id=notification.entity_id,
             entity_type=notification.entity_type,
-            # metadata=notification.metadata,
-            email_template=notification.email_template or "",
-            should_email=user in email_recipients,
+            metadata=_json_safe_metadata(notification.metadata),
+            user_ids=sorted(user_ids) if user_ids is not None else None,
         )
-        # Lets create the note
-        log_system_activity(
-            entity,
-            "{notification_type_name} notification sent to {target}".format(
-                notification_type_name=notification_type_name,
-                target=user.email_address(),
-            ),
+        return []
+    return fan_out_notification(notification, user_ids)
+
+
+def fan_out_notification(notification, user_ids=None):
+    """Create ``notification`` for every recipient: ``user_ids``, or the
+    subscribers if None. Returns the created Notifications.
+
+    Recipients and email recipients are worked out as id sets, the rows are
+    bulk inserted, and one activity note records who was notified.
+    """
+    from chaotica_utils.models.user import User
+    from chaotica_utils.views.common import log_system_activity
+
+    if user_ids is None:
+        # Use the subscription system
+        recipient_ids = notification.subscriber_ids()
+        email_ids = set()
+        if notification.email_template:
+            email_ids = notification.email_subscriber_ids()
+    else:
+        recipient_ids = set(user_ids)
+        email_ids = recipient_ids if notification.email_template else set()
+
+    if not recipient_ids:
+        return []
+
+    created = Notification.objects.bulk_create(
+        [
+            Notification(
+                user_id=user_id,
+                notification_type=notification.notification_type,
+                title=notification.title,
+                message=notification.message,
+                link=notification.action_link,
+                entity_id=notification.entity_id,
+                entity_type=notification.entity_type,
+                # metadata=notification.metadata,
+                email_template=notification.email_template or "",
+                should_email=user_id in email_ids,
+            )
+            for user_id in sorted(recipient_ids)
+        ],
+        batch_size=FANOUT_BATCH_SIZE,
+    )
+
+    notification_type_name = dict(NotificationTypes.CHOICES).get(
+        notification.notification_type, "Unknown"
+    )
+    entity = get_entity_object(
+        entity_id=notification.entity_id, entity_type=notification.entity_type
+    )
+    targets = sorted(
+        str(user.email_address())
+        for user in User.objects.filter(pk__in=recipient_ids).only(
+            "email", "notification_email"
         )
+    )
+    log_system_activity(
+        entity,
+        "{notification_type_name} notification sent to {count} recipient(s): {targets}".format(
+            notification_type_name=notification_type_name,
+            count=len(targets),
+            targets=", ".join(targets),
+        ),
+    )
+    return created
+
+
+def process_deferred_fanouts(max_seconds=None):
+    """Fan out queued ``NotificationFanout`` rows, oldest first; stops claiming
+    new ones after ``max_seconds`` (if given).
+
+    A fan-out that raises is kept and retried after a back-off, and marked
+    failed (``failed_at``) after :data:`FANOUT_MAX_ATTEMPTS`.
+
+    Returns ``{"processed", "failed"}`` counts.
+    """
+    started = timezone.now()
+    stats = {"processed": 0, "failed": 0}
+    while max_seconds is None or (timezone.now() - started).total_seconds() < max_seconds:
+        with transaction.atomic():
+            now = timezone.now()
+            fanout = (
+                NotificationFanout.objects.select_for_update(skip_locked=True)
+                .filter(failed_at__isnull=True)
+                .filter(Q(retry_at__isnull=True) | Q(retry_at__lte=now))
+                .order_by("created_at")
+                .first()
+            )
+            if fanout is None:
+                break
+            notification = AppNotification(
+                notification_type=fanout.notification_type,
+                title=fanout.title,
+                message=fanout.message,
+                email_template=fanout.email_template or None,
+                metadata=fanout.metadata,
+                link=fanout.link,
+                entity_type=fanout.entity_type,
+                entity_id=fanout.entity_id,
+            )
+            try:
+                with transaction.atomic():
+                    fan_out_notification(notification, fanout.user_ids)
+            except Exception as e:
+                logger.error(f"Failed to fan out {fanout}: {e}", exc_info=True)
+                stats["failed"] += 1
+                fanout.attempts += 1
+                fanout.error_message = str(e)
+                if fanout.attempts >= FANOUT_MAX_ATTEMPTS:
+                    fanout.failed_at = now
+                else:
+                    fanout.retry_at = now + FANOUT_RETRY_INTERVAL * fanout.attempts
+                fanout.save(
+                    update_fields=["attempts", "error_message", "failed_at", "retry_at"]
+                )
+                continue
+            fanout.delete()
+        stats["processed"] += 1
+    return stats
 
 
 def auto_subscribe_users(notification_type, entity):
@@ -355,71 +472,19 @@ def get_entities_by_type_and_ids(entity_type, entity_ids):
 
 def apply_rule_to_entity(rule, entity):
     """Apply a single subscription rule to a single entity"""
-    # Get all users that should be subscribed according to the rule
-    matching_users = []
-
-    # Process each criteria
-    for criteria in rule.globalrolecriteria_criteria.all():
-        users = criteria.get_matching_users(entity)
-        matching_users.extend(users)
-    for criteria in rule.orgunitrolecriteria_criteria.all():
-        users = criteria.get_matching_users(entity)
-        matching_users.extend(users)
-    for criteria in rule.jobrolecriteria_criteria.all():
-        users = criteria.get_matching_users(entity)
-        matching_users.extend(users)
-    for criteria in rule.phaserolecriteria_criteria.all():
-        users = criteria.get_matching_users(entity)
-        matching_users.extend(users)
-    for criteria in rule.dynamicrulecriteria_criteria.all():
-        users = criteria.get_matching_users(entity)
-        matching_users.extend(users)
-
-    # Remove duplicates
-    matching_users = list(set(matching_users))
-
-    # Create subscriptions for matching users
-    for user in matching_users:
-        NotificationSubscription.objects.get_or_create(
-            notification_type=rule.notification_type,
-            entity_type=entity.__class__.__name__,
-            entity_id=entity.id,
-            user=user,
-            defaults={
-                "created_by_rule": True,
-                "rule_id": rule.id,
-                "created_at": timezone.now(),
-            },
-        )
+    from .rule_application import apply_to_entities
+
+    apply_to_entities(rule, entity.__class__.__name__, [entity])
 
 
 def apply_rule_to_all_entities(rule, entity_type=None):
-    """Apply a rule to all relevant entities (or entities of a specific type)"""
+    """Apply a rule to all relevant entities (or entities of a specific type).
+
+    Runs in chunks to completion; use ``rule_application.enqueue`` to do it in
+    the background instead.
+    """
     if not rule.is_active:
         return
+    from .rule_application import apply_all
 
-    # Define which entity types to process based on the notification type
-    notification_type = rule.notification_type
-
-    entity_types_to_process = []
-
-    # If a specific entity type was requested, only process that one
-    if entity_type:
-        entity_types_to_process = [entity_type]
-    else:
-        # Otherwise determine which types to process based on notification type
-        if notification_type in NotificationTypes.LEAVE_EVENTS:
-            entity_types_to_process.append("LeaveRequest")
-
-        if notification_type in NotificationTypes.JOB_EVENTS:
-            entity_types_to_process.append("Job")
-
-        if notification_type in NotificationTypes.PHASE_EVENTS:
-            entity_types_to_process.append("Phase")
-
-    # Process each entity type
-    for entity_type in entity_types_to_process:
-        entities = get_all_entities_by_type(entity_type)
-
-        for entity in entities:
-            apply_rule_to_entity(rule, entity)
+    apply_all(rule, [entity_type] if entity_type else None)
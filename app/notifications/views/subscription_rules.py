@@ -527,17 +527,11 @@ def notification_rule_reapply(request, rule_id):
     rule = get_object_or_404(SubscriptionRule, id=rule_id)
     
     if request.method == 'POST':
-        # First, remove existing subscriptions created by this rule
-        NotificationSubscription.objects.filter(
-            created_by_rule=True,
-            rule_id=rule.id
-        ).delete()
+        # Queue the re-application; only changed subscriptions are written
+        from notifications.rule_application import enqueue
+        enqueue(rule)
         
-        # Re-apply the rule
-        from notifications.utils import apply_rule_to_all_entities
-        apply_rule_to_all_entities(rule)
-        
-        messages.success(request, f"Rule '{rule.name}' has been re-applied to all relevant entities.")
+        messages.success(request, f"Rule '{rule.name}' will be re-applied to all relevant entities in the background.")
         return redirect('notification_rule_detail', rule_id=rule_id)
     
     # Show confirmation page
@@ -3,7 +3,7 @@ from .models import (
     Report, ReportCategory, ReportField, ReportFilter, ReportSort,
     DataArea, DataField, DataSource, RelationshipType,
     FieldType, FieldPresentation, FilterType, FilterCondition,
-    ScheduledReport
+    ScheduledReport, ReportRun
 )
 
 # Register basic models with simple admin interfaces
@@ -137,4 +137,14 @@ class ScheduledReportAdmin(admin.ModelAdmin):
     list_filter = ['enabled', 'frequency']
     search_fields = ['name', 'report__name']
     raw_id_fields = ['report', 'run_as_user', 'split_by_field', 'recipient_group']
-    readonly_fields = ['last_sent_at', 'created_at', 'updated_at']
\ No newline at end of file
+    readonly_fields = ['last_sent_at', 'created_at', 'updated_at']
+
+
+# ReportRun admin
+@admin.register(ReportRun)
+class ReportRunAdmin(admin.ModelAdmin):
+    list_display = ['report', 'requested_by', 'status', 'progress', 'row_count', 'created_at', 'completed_at']
+    list_filter = ['status']
+    search_fields = ['report__name']
+    raw_id_fields = ['report', 'requested_by']
+    readonly_fields = ['result_key', 'row_count', 'error_message', 'created_at', 'started_at', 'completed_at']
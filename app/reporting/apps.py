@@ -8,4 +8,4 @@ class ReportingConfig(AppConfig):
 
     def ready(self):
         # Import signals or any startup code here
-        pass
\ No newline at end of file
+        import reporting.signals
\ No newline at end of file
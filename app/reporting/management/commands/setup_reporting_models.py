@@ -9,7 +9,7 @@ from reporting.models import (
 from chaotica_utils.models import User
 from jobtracker.models import (
     Job, Phase, Project, Client, Team, OrganisationalUnit,
-    TimeSlot, Skill, Service
+    TimeSlot, Skill, Service, ServiceReadiness
 )
 
 
@@ -52,6 +52,7 @@ class Command(BaseCommand):
             self.setup_phase_data_area()
             self.setup_project_data_area()
             self.setup_client_data_area()
+            self.setup_service_readiness_data_area()
 
             # Setup data area relationships
             self.setup_data_sources()
@@ -442,6 +443,40 @@ class Command(BaseCommand):
 
         self._sync_fields(data_area, fields)
 
+    def setup_service_readiness_data_area(self):
+        """Set up Service Readiness data area and fields"""
+        self.stdout.write('Setting up Service Readiness data area...')
+
+        content_type = ContentType.objects.get_for_model(ServiceReadiness)
+
+        data_area = self._get_or_create_data_area('Service Readiness', {
+            'description': 'Competency tier of each user for each service',
+            'content_type': content_type,
+            'model_name': 'ServiceReadiness',
+            'default_sort_field': 'service__name',
+            'icon_class': 'fa-user-check',
+            'population_options': {}
+        })
+
+        text_type = self.field_types['Text']
+        email_type = self.field_types['Email']
+        integer_type = self.field_types['Integer']
+        datetime_type = self.field_types['DateTime']
+        foreign_key_type = self.field_types['Foreign Key']
+
+        fields = [
+            {'name': 'service', 'display_name': 'Service', 'field_path': 'service__name', 'field_type': foreign_key_type, 'group': 'Basic'},
+            {'name': 'user_email', 'display_name': 'User Email', 'field_path': 'user__email', 'field_type': email_type, 'group': 'Basic'},
+            {'name': 'user_first_name', 'display_name': 'User First Name', 'field_path': 'user__first_name', 'field_type': text_type, 'group': 'Basic'},
+            {'name': 'user_last_name', 'display_name': 'User Last Name', 'field_path': 'user__last_name', 'field_type': text_type, 'group': 'Basic'},
+            {'name': 'tier', 'display_name': 'Tier (0 = missing skills, 3 = specialist)', 'field_path': 'tier', 'field_type': integer_type, 'group': 'Readiness'},
+            {'name': 'missing_skills', 'display_name': 'Missing Required Skills', 'field_path': 'missing_skills', 'field_type': integer_type, 'group': 'Readiness'},
+            {'name': 'missing_qualifications', 'display_name': 'Missing Required Qualifications', 'field_path': 'missing_qualifications', 'field_type': integer_type, 'group': 'Readiness'},
+            {'name': 'updated_at', 'display_name': 'Last Refreshed', 'field_path': 'updated_at', 'field_type': datetime_type, 'group': 'Dates'},
+        ]
+
+        self._sync_fields(data_area, fields)
+
     def setup_data_sources(self):
         """Set up relationships between data areas"""
         self.stdout.write('Setting up data source relationships...')
@@ -455,6 +490,7 @@ class Command(BaseCommand):
             phases_area = DataArea.objects.get(name='Phases')
             projects_area = DataArea.objects.get(name='Projects')
             clients_area = DataArea.objects.get(name='Clients')
+            readiness_area = DataArea.objects.get(name='Service Readiness')
 
             relationships = [
                 {
@@ -492,6 +528,13 @@ class Command(BaseCommand):
                     'join_field': 'primary_poc',
                     'display_name': 'Project POC',
                 },
+                {
+                    'from_area': readiness_area,
+                    'to_area': users_area,
+                    'relationship_type': many_to_one,
+                    'join_field': 'user',
+                    'display_name': 'Readiness User',
+                },
             ]
 
             for rel_data in relationships:
@@ -2,4 +2,5 @@ from .report import Report, ReportCategory, ReportField, ReportFilter, ReportSor
 from .data_source import DataSource, DataArea, DataField, RelationshipType
 from .field import FieldType, FieldPresentation
 from .filter import FilterType, FilterCondition
-from .schedule import ScheduledReport
\ No newline at end of file
+from .schedule import ScheduledReport
+from .run import ReportRun
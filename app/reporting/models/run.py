@@ -0,0 +1,76 @@
+import pickle
+import zlib
+
+from django.conf import settings
+from django.db import models
+from django.urls import reverse
+
+
+class ReportRun(models.Model):
+    """One execution of a :class:`Report` and its stored result.
+
+    Runs are queued by :class:`~reporting.services.run_service.RunService` and
+    executed by the ``task_run_queued_reports`` cron job, or recorded inline
+    when a caller needs the data immediately. ``result_key`` identifies the
+    definition, filter values and permission scope the result was produced
+    for, so an identical run within the freshness window reuses it.
+    """
+
+    STATUS_QUEUED = 'queued'
+    STATUS_RUNNING = 'running'
+    STATUS_COMPLETE = 'complete'
+    STATUS_FAILED = 'failed'
+    STATUS_CHOICES = [
+        (STATUS_QUEUED, 'Queued'),
+        (STATUS_RUNNING, 'Running'),
+        (STATUS_COMPLETE, 'Complete'),
+        (STATUS_FAILED, 'Failed'),
+    ]
+
+    report = models.ForeignKey('Report', on_delete=models.CASCADE, related_name='runs')
+    requested_by = models.ForeignKey(
+        settings.AUTH_USER_MODEL, on_delete=models.CASCADE, related_name='report_runs',
+    )
+    filter_values = models.JSONField(default=dict, blank=True)
+    extra_field_paths = models.JSONField(default=list, blank=True)
+    result_key = models.CharField(max_length=64, db_index=True, editable=False)
+
+    status = models.CharField(max_length=10, choices=STATUS_CHOICES, default=STATUS_QUEUED)
+    progress = models.PositiveSmallIntegerField(default=0, help_text="Percent complete.")
+    row_count = models.PositiveIntegerField(null=True, blank=True)
+    # zlib-compressed pickle of the result rows, written only by set_data() so
+    # dates / decimals reach the exporters unchanged.
+    result = models.BinaryField(null=True, blank=True, editable=False)
+    error_message = models.TextField(blank=True)
+
+    created_at = models.DateTimeField(auto_now_add=True)
+    started_at = models.DateTimeField(null=True, blank=True)
+    completed_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        ordering = ['-created_at']
+        indexes = [
+            models.Index(fields=['result_key', 'status', '-completed_at'], name='rep_run_key_status_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.report} ({self.get_status_display()})"
+
+    @property
+    def is_finished(self):
+        return self.status in (self.STATUS_COMPLETE, self.STATUS_FAILED)
+
+    def get_absolute_url(self):
+        return reverse('reporting:report_run', kwargs={'uuid': self.report.uuid, 'pk': self.pk})
+
+    def status_url(self):
+        return reverse('reporting:report_run_status', kwargs={'uuid': self.report.uuid, 'pk': self.pk})
+
+    def set_data(self, rows):
+        self.result = zlib.compress(pickle.dumps(rows, protocol=pickle.HIGHEST_PROTOCOL))
+        self.row_count = len(rows)
+
+    def get_data(self):
+        if self.result is None:
+            return None
+        return pickle.loads(zlib.decompress(bytes(self.result)))
@@ -5,9 +5,15 @@ from django.apps import apps
 from django.core.exceptions import PermissionDenied
 
 from ..models import DataArea, DataField, Report, ReportField, ReportFilter, ReportSort
-from ..utils.query_builder import build_query_from_report
+from ..utils.query_builder import build_filter_conditions
 from ..resolvers import REPORTING_RESOLVERS
 from ..permissions import can_view_report
+from .report_plan import compile_report
+
+# Rows resolved between progress callbacks on the instance path
+PROGRESS_EVERY = 250
+# Rows fetched per database round trip when streaming a report
+STREAM_CHUNK_SIZE = 2000
 
 class DataService:
     """
@@ -53,7 +59,7 @@ class DataService:
         return fields.order_by('group', 'name')
     
     @staticmethod
-    def get_report_data(report, user, filter_values=None, extra_field_paths=None):
+    def get_report_data(report, user, filter_values=None, extra_field_paths=None, progress=None):
         """
         Execute a report and return the data.
 
@@ -61,56 +67,69 @@ class DataService:
         row (keyed by path) without adding them as display columns - used e.g. to
         fetch a grouping key (like an account manager email) for splitting a
         scheduled report into per-recipient slices.
+
+        ``progress`` is an optional ``callable(done, total)`` the row-by-row
+        instance path reports to as it resolves rows (used by background runs).
         """
         extra_field_paths = extra_field_paths or []
+        queryset, plan = DataService._prepare_query(report, user, filter_values)
+        if plan.has_resolver:
+            return DataService._execute_instance_query(
+                queryset, plan.fields, user, extra_field_paths, progress=progress,
+                hints=(plan.select_related, plan.prefetch_related),
+            )
+
+        # Execute the query and return the results
+        return DataService._execute_query(queryset, plan.fields, user, extra_field_paths)
+
+    @staticmethod
+    def iter_report_data(report, user, filter_values=None, chunk_size=STREAM_CHUNK_SIZE):
+        """
+        Execute a report and return an iterator over its rows.
+
+        The streaming counterpart of ``get_report_data``: rows are fetched with
+        ``.iterator(chunk_size=...)`` (resolver reports prefetch per chunk) and
+        redacted as they are produced, so memory stays flat however large the
+        result. Permission and definition errors are raised here, before the
+        first row is read.
+        """
+        queryset, plan = DataService._prepare_query(report, user, filter_values)
+        if plan.has_resolver:
+            return DataService._iter_instance_query(
+                queryset, plan.fields, user, chunk_size=chunk_size,
+                hints=(plan.select_related, plan.prefetch_related),
+            )
+        return DataService._iter_query(queryset, plan.fields, user, chunk_size=chunk_size)
+
+    @staticmethod
+    def _prepare_query(report, user, filter_values=None):
+        """Permission-scoped, filtered and sorted queryset for a report.
+
+        The definition comes from the cached compiled plan (``compile_report``);
+        only the user's scoping and the runtime filter values are applied here.
+        Returns ``(queryset, plan)``.
+        """
         # Check if user has permission to run this report. Use the single
         # permission source of truth (permissions.can_view_report) rather than the
         # weaker Report.can_view, so the data path can't be looser than the views.
         if not can_view_report(user, report):
             raise PermissionDenied("You don't have permission to run this report")
-        
-        # Get the model and queryset
-        content_type = report.data_area.content_type
-        model = content_type.model_class()
-        queryset = model.objects.all()
+
+        plan = compile_report(report)
+        queryset = plan.model.objects.all()
         
         # Apply permission filters for the data
         queryset = DataService._apply_permission_filter(queryset, report.data_area, user)
         
-        # Build the query based on report definition
-        queryset = build_query_from_report(queryset, report, filter_values)
-        
-        # Get the fields to retrieve
-        fields = report.get_fields()
-
-        # Apply sorting. Resolver (computed) fields are not real DB columns, so
-        # they can't be used in an ORM order_by - skip them here.
-        sorts = report.get_sorts()
-        if sorts:
-            sort_params = []
-            for sort in sorts:
-                if getattr(sort.data_field, 'source_type', DataField.SOURCE_ORM) == DataField.SOURCE_RESOLVER:
-                    continue
-                field_path = sort.data_field.field_path
-                if sort.direction == 'desc':
-                    field_path = f"-{field_path}"
-                sort_params.append(field_path)
-
-            if sort_params:
-                queryset = queryset.order_by(*sort_params)
-
-        # If the report uses any computed (resolver) fields, we can't rely on
-        # .values() - fall back to iterating model instances and resolving each
-        # field in Python. Otherwise use the fast ORM path unchanged.
-        has_resolver = any(
-            getattr(f.data_field, 'source_type', DataField.SOURCE_ORM) == DataField.SOURCE_RESOLVER
-            for f in fields
-        )
-        if has_resolver:
-            return DataService._execute_instance_query(queryset, fields, user, extra_field_paths)
+        # Apply the report's filters with this run's prompt values
+        if plan.filters:
+            filter_q = build_filter_conditions(plan.filters, filter_values)
+            if filter_q:
+                queryset = queryset.filter(filter_q)
 
-        # Execute the query and return the results
-        return DataService._execute_query(queryset, fields, user, extra_field_paths)
+        if plan.sort_params:
+            queryset = queryset.order_by(*plan.sort_params)
+        return queryset, plan
     
     @staticmethod
     def _apply_permission_filter(queryset, data_area, user):
@@ -141,12 +160,9 @@ class DataService:
         # areas). This is the same guardian model the rest of the app enforces.
         cross_org = bool(user and user.has_perm('reporting.can_run_all_reports'))
         if not cross_org:
-            from jobtracker.models import OrganisationalUnit
-            from guardian.shortcuts import get_objects_for_user
+            from jobtracker.permission_scope import unit_ids
 
-            units = get_objects_for_user(
-                user, 'jobtracker.can_view_jobs', klass=OrganisationalUnit
-            )
+            units = unit_ids(user, 'jobtracker.can_view_jobs')
             if 'unit' in field_names:
                 queryset = queryset.filter(unit__in=units)
             elif 'job' in field_names:
@@ -183,6 +199,12 @@ class DataService:
         same rule the instance/resolver path applies via ``_field_visible``) so
         the fast ``.values()`` path can't leak protected columns.
         """
+        return list(DataService._iter_query(queryset, fields, user, extra_field_paths))
+
+    @staticmethod
+    def _iter_query(queryset, fields, user=None, extra_field_paths=None, chunk_size=None):
+        """Row iterator behind ``_execute_query``; with ``chunk_size`` the rows
+        are streamed from the database rather than fetched at once."""
         extra_field_paths = extra_field_paths or []
         AGGREGATION_MAP = {
             'count': Count,
@@ -192,6 +214,9 @@ class DataService:
             'max': Max,
         }
 
+        def fetch(results):
+            return results.iterator(chunk_size=chunk_size) if chunk_size else results
+
         # Separate fields into group-by and aggregated
         group_by_fields = []
         annotations = {}
@@ -200,54 +225,53 @@ class DataService:
         )
 
         if has_aggregation:
+            # (output key, source key, visible) per field, in field order
+            columns = []
             for field in fields:
                 field_path = field.data_field.field_path
+                visible = DataService._field_visible(field.data_field, user)
                 agg_func = getattr(field, 'aggregation_function', '')
                 if agg_func and agg_func in AGGREGATION_MAP:
                     # Create a unique alias for the annotation
                     alias = f"{agg_func}_{field_path}".replace('__', '_')
                     agg_class = AGGREGATION_MAP[agg_func]
                     annotations[alias] = agg_class(field_path)
+                    columns.append((alias, visible))
                 else:
                     group_by_fields.append(field_path)
+                    columns.append((field_path, visible))
 
             results = queryset.values(*group_by_fields).annotate(**annotations).order_by()
 
             # Reorder result keys to match the original field order, redacting
             # sensitive fields the user may not see.
-            ordered_results = []
-            for row in results:
-                ordered_row = {}
-                for field in fields:
-                    field_path = field.data_field.field_path
-                    visible = DataService._field_visible(field.data_field, user)
-                    agg_func = getattr(field, 'aggregation_function', '')
-                    if agg_func and agg_func in AGGREGATION_MAP:
-                        alias = f"{agg_func}_{field_path}".replace('__', '_')
-                        ordered_row[alias] = row.get(alias) if visible else None
-                    else:
-                        ordered_row[field_path] = row.get(field_path) if visible else None
-                ordered_results.append(ordered_row)
-            return ordered_results
-        else:
-            # No aggregation — original behaviour (plus any hidden extra paths)
-            field_paths = [field.data_field.field_path for field in fields]
-            for path in extra_field_paths:
-                if path not in field_paths:
-                    field_paths.append(path)
-            results = list(queryset.values(*field_paths))
-            # Redact sensitive columns the user may not see.
-            hidden = {
-                field.data_field.field_path
-                for field in fields
-                if not DataService._field_visible(field.data_field, user)
-            }
-            if hidden:
-                for row in results:
-                    for key in hidden:
-                        if key in row:
-                            row[key] = None
-            return results
+            def aggregated_rows():
+                for row in fetch(results):
+                    yield {key: row.get(key) if visible else None for key, visible in columns}
+            return aggregated_rows()
+
+        # No aggregation — original behaviour (plus any hidden extra paths)
+        field_paths = [field.data_field.field_path for field in fields]
+        for path in extra_field_paths:
+            if path not in field_paths:
+                field_paths.append(path)
+        results = queryset.values(*field_paths)
+        # Redact sensitive columns the user may not see.
+        hidden = {
+            field.data_field.field_path
+            for field in fields
+            if not DataService._field_visible(field.data_field, user)
+        }
+        if not hidden:
+            return iter(fetch(results))
+
+        def redacted_rows():
+            for row in fetch(results):
+                for key in hidden:
+                    if key in row:
+                        row[key] = None
+                yield row
+        return redacted_rows()
 
     @staticmethod
     def _field_visible(data_field, user):
@@ -279,7 +303,8 @@ class DataService:
         return value
 
     @staticmethod
-    def _execute_instance_query(queryset, fields, user, extra_field_paths=None):
+    def _execute_instance_query(queryset, fields, user, extra_field_paths=None, progress=None,
+                                hints=None):
         """Instance-resolution path for reports containing computed fields.
 
         Applies the union of every used resolver's select_related/prefetch_related
@@ -288,6 +313,23 @@ class DataService:
         callable, ORM fields via a Python getattr walk. Sensitive fields the user
         can't see are redacted to ``None``.
         """
+        rows = DataService._iter_instance_query(
+            queryset, fields, user, extra_field_paths, hints=hints
+        )
+        total = queryset.count() if progress else 0
+        results = []
+        for row in rows:
+            if progress and results and len(results) % PROGRESS_EVERY == 0:
+                progress(len(results), total)
+            results.append(row)
+        return results
+
+    @staticmethod
+    def _iter_instance_query(queryset, fields, user, extra_field_paths=None, chunk_size=None,
+                             hints=None):
+        """Row iterator behind ``_execute_instance_query``. With ``chunk_size``
+        instances are streamed and the resolvers' prefetches run per chunk.
+        ``hints`` is a compiled plan's ``(select_related, prefetch_related)``."""
         # Mixing GROUP BY / aggregation with per-instance resolvers is not
         # supported - the two execution models are incompatible.
         if any(getattr(f, 'aggregation_function', '') for f in fields):
@@ -298,14 +340,17 @@ class DataService:
         extra_field_paths = extra_field_paths or []
         display_paths = {f.data_field.field_path for f in fields}
 
-        select_related = set()
-        prefetch_related = set()
-        for f in fields:
-            if getattr(f.data_field, 'source_type', DataField.SOURCE_ORM) == DataField.SOURCE_RESOLVER:
-                resolver = REPORTING_RESOLVERS.get(f.data_field.resolver_key)
-                if resolver:
-                    select_related.update(resolver.select_related)
-                    prefetch_related.update(resolver.prefetch_related)
+        if hints is not None:
+            select_related, prefetch_related = set(hints[0]), set(hints[1])
+        else:
+            select_related = set()
+            prefetch_related = set()
+            for f in fields:
+                if getattr(f.data_field, 'source_type', DataField.SOURCE_ORM) == DataField.SOURCE_RESOLVER:
+                    resolver = REPORTING_RESOLVERS.get(f.data_field.resolver_key)
+                    if resolver:
+                        select_related.update(resolver.select_related)
+                        prefetch_related.update(resolver.prefetch_related)
         # select_related for the relation behind each hidden extra ORM path.
         for path in extra_field_paths:
             if '__' in path:
@@ -316,24 +361,28 @@ class DataService:
         if prefetch_related:
             queryset = queryset.prefetch_related(*prefetch_related)
 
+        # Resolve each column's getter once rather than per row.
+        columns = []
+        for f in fields:
+            data_field = f.data_field
+            key = data_field.field_path
+            if not DataService._field_visible(data_field, user):
+                columns.append((key, None))
+            elif getattr(data_field, 'source_type', DataField.SOURCE_ORM) == DataField.SOURCE_RESOLVER:
+                resolver = REPORTING_RESOLVERS.get(data_field.resolver_key)
+                columns.append((key, resolver.fn if resolver else None))
+            else:
+                columns.append((key, lambda instance, ctx, path=key: DataService._walk_path(instance, path)))
+        # Hidden extra paths (e.g. a split key) not already displayed.
+        extras = [path for path in extra_field_paths if path not in display_paths]
+
         ctx = {'user': user}
-        results = []
-        for instance in queryset:
-            row = {}
-            for f in fields:
-                data_field = f.data_field
-                key = data_field.field_path
-                if not DataService._field_visible(data_field, user):
-                    row[key] = None
-                    continue
-                if getattr(data_field, 'source_type', DataField.SOURCE_ORM) == DataField.SOURCE_RESOLVER:
-                    resolver = REPORTING_RESOLVERS.get(data_field.resolver_key)
-                    row[key] = resolver.fn(instance, ctx) if resolver else None
-                else:
-                    row[key] = DataService._walk_path(instance, data_field.field_path)
-            # Hidden extra paths (e.g. a split key) not already displayed.
-            for path in extra_field_paths:
-                if path not in display_paths:
+        instances = queryset.iterator(chunk_size=chunk_size) if chunk_size else queryset
+
+        def rows():
+            for instance in instances:
+                row = {key: getter(instance, ctx) if getter else None for key, getter in columns}
+                for path in extras:
                     row[path] = DataService._walk_path(instance, path)
-            results.append(row)
-        return results
\ No newline at end of file
+                yield row
+        return rows()
@@ -1,15 +1,31 @@
 import io
 import csv
 import json
-from django.http import HttpResponse, FileResponse
+from itertools import islice
+from asgiref.sync import sync_to_async
+from django.core.serializers.json import DjangoJSONEncoder
+from django.http import HttpResponse, FileResponse, StreamingHttpResponse
 from django.template.loader import render_to_string
 from django.utils.text import slugify
 from django.utils import timezone
 
+class _Echo:
+    """File-like object whose write() returns the value, so csv.writer can
+    produce lines for a streaming response."""
+
+    def write(self, value):
+        return value
+
+
 class ExportService:
     """
     Service for exporting report data to various formats
     """
+
+    # Formats stream_report can write row by row
+    STREAMING_FORMATS = ('csv', 'json')
+    # Chunks pulled per worker-thread hop when streaming to an ASGI server
+    ASYNC_BATCH_SIZE = 500
     
     @staticmethod
     def export_report(report, data, format_type=None):
@@ -28,6 +44,7 @@ class ExportService:
             'csv': ExportService.export_to_csv,
             'word': ExportService.export_to_word,
             'text': ExportService.export_to_text,
+            'json': ExportService.export_to_json,
         }
         
         # Use the selected export method or default to CSV if not found
@@ -43,6 +60,85 @@ class ExportService:
         # Call the export method
         return export_method(data, field_names, filename, report)
     
+    @staticmethod
+    def stream_report(report, rows, format_type, asynchronous=False):
+        """
+        Stream report rows as CSV or JSON without holding them all in memory
+
+        ``rows`` may be any iterable, e.g. ``DataService.iter_report_data``.
+        Pass ``asynchronous=True`` when serving under ASGI: Django consumes a
+        sync iterator there by materialising it whole, so the chunks are
+        wrapped in an async generator instead.
+        """
+        filename = f"{slugify(report.name)}_{timezone.now().strftime('%Y%m%d_%H%M%S')}"
+        field_names = [field.get_display_name() for field in report.get_fields()]
+        if format_type == 'json':
+            chunks = ExportService._json_chunks(rows, field_names)
+            content_type, extension = 'application/json', 'json'
+        else:
+            chunks = ExportService._csv_lines(rows, field_names)
+            content_type, extension = 'text/csv', 'csv'
+        if asynchronous:
+            chunks = ExportService._async_chunks(chunks)
+        response = StreamingHttpResponse(chunks, content_type=content_type)
+        response['Content-Disposition'] = f'attachment; filename="{filename}.{extension}"'
+        return response
+
+    @staticmethod
+    async def _async_chunks(chunks):
+        """Async generator over a sync chunk generator.
+
+        The generator (and the query iterator behind it) is advanced in the
+        request's sync thread, ``ASYNC_BATCH_SIZE`` chunks per hop, so the
+        database connection stays on one thread and the event loop is never
+        blocked on the query.
+        """
+        chunks = iter(chunks)
+        next_batch = sync_to_async(
+            lambda: list(islice(chunks, ExportService.ASYNC_BATCH_SIZE)),
+            thread_sensitive=True,
+        )
+        while True:
+            batch = await next_batch()
+            if not batch:
+                return
+            for chunk in batch:
+                yield chunk
+
+    @staticmethod
+    def _csv_lines(rows, field_names):
+        writer = csv.writer(_Echo())
+        yield writer.writerow(field_names)
+        for row in rows:
+            yield writer.writerow(row.values())
+
+    @staticmethod
+    def _json_rows(rows, field_names):
+        """Rows keyed by display name, as the JSON export writes them."""
+        for row in rows:
+            yield dict(zip(field_names, row.values()))
+
+    @staticmethod
+    def _json_chunks(rows, field_names):
+        yield '['
+        separator = ''
+        for row in ExportService._json_rows(rows, field_names):
+            yield separator + json.dumps(row, cls=DjangoJSONEncoder)
+            separator = ','
+        yield ']'
+
+    @staticmethod
+    def export_to_json(data, field_names, filename, report=None):
+        """
+        Export data to JSON format (a list of objects keyed by column name)
+        """
+        response = HttpResponse(
+            json.dumps(list(ExportService._json_rows(data, field_names)), cls=DjangoJSONEncoder),
+            content_type='application/json',
+        )
+        response['Content-Disposition'] = f'attachment; filename="{filename}.json"'
+        return response
+
     @staticmethod
     def export_to_excel(data, field_names, filename, report=None):
         """
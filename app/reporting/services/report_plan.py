@@ -0,0 +1,155 @@
+"""Compiled report definitions, cached per report version.
+
+Running a report needs its columns, filters, sorts and resolver hints, which
+otherwise cost a query per related row (data field, field type, filter type)
+on every run. :func:`compile_report` flattens them into a
+:class:`CompiledReport` of plain values and caches it under the report's id and
+``updated_at``. Only the user-specific scoping and the runtime filter values are
+applied per run.
+
+``updated_at`` is bumped whenever a report's fields, filters or sorts change, or
+a data field they use is edited (see ``reporting.signals``), so an edited report
+compiles a fresh plan.
+"""
+import hashlib
+import json
+from types import SimpleNamespace
+
+from django.apps import apps
+from django.core.cache import cache
+
+from ..models import DataField
+from ..resolvers import REPORTING_RESOLVERS
+
+PLAN_CACHE_TIMEOUT = 60 * 60
+_PLAN_KEY = "report_plan_{}_{}"
+
+AGGREGATION_FUNCTIONS = ('count', 'sum', 'avg', 'min', 'max')
+
+
+def _data_field(data_field):
+    """The parts of a DataField the data paths read, detached from the ORM."""
+    return SimpleNamespace(
+        field_path=data_field.field_path,
+        source_type=data_field.source_type,
+        resolver_key=data_field.resolver_key,
+        is_sensitive=data_field.is_sensitive,
+        requires_permission=data_field.requires_permission,
+        field_type=SimpleNamespace(django_field_type=data_field.field_type.django_field_type),
+    )
+
+
+class CompiledField:
+    """A report column: duck-types ``ReportField`` for the data paths."""
+
+    def __init__(self, report_field):
+        self.id = report_field.pk
+        self.data_field = _data_field(report_field.data_field)
+        self.aggregation_function = report_field.aggregation_function or ''
+        self.display_name = report_field.get_display_name()
+        if self.aggregation_function in AGGREGATION_FUNCTIONS:
+            # Result key of an aggregated column (see DataService._iter_query)
+            self.key = f"{self.aggregation_function}_{self.data_field.field_path}".replace('__', '_')
+        else:
+            self.key = self.data_field.field_path
+
+    def get_display_name(self):
+        return self.display_name
+
+
+def _compiled_filter(report_filter):
+    """A filter: duck-types ``ReportFilter`` for ``build_filter_conditions``."""
+    return SimpleNamespace(
+        id=report_filter.pk,
+        parent_filter_id=report_filter.parent_filter_id,
+        operator=report_filter.operator,
+        prompt_at_runtime=report_filter.prompt_at_runtime,
+        value=report_filter.value,
+        position=report_filter.position,
+        data_field=_data_field(report_filter.data_field),
+        filter_type=SimpleNamespace(
+            name=report_filter.filter_type.name,
+            operator=report_filter.filter_type.operator,
+        ),
+    )
+
+
+class CompiledReport:
+    """Everything about a report's definition a run needs, as plain values."""
+
+    def __init__(self, report):
+        content_type = report.data_area.content_type
+        self.report_id = report.pk
+        self.app_label = content_type.app_label
+        self.model_name = content_type.model
+
+        self.fields = [
+            CompiledField(f)
+            for f in report.get_fields().select_related('data_field__field_type')
+        ]
+        self.filters = [
+            _compiled_filter(f)
+            for f in report.get_filters().select_related(
+                'data_field__field_type', 'filter_type'
+            )
+        ]
+
+        # Resolver (computed) fields are not real DB columns, so they can't be
+        # used in an ORM order_by - skip them here.
+        self.sort_params = []
+        self.sorts = []
+        for sort in report.get_sorts().select_related('data_field'):
+            self.sorts.append([sort.data_field_id, sort.direction])
+            if sort.data_field.source_type == DataField.SOURCE_RESOLVER:
+                continue
+            path = sort.data_field.field_path
+            self.sort_params.append(f"-{path}" if sort.direction == 'desc' else path)
+
+        self.has_resolver = any(
+            f.data_field.source_type == DataField.SOURCE_RESOLVER for f in self.fields
+        )
+        self.has_aggregation = any(f.aggregation_function for f in self.fields)
+
+        # Union of the resolvers' select_related/prefetch_related hints
+        self.select_related = set()
+        self.prefetch_related = set()
+        for f in self.fields:
+            if f.data_field.source_type == DataField.SOURCE_RESOLVER:
+                resolver = REPORTING_RESOLVERS.get(f.data_field.resolver_key)
+                if resolver:
+                    self.select_related.update(resolver.select_related)
+                    self.prefetch_related.update(resolver.prefetch_related)
+
+        self.definition_hash = hashlib.sha256(
+            json.dumps(self._definition(report), default=str).encode()
+        ).hexdigest()
+
+    def _definition(self, report):
+        return {
+            'data_area': report.data_area_id,
+            'fields': [
+                [f.id, f.data_field.field_path, f.data_field.source_type,
+                 f.data_field.resolver_key, f.aggregation_function]
+                for f in self.fields
+            ],
+            'filters': [
+                [f.id, f.data_field.field_path, f.filter_type.operator, f.filter_type.name,
+                 f.value, f.prompt_at_runtime, f.parent_filter_id, f.operator, f.position]
+                for f in self.filters
+            ],
+            'sorts': self.sorts,
+        }
+
+    @property
+    def model(self):
+        return apps.get_model(self.app_label, self.model_name)
+
+
+def compile_report(report):
+    """The cached :class:`CompiledReport` for ``report``'s current version."""
+    key = _PLAN_KEY.format(report.pk, report.updated_at.timestamp())
+    plan = cache.get(key)
+    if plan is None:
+        plan = CompiledReport(report)
+        cache.set(key, plan, PLAN_CACHE_TIMEOUT)
+    return plan
@@ -0,0 +1,245 @@
+import hashlib
+import json
+import logging
+from datetime import timedelta
+
+from django.core.cache import cache
+from django.core.exceptions import PermissionDenied
+from django.db import transaction
+from django.utils import timezone
+
+from ..models import ReportRun
+from ..permissions import can_view_report
+from .data_service import DataService
+from .report_plan import compile_report
+
+logger = logging.getLogger(__name__)
+
+# How long a completed run's result is reused for an identical run
+RESULT_MAX_AGE = timedelta(minutes=15)
+# Finished runs are purged after this long
+RUN_RETENTION = timedelta(days=1)
+# Inline results larger than this are never stored for reuse
+STORE_MAX_ROWS = 5000
+
+_SEEN_KEY = "report_result_seen_{}"
+
+
+class RunService:
+    """
+    Queues, executes and reuses report runs (:class:`~reporting.models.ReportRun`).
+
+    A run's ``result_key`` hashes the report definition, the filter values and
+    the running user's permission scope, so two users who would see exactly the
+    same rows share one result, and editing the report or changing a user's
+    access never serves a stale one.
+    """
+
+    @staticmethod
+    def definition_hash(report):
+        """Hash of everything in a report's definition that shapes its rows."""
+        return compile_report(report).definition_hash
+
+    @staticmethod
+    def permission_scope(report, user):
+        """What ``user`` may see of ``report``'s data area, as a hashable value.
+
+        Mirrors ``DataService._apply_permission_filter`` and ``_field_visible``:
+        superusers share one scope, cross-org reporting accounts another, and
+        everyone else is keyed by the units they may view jobs in. Sensitive
+        fields the user can't see are part of the scope too.
+        """
+        model_class = report.data_area.content_type.model_class()
+        if hasattr(model_class, 'filter_by_user_permissions'):
+            # Bespoke scoping we can't characterise - never share.
+            rows = ['user', user.pk]
+        elif user.is_superuser:
+            rows = ['all']
+        elif user.has_perm('reporting.can_run_all_reports'):
+            rows = ['cross_org']
+        else:
+            from jobtracker.permission_scope import unit_ids
+
+            rows = ['units', sorted(unit_ids(user, 'jobtracker.can_view_jobs'))]
+        hidden = sorted(
+            f.id
+            for f in compile_report(report).fields
+            if not DataService._field_visible(f.data_field, user)
+        )
+        return [rows, hidden]
+
+    @staticmethod
+    def result_key(report, user, filter_values=None, extra_field_paths=None):
+        key = [
+            RunService.definition_hash(report),
+            sorted((str(k), str(v)) for k, v in (filter_values or {}).items()),
+            sorted(extra_field_paths or []),
+            RunService.permission_scope(report, user),
+        ]
+        return hashlib.sha256(json.dumps(key, default=str).encode()).hexdigest()
+
+    @staticmethod
+    def fresh_run(result_key, max_age=RESULT_MAX_AGE):
+        """The newest completed run for ``result_key`` within ``max_age``."""
+        return (
+            ReportRun.objects.filter(
+                result_key=result_key,
+                status=ReportRun.STATUS_COMPLETE,
+                completed_at__gte=timezone.now() - max_age,
+            )
+            .order_by('-completed_at')
+            .first()
+        )
+
+    @staticmethod
+    def enqueue(report, user, filter_values=None):
+        """Queue a background run, reusing a fresh or in-flight identical one."""
+        if not can_view_report(user, report):
+            raise PermissionDenied("You don't have permission to run this report")
+        key = RunService.result_key(report, user, filter_values)
+        run = RunService.fresh_run(key)
+        if run is None:
+            run = (
+                ReportRun.objects.filter(
+                    result_key=key,
+                    requested_by=user,
+                    status__in=[ReportRun.STATUS_QUEUED, ReportRun.STATUS_RUNNING],
+                )
+                .order_by('-created_at')
+                .first()
+            )
+        if run is None:
+            run = ReportRun.objects.create(
+                report=report,
+                requested_by=user,
+                filter_values=filter_values or {},
+                result_key=key,
+            )
+        return run
+
+    @staticmethod
+    def claim_next():
+        """Atomically claim the oldest queued run, or return None."""
+        with transaction.atomic():
+            run = (
+                ReportRun.objects.select_for_update(skip_locked=True)
+                .filter(status=ReportRun.STATUS_QUEUED)
+                .order_by('created_at')
+                .first()
+            )
+            if run is None:
+                return None
+            run.status = ReportRun.STATUS_RUNNING
+            run.started_at = timezone.now()
+            run.save(update_fields=['status', 'started_at'])
+        return run
+
+    @staticmethod
+    def execute(run):
+        """Execute a claimed run and store its result (or its error)."""
+        def progress(done, total):
+            if total:
+                ReportRun.objects.filter(pk=run.pk).update(
+                    progress=min(99, int(done * 100 / total))
+                )
+
+        try:
+            data = DataService.get_report_data(
+                run.report, run.requested_by, run.filter_values,
+                extra_field_paths=run.extra_field_paths, progress=progress,
+            )
+        except Exception as e:
+            logger.error(f"Report run {run.pk} failed: {e}", exc_info=True)
+            run.status = ReportRun.STATUS_FAILED
+            run.error_message = str(e)
+            run.completed_at = timezone.now()
+            run.save(update_fields=['status', 'error_message', 'completed_at'])
+            return run
+
+        run.set_data(data)
+        run.status = ReportRun.STATUS_COMPLETE
+        run.progress = 100
+        run.completed_at = timezone.now()
+        run.save(update_fields=['result', 'row_count', 'status', 'progress', 'completed_at'])
+        run.report.last_run_at = run.completed_at
+        run.report.save(update_fields=['last_run_at'])
+        return run
+
+    @staticmethod
+    def get_report_data(report, user, filter_values=None, extra_field_paths=None,
+                        max_age=RESULT_MAX_AGE):
+        """``DataService.get_report_data``, reusing a fresh identical result."""
+        data, _generated_at = RunService.get_report_result(
+            report, user, filter_values, extra_field_paths, max_age
+        )
+        return data
+
+    @staticmethod
+    def get_report_result(report, user, filter_values=None, extra_field_paths=None,
+                          max_age=RESULT_MAX_AGE):
+        """``(rows, generated_at)`` for a report, reusing a fresh identical result.
+
+        A result computed here is only stored as a completed run (for later
+        interactive, export or scheduled callers to reuse) when it is likely to
+        be reused - the same result was already asked for within
+        :data:`RESULT_MAX_AGE` - and has at most :data:`STORE_MAX_ROWS` rows.
+        ``max_age=None`` always re-executes.
+        """
+        if not can_view_report(user, report):
+            raise PermissionDenied("You don't have permission to run this report")
+        key = RunService.result_key(report, user, filter_values, extra_field_paths)
+        if max_age is not None:
+            run = RunService.fresh_run(key, max_age)
+            if run is not None:
+                return run.get_data(), run.completed_at
+
+        started = timezone.now()
+        data = DataService.get_report_data(
+            report, user, filter_values, extra_field_paths=extra_field_paths
+        )
+        completed = timezone.now()
+        # add() succeeds for the first request in the window (and returns None,
+        # storing nothing, if the cache is unavailable)
+        first_request = cache.add(
+            _SEEN_KEY.format(key), True, int(RESULT_MAX_AGE.total_seconds())
+        )
+        if first_request is False and len(data) <= STORE_MAX_ROWS:
+            run = ReportRun(
+                report=report,
+                requested_by=user,
+                filter_values=filter_values or {},
+                extra_field_paths=extra_field_paths or [],
+                result_key=key,
+                status=ReportRun.STATUS_COMPLETE,
+                progress=100,
+                started_at=started,
+                completed_at=completed,
+            )
+            run.set_data(data)
+            run.save()
+        return data, completed
+
+    @staticmethod
+    def iter_report_data(report, user, filter_values=None, max_age=RESULT_MAX_AGE):
+        """Rows to stream: a fresh identical result if there is one, else a
+        live ``DataService.iter_report_data`` iterator (not stored, so a large
+        export is never held in memory)."""
+        if max_age is not None:
+            if not can_view_report(user, report):
+                raise PermissionDenied("You don't have permission to run this report")
+            run = RunService.fresh_run(
+                RunService.result_key(report, user, filter_values), max_age
+            )
+            if run is not None:
+                return run.get_data()
+        return DataService.iter_report_data(report, user, filter_values)
+
+    @staticmethod
+    def purge(now=None):
+        """Delete finished runs past :data:`RUN_RETENTION`; returns the count."""
+        cutoff = (now or timezone.now()) - RUN_RETENTION
+        deleted, _ = ReportRun.objects.filter(
+            status__in=[ReportRun.STATUS_COMPLETE, ReportRun.STATUS_FAILED],
+            completed_at__lt=cutoff,
+        ).delete()
+        return deleted
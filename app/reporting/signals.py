@@ -0,0 +1,35 @@
+from django.db.models import Q
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+from django.utils import timezone
+
+from .models import DataField, Report, ReportField, ReportFilter, ReportSort
+
+
+def _touch(reports):
+    """Bump ``updated_at`` so the compiled plan cached for the old version
+    (reporting.services.report_plan) is no longer used."""
+    reports.update(updated_at=timezone.now())
+
+
+@receiver(post_save, sender=ReportField)
+@receiver(post_delete, sender=ReportField)
+@receiver(post_save, sender=ReportFilter)
+@receiver(post_delete, sender=ReportFilter)
+@receiver(post_save, sender=ReportSort)
+@receiver(post_delete, sender=ReportSort)
+def report_definition_changed(sender, instance, **kwargs):
+    _touch(Report.objects.filter(pk=instance.report_id))
+
+
+@receiver(post_save, sender=DataField)
+def data_field_changed(sender, instance, created, **kwargs):
+    if created:
+        return
+    _touch(
+        Report.objects.filter(
+            Q(fields__data_field=instance)
+            | Q(filters__data_field=instance)
+            | Q(sorts__data_field=instance)
+        )
+    )
@@ -13,8 +13,8 @@ from constance import config
 
 from chaotica_utils.models import User
 from .models import ScheduledReport
-from .services.data_service import DataService
 from .services.export_service import ExportService
+from .services.run_service import RunService
 
 logger = logging.getLogger(__name__)
 
@@ -43,6 +43,29 @@ _ATTACHMENT_META = {
 }
 
 
+class task_run_queued_reports(CronJobBase):
+    """Execute queued background report runs (see RunService.enqueue) and purge
+    old finished ones."""
+
+    RUN_EVERY_MINS = 1
+    # Stop claiming new runs after this long so ticks don't pile up
+    MAX_SECONDS = 50
+    schedule = Schedule(run_every_mins=RUN_EVERY_MINS)
+    code = 'reporting.task_run_queued_reports'
+
+    def do(self):
+        started = timezone.now()
+        executed = 0
+        while (timezone.now() - started).total_seconds() < self.MAX_SECONDS:
+            run = RunService.claim_next()
+            if run is None:
+                break
+            RunService.execute(run)
+            executed += 1
+        purged = RunService.purge()
+        return f"Executed {executed} report run(s), purged {purged}"
+
+
 class task_send_scheduled_reports(CronJobBase):
     """Send any due scheduled reports.
 
@@ -78,7 +101,8 @@ class task_send_scheduled_reports(CronJobBase):
         split_path = sched.split_by_field.field_path if sched.split_by_field_id else None
         extra = [split_path] if split_path and split_path not in display_paths else []
 
-        data = DataService.get_report_data(
+        # Reuses a fresh result for the same definition / filters / scope.
+        data = RunService.get_report_data(
             report, sched.run_as_user, sched.filter_overrides, extra_field_paths=extra
         )
 
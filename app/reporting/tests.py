@@ -1,6 +1,7 @@
 import datetime
 from decimal import Decimal
 from types import SimpleNamespace
+from unittest import mock
 
 from django.test import SimpleTestCase
 
@@ -263,3 +264,174 @@ class RunAsUserFormTests(TestCase):
         form = ScheduledReportForm(data={'run_as_user': self.superuser.pk})
         self.assertFalse(form.is_valid())
         self.assertIn('run_as_user', form.errors)
+
+
+class ReportRunTests(TestCase):
+    """Background runs: results are keyed by definition, filters and permission
+    scope, and an identical run reuses a fresh result."""
+
+    def setUp(self):
+        from django.contrib.contenttypes.models import ContentType
+        from jobtracker.models import Job
+        from reporting.models import DataArea, DataField, FieldType, Report, ReportField
+
+        ReportingScopingTests.setUp(self)
+        area = DataArea.objects.create(
+            name="Jobs", content_type=ContentType.objects.get_for_model(Job), model_name="Job",
+        )
+        title = DataField.objects.create(
+            data_area=area, name="title", field_path="title", display_name="Title",
+            field_type=FieldType.objects.create(name="Text", django_field_type="CharField"),
+        )
+        self.report = Report.objects.create(
+            name="Jobs", owner=self.superuser, data_area=area, is_private=False,
+        )
+        ReportField.objects.create(report=self.report, data_field=title, position=0)
+
+        from chaotica_utils.models import User
+        self.peer = User.objects.create_user(email="peer@test.com", password="pw12345")
+        assign_perm("jobtracker.can_view_jobs", self.peer, self.unit_a)
+        assign_perm("reporting.view_report", self.peer)
+        assign_perm("reporting.view_report", self.scoped_user)
+        self.peer = User.objects.get(pk=self.peer.pk)
+        self.scoped_user = User.objects.get(pk=self.scoped_user.pk)
+
+    def test_result_key_follows_permission_scope(self):
+        from reporting.services.run_service import RunService
+
+        key = RunService.result_key(self.report, self.scoped_user)
+        self.assertEqual(key, RunService.result_key(self.report, self.peer))
+        self.assertNotEqual(key, RunService.result_key(self.report, self.superuser))
+        self.assertNotEqual(key, RunService.result_key(self.report, self.scoped_user, {'1': 'x'}))
+
+    def test_queued_run_executes_and_is_reused(self):
+        from reporting.models import ReportRun
+        from reporting.services.run_service import RunService
+        from reporting.tasks import task_run_queued_reports
+
+        run = RunService.enqueue(self.report, self.scoped_user)
+        self.assertEqual(run.status, ReportRun.STATUS_QUEUED)
+        # Identical request while queued doesn't queue twice
+        self.assertEqual(RunService.enqueue(self.report, self.scoped_user).pk, run.pk)
+
+        task_run_queued_reports().do()
+        run.refresh_from_db()
+        self.assertEqual(run.status, ReportRun.STATUS_COMPLETE)
+        self.assertEqual(run.get_data(), [{'title': 'A'}])
+
+        # Same scope: the fresh result is served without re-running
+        self.assertEqual(RunService.enqueue(self.report, self.peer).pk, run.pk)
+        run.set_data([{'title': 'cached'}])
+        run.save(update_fields=['result', 'row_count'])
+        self.assertEqual(
+            RunService.get_report_data(self.report, self.peer), [{'title': 'cached'}]
+        )
+        self.assertEqual(
+            RunService.get_report_data(self.report, self.peer, max_age=None), [{'title': 'A'}]
+        )
+
+    def test_inline_result_stored_only_when_repeated_and_small(self):
+        from django.core.cache import cache
+        from django.test import override_settings
+        from jobtracker.tests.test_schedule_cache import LOCMEM
+        from reporting.models import ReportRun
+        from reporting.services import run_service
+        from reporting.services.run_service import RunService
+
+        with override_settings(CACHES=LOCMEM):
+            cache.clear()
+            data, generated_at = RunService.get_report_result(self.report, self.peer)
+            self.assertEqual(data, [{'title': 'A'}])
+            self.assertIsNotNone(generated_at)
+            self.assertFalse(ReportRun.objects.exists())
+
+            # Asked for again within the window: now worth keeping
+            RunService.get_report_data(self.report, self.peer)
+            run = ReportRun.objects.get()
+            _, reused_at = RunService.get_report_result(self.report, self.peer)
+            self.assertEqual(reused_at, run.completed_at)
+
+            # Too many rows to be worth storing
+            ReportRun.objects.all().delete()
+            with mock.patch.object(run_service, 'STORE_MAX_ROWS', 0):
+                RunService.get_report_data(self.report, self.peer)
+            self.assertFalse(ReportRun.objects.exists())
+
+    def test_iter_report_data_streams_scoped_rows(self):
+        rows = DataService.iter_report_data(self.report, self.scoped_user, chunk_size=1)
+        self.assertNotIsInstance(rows, list)
+        self.assertEqual(list(rows), [{'title': 'A'}])
+
+
+class StreamingExportTests(SimpleTestCase):
+    def _report(self):
+        field = SimpleNamespace(get_display_name=lambda: 'Title')
+        return SimpleNamespace(name='Jobs', get_fields=lambda: [field])
+
+    def test_csv_streams_header_then_rows(self):
+        from reporting.services.export_service import ExportService
+
+        rows = iter([{'title': 'A'}, {'title': 'B, C'}])
+        resp = ExportService.stream_report(self._report(), rows, 'csv')
+        self.assertEqual(
+            b''.join(resp.streaming_content).decode(), 'Title\r\nA\r\n"B, C"\r\n'
+        )
+
+    def test_json_streams_objects_keyed_by_column(self):
+        import json
+        from reporting.services.export_service import ExportService
+
+        rows = iter([{'title': datetime.date(2026, 1, 2)}])
+        resp = ExportService.stream_report(self._report(), rows, 'json')
+        self.assertEqual(
+            json.loads(b''.join(resp.streaming_content)), [{'Title': '2026-01-02'}]
+        )
+
+    def test_asynchronous_streams_async_iterator(self):
+        from asgiref.sync import async_to_sync
+        from reporting.services.export_service import ExportService
+
+        async def collect(resp):
+            return b''.join([chunk async for chunk in resp.streaming_content])
+
+        rows = iter([{'title': 'A'}, {'title': 'B'}])
+        with mock.patch.object(ExportService, 'ASYNC_BATCH_SIZE', 2):
+            resp = ExportService.stream_report(self._report(), rows, 'csv', asynchronous=True)
+            self.assertTrue(resp.is_async)
+            self.assertEqual(async_to_sync(collect)(resp).decode(), 'Title\r\nA\r\nB\r\n')
+
+
+from django.test import override_settings
+from jobtracker.tests.test_schedule_cache import LOCMEM
+
+
+@override_settings(CACHES=LOCMEM)
+class ReportPlanTests(TestCase):
+    def setUp(self):
+        from django.core.cache import cache
+
+        cache.clear()
+        ReportRunTests.setUp(self)
+        self.report.refresh_from_db()
+
+    def test_plan_is_compiled_once_per_version(self):
+        from reporting.services.report_plan import compile_report
+
+        plan = compile_report(self.report)
+        self.assertEqual([f.key for f in plan.fields], ['title'])
+        with self.assertNumQueries(0):
+            self.assertEqual(compile_report(self.report).definition_hash, plan.definition_hash)
+
+    def test_definition_change_compiles_a_new_plan(self):
+        from reporting.models import ReportSort
+        from reporting.services.report_plan import compile_report
+
+        before = compile_report(self.report)
+        ReportSort.objects.create(
+            report=self.report, data_field=self.report.fields.get().data_field, direction='desc',
+        )
+        self.report.refresh_from_db()
+        after = compile_report(self.report)
+        self.assertEqual(before.sort_params, [])
+        self.assertEqual(after.sort_params, ['-title'])
+        self.assertNotEqual(before.definition_hash, after.definition_hash)
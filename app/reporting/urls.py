@@ -10,6 +10,8 @@ urlpatterns = [
     path('reports/', reports.ReportListView.as_view(), name='report_list'),
     path('reports/<uuid:uuid>/', reports.ReportDetailView.as_view(), name='report_detail'),
     path('reports/<uuid:uuid>/run/', reports.run_report, name='run_report'),
+    path('reports/<uuid:uuid>/runs/<int:pk>/', reports.report_run, name='report_run'),
+    path('reports/<uuid:uuid>/runs/<int:pk>/status/', reports.report_run_status, name='report_run_status'),
     path('reports/<uuid:uuid>/delete/', reports.ReportDeleteView.as_view(), name='report_delete'),
     path('reports/<uuid:uuid>/favorite/', reports.toggle_favorite, name='toggle_favorite'),
     path('categories/create/', reports.create_category, name='create_category'),
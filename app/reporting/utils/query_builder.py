@@ -1,5 +1,4 @@
 from django.db.models import Q
-import json
 import operator
 import re
 from functools import reduce
@@ -26,26 +25,6 @@ def resolve_relative_date_token(value):
     return datetime.date.today() + delta if sign == '+' else datetime.date.today() - delta
 
 
-def build_query_from_report(queryset, report, filter_values=None):
-    """
-    Build a Django queryset based on a report definition
-
-    :param queryset: Base queryset to start with
-    :param report: Report model instance
-    :param filter_values: Dict of runtime filter values for prompts
-    :return: Modified queryset with filters applied
-    """
-    filter_values = filter_values or {}
-    
-    # Apply report filters
-    filters = report.get_filters()
-    if filters:
-        filter_q = build_filter_conditions(filters, filter_values)
-        if filter_q:
-            queryset = queryset.filter(filter_q)
-    
-    return queryset
-
 def build_filter_conditions(filters, runtime_values=None):
     """
     Build Django Q objects from filter conditions
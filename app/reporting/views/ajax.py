@@ -2,12 +2,14 @@ from django.http import JsonResponse, HttpResponseBadRequest
 from django.contrib.auth.decorators import login_required
 from django.views.decorators.http import require_POST, require_GET
 from django.shortcuts import get_object_or_404
+from itertools import islice
 import json
 
 from ..models import (
     DataArea, DataField, FilterType, Report, ReportField, ReportCategory
 )
 from ..services.data_service import DataService
+from ..services.report_plan import compile_report
 from ..permissions import can_view_report
 from ..utils.filter_utils import (
     get_filter_type_choices, get_dynamic_filter_values, get_filter_value_widget_type
@@ -295,7 +297,7 @@ def preview_report_data(request, uuid):
             return JsonResponse({'success': False, 'error': 'Permission denied'}, status=403)
 
         # Set a limit for the preview
-        limit = int(request.GET.get('limit', 10))
+        limit = max(1, int(request.GET.get('limit', 10)))
         
         # Get filter values from request
         filter_values = {}
@@ -304,16 +306,17 @@ def preview_report_data(request, uuid):
                 filter_id = key[7:]  # Remove 'filter_' prefix
                 filter_values[filter_id] = value
         
-        # Get a sample of data
-        data = DataService.get_report_data(report, request.user, filter_values)
-        
-        # Limit the results
-        if len(data) > limit:
-            data = data[:limit]
+        # Get a sample of data - only the first limit + 1 rows are read
+        data = list(islice(
+            DataService.iter_report_data(report, request.user, filter_values, chunk_size=limit + 1),
+            limit + 1,
+        ))
+        has_more = len(data) > limit
+        data = data[:limit]
         
         # Get field info
         fields = []
-        for field in report.get_fields():
+        for field in compile_report(report).fields:
             fields.append({
                 'id': field.id,
                 'name': field.get_display_name(),
@@ -324,7 +327,7 @@ def preview_report_data(request, uuid):
             'success': True,
             'fields': fields,
             'data': data,
-            'has_more': len(data) >= limit
+            'has_more': has_more
         })
         
     except Exception as e:
@@ -3,15 +3,16 @@ from django.urls import reverse
 from django.contrib.auth.decorators import login_required
 from django.contrib.auth.mixins import LoginRequiredMixin
 from django.contrib import messages
+from django.core.handlers.asgi import ASGIRequest
 from django.http import JsonResponse, HttpResponseRedirect, Http404
 from django.views.generic import ListView, DetailView, DeleteView
 from django.views.decorators.http import require_POST, require_safe, require_http_methods
 from django.db.models import Q
 import logging
 
-from ..models import Report, ReportCategory, ReportFilter
-from ..services.data_service import DataService
+from ..models import Report, ReportCategory, ReportFilter, ReportRun
 from ..services.export_service import ExportService
+from ..services.run_service import RunService, RESULT_MAX_AGE
 from ..permissions import (
     can_view_report, can_edit_report, can_delete_report, 
     ReportAccessMixin, ReportEditMixin, ReportDeleteMixin
@@ -133,6 +134,13 @@ class ReportDetailView(ReportAccessMixin, DetailView):
         return context
 
 
+def _result_max_age(request):
+    """``?refresh=1`` forces a re-run instead of reusing a fresh result."""
+    if request.GET.get('refresh') or request.POST.get('refresh'):
+        return None
+    return RESULT_MAX_AGE
+
+
 @login_required
 @require_http_methods(["GET", "POST"])
 def run_report(request, uuid):
@@ -164,7 +172,7 @@ def run_report(request, uuid):
         
         # Set export format if provided
         export_format = request.POST.get('export_format')
-        if export_format:
+        if export_format and not request.POST.get('background'):
             return export_report(request, uuid, export_format, filter_values)
     
     # Get any runtime filter prompts
@@ -177,10 +185,17 @@ def run_report(request, uuid):
             'runtime_filters': runtime_filters,
             'presentation_choices': Report.PRESENTATION_CHOICES if report.allow_presentation_choice else None,
         })
+
+    # Queue the run for the background runner instead of waiting on it
+    if request.POST.get('background'):
+        run = RunService.enqueue(report, request.user, filter_values)
+        return redirect(run.get_absolute_url())
     
-    # Run the report
+    # Run the report (a fresh identical result is reused unless refreshing)
     try:
-        data = DataService.get_report_data(report, request.user, filter_values)
+        data, generated_at = RunService.get_report_result(
+            report, request.user, filter_values, max_age=_result_max_age(request)
+        )
         
         # Set last_run_at datetime
         report.last_run_at = timezone.now()
@@ -206,6 +221,7 @@ def run_report(request, uuid):
         'report': report,
         'fields': fields,
         'data': data,
+        'generated_at': generated_at,
         'filter_values': filter_values,
         'runtime_filters': runtime_filters,
         'presentation_choices': Report.PRESENTATION_CHOICES if report.allow_presentation_choice else None,
@@ -234,9 +250,26 @@ def export_report(request, uuid, format_type, filter_values=None):
                 filter_id = key[7:]  # Remove 'filter_' prefix
                 filter_values[filter_id] = value
     
-    # Run the report
+    # CSV / JSON are streamed row by row rather than materialised
+    if format_type in ExportService.STREAMING_FORMATS:
+        try:
+            rows = RunService.iter_report_data(
+                report, request.user, filter_values, max_age=_result_max_age(request)
+            )
+        except Exception as e:
+            messages.error(request, f"Error running report: {str(e)}")
+            return redirect('reporting:report_detail', uuid=report.uuid)
+        report.last_run_at = timezone.now()
+        report.save(update_fields=['last_run_at'])
+        return ExportService.stream_report(
+            report, rows, format_type, asynchronous=isinstance(request, ASGIRequest)
+        )
+
+    # Run the report (a fresh identical result is reused unless refreshing)
     try:
-        data = DataService.get_report_data(report, request.user, filter_values)
+        data = RunService.get_report_data(
+            report, request.user, filter_values, max_age=_result_max_age(request)
+        )
         
         # Set last_run_at datetime
         report.last_run_at = timezone.now()
@@ -257,6 +290,76 @@ def export_report(request, uuid, format_type, filter_values=None):
         return redirect('reporting:report_detail', uuid=report.uuid)
 
 
+def _get_run(request, uuid, pk):
+    """A run of the report the user may see: their own, or a shared result
+    computed for exactly their permission scope."""
+    run = get_object_or_404(
+        ReportRun.objects.select_related('report'), pk=pk, report__uuid=uuid
+    )
+    if not can_view_report(request.user, run.report):
+        raise Http404
+    if run.requested_by_id != request.user.pk and not request.user.is_superuser:
+        key = RunService.result_key(
+            run.report, request.user, run.filter_values, run.extra_field_paths
+        )
+        if key != run.result_key:
+            raise Http404
+    return run
+
+
+@login_required
+@require_safe
+def report_run(request, uuid, pk):
+    """
+    Show a background run: its progress while pending, its results once complete
+    """
+    run = _get_run(request, uuid, pk)
+    report = run.report
+    if run.status == ReportRun.STATUS_FAILED:
+        messages.error(request, f"Error running report: {run.error_message}")
+        return redirect('reporting:report_detail', uuid=report.uuid)
+    if run.status != ReportRun.STATUS_COMPLETE:
+        return render(request, 'reporting/report_run_pending.html', {
+            'report': report,
+            'run': run,
+        })
+
+    export_format = request.GET.get('format')
+    if export_format:
+        try:
+            return ExportService.export_report(report, run.get_data(), export_format)
+        except Exception as e:
+            messages.error(request, f"Error exporting report: {str(e)}")
+            return redirect('reporting:report_detail', uuid=report.uuid)
+
+    return render(request, 'reporting/report_results.html', {
+        'report': report,
+        'fields': report.get_fields(),
+        'data': run.get_data(),
+        'generated_at': run.completed_at,
+        'filter_values': run.filter_values,
+        'runtime_filters': report.filters.filter(prompt_at_runtime=True),
+        'presentation_choices': Report.PRESENTATION_CHOICES if report.allow_presentation_choice else None,
+        'run': run,
+    })
+
+
+@login_required
+@require_safe
+def report_run_status(request, uuid, pk):
+    """
+    Poll a background run's progress
+    """
+    run = _get_run(request, uuid, pk)
+    return JsonResponse({
+        'status': run.status,
+        'progress': run.progress,
+        'row_count': run.row_count,
+        'finished': run.is_finished,
+        'url': run.get_absolute_url(),
+    })
+
+
 class ReportDeleteView(ReportDeleteMixin, DeleteView):
     """
     Delete a report